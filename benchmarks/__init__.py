@@ -0,0 +1,4 @@
+"""Performance benchmarks for grpcAPI.
+
+Each module is runnable on its own, e.g. ``python -m benchmarks.overhead``.
+"""
@@ -0,0 +1,79 @@
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from typing_extensions import Any, Awaitable, Callable, Dict, List, Optional
+
+from grpcAPI import __version__
+
+
+async def time_async(
+    call: Callable[[], Awaitable[Any]], number: int, repeat: int
+) -> List[float]:
+    """Run `call` `number` times per round and return seconds per call for each round"""
+    rounds: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            await call()
+        rounds.append((time.perf_counter() - start) / number)
+    return rounds
+
+
+def summarize(rounds: List[float]) -> Dict[str, float]:
+    return {
+        "ns_per_call": min(rounds) * 1e9,
+        "median_ns": statistics.median(rounds) * 1e9,
+    }
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "grpcapi": __version__,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+    }
+
+
+def write_json(path: Path, data: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def read_json(path: Path) -> Dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def find_regressions(
+    current: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    metric: str,
+    threshold: float,
+) -> List[Dict[str, Any]]:
+    """Compare `metric` of every case present in both result sets.
+
+    A case regresses when its current value exceeds the baseline value by
+    more than `threshold` percent.
+    """
+    regressions: List[Dict[str, Any]] = []
+    for name, result in current.items():
+        base: Optional[Dict[str, float]] = baseline.get(name)
+        if base is None or metric not in base or metric not in result:
+            continue
+        if base[metric] <= 0:
+            continue
+        change = (result[metric] - base[metric]) / base[metric] * 100.0
+        if change > threshold:
+            regressions.append(
+                {
+                    "case": name,
+                    "baseline": base[metric],
+                    "current": result[metric],
+                    "change_pct": round(change, 2),
+                }
+            )
+    return regressions
@@ -0,0 +1,115 @@
+"""Sequential vs process pool proto compilation of a synthetic app.
+
+    python -m benchmarks.compile_parallel --packages 100 --services 10
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from google.protobuf.wrappers_pb2 import StringValue
+from typing_extensions import Any, Callable, Dict, List, Optional
+
+from benchmarks._common import environment, write_json
+from grpcAPI.app import APIService
+from grpcAPI.build_proto import make_protos
+
+
+def make_handler(name: str) -> Callable[..., Any]:
+    """A handler named `name`, kept as an attribute of this module, so the
+    spawned compiler workers can unpickle it"""
+    handler = globals().get(name)
+    if handler is not None:
+        return handler
+
+    async def handler(request: StringValue) -> StringValue:
+        return request
+
+    handler.__name__ = name
+    handler.__qualname__ = name
+    globals()[name] = handler
+    return handler
+
+
+def __getattr__(name: str) -> Any:
+    # handlers are made on demand, when unpickled in a worker too
+    if name.startswith("method") and name[len("method") :].isdigit():
+        return make_handler(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def make_synthetic_services(
+    packages: int, services: int, methods: int, modules: int = 3
+) -> Dict[str, List[APIService]]:
+    """`packages` x `services` services with `methods` unary methods each"""
+    app: Dict[str, List[APIService]] = {}
+    for p in range(packages):
+        package = f"pack{p}"
+        service_list: List[APIService] = []
+        for s in range(services):
+            service = APIService(
+                f"service{s}",
+                package=package,
+                module=f"module{s % modules}",
+                comments=f"Synthetic service {s} of {package}",
+            )
+            for m in range(methods):
+                service(make_handler(f"method{m}"))
+            service_list.append(service)
+        app[package] = service_list
+    return app
+
+
+def time_compile(services: Dict[str, List[APIService]], workers: int) -> float:
+    start = time.perf_counter()
+    protos = list(make_protos(services, workers=workers))
+    elapsed = time.perf_counter() - start
+    assert protos, "synthetic app produced no protos"
+    return elapsed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.compile_parallel",
+        description=__doc__.splitlines()[0],
+    )
+    parser.add_argument("--packages", type=int, default=100)
+    parser.add_argument("--services", type=int, default=10, help="per package")
+    parser.add_argument("--methods", type=int, default=5, help="per service")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    args = parser.parse_args(argv)
+
+    services = make_synthetic_services(args.packages, args.services, args.methods)
+    sequential = time_compile(services, workers=1)
+    services = make_synthetic_services(args.packages, args.services, args.methods)
+    parallel = time_compile(services, workers=args.workers)
+
+    total = args.packages * args.services
+    print(f"{total} services, {total * args.methods} methods")
+    print(f"sequential          {sequential:8.3f} s")
+    print(f"parallel ({args.workers:>2} proc)  {parallel:8.3f} s")
+    print(f"speedup             {sequential / parallel:8.2f} x")
+
+    if args.json:
+        write_json(
+            args.json,
+            {
+                "benchmark": "compile_parallel",
+                "environment": environment(),
+                "packages": args.packages,
+                "services": total,
+                "methods": total * args.methods,
+                "workers": args.workers,
+                "sequential_s": sequential,
+                "parallel_s": parallel,
+                "speedup": sequential / parallel,
+            },
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
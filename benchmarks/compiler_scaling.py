@@ -0,0 +1,240 @@
+"""Proto compiler wall time and peak memory on synthetic apps of growing size.
+
+    python -m benchmarks.compiler_scaling --sizes 2x2x2x5 8x4x4x10 --repeat 3
+    python -m benchmarks.compiler_scaling --baseline results.json --threshold 20
+    python -m benchmarks.compiler_scaling --max-exponent 1.2
+
+Sizes are packages x modules x services per module x methods per service.
+"""
+
+import argparse
+import gc
+import math
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from typing_extensions import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks._common import environment, find_regressions, read_json, write_json
+from benchmarks.compile_parallel import make_handler
+from grpcAPI.app import APIPackage, App
+from grpcAPI.build_proto import make_protos, validate_signature_pass
+from grpcAPI.makeproto.build_service import compile_service
+from grpcAPI.makeproto.write_proto import write_protos
+from grpcAPI.service_proc.run_process_service import run_process_service
+
+Size = Tuple[int, int, int, int]
+
+DEFAULT_SIZES = ["1x2x2x5", "4x4x4x10", "16x4x8x10"]
+STAGES = ["run_process_service", "compile_service", "make_protos", "write_protos"]
+
+
+def parse_size(text: str) -> Size:
+    try:
+        packages, modules, services, methods = (int(n) for n in text.split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid size '{text}', expected PACKAGESxMODULESxSERVICESxMETHODS"
+        ) from None
+    return packages, modules, services, methods
+
+
+def size_name(size: Size) -> str:
+    return "x".join(str(n) for n in size)
+
+
+def method_count(size: Size) -> int:
+    return math.prod(size)
+
+
+def make_app(size: Size) -> App:
+    """An app built the way large apps are: packages of modules of services"""
+    packages, modules, services, methods = size
+    app = App()
+    for p in range(packages):
+        package = APIPackage(f"pack{p}")
+        for m in range(modules):
+            module = package.make_module(f"module{m}")
+            for s in range(services):
+                # service names are unique per package, not per module
+                service = module.make_service(
+                    f"{module.name}_service{s}",
+                    comments=f"Synthetic service {s} of {module.name}",
+                )
+                for n in range(methods):
+                    service(make_handler(f"method{n}"))
+        app.add_service(package)
+    return app
+
+
+def _stages(out_dir: Path) -> Dict[str, Callable[[App], Any]]:
+    def process(app: App) -> None:
+        run_process_service(app, {})
+
+    def compile_only(app: App) -> None:
+        protos = compile_service(app.services, custompassmethod=validate_signature_pass)
+        assert protos is not None, "synthetic app failed to compile"
+        list(protos)
+
+    def protos(app: App) -> None:
+        list(make_protos(app.services, workers=1))
+
+    def write(app: App) -> None:
+        with tempfile.TemporaryDirectory(dir=out_dir) as temp_dir:
+            write_protos(make_protos(app.services, workers=1), Path(temp_dir))
+
+    return {
+        "run_process_service": process,
+        "compile_service": compile_only,
+        "make_protos": protos,
+        "write_protos": write,
+    }
+
+
+def measure_stage(
+    size: Size, stage: Callable[[App], Any], repeat: int
+) -> Dict[str, float]:
+    """Seconds per round on a fresh app, then peak memory of one more round"""
+    timings: List[float] = []
+    for _ in range(repeat):
+        app = make_app(size)
+        gc.collect()
+        start = time.perf_counter()
+        stage(app)
+        timings.append(time.perf_counter() - start)
+
+    # tracemalloc slows allocations down, so memory is measured apart
+    app = make_app(size)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        stage(app)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(timings)
+    return {
+        "median_s": median,
+        "min_s": min(timings),
+        "us_per_method": median / method_count(size) * 1e6,
+        "peak_kib": peak / 1024,
+    }
+
+
+def scaling_exponents(
+    results: Dict[str, Dict[str, float]], sizes: List[Size], stage: str
+) -> List[float]:
+    """Growth of `stage` time between consecutive sizes, as the exponent k
+    of time ~ methods ** k. Linear scaling gives k = 1."""
+    exponents: List[float] = []
+    for small, large in zip(sizes, sizes[1:]):
+        ratio = method_count(large) / method_count(small)
+        before = results[f"{size_name(small)}/{stage}"]["median_s"]
+        after = results[f"{size_name(large)}/{stage}"]["median_s"]
+        if ratio <= 1 or before <= 0 or after <= 0:
+            continue
+        exponents.append(math.log(after / before) / math.log(ratio))
+    return exponents
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.compiler_scaling",
+        description=__doc__.splitlines()[0],
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=parse_size,
+        default=[parse_size(s) for s in DEFAULT_SIZES],
+        metavar="PxMxSxL",
+    )
+    parser.add_argument("--stage", action="append", choices=STAGES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    parser.add_argument("--baseline", type=Path, help="compare against these results")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=20.0,
+        help="percent increase of us_per_method that counts as a regression",
+    )
+    parser.add_argument(
+        "--max-exponent",
+        type=float,
+        help="fail when a stage grows faster than methods ** MAX_EXPONENT",
+    )
+    args = parser.parse_args(argv)
+
+    sizes: List[Size] = sorted(args.sizes, key=method_count)
+    stages = args.stage or STAGES
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        runners = _stages(Path(temp_dir))
+        for stage in stages:  # imports and caches filled on first use
+            runners[stage](make_app((1, 1, 1, 1)))
+        for size in sizes:
+            for stage in stages:
+                results[f"{size_name(size)}/{stage}"] = measure_stage(
+                    size, runners[stage], args.repeat
+                )
+
+    print(
+        f"{'size':<14}{'methods':>8}  {'stage':<22}{'median ms':>11}"
+        f"{'us/method':>11}{'peak KiB':>11}"
+    )
+    for size in sizes:
+        for stage in stages:
+            result = results[f"{size_name(size)}/{stage}"]
+            print(
+                f"{size_name(size):<14}{method_count(size):>8}  {stage:<22}"
+                f"{result['median_s'] * 1000:>11.1f}"
+                f"{result['us_per_method']:>11.1f}{result['peak_kib']:>11.0f}"
+            )
+    exponents = {stage: scaling_exponents(results, sizes, stage) for stage in stages}
+    too_steep: List[str] = []
+    for stage, values in exponents.items():
+        if values:
+            print(f"{stage:<22} scaling exponent {max(values):.2f}")
+            if args.max_exponent is not None and max(values) > args.max_exponent:
+                too_steep.append(stage)
+
+    if args.json:
+        write_json(
+            args.json,
+            {
+                "benchmark": "compiler_scaling",
+                "environment": environment(),
+                "repeat": args.repeat,
+                "sizes": [size_name(size) for size in sizes],
+                "results": results,
+                "scaling_exponents": exponents,
+            },
+        )
+
+    if args.baseline:
+        baseline = read_json(args.baseline)["results"]
+        regressions = find_regressions(
+            results, baseline, "us_per_method", args.threshold
+        )
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['case']}: "
+                f"{regression['baseline']:.1f} -> {regression['current']:.1f} "
+                f"us/method (+{regression['change_pct']}%)"
+            )
+        if regressions:
+            return 1
+    if too_steep:
+        print(f"SUPERLINEAR {', '.join(too_steep)}: exponent above {args.max_exponent}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""Per-call framework overhead of grpcAPI handlers.
+
+Every case handles the same request and is compared against a raw grpcio
+style handler, so the reported ``ratio`` isolates what the runner,
+dependency injection and validation add on top of the user function.
+
+    python -m benchmarks.overhead --json results.json
+    python -m benchmarks.overhead --baseline results.json --threshold 15
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import sys
+from pathlib import Path
+
+from google.protobuf.wrappers_pb2 import StringValue
+from typing_extensions import (
+    Annotated,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+)
+
+from benchmarks._common import (
+    environment,
+    find_regressions,
+    read_json,
+    summarize,
+    time_async,
+    write_json,
+)
+from grpcAPI.datatypes import AsyncContext, Depends, FromRequest
+from grpcAPI.make_method import make_stream_runner, make_unary_runner
+from grpcAPI.typehint_proto import inject_proto_typing
+
+STREAM_MESSAGES = 10
+
+BenchCase = Callable[[Any, Any], Awaitable[Any]]
+
+
+def make_depends_chain(depth: int) -> Callable[..., int]:
+    """Build `depth` nested dependencies, each one depending on the previous"""
+
+    def dep_0() -> int:
+        return 0
+
+    dep = dep_0
+    for _ in range(depth - 1):
+
+        def dep(value: int = Depends(dep)) -> int:  # noqa: B008
+            return value + 1
+
+    return dep
+
+
+def unary_call(handler: Callable[..., Any]) -> BenchCase:
+    async def call(request: Any, context: Any) -> Any:
+        return await handler(request, context)
+
+    return call
+
+
+def stream_call(handler: Callable[..., Any]) -> BenchCase:
+    async def call(request: Any, context: Any) -> Any:
+        async for _ in handler(request, context):
+            pass
+
+    return call
+
+
+def build_cases() -> Dict[str, BenchCase]:
+    inject_proto_typing(StringValue)
+    no_deps: Dict[Callable[..., Any], Callable[..., Any]] = {}
+
+    async def raw_unary(request: StringValue, context: Any) -> StringValue:
+        return StringValue(value=request.value)
+
+    async def raw_stream(
+        request: StringValue, context: Any
+    ) -> AsyncIterator[StringValue]:
+        for _ in range(STREAM_MESSAGES):
+            yield StringValue(value=request.value)
+
+    async def plain(request: StringValue) -> StringValue:
+        return StringValue(value=request.value)
+
+    async def from_request(
+        value: Annotated[str, FromRequest(StringValue)],
+        context: AsyncContext,
+    ) -> StringValue:
+        return StringValue(value=value)
+
+    async def validated(
+        value: Annotated[
+            str,
+            FromRequest(
+                StringValue, min_length=1, max_length=64, pattern=r"^[a-z]+$"
+            ),
+        ],
+    ) -> StringValue:
+        return StringValue(value=value)
+
+    def depends_handler(depth: int) -> Callable[..., Any]:
+        chain = make_depends_chain(depth)
+
+        async def handler(
+            request: StringValue, value: int = Depends(chain)  # noqa: B008
+        ) -> StringValue:
+            return StringValue(value=request.value)
+
+        return handler
+
+    async def streaming(request: StringValue) -> AsyncIterator[StringValue]:
+        for _ in range(STREAM_MESSAGES):
+            yield StringValue(value=request.value)
+
+    def unary(func: Callable[..., Any]) -> BenchCase:
+        return unary_call(make_unary_runner(func, no_deps, {}, StringValue))
+
+    return {
+        "raw_unary": unary_call(raw_unary),
+        "unary_no_deps": unary(plain),
+        "unary_from_request": unary(from_request),
+        "unary_validation": unary(validated),
+        "unary_depends_1": unary(depends_handler(1)),
+        "unary_depends_5": unary(depends_handler(5)),
+        "unary_depends_10": unary(depends_handler(10)),
+        "raw_stream": stream_call(raw_stream),
+        "stream_no_deps": stream_call(
+            make_stream_runner(streaming, no_deps, {}, StringValue)
+        ),
+    }
+
+
+def reference_case(name: str) -> str:
+    return "raw_stream" if name.startswith(("raw_stream", "stream_")) else "raw_unary"
+
+
+async def run_cases(
+    cases: Dict[str, BenchCase], number: int, repeat: int
+) -> Dict[str, Dict[str, float]]:
+    request = StringValue(value="benchmark")
+    results: Dict[str, Dict[str, float]] = {}
+    for name, case in cases.items():
+
+        async def call(case: BenchCase = case) -> Any:
+            return await case(request, None)
+
+        await call()  # warm up lazily built state
+        results[name] = summarize(await time_async(call, number, repeat))
+
+    for name, result in results.items():
+        ref = results.get(reference_case(name))
+        if ref is None:
+            continue
+        result["overhead_ns"] = result["ns_per_call"] - ref["ns_per_call"]
+        result["ratio"] = result["ns_per_call"] / ref["ns_per_call"]
+    return results
+
+
+def select_cases(
+    cases: Dict[str, BenchCase], patterns: Optional[List[str]]
+) -> Dict[str, BenchCase]:
+    if not patterns:
+        return cases
+    selected = {
+        name: case
+        for name, case in cases.items()
+        if any(fnmatch.fnmatch(name, p) for p in patterns)
+    }
+    # references are always measured so ratios stay meaningful
+    for name in list(selected):
+        ref = reference_case(name)
+        selected.setdefault(ref, cases[ref])
+    return selected
+
+
+def print_results(results: Dict[str, Dict[str, float]]) -> None:
+    print(f"{'case':<22}{'ns/call':>12}{'overhead ns':>14}{'ratio':>9}")
+    for name, result in results.items():
+        print(
+            f"{name:<22}{result['ns_per_call']:>12.0f}"
+            f"{result.get('overhead_ns', 0.0):>14.0f}"
+            f"{result.get('ratio', 1.0):>9.2f}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.overhead", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--number", type=int, default=2000, help="calls per round")
+    parser.add_argument("--repeat", type=int, default=5, help="rounds per case")
+    parser.add_argument("--case", action="append", help="fnmatch case filter")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    parser.add_argument("--baseline", type=Path, help="results file to compare to")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="allowed overhead ratio increase over the baseline, in percent",
+    )
+    args = parser.parse_args(argv)
+
+    cases = select_cases(build_cases(), args.case)
+    results = asyncio.run(run_cases(cases, args.number, args.repeat))
+    print_results(results)
+
+    if args.json:
+        write_json(
+            args.json,
+            {
+                "benchmark": "overhead",
+                "environment": environment(),
+                "number": args.number,
+                "repeat": args.repeat,
+                "results": results,
+            },
+        )
+
+    if args.baseline:
+        baseline = read_json(args.baseline)["results"]
+        regressions = find_regressions(results, baseline, "ratio", args.threshold)
+        for reg in regressions:
+            print(
+                f"REGRESSION {reg['case']}: ratio {reg['baseline']:.2f} -> "
+                f"{reg['current']:.2f} (+{reg['change_pct']}%)"
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
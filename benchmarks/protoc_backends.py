@@ -0,0 +1,119 @@
+"""Subprocess vs in-process protoc over a synthetic proto tree.
+
+    python -m benchmarks.protoc_backends --files 50 --repeat 5
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from typing_extensions import Dict, List, Optional
+
+from benchmarks._common import environment, write_json
+from grpcAPI.protoc.compile import BACKENDS, compile_protoc
+
+
+def make_proto_tree(root: Path, files: int, messages: int = 5) -> None:
+    """`files` protos importing a shared one and a well known type"""
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "common.proto").write_text(
+        'syntax = "proto3";\npackage common;\nmessage Id { string value = 1; }\n'
+    )
+    for f in range(files):
+        body = "\n".join(
+            f"message Msg{m} {{ common.Id id = 1; "
+            f"google.protobuf.Timestamp at = 2; repeated string tags = 3; }}"
+            for m in range(messages)
+        )
+        (root / f"file{f}.proto").write_text(
+            f'syntax = "proto3";\npackage pack{f};\nimport "common.proto";\n'
+            f'import "google/protobuf/timestamp.proto";\n{body}\n'
+            f"service Service{f} {{ rpc call(Msg0) returns (Msg1); }}\n"
+        )
+
+
+def time_backend(
+    root: Path, backend: str, repeat: int, per_file: bool, mypy_stubs: bool
+) -> List[float]:
+    """Seconds per round. `per_file` runs protoc once per file, as a build
+    or test pipeline compiling files one at a time would."""
+    files = sorted(p.name for p in root.glob("*.proto"))
+    batches = [[name] for name in files] if per_file else [files]
+    timings: List[float] = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as out_dir:
+            start = time.perf_counter()
+            for batch in batches:
+                compile_protoc(
+                    root,
+                    Path(out_dir),
+                    clss=True,
+                    services=True,
+                    mypy_stubs=mypy_stubs,
+                    files=batch,
+                    backend=backend,
+                )
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.protoc_backends",
+        description=__doc__.splitlines()[0],
+    )
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--mypy-stubs", action="store_true", help="add --mypy_out")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir) / "proto"
+        make_proto_tree(root, args.files)
+        for mode in ("batch", "per_file"):
+            for backend in BACKENDS:
+                timings = time_backend(
+                    root, backend, args.repeat, mode == "per_file", args.mypy_stubs
+                )
+                results[f"{mode}_{backend}"] = {
+                    "median_s": statistics.median(timings),
+                    "min_s": min(timings),
+                }
+
+    print(f"{'case':<24}{'median ms':>12}{'min ms':>10}")
+    for name, result in results.items():
+        print(
+            f"{name:<24}{result['median_s'] * 1000:>12.1f}"
+            f"{result['min_s'] * 1000:>10.1f}"
+        )
+    speedup: Dict[str, float] = {}
+    for mode in ("batch", "per_file"):
+        speedup[mode] = (
+            results[f"{mode}_subprocess"]["median_s"]
+            / results[f"{mode}_inprocess"]["median_s"]
+        )
+        print(f"{mode + ' speedup':<24}{speedup[mode]:>12.2f} x")
+
+    if args.json:
+        write_json(
+            args.json,
+            {
+                "benchmark": "protoc_backends",
+                "environment": environment(),
+                "files": args.files,
+                "repeat": args.repeat,
+                "mypy_stubs": args.mypy_stubs,
+                "results": results,
+                "speedup": speedup,
+            },
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Registration time, memory and lookup cost of the service registry.
+
+    python -m benchmarks.registry --methods 10000 --per-service 10
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from typing_extensions import Any, Callable, Dict, List, Optional
+
+from benchmarks._common import environment, write_json
+from benchmarks.compile_parallel import make_handler
+from grpcAPI.app import APIPackage, APIService, App
+from grpcAPI.label_method import LabeledMethod
+
+SERVICES_PER_MODULE = 10
+MODULES_PER_PACKAGE = 10
+
+
+def build_app(methods: int, per_service: int) -> App:
+    """An app with `methods` methods, `per_service` per service, added one
+    package at a time as decorators would"""
+    app = App()
+    services = max(1, methods // per_service)
+    per_package = SERVICES_PER_MODULE * MODULES_PER_PACKAGE
+    package: Optional[APIPackage] = None
+    for s in range(services):
+        if s % per_package == 0:
+            package = APIPackage(f"pack{s // per_package}")
+            app.add_service(package)
+        assert package is not None
+        module = f"module{s // SERVICES_PER_MODULE % MODULES_PER_PACKAGE}"
+        service = package.make_service(f"service{s}", module=module)
+        for m in range(per_service):
+            service(make_handler(f"method{m}"))
+    app.services  # adds the packages to the registry
+    return app
+
+
+def time_per_call(call: Callable[[], Any], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        call()
+    return (time.perf_counter() - start) / number
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.registry",
+        description=__doc__.splitlines()[0],
+    )
+    parser.add_argument("--methods", type=int, default=10_000)
+    parser.add_argument("--per-service", type=int, default=10)
+    parser.add_argument("--number", type=int, default=1000, help="lookups timed")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    args = parser.parse_args(argv)
+
+    gc.collect()
+    start = time.perf_counter()
+    app = build_app(args.methods, args.per_service)
+    registration = time.perf_counter() - start
+    del app
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        app = build_app(args.methods, args.per_service)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    service_list = list(app.service_list)
+    last = service_list[-1]
+    assert isinstance(last, APIService)
+    method = last.methods[-1]
+    lookups: Dict[str, float] = {
+        "services": time_per_call(lambda: app.services, args.number),
+        "service_list": time_per_call(lambda: app.service_list, args.number),
+        "service.methods": time_per_call(lambda: last.methods, args.number),
+        "get_service": time_per_call(
+            lambda: app.get_service(last.package, last.name), args.number
+        ),
+        "get_method": time_per_call(
+            lambda: app.get_method(last.package, last.name, method.name), args.number
+        ),
+    }
+    methods = sum(len(s.methods) for s in service_list)
+    results: Dict[str, Any] = {
+        "services": len(service_list),
+        "methods": methods,
+        "registration_s": registration,
+        "registration_us_per_method": registration / methods * 1e6,
+        "retained_kib": retained / 1024,
+        "peak_kib": peak / 1024,
+        "bytes_per_method": retained / methods,
+        "labeled_method_bytes": sys.getsizeof(method),
+        "labeled_method_slotted": not hasattr(method, "__dict__")
+        and isinstance(method, LabeledMethod),
+        "lookup_ns": {name: t * 1e9 for name, t in lookups.items()},
+    }
+
+    print(f"{results['services']} services, {methods} methods")
+    print(
+        f"registration      {registration * 1000:10.1f} ms"
+        f"  ({results['registration_us_per_method']:.1f} us/method)"
+    )
+    print(
+        f"memory            {results['retained_kib']:10.0f} KiB"
+        f"  ({results['bytes_per_method']:.0f} B/method, "
+        f"peak {results['peak_kib']:.0f} KiB)"
+    )
+    for name, ns in results["lookup_ns"].items():
+        print(f"{name:<18}{ns:10.0f} ns")
+
+    if args.json:
+        write_json(
+            args.json,
+            {
+                "benchmark": "registry",
+                "environment": environment(),
+                "results": results,
+            },
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
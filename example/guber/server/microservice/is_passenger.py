@@ -1,28 +1,21 @@
-from pathlib import Path
+from typing import Awaitable, Callable
 
-from example.guber.client.channel import get_async_channel
-from grpcAPI.commands.settings.utils import load_file_by_extension
-from grpcAPI.protobuf import BoolValue, StringValue
+from example.guber.server.app import app
+from example.guber.server.application.usecase.account import account_services
+from grpcAPI import Depends
+from grpcAPI.client import ServiceClient
+from grpcAPI.protobuf import StringValue
 
-MICROSERVICE_PATH = Path(__file__).parent / "account.config.json"
-guber_settings = load_file_by_extension(MICROSERVICE_PATH)
+# "account" is resolved from the "client" settings of the ride server; the
+# channels are opened once, reused by every call and closed on shutdown
+account_client = app.channel_pool.dependency(account_services, "account")
 
-ACCOUNT_HOST = guber_settings.get("host", "localhost")
-ACCOUNT_PORT = str(guber_settings.get("port", 50051))
 
-
-def is_passenger_client():
+def is_passenger_client(
+    account: ServiceClient = Depends(account_client),
+) -> Callable[[str], Awaitable[bool]]:
     async def is_passenger_client_(id: str) -> bool:
-
-        async with get_async_channel(ACCOUNT_HOST, ACCOUNT_PORT) as channel:
-            method_name = "/account.account_services/is_passenger"
-            stub = channel.unary_unary(
-                method_name,
-                request_serializer=StringValue.SerializeToString,
-                response_deserializer=BoolValue.FromString,
-            )
-            request = StringValue(value=id)
-            response = await stub(request)
-            return response.value
+        response = await account.is_passenger(StringValue(value=id))
+        return response.value
 
     return is_passenger_client_
@@ -2,6 +2,7 @@ from grpcAPI._version import __version__
 from grpcAPI.app import APIModule, APIPackage, APIService, GrpcAPI
 from grpcAPI.datatypes import (
     AsyncContext,
+    Batch,
     Depends,
     ExceptionRegistry,
     FromContext,
@@ -10,6 +11,7 @@ from grpcAPI.datatypes import (
 
 __all__ = [
     "AsyncContext",
+    "Batch",
     "ExceptionRegistry",
     "__version__",
     "FromRequest",
@@ -1,10 +1,55 @@
 import grpc
-from typing_extensions import Any, Callable, Dict, Mapping, Tuple
+from typing_extensions import Any, Callable, Dict, Iterable, Mapping, Tuple, Union
 
 from grpcAPI import ExceptionRegistry
 from grpcAPI.make_method import make_method_async
 from grpcAPI.makeproto import ILabeledMethod, IService
 from grpcAPI.server import ServerWrapper
+from grpcAPI.startup_report import measure
+
+
+class LazyPolicy:
+    """
+    Which methods get their handler built on the first call instead of at
+    startup. Methods in `warm`, named "package.Service" or
+    "package.Service.method", and methods tagged with one of `eager_tags`
+    are always built at startup; methods tagged with one of `lazy_tags` are
+    always built on first call; the others follow `lazy`.
+    """
+
+    def __init__(
+        self,
+        lazy: bool = False,
+        warm: Iterable[str] = (),
+        eager_tags: Iterable[str] = (),
+        lazy_tags: Iterable[str] = (),
+    ) -> None:
+        self.lazy = lazy
+        self.warm = set(warm)
+        self.eager_tags = set(eager_tags)
+        self.lazy_tags = set(lazy_tags)
+
+    @classmethod
+    def from_settings(cls, settings: Mapping[str, Any]) -> "LazyPolicy":
+        return cls(
+            lazy=settings.get("lazy", False),
+            warm=settings.get("warm", []),
+            eager_tags=settings.get("eager_tags", []),
+            lazy_tags=settings.get("lazy_tags", []),
+        )
+
+    def __call__(self, method: ILabeledMethod) -> bool:
+        service = (
+            f"{method.package}.{method.service}" if method.package else method.service
+        )
+        if service in self.warm or f"{service}.{method.name}" in self.warm:
+            return False
+        tags = set(method.tags)
+        if tags & self.eager_tags:
+            return False
+        if tags & self.lazy_tags:
+            return True
+        return self.lazy
 
 
 def add_to_server(
@@ -12,22 +57,27 @@ def add_to_server(
     server: ServerWrapper,
     overrides: Dict[Callable[..., Any], Callable[..., Any]],
     exception_registry: ExceptionRegistry,
+    lazy: Union[bool, Callable[[ILabeledMethod], bool]] = False,
 ) -> Mapping[str, Callable[..., Any]]:
 
     rpc_method_handlers: Dict[str, Any] = {}
     methods: Dict[str, Callable[..., Any]] = {}
     for method in service.methods:
         key = method.name
-        handler = get_handler(method)
-        tgt_method = make_method_async(method, overrides, exception_registry)
-
-        methods[key] = tgt_method
-        req_des, resp_ser = get_deserializer_serializer(method)
-        rpc_method_handlers[key] = handler(
-            tgt_method,
-            request_deserializer=req_des,
-            response_serializer=resp_ser,
-        )
+        with measure(f"{service.qual_name}.{key}", "method"):
+            handler = get_handler(method)
+            is_lazy = lazy(method) if callable(lazy) else lazy
+            tgt_method = make_method_async(
+                method, overrides, exception_registry, lazy=is_lazy
+            )
+
+            methods[key] = tgt_method
+            req_des, resp_ser = get_deserializer_serializer(method)
+            rpc_method_handlers[key] = handler(
+                tgt_method,
+                request_deserializer=req_des,
+                response_serializer=resp_ser,
+            )
     service_name = service.qual_name
     generic_handler = grpc.method_handlers_generic_handler(
         service_name, rpc_method_handlers
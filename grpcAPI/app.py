@@ -4,24 +4,34 @@ from collections import defaultdict
 from grpc import aio
 from typing_extensions import (
     Any,
-    AsyncGenerator,
+    AsyncContextManager,
     Callable,
     DefaultDict,
     Dict,
     Iterable,
     List,
     Mapping,
-    Never,
     Optional,
+    Tuple,
     Type,
     Union,
 )
 
+from grpcAPI.batch import (
+    BATCH_CONCURRENCY,
+    DEFAULT_CONCURRENCY,
+    batch_method_name,
+    check_batchable,
+    make_batch_method,
+)
+from grpcAPI.client import CallPolicy, ChannelPool
 from grpcAPI.datatypes import AsyncContext, ExceptionRegistry
 from grpcAPI.label_method import make_labeled_method
 from grpcAPI.makeproto import ILabeledMethod, IService
 from grpcAPI.service_proc import ProcessService
 from grpcAPI.singleton import SingletonMeta
+from grpcAPI.stream_batch import batch_options
+from grpcAPI.stream_buffer import buffer_size
 
 Interceptor = aio.ServerInterceptor
 
@@ -86,11 +96,16 @@ class APIPackage(MetaData):
         comments: Optional[List[str]] = None,
     ):
         self.modules: List[APIModule] = []
+        self._modules_by_name: Dict[str, APIModule] = {}
         super().__init__(name, options, comments)
 
     def get_module(self, name: str) -> Optional[APIModule]:
-        for module in self.modules:
+        module = self._modules_by_name.get(name)
+        if module is not None and module.name == name:
+            return module
+        for module in self.modules:  # renamed, or appended to `modules`
             if module.name == name:
+                self._modules_by_name[name] = module
                 return module
         return None
 
@@ -109,6 +124,7 @@ class APIPackage(MetaData):
             options=list(set(options + self.options)),
         )
         self.modules.append(module)
+        self._modules_by_name.setdefault(module_name, module)
         return module
 
     def make_service(
@@ -162,12 +178,36 @@ class APIService(IService):
         self.module_level_comments = module_level_comments or []
         self.module_level_imports = module_level_imports or []
         self.__methods: List[ILabeledMethod] = []
+        self.__by_name: Dict[str, ILabeledMethod] = {}
+        self.__active: Optional[List[ILabeledMethod]] = None
+        # batchable methods whose batch method is not added yet
+        self.__batchable: List[ILabeledMethod] = []
+        # set by the app of the service, to add their batch methods
+        self._on_batchable: Optional[Callable[[], None]] = None
         self.active = True
         self.meta = kwargs
 
     @property
     def methods(self) -> List[ILabeledMethod]:
-        return [m for m in self.__methods if m.active]
+        """Active methods. The list is cached until a method is registered or
+        (de)activated, so it must not be modified."""
+        if self.__active is None:
+            self.__active = [m for m in self.__methods if m.active]
+        return self.__active
+
+    def _invalidate_methods(self) -> None:
+        self.__active = None
+
+    def get_method(self, name: str) -> Optional[ILabeledMethod]:
+        """Registered method named `name`, active or not"""
+        method = self.__by_name.get(name)
+        if method is not None and method.name == name:
+            return method
+        for method in self.__methods:  # renamed after registration
+            if method.name == name:
+                self.__by_name[name] = method
+                return method
+        return None
 
     @property
     def qual_name(self) -> str:
@@ -190,6 +230,9 @@ class APIService(IService):
     ) -> Callable[..., Any]:
         comment = comment or func.__doc__ or ""
         title = title or func.__name__
+        # fail on an invalid timeout, retry, hedging or stream options
+        CallPolicy.from_meta(kwargs)
+        batch_options(kwargs)
 
         labeled_method = make_labeled_method(
             title,
@@ -206,9 +249,38 @@ class APIService(IService):
             meta=kwargs,
         )
 
-        self.__methods.append(labeled_method)
+        buffer_size(labeled_method)
+        if kwargs.get("batchable"):
+            concurrency = kwargs.get(BATCH_CONCURRENCY, DEFAULT_CONCURRENCY)
+            check_batchable(labeled_method, concurrency)
+            self._check_free(batch_method_name(labeled_method.name))
+            self.__batchable.append(labeled_method)
+        self._add_method(labeled_method)
+        if self.__batchable and self._on_batchable is not None:
+            self._on_batchable()
         return func
 
+    def _check_free(self, name: str) -> None:
+        if self.get_method(name) is not None:
+            raise KeyError(f"Service '{self.name}' already has a method '{name}'")
+
+    def add_batch_methods(self) -> None:
+        """Add the batch methods of the `batchable` methods, once. Their
+        wrapper messages go to the default descriptor pool, so the app does
+        it when it builds its services rather than on registration."""
+        while self.__batchable:
+            method = self.__batchable[0]
+            self._check_free(batch_method_name(method.name))
+            concurrency = method.meta.get(BATCH_CONCURRENCY, DEFAULT_CONCURRENCY)
+            self._add_method(make_batch_method(method, concurrency))
+            self.__batchable.pop(0)
+
+    def _add_method(self, labeled_method: ILabeledMethod) -> None:
+        labeled_method._on_change = self._invalidate_methods  # type: ignore
+        self.__methods.append(labeled_method)
+        self.__by_name.setdefault(labeled_method.name, labeled_method)
+        self._invalidate_methods()
+
     def __call__(
         self,
         func: Optional[Callable[..., Any]] = None,
@@ -245,7 +317,7 @@ class APIService(IService):
 
 DependencyRegistry = Dict[Callable[..., Any], Callable[..., Any]]
 
-Lifespan = Callable[["App"], AsyncGenerator[Never, bool]]
+Lifespan = Callable[["App"], AsyncContextManager[Any]]
 
 
 class App:
@@ -267,25 +339,62 @@ class App:
         self.server = server
 
         self._services: DefaultDict[str, List[IService]] = defaultdict(list)
+        self._index: Dict[Tuple[str, str], IService] = {}
+        self._services_view: Optional[Dict[str, List[IService]]] = None
+        self._service_list: Optional[List[IService]] = None
         self.dependency_overrides: DependencyRegistry = {}
         self._exception_handlers: ExceptionRegistry = {}
         self._service_processing: List[Type[ProcessService]] = []
+        self.warmups: List[Callable[[], Any]] = []
+        self.channel_pool = ChannelPool(app=self)
         self._modules: List[APIModule] = []
         self._packages: List[APIPackage] = []
 
     @property
     def services(self) -> Mapping[str, List[IService]]:
+        """Services by package. The mapping is cached until a service is
+        added, so it must not be modified."""
         for module in self._modules:
             self._add_module(module)
         self._modules.clear()
         for package in self._packages:
             self._add_package(package)
         self._packages.clear()
-        return dict(self._services)
+        if self._services_view is None:
+            for service in itertools.chain.from_iterable(self._services.values()):
+                if isinstance(service, APIService):
+                    service.add_batch_methods()
+            self._services_view = dict(self._services)
+        return self._services_view
 
     @property
     def service_list(self) -> Iterable[IService]:
-        return list(itertools.chain.from_iterable(self.services.values()))
+        services = self.services
+        if self._service_list is None:
+            self._service_list = list(itertools.chain.from_iterable(services.values()))
+        return self._service_list
+
+    def _find(self, package: str, name: str) -> Optional[IService]:
+        service = self._index.get((package, name))
+        if service is not None and (service.package, service.name) == (package, name):
+            return service
+        for service in self._services.get(package, []):  # renamed or added directly
+            if service.name == name:
+                self._index[(package, name)] = service
+                return service
+        return None
+
+    def get_service(self, package: str, name: str) -> Optional[IService]:
+        self.services  # add the pending modules and packages
+        return self._find(package, name)
+
+    def get_method(
+        self, package: str, service: str, method: str
+    ) -> Optional[ILabeledMethod]:
+        api_service = self.get_service(package, service)
+        if not isinstance(api_service, APIService):
+            return None
+        return api_service.get_method(method)
 
     @property
     def interceptors(self) -> List[Interceptor]:
@@ -306,12 +415,21 @@ class App:
             )
 
     def _add_service(self, service: APIService) -> None:
-        for existing_service in self._services[service.package]:
-            if existing_service.name == service.name:
-                raise KeyError(
-                    f"Service '{service.name}' already registered in package '{service.package}', module '{existing_service.module}'"
-                )
+        key = (service.package, service.name)
+        existing_service = self._index.get(key)
+        if existing_service is not None:
+            raise KeyError(
+                f"Service '{service.name}' already registered in package '{service.package}', module '{existing_service.module}'"
+            )
+        self._index[key] = service
         self._services[service.package].append(service)
+        if isinstance(service, APIService):
+            service._on_batchable = self._invalidate_services
+        self._invalidate_services()
+
+    def _invalidate_services(self) -> None:
+        self._services_view = None
+        self._service_list = None
 
     def _add_module(self, module: "APIModule") -> None:
         for service in module.services:
@@ -323,13 +441,11 @@ class App:
 
     def service(self, name: str) -> Callable[..., Callable[..., Any] | Any]:
         def decorator(func: Callable[..., Any]) -> Callable[..., Any] | Any:
-            for service in self._services[""]:
-                if service.name == name:
-                    break
-            else:
+            service = self._find("", name)
+            if not isinstance(service, APIService):
                 service = APIService(name=name)
                 self.add_service(service)
-                
+
             return service.register_method(func)
 
         return decorator
@@ -359,6 +475,15 @@ class App:
     def add_service_processing(self, service_proc: Type[ProcessService]) -> None:
         self._service_processing.append(service_proc)
 
+    def add_warmup(self, func: Callable[[], Any]) -> None:
+        self.warmups.append(func)
+
+    def warmup(self, func: Callable[[], Any]) -> Callable[[], Any]:
+        """Run `func`, sync or async, after the lifespans and before the
+        health check reports SERVING"""
+        self.add_warmup(func)
+        return func
+
 
 class GrpcAPI(App, metaclass=SingletonMeta):
     pass
@@ -0,0 +1,252 @@
+import inspect
+
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+from typing_extensions import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+)
+
+from grpcAPI.datatypes import AsyncContext
+from grpcAPI.label_method import LabeledMethod, type_to_metatype
+from grpcAPI.makeproto import ILabeledMethod, IService
+
+if TYPE_CHECKING:
+    from grpcAPI.makeproto.build_service import ProtoPackage
+
+# meta of a batch method: the method it batches and how many of its calls
+# run at the same time
+BATCH_OF = "batch_of"
+BATCH_CONCURRENCY = "batch_concurrency"
+DEFAULT_CONCURRENCY = 16
+
+REQUESTS_FIELD = "requests"
+RESPONSES_FIELD = "responses"
+
+HEADER = '/* "Generated .proto file" */\n'
+
+_LABEL_REPEATED = descriptor_pb2.FieldDescriptorProto.LABEL_REPEATED
+_TYPE_MESSAGE = descriptor_pb2.FieldDescriptorProto.TYPE_MESSAGE
+
+# wrapper files added to the default pool, by name
+_files: Dict[str, descriptor_pb2.FileDescriptorProto] = {}
+
+
+def batch_method_name(name: str) -> str:
+    return f"batch_{name}"
+
+
+def _pascal(name: str) -> str:
+    return "".join(part[:1].upper() + part[1:] for part in name.split("_"))
+
+
+def batch_file_name(package: str, service: str, method: str) -> str:
+    """File of the wrapper messages of a method, one per method as files
+    can not be extended once in the pool"""
+    name = f"batch/{service}_{method}.proto"
+    return f"{package.replace('.', '/')}/{name}" if package else name
+
+
+def make_batch_file(
+    package: str, service: str, method: str, request: Type[Any], response: Type[Any]
+) -> descriptor_pb2.FileDescriptorProto:
+    """
+    The FileDescriptorProto of the wrappers of a method, in the package of
+    its service:
+
+        message BatchGetRideRequest { repeated RideRequest requests = 1; }
+        message BatchGetRideResponse { repeated Ride responses = 1; }
+    """
+    file = descriptor_pb2.FileDescriptorProto()
+    file.name = batch_file_name(package, service, method)
+    file.syntax = "proto3"
+    if package:
+        file.package = package
+    file.dependency.extend(
+        sorted({request.DESCRIPTOR.file.name, response.DESCRIPTOR.file.name})
+    )
+    prefix = _pascal(batch_method_name(method))
+    for suffix, field_name, item in (
+        ("Request", REQUESTS_FIELD, request),
+        ("Response", RESPONSES_FIELD, response),
+    ):
+        message = file.message_type.add(name=f"{prefix}{suffix}")
+        message.field.add(
+            name=field_name,
+            number=1,
+            label=_LABEL_REPEATED,
+            type=_TYPE_MESSAGE,
+            type_name=f".{item.DESCRIPTOR.full_name}",
+        )
+    return file
+
+
+def _message_class(descriptor: Any) -> Type[Any]:
+    get_class = getattr(message_factory, "GetMessageClass", None)
+    if get_class is None:  # pragma: no cover
+        factory = message_factory.MessageFactory()
+        return factory.GetPrototype(descriptor)  # type: ignore[attr-defined]
+    return get_class(descriptor)
+
+
+def add_batch_file(
+    file: descriptor_pb2.FileDescriptorProto,
+) -> Tuple[Type[Any], Type[Any]]:
+    """Add the wrapper file to the default pool, where the files of its
+    items must already be, and return its request and response classes"""
+    pool = descriptor_pool.Default()
+    try:
+        pool.Add(file)  # adding the same file again is a no-op
+    except TypeError as e:
+        raise ValueError(f"Can not add batch messages '{file.name}': {e}") from None
+    _files[file.name] = file
+    package = f"{file.package}." if file.package else ""
+    request, response = (
+        _message_class(pool.FindMessageTypeByName(f"{package}{message.name}"))
+        for message in file.message_type
+    )
+    return request, response
+
+
+def batch_message_classes(serialized: bytes) -> Tuple[Type[Any], Type[Any]]:
+    """The request and response wrappers of a serialized batch file, as
+    embedded by `grpcapi build --client`"""
+    return add_batch_file(descriptor_pb2.FileDescriptorProto.FromString(serialized))
+
+
+def batch_file_of(cls: Type[Any]) -> Optional[descriptor_pb2.FileDescriptorProto]:
+    """The batch file defining the message class `cls`, if any"""
+    descriptor = getattr(cls, "DESCRIPTOR", None)
+    if descriptor is None:
+        return None
+    return _files.get(descriptor.file.name)
+
+
+def batch_item_types(file: descriptor_pb2.FileDescriptorProto) -> List[Type[Any]]:
+    """The message classes of the requests and responses in a batch file"""
+    pool = descriptor_pool.Default()
+    return [
+        _message_class(pool.FindMessageTypeByName(message.field[0].type_name[1:]))
+        for message in file.message_type
+    ]
+
+
+def check_batchable(method: ILabeledMethod, concurrency: int) -> None:
+    """Fail when `method` can not have a batch method"""
+    if method.is_client_stream or method.is_server_stream:
+        raise ValueError(f"Only unary methods are batchable, not '{method.name}'")
+    if concurrency < 1:
+        raise ValueError("batch_concurrency must be at least 1")
+
+
+def make_batch_method(
+    method: ILabeledMethod, concurrency: int = DEFAULT_CONCURRENCY
+) -> ILabeledMethod:
+    """
+    The labeled method taking the requests of a unary method in a batch and
+    answering its responses in the same order. Its handler is built by
+    `make_method_async`, calling the handler of `method` for each request.
+    The wrapper messages are added to the default pool.
+    """
+    check_batchable(method, concurrency)
+    file = make_batch_file(
+        method.package,
+        method.service,
+        method.name,
+        method.input_base_type,
+        method.output_base_type,
+    )
+    request_type, response_type = add_batch_file(file)
+    name = batch_method_name(method.name)
+
+    async def batch(request: Any, context: AsyncContext) -> Any:
+        raise RuntimeError(f"'{name}' is called through make_method_async")
+
+    batch.__name__ = batch.__qualname__ = name
+    batch.__annotations__ = {
+        "request": request_type,
+        "context": AsyncContext,
+        "return": response_type,
+    }
+    batch.__signature__ = inspect.signature(batch).replace(  # type: ignore
+        parameters=[
+            inspect.Parameter(
+                "request",
+                inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                annotation=request_type,
+            ),
+            inspect.Parameter(
+                "context",
+                inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                annotation=AsyncContext,
+            ),
+        ],
+        return_annotation=response_type,
+    )
+
+    return LabeledMethod(
+        title=f"Batch {getattr(method, 'title', method.name)}",
+        name=name,
+        method=batch,
+        package=method.package,
+        module=method.module,
+        service=method.service,
+        comments=f"Calls {method.name} for each request, answering in order",
+        description=f"Batch of {method.name}",
+        options=[],
+        tags=list(method.tags),
+        meta={BATCH_OF: method, BATCH_CONCURRENCY: concurrency},
+        request_types=[type_to_metatype(request_type)],
+        response_types=type_to_metatype(response_type),
+    )
+
+
+def _print_batch_file(file: descriptor_pb2.FileDescriptorProto) -> str:
+    lines: List[str] = [HEADER, f'syntax = "{file.syntax}";\n\n']
+    if file.package:
+        lines.append(f"package {file.package};\n\n")
+    lines.extend(f'import "{dependency}";\n' for dependency in file.dependency)
+    for message in file.message_type:
+        lines.append(f"\nmessage {message.name} {{\n")
+        for field in message.field:
+            lines.append(f"  repeated {field.type_name} {field.name} = 1;\n")
+        lines.append("}\n")
+    return "".join(lines)
+
+
+def batch_protos(services: Mapping[str, Iterable[IService]]) -> List["ProtoPackage"]:
+    """The wrapper files of the active batch methods, to write with the
+    protos of their services"""
+    # the compiler pulls in the template engine, load it only when used
+    from grpcAPI.makeproto.build_service import ProtoPackage
+
+    protos: List[ProtoPackage] = []
+    for service_list in services.values():
+        for service in service_list:
+            if not service.active:
+                continue
+            for method in service.methods:
+                if BATCH_OF not in method.meta:
+                    continue
+                file = batch_file_of(method.input_base_type)
+                if file is None:  # pragma: no cover
+                    continue
+                filename = file.name[: -len(".proto")]
+                if file.package:
+                    filename = filename[len(file.package) + 1 :]
+                protos.append(
+                    ProtoPackage(
+                        file.package,
+                        filename,
+                        _print_batch_file(file),
+                        set(file.dependency),
+                        file,
+                    )
+                )
+    return protos
@@ -1,15 +1,26 @@
+import itertools
 import sys
 
-from typing_extensions import Any, AsyncIterator, Callable, Iterable, List, Mapping
+from typing_extensions import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+)
 
 from grpcAPI.app import APIService
+from grpcAPI.batch import batch_protos
 from grpcAPI.ctxinject_proto import (
     func_signature_check,
     ignore_context_metadata,
     ignore_enum,
     protobuf_types_predicate,
 )
-from grpcAPI.datatypes import AsyncContext, Message, get_function_metadata
+from grpcAPI.datatypes import AsyncContext, Batch, Message, get_function_metadata
 from grpcAPI.makeproto import IProtoPackage, compile_service
 from grpcAPI.makeproto.compiler import CompilerContext
 
@@ -20,7 +31,7 @@ def validate_signature_pass(
     bynames = get_function_metadata(func)
     return func_signature_check(
         func,
-        [Message, AsyncIterator[Message], AsyncContext],
+        [Message, AsyncIterator[Message], AsyncIterator[Batch[Message]], AsyncContext],
         bynames or {},
         True,
         [protobuf_types_predicate, ignore_enum, ignore_context_metadata],
@@ -35,17 +46,24 @@ class CompilerException(RuntimeError):
 
 
 def make_protos(
-    services: Mapping[str, List[APIService]], exit: bool = True
+    services: Mapping[str, List[APIService]],
+    exit: bool = True,
+    workers: int = 1,
+    timings: Optional[Dict[str, float]] = None,
+    renderer: str = "jinja",
 ) -> Iterable[IProtoPackage]:
 
     proto_stream = compile_service(
         services=services,
         custompassmethod=validate_signature_pass,
         version=3,
+        workers=workers,
+        timings=timings,
+        renderer=renderer,
     )
     if isinstance(proto_stream, CompilerContext):
         if exit:
             sys.exit(1)
         else:
             raise CompilerException(proto_stream)
-    return proto_stream
+    return itertools.chain(proto_stream, batch_protos(services))
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import asyncio
+import importlib
 import logging  # noqa: F401
 import sys
 from pathlib import Path
@@ -10,23 +11,39 @@ from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.table import Table
 from rich.text import Text
-from typing_extensions import Optional
+from typing_extensions import Any, Optional, Tuple
 
+from grpcAPI._version import __version__
 from grpcAPI.commands.settings.utils import load_app
-from grpcAPI.logger import LOGGING_CONFIG
-
-# Try to import version, fallback to default
-try:
-    from grpcAPI import __version__
-except ImportError:
-    __version__ = "0.1.0"
-from grpcAPI.app import GrpcAPI
-from grpcAPI.commands.build import BuildCommand
-from grpcAPI.commands.init import InitCommand
-from grpcAPI.commands.lint import LintCommand
-from grpcAPI.commands.list import ListCommand
-from grpcAPI.commands.protoc import ProtocCommand
-from grpcAPI.commands.run import RunCommand
+from grpcAPI.startup_report import StartupReport, measure
+
+# Command modules pull in the proto compiler, jinja2, grpc_tools and so on.
+# They are imported when a command runs, not when the CLI is loaded.
+_lazy_attrs = {
+    "GrpcAPI": "grpcAPI.app",
+    "BenchCommand": "grpcAPI.commands.bench",
+    "BuildCommand": "grpcAPI.commands.build",
+    "InitCommand": "grpcAPI.commands.init",
+    "LintCommand": "grpcAPI.commands.lint",
+    "ListCommand": "grpcAPI.commands.list",
+    "ProtocCommand": "grpcAPI.commands.protoc",
+    "RunCommand": "grpcAPI.commands.run",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _lazy_attrs.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def lazy(name: str) -> Any:
+    """Resolve a lazily imported name through the module, so patches apply"""
+    return getattr(sys.modules[__name__], name)
+
 
 # Initialize Rich console
 console = Console()
@@ -36,8 +53,10 @@ def setup_cli_logging(verbose: bool = False):
     """Setup logging for CLI operations using the unified LOGGING_CONFIG"""
     import logging.config
 
+    from grpcAPI.logger import logging_config
+
     # Clone the config so we don't modify the original
-    cli_config = LOGGING_CONFIG.copy()
+    cli_config = logging_config().copy()
 
     # Update grpcAPI logger level based on verbose flag
     if "loggers" in cli_config:
@@ -55,9 +74,10 @@ def setup_cli_logging(verbose: bool = False):
     logging.config.dictConfig(cli_config)
 
 
-def get_app_instance(app_path: str) -> GrpcAPI:
-    load_app(app_path)
-    return GrpcAPI()
+def get_app_instance(app_path: str) -> Any:
+    with measure("import_app"):
+        load_app(app_path)
+    return lazy("GrpcAPI")()
 
 
 def print_banner():
@@ -117,6 +137,13 @@ def cli(ctx, version):
 @click.option("--port", "-p", help="Server port")
 @click.option("--settings", "-s", help="Path to settings file")
 @click.option("--no-lint", is_flag=True, help="Skip protocol buffer validation")
+@click.option(
+    "--startup-report",
+    is_flag=False,
+    flag_value="startup_report.json",
+    default=None,
+    help="Time each startup phase and write it as JSON (default: startup_report.json)",
+)
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose logging")
 def run(
     app_path: str,
@@ -124,6 +151,7 @@ def run(
     port: Optional[int],
     settings: Optional[str],
     no_lint: bool,
+    startup_report: Optional[str],
     verbose: bool,
 ):
     """
@@ -134,6 +162,9 @@ def run(
     and reflection.
     """
     try:
+        if startup_report:
+            StartupReport().activate()
+
         # Setup logging for the CLI
         setup_cli_logging(verbose)
 
@@ -145,7 +176,7 @@ def run(
             progress.add_task("=� Starting server...", total=None)
 
             app = get_app_instance(app_path)
-            command = RunCommand(app, settings)
+            command = lazy("RunCommand")(app, settings)
 
             console.print(
                 f"[bold green]🚀 Starting {app.name} {app.version} server on {host}:{port}[/bold green]"
@@ -153,18 +184,137 @@ def run(
             console.print(f"[dim]Settings: {settings or 'default'}[/dim]")
             console.print(f"[dim]Lint: {'disabled' if no_lint else 'enabled'}[/dim]\n")
 
-        asyncio.run(command.run(host=host, port=port, lint=not no_lint))
+        asyncio.run(
+            command.run(
+                host=host,
+                port=port,
+                lint=not no_lint,
+                startup_report=startup_report,
+            )
+        )
 
     except Exception as e:
         handle_error(e, "run")
 
 
+@cli.command()
+@click.argument("app_path", type=str)
+@click.option(
+    "--method",
+    "-m",
+    "methods",
+    multiple=True,
+    help="Method pattern to benchmark, e.g. 'ride.ride_actions/get_*' (repeatable)",
+)
+@click.option("--concurrency", "-c", type=int, help="Concurrent in-flight calls")
+@click.option("--rate", "-r", type=float, help="Fixed request rate (calls/s)")
+@click.option("--duration", "-d", type=float, help="Seconds to drive each method")
+@click.option("--requests", "-n", type=int, help="Calls per method")
+@click.option("--fixtures", "-f", help="Request fixtures file (json/yaml/toml)")
+@click.option(
+    "--stream-messages", type=int, help="Messages sent per client-stream call"
+)
+@click.option("--host", "-h", help="Server host address")
+@click.option("--port", "-p", type=int, help="Server port (default: random)")
+@click.option("--uds", help="Serve on a unix domain socket at this path")
+@click.option("--json", "json_path", help="Write results as JSON to this path")
+@click.option("--settings", "-s", help="Path to settings file")
+@click.option("--verbose", "-v", is_flag=True, help="Enable verbose logging")
+def bench(
+    app_path: str,
+    methods: Tuple[str, ...],
+    concurrency: Optional[int],
+    rate: Optional[float],
+    duration: Optional[float],
+    requests: Optional[int],
+    fixtures: Optional[str],
+    stream_messages: Optional[int],
+    host: Optional[str],
+    port: Optional[int],
+    uds: Optional[str],
+    json_path: Optional[str],
+    settings: Optional[str],
+    verbose: bool,
+) -> None:
+    """
+    ⏱️ Benchmark registered methods
+
+    Starts the app in-process on a local port or unix socket and drives
+    the selected methods at a fixed concurrency or rate, reporting
+    throughput, latency percentiles and error rates per method.
+    """
+    try:
+        setup_cli_logging(verbose)
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=console,
+        ) as progress:
+            progress.add_task("⏱️ Benchmarking...", total=None)
+
+            app = get_app_instance(app_path)
+            command = lazy("BenchCommand")(app, settings)
+            report = command.execute(
+                methods=list(methods),
+                concurrency=concurrency,
+                rate=rate,
+                duration=duration,
+                requests=requests,
+                fixtures=fixtures,
+                stream_messages=stream_messages,
+                host=host,
+                port=port,
+                uds=uds,
+                json_path=json_path,
+            )
+
+        table = Table(title=f"⏱️ Benchmark Results ({report['mode']})")
+        table.add_column("Method", style="cyan", no_wrap=True)
+        table.add_column("Shape", style="white")
+        table.add_column("Calls", justify="right")
+        table.add_column("RPS", justify="right", style="green")
+        for pct in ("p50", "p90", "p99", "p999"):
+            table.add_column(f"{pct} ms", justify="right")
+        table.add_column("Errors", justify="right", style="red")
+
+        for row in report["methods"]:
+            table.add_row(
+                row["method"],
+                row["shape"],
+                str(row["requests"]),
+                f"{row['throughput_rps']:.1f}",
+                f"{row['p50_ms']:.3f}",
+                f"{row['p90_ms']:.3f}",
+                f"{row['p99_ms']:.3f}",
+                f"{row['p999_ms']:.3f}",
+                f"{row['errors']} ({row['error_rate']:.1%})",
+            )
+
+        console.print("\n")
+        console.print(table)
+        if json_path:
+            console.print(f"[dim]Results written to {json_path}[/dim]")
+
+    except Exception as e:
+        handle_error(e, "bench")
+
+
 @cli.command()
 @click.argument("app_path", type=str)
 @click.option("--output", "-o", help="Output directory for proto files")
 @click.option("--settings", "-s", help="Path to settings file")
 @click.option("--overwrite", is_flag=True, help="Overwrite existing files")
 @click.option("--zip", is_flag=True, help="Create zip archive of generated files")
+@click.option(
+    "--archive-format",
+    type=click.Choice(["zip", "tar", "tar.gz", "tar.zst"]),
+    help="Archive written by --zip (default: zip)",
+)
+@click.option(
+    "--full", is_flag=True, help="Rewrite every file, ignoring the build manifest"
+)
+@click.option("--client", is_flag=True, help="Also write typed clients of the services")
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose output")
 def build(
     app_path: str,
@@ -172,6 +322,9 @@ def build(
     settings: Optional[str],
     overwrite: bool,
     zip: bool,
+    archive_format: Optional[str],
+    full: bool,
+    client: bool,
     verbose: bool,
 ):
     """
@@ -190,12 +343,15 @@ def build(
             task = progress.add_task("=( Building protocol buffers...", total=None)
 
             app = get_app_instance(app_path)
-            command = BuildCommand(app, settings)
+            command = lazy("BuildCommand")(app, settings)
 
             result = command.execute(
                 outdir=output,
                 overwrite=overwrite,
                 zipcompress=zip,
+                full_rebuild=full,
+                archive_format=archive_format,
+                client=client,
             )
 
             progress.remove_task(task)
@@ -241,8 +397,8 @@ def lint(app_path: str, settings: Optional[str], verbose: bool):
             progress.add_task("🔍 Validating services...", total=None)
 
             app = get_app_instance(app_path)
-            command = LintCommand(app, settings)
-            proto_files = command.execute()
+            command = lazy("LintCommand")(app, settings)
+            proto_files = command.execute(verbose=verbose)
 
         # Display validation results
         console.print("\n[bold green] Validation successful![/bold green]\n")
@@ -280,7 +436,7 @@ def list_services(app_path: str, settings: Optional[str], show_descriptions: boo
     """
     try:
         app = get_app_instance(app_path)
-        command = ListCommand(app, settings)
+        command = lazy("ListCommand")(app, settings)
         command.execute(show_descriptions=show_descriptions)
 
     except Exception as e:
@@ -306,7 +462,7 @@ def init(force: bool, output: Optional[str]):
         ) as progress:
             progress.add_task("🆕 Creating configuration...", total=None)
 
-            command = InitCommand(settings_path=None)
+            command = lazy("InitCommand")(settings_path=None)
             command.execute(force=force, dst=Path(output) if output else Path.cwd())
 
         config_path = (Path(output) if output else Path.cwd()) / "grpcapi.config.json"
@@ -341,12 +497,25 @@ def init(force: bool, output: Optional[str]):
 )
 @click.option("--settings", "-s", help="Path to settings file")
 @click.option("--no-mypy-stubs", is_flag=True, help="Disable mypy stub generation")
+@click.option(
+    "--incremental",
+    "-i",
+    is_flag=True,
+    help="Only recompile changed files, in parallel, reusing cached output",
+)
+@click.option(
+    "--backend",
+    type=click.Choice(["subprocess", "inprocess"]),
+    help="Run protoc in a subprocess or in this process (default: subprocess)",
+)
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose output")
 def protoc(
     proto_path: Optional[str],
     lib_path: Optional[str],
     settings: Optional[str],
     no_mypy_stubs: bool,
+    incremental: bool,
+    backend: Optional[str],
     verbose: bool,
 ):
     """
@@ -356,17 +525,17 @@ def protoc(
     Use this when you have pre-existing .proto files that need compilation.
     """
     try:
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-        ) as progress:
-            progress.add_task("⚙️ Compiling protocol buffers...", total=None)
-
-            command = ProtocCommand(settings)
-            proto_files = command.execute(
-                proto_path=proto_path, lib_path=lib_path, mypy_stubs=not no_mypy_stubs
-            )
+        # no live progress display: its refresh thread would print into the
+        # output of an in-process protoc, which captures the whole process
+        console.print("⚙️ Compiling protocol buffers...")
+        command = lazy("ProtocCommand")(settings)
+        proto_files = command.execute(
+            proto_path=proto_path,
+            lib_path=lib_path,
+            mypy_stubs=not no_mypy_stubs,
+            incremental=incremental,
+            backend=backend,
+        )
 
         # Display results
         console.print("\n[bold green]✅ Compilation successful![/bold green]")
@@ -0,0 +1,742 @@
+import asyncio
+import json
+import random
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+import grpc
+from typing_extensions import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from grpcAPI.load_credential import get_client_certificate
+from grpcAPI.makeproto import ILabeledMethod, IService
+
+if TYPE_CHECKING:
+    from grpcAPI.app import App
+    from grpcAPI.local_call import LocalMethod
+
+ChannelKey = Tuple[str, Optional[str], Optional[str]]
+Metadata = Sequence[Tuple[str, Union[str, bytes]]]
+C = TypeVar("C", bound="ServiceClient")
+ClientKey = Tuple[str, type, Optional[ChannelKey], int]
+
+DEFAULT_KEEPALIVE: Dict[str, Any] = {
+    "time_ms": 30000,  # ping an idle connection every 30s
+    "timeout_ms": 10000,  # and drop it when the ping is not answered in 10s
+    "permit_without_calls": True,
+}
+
+
+def channel_options(
+    keepalive: Mapping[str, Any], options: List[Tuple[str, Any]]
+) -> List[Tuple[str, Any]]:
+    tuned: List[Tuple[str, Any]] = [
+        # channels with the same arguments share their connections otherwise
+        ("grpc.use_local_subchannel_pool", 1),
+        ("grpc.keepalive_time_ms", int(keepalive["time_ms"])),
+        ("grpc.keepalive_timeout_ms", int(keepalive["timeout_ms"])),
+        ("grpc.keepalive_permit_without_calls", int(keepalive["permit_without_calls"])),
+        ("grpc.http2.max_pings_without_data", 0),
+    ]
+    names = {name for name, _ in options}
+    return [o for o in tuned if o[0] not in names] + [tuple(o) for o in options]
+
+
+def service_config_options(path: str) -> List[Tuple[str, Any]]:
+    """Channel options applying the gRPC service config JSON at `path`"""
+    with open(path) as f:
+        config = json.load(f)  # fail here, grpc only logs an invalid config
+    return [("grpc.service_config", json.dumps(config))]
+
+
+def status_codes(names: Sequence[str]) -> FrozenSet[grpc.StatusCode]:
+    """Status codes from their names, as written in a gRPC service config"""
+    try:
+        return frozenset(grpc.StatusCode[name.upper()] for name in names)
+    except KeyError as e:
+        raise ValueError(f"Unknown status code: {e.args[0]}") from None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retries of a unary call that fails with one of `retryable_status_codes`,
+    after an exponential backoff with jitter. The fields are those of a
+    gRPC service config retryPolicy, in seconds.
+    """
+
+    max_attempts: int = 3
+    initial_backoff: float = 0.1
+    max_backoff: float = 1.0
+    backoff_multiplier: float = 2.0
+    retryable_status_codes: Tuple[str, ...] = ("UNAVAILABLE",)
+
+    def __post_init__(self) -> None:
+        if self.max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        object.__setattr__(
+            self, "retryable_status_codes", tuple(self.retryable_status_codes)
+        )
+        status_codes(self.retryable_status_codes)
+
+
+@dataclass(frozen=True)
+class HedgingPolicy:
+    """
+    Copies of a unary call sent `hedging_delay` seconds apart, up to
+    `max_attempts`, the first response winning and cancelling the others.
+    A failure with one of `non_fatal_status_codes` sends the next copy at
+    once, any other fails the call. The fields are those of a gRPC service
+    config hedgingPolicy.
+    """
+
+    max_attempts: int = 2
+    hedging_delay: float = 0.05
+    non_fatal_status_codes: Tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        if self.max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        object.__setattr__(
+            self, "non_fatal_status_codes", tuple(self.non_fatal_status_codes)
+        )
+        status_codes(self.non_fatal_status_codes)
+
+
+@dataclass(frozen=True)
+class CallPolicy:
+    """
+    Defaults of the calls to a method: the deadline, in seconds, of calls
+    made without `timeout`, and how failed unary calls are retried or
+    hedged, one or the other. Streaming calls only take the deadline.
+    """
+
+    timeout: Optional[float] = None
+    retry: Optional[RetryPolicy] = None
+    hedging: Optional[HedgingPolicy] = None
+
+    def __post_init__(self) -> None:
+        if self.retry is not None and self.hedging is not None:
+            raise ValueError("A call policy can not both retry and hedge")
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "CallPolicy":
+        """A policy from settings, `{"timeout": 1.0, "retry": {...}}`"""
+        return cls.from_meta(config) or cls()
+
+    @classmethod
+    def from_meta(cls, meta: Mapping[str, Any]) -> Optional["CallPolicy"]:
+        """
+        The policy a method declares, `@service(timeout=..., retry=...,
+        hedging=...)`, None when it declares none. `retry` and `hedging`
+        take a policy, its fields as a dict, or True for the defaults.
+        """
+        timeout = meta.get("timeout")
+        retry = _sub_policy(meta.get("retry"), RetryPolicy)
+        hedging = _sub_policy(meta.get("hedging"), HedgingPolicy)
+        if timeout is None and retry is None and hedging is None:
+            return None
+        if timeout is not None and not isinstance(timeout, (int, float)):
+            raise TypeError(f"timeout must be a number of seconds, not {timeout!r}")
+        return cls(timeout=timeout, retry=retry, hedging=hedging)
+
+
+P = TypeVar("P", RetryPolicy, HedgingPolicy)
+
+
+def _sub_policy(value: Any, policy_class: Type[P]) -> Optional[P]:
+    if value is None or value is False:
+        return None
+    if value is True:
+        return policy_class()
+    if isinstance(value, policy_class):
+        return value
+    if isinstance(value, Mapping):
+        return policy_class(**value)
+    raise TypeError(f"Expected a {policy_class.__name__}, got {value!r}")
+
+
+def make_metadata(
+    values: Optional[Mapping[str, Union[str, bytes]]] = None,
+    **kwargs: Union[str, bytes],
+) -> Tuple[Tuple[str, Union[str, bytes]], ...]:
+    """
+    Call metadata from keyword arguments or a mapping. Keys are lower-cased
+    with "_" written "-", and keys of bytes values get the "-bin" suffix
+    gRPC requires of binary metadata.
+
+        make_metadata(request_id="42", trace=b"...")
+        # (("request-id", "42"), ("trace-bin", b"..."))
+    """
+    pairs = []
+    for key, value in {**(values or {}), **kwargs}.items():
+        key = key.lower().replace("_", "-")
+        if isinstance(value, bytes) and not key.endswith("-bin"):
+            key += "-bin"
+        pairs.append((key, value))
+    return tuple(pairs)
+
+
+@dataclass(frozen=True)
+class MethodSpec:
+    """The part of a labeled method a client needs to call it"""
+
+    name: str
+    input_base_type: Type[Any]
+    output_base_type: Type[Any]
+    is_client_stream: bool = False
+    is_server_stream: bool = False
+    policy: Optional[CallPolicy] = None
+
+    @classmethod
+    def from_method(cls, method: ILabeledMethod) -> "MethodSpec":
+        return cls(
+            method.name,
+            method.input_base_type,
+            method.output_base_type,
+            method.is_client_stream,
+            method.is_server_stream,
+            CallPolicy.from_meta(method.meta),
+        )
+
+
+def declared_policy(method: Union[ILabeledMethod, MethodSpec]) -> Optional[CallPolicy]:
+    """The call policy a method declares on its service"""
+    if isinstance(method, MethodSpec):
+        return method.policy
+    return CallPolicy.from_meta(method.meta)
+
+
+@dataclass(frozen=True)
+class ServiceSpec:
+    """The part of a service a client needs to call it, so clients can be
+    built without importing the module that defines the service"""
+
+    package: str
+    name: str
+    methods: Tuple[MethodSpec, ...] = field(default=())
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "methods", tuple(self.methods))
+
+    @property
+    def qual_name(self) -> str:
+        return f"{self.package}.{self.name}" if self.package else self.name
+
+    @classmethod
+    def from_service(cls, service: IService) -> "ServiceSpec":
+        methods = tuple(MethodSpec.from_method(m) for m in service.methods)
+        return cls(service.package, service.name, methods)
+
+
+def method_path(service: IService, method: ILabeledMethod) -> str:
+    return f"/{service.qual_name}/{method.name}"
+
+
+def make_multicallable(
+    channel: grpc.aio.Channel, service: IService, method: ILabeledMethod
+) -> Any:
+    factories: Dict[Tuple[bool, bool], Callable[..., Any]] = {
+        (False, False): channel.unary_unary,
+        (True, False): channel.stream_unary,
+        (False, True): channel.unary_stream,
+        (True, True): channel.stream_stream,
+    }
+    factory = factories[(method.is_client_stream, method.is_server_stream)]
+    return factory(
+        method_path(service, method),
+        request_serializer=method.input_base_type.SerializeToString,
+        response_deserializer=method.output_base_type.FromString,
+    )
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def _code(error: BaseException) -> Optional[grpc.StatusCode]:
+    code = getattr(error, "code", None)
+    return code() if callable(code) else None
+
+
+class PolicyCall:
+    """
+    A multicallable, remote or in process, called with the default deadline
+    and metadata of its client, retrying or hedging unary calls as its
+    policy says. The deadline covers every attempt of a call.
+    """
+
+    __slots__ = ("call", "policy", "metadata", "unary", "codes")
+
+    def __init__(
+        self, call: Any, policy: CallPolicy, metadata: Metadata, unary: bool
+    ) -> None:
+        self.call = call
+        self.policy = policy
+        self.metadata = tuple(metadata)
+        self.unary = unary
+        self.codes: FrozenSet[grpc.StatusCode] = frozenset()
+        if policy.retry is not None:
+            self.codes = status_codes(policy.retry.retryable_status_codes)
+        elif policy.hedging is not None:
+            self.codes = status_codes(policy.hedging.non_fatal_status_codes)
+
+    def __call__(
+        self,
+        request: Any,
+        timeout: Optional[float] = None,
+        metadata: Optional[Metadata] = None,
+        **kwargs: Any,
+    ) -> Any:
+        if timeout is None:
+            timeout = self.policy.timeout
+        if metadata:
+            metadata = self.metadata + tuple(metadata)
+        else:
+            metadata = self.metadata or None
+        retry, hedging = self.policy.retry, self.policy.hedging
+        if self.unary and retry is not None:
+            return self._retry(retry, request, timeout, metadata, kwargs)
+        if self.unary and hedging is not None:
+            return self._hedge(hedging, request, timeout, metadata, kwargs)
+        return self.call(request, timeout=timeout, metadata=metadata, **kwargs)
+
+    async def _retry(
+        self,
+        retry: RetryPolicy,
+        request: Any,
+        timeout: Optional[float],
+        metadata: Optional[Metadata],
+        kwargs: Dict[str, Any],
+    ) -> Any:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        backoff = retry.initial_backoff
+        for attempt in range(1, retry.max_attempts + 1):
+            try:
+                return await self.call(
+                    request, timeout=_remaining(deadline), metadata=metadata, **kwargs
+                )
+            except grpc.RpcError as e:
+                if attempt == retry.max_attempts or _code(e) not in self.codes:
+                    raise
+                # jitter spreading the retries of the clients, not a secret
+                delay = random.uniform(0, backoff)  # noqa: S311
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    raise
+            await asyncio.sleep(delay)
+            backoff = min(backoff * retry.backoff_multiplier, retry.max_backoff)
+
+    async def _hedge(
+        self,
+        hedging: HedgingPolicy,
+        request: Any,
+        timeout: Optional[float],
+        metadata: Optional[Metadata],
+        kwargs: Dict[str, Any],
+    ) -> Any:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pending: Set["asyncio.Future[Any]"] = set()
+        error: Optional[BaseException] = None
+        try:
+            for attempt in range(1, hedging.max_attempts + 1):
+                call = self.call(
+                    request, timeout=_remaining(deadline), metadata=metadata, **kwargs
+                )
+                pending.add(asyncio.ensure_future(call))
+                last = attempt == hedging.max_attempts
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending,
+                        timeout=None if last else hedging.hedging_delay,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    for task in done:
+                        e = task.exception()
+                        if e is None:
+                            return task.result()
+                        if _code(e) not in self.codes:
+                            raise e
+                        error = e
+                    if not last:
+                        # the delay elapsed or an attempt failed: send the next
+                        break
+            if error is None:  # pragma: no cover
+                raise RuntimeError("A hedged call ended without an attempt")
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+class ServiceClient:
+    """
+    Stub of an APIService: each active method of the service is an
+    attribute, called as a grpc.aio multicallable, with the request and
+    response types of the labeled method.
+
+        response = await client.is_passenger(StringValue(value=id))
+
+    Methods in `local` are called in process, the others over `channel`,
+    which is None when every method is local.
+
+    `policy` sets the deadline, retries or hedging of the calls to every
+    method, `policies` those of single methods, by name, and `metadata` is
+    sent with every call, before the metadata of the call. Methods without
+    either keep the policy declared on the service, `@service(timeout=...)`,
+    unless `channel_policies` tells that the channel applies the declared
+    policies itself, from a gRPC service config; local methods always keep
+    it.
+
+    Subclasses generated by `grpcapi build --client`, or made by
+    `make_client_class`, set `spec` and add typed methods; they are built
+    with `connect` or `from_channel`.
+    """
+
+    spec: Optional[ServiceSpec] = None
+
+    def __init__(
+        self,
+        service: IService,
+        channel: Optional[grpc.aio.Channel],
+        local: Optional[Mapping[str, "LocalMethod"]] = None,
+        policy: Optional[CallPolicy] = None,
+        policies: Optional[Mapping[str, CallPolicy]] = None,
+        metadata: Metadata = (),
+        channel_policies: bool = False,
+    ) -> None:
+        self.service = service
+        self.channel = channel
+        local = local or {}
+        self._calls: Dict[str, Any] = {}
+        # methods whose declared policy this client applies
+        self._declared: FrozenSet[str] = frozenset(
+            method.name
+            for method in service.methods
+            if not channel_policies or method.name in local
+        )
+        for method in service.methods:
+            call = local.get(method.name)
+            if call is None:
+                if channel is None:
+                    raise ValueError(
+                        f"No channel to call '{service.qual_name}.{method.name}': "
+                        "give the client a channel or a target, or serve the "
+                        "method in process"
+                    )
+                call = make_multicallable(channel, service, method)
+            self._calls[method.name] = call
+        self._bind(policy, dict(policies or {}), tuple(metadata))
+
+    def _bind(
+        self,
+        policy: Optional[CallPolicy],
+        policies: Dict[str, CallPolicy],
+        metadata: Tuple[Tuple[str, Union[str, bytes]], ...],
+    ) -> None:
+        self.policy = policy
+        self.policies = policies
+        self.metadata = metadata
+        self._methods: Dict[str, Any] = {}
+        for method in self.service.methods:
+            call = self._calls[method.name]
+            method_policy = policies.get(method.name, policy)
+            if method_policy is None and method.name in self._declared:
+                method_policy = declared_policy(method)
+            if method_policy is not None or metadata:
+                unary = not method.is_client_stream and not method.is_server_stream
+                call = PolicyCall(call, method_policy or CallPolicy(), metadata, unary)
+            self._methods[method.name] = call
+
+    @property
+    def is_local(self) -> bool:
+        return self.channel is None
+
+    def with_options(
+        self: C,
+        policy: Optional[CallPolicy] = None,
+        policies: Optional[Mapping[str, CallPolicy]] = None,
+        metadata: Metadata = (),
+    ) -> C:
+        """A client sharing the channel of this one, with `policy` and
+        `policies` replacing its own and `metadata` added to its own"""
+        client = object.__new__(type(self))
+        client.service = self.service
+        client.channel = self.channel
+        client._calls = self._calls
+        client._declared = self._declared
+        client._bind(
+            self.policy if policy is None else policy,
+            {**self.policies, **(policies or {})},
+            self.metadata + tuple(metadata),
+        )
+        return client
+
+    def with_metadata(
+        self: C,
+        values: Optional[Mapping[str, Union[str, bytes]]] = None,
+        **kwargs: Union[str, bytes],
+    ) -> C:
+        """A client sending this metadata with every call, see
+        `make_metadata`"""
+        return self.with_options(metadata=make_metadata(values, **kwargs))
+
+    @classmethod
+    def _spec(cls) -> ServiceSpec:
+        if cls.spec is None:
+            raise TypeError(f"{cls.__name__} has no service spec")
+        return cls.spec
+
+    @classmethod
+    def connect(cls: Type[C], pool: "ChannelPool", target: str) -> C:
+        """A client of `spec` from `pool`, see `ChannelPool.client`"""
+        return pool.client(cls._spec(), target, cls)  # type: ignore[arg-type]
+
+    @classmethod
+    def from_channel(cls: Type[C], channel: grpc.aio.Channel, **kwargs: Any) -> C:
+        """A client of `spec` calling every method over `channel`"""
+        return cls(cls._spec(), channel, **kwargs)  # type: ignore[arg-type]
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self.__dict__["_methods"][name]
+        except KeyError:
+            raise AttributeError(
+                f"Service '{self.service.qual_name}' has no method '{name}'"
+            ) from None
+
+
+def client_class_name(service_name: str) -> str:
+    """Name of the client class of a service, AccountServicesClient for
+    account_services"""
+    parts = service_name.split("_")
+    return "".join(part[:1].upper() + part[1:] for part in parts) + "Client"
+
+
+def make_client_class(service: IService) -> Type[ServiceClient]:
+    """A ServiceClient subclass for `service`, the runtime counterpart of
+    the classes `grpcapi build --client` writes, without their typing"""
+    return type(
+        client_class_name(service.name),
+        (ServiceClient,),
+        {"spec": ServiceSpec.from_service(service), "__module__": __name__},
+    )
+
+
+class ChannelPool:
+    """
+    App-scoped grpc.aio channels, opened on first use and shared by every
+    client of the same target and credentials.
+
+    A target is an address, "host:port", or the name of an entry of
+    `targets`, `{"address": ..., "ca": <root certificate path>}`, which
+    may add `"service_config": <path>`, a gRPC service config the channels
+    apply, e.g. the one `grpcapi build` writes. Each
+    target gets `channels_per_target` channels, each with its own HTTP/2
+    connection, handed out round-robin.
+
+    With `local["enabled"]`, methods of services registered and active in
+    `app` are called in process instead, see LocalMethod, as long as the
+    app has no server interceptors, which such calls would skip;
+    `local["isolate"]` copies their messages through serialization. So
+    the same client code works whether the services are deployed together
+    or apart.
+
+    `policies` holds the CallPolicy settings of the clients, by service,
+    "package.Service", or method, "package.Service.method".
+    """
+
+    def __init__(
+        self,
+        channels_per_target: int = 1,
+        keepalive: Optional[Mapping[str, Any]] = None,
+        options: Optional[List[Tuple[str, Any]]] = None,
+        targets: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        local: Optional[Mapping[str, Any]] = None,
+        policies: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        app: Optional["App"] = None,
+    ) -> None:
+        self.app = app
+        self._channels: Dict[ChannelKey, List[grpc.aio.Channel]] = {}
+        self._next: Dict[ChannelKey, int] = {}
+        self._clients: Dict[ClientKey, ServiceClient] = {}
+        self._local: Dict[str, Dict[str, "LocalMethod"]] = {}
+        self.configure(
+            channels_per_target, keepalive, options, targets, local, policies
+        )
+
+    def configure(
+        self,
+        channels_per_target: int = 1,
+        keepalive: Optional[Mapping[str, Any]] = None,
+        options: Optional[List[Tuple[str, Any]]] = None,
+        targets: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        local: Optional[Mapping[str, Any]] = None,
+        policies: Optional[Mapping[str, Mapping[str, Any]]] = None,
+    ) -> None:
+        """Settings of the channels opened from now on, e.g. from the
+        "client" settings"""
+        if channels_per_target < 1:
+            raise ValueError("channels_per_target must be at least 1")
+        self.channels_per_target = channels_per_target
+        self.options = channel_options(
+            {**DEFAULT_KEEPALIVE, **(keepalive or {})}, list(options or [])
+        )
+        self.targets: Dict[str, Mapping[str, Any]] = dict(targets or {})
+        local = local or {}
+        self.local = bool(local.get("enabled", False))
+        self.isolate = bool(local.get("isolate", False))
+        self.policies = {
+            name: CallPolicy.from_config(config)
+            for name, config in (policies or {}).items()
+        }
+        self._local.clear()
+        self._clients.clear()
+
+    def resolve(self, target: str) -> ChannelKey:
+        """Address, root certificate path and service config path of a
+        target"""
+        config = self.targets.get(target)
+        if config is None:
+            return target, None, None
+        return config["address"], config.get("ca"), config.get("service_config")
+
+    def _open(self, key: ChannelKey) -> List[grpc.aio.Channel]:
+        address, ca, service_config = key
+        options = self.options
+        if service_config is not None:
+            options = options + service_config_options(service_config)
+        if ca is None:
+            return [
+                grpc.aio.insecure_channel(address, options=options)
+                for _ in range(self.channels_per_target)
+            ]
+        credentials = get_client_certificate(ca)
+        return [
+            grpc.aio.secure_channel(address, credentials, options=options)
+            for _ in range(self.channels_per_target)
+        ]
+
+    def _pick(self, target: str) -> Tuple[ChannelKey, int]:
+        key = self.resolve(target)
+        channels = self._channels.get(key)
+        if channels is None:
+            channels = self._channels[key] = self._open(key)
+        index = self._next.get(key, 0)
+        self._next[key] = (index + 1) % len(channels)
+        return key, index
+
+    def channel(self, target: str) -> grpc.aio.Channel:
+        """The next channel to `target`"""
+        key, index = self._pick(target)
+        return self._channels[key][index]
+
+    def local_methods(self, service: IService) -> Dict[str, "LocalMethod"]:
+        """Methods of `service` the app serves, to call in process"""
+        if not self.local or self.app is None or self.app.interceptors:
+            return {}
+        methods = self._local.get(service.qual_name)
+        if methods is None:
+            # local_call imports make_method, which needs grpcAPI initialized
+            from grpcAPI.local_call import LocalMethod
+
+            methods = {}
+            local_service = self.app.get_service(service.package, service.name)
+            if local_service is not None and local_service.active:
+                methods = {
+                    method.name: LocalMethod(method, self.app, self.isolate)
+                    for method in local_service.methods
+                }
+            self._local[service.qual_name] = methods
+        return methods
+
+    def _client_options(self, service: IService) -> Dict[str, Any]:
+        policies = {}
+        for method in service.methods:
+            policy = self.policies.get(f"{service.qual_name}.{method.name}")
+            if policy is not None:
+                policies[method.name] = policy
+        return {"policy": self.policies.get(service.qual_name), "policies": policies}
+
+    def client(
+        self,
+        service: IService,
+        target: str,
+        client_class: Type[C] = ServiceClient,  # type: ignore[assignment]
+    ) -> C:
+        """A `client_class` of `service`: in process for the methods the
+        app serves, over the next channel to `target` for the others"""
+        local = self.local_methods(service)
+        if local and all(method.name in local for method in service.methods):
+            key: Optional[ChannelKey] = None
+            index = 0
+        else:
+            key, index = self._pick(target)
+        client_key = (service.qual_name, client_class, key, index)
+        client = self._clients.get(client_key)
+        if client is None:
+            channel = None if key is None else self._channels[key][index]
+            options = self._client_options(service)
+            # grpc retries the calls of a channel with a service config
+            channel_policies = key is not None and key[2] is not None
+            client = client_class(
+                service, channel, local, channel_policies=channel_policies, **options
+            )
+            self._clients[client_key] = client
+        return client  # type: ignore[return-value]
+
+    def dependency(
+        self,
+        service: IService,
+        target: str,
+        client_class: Type[C] = ServiceClient,  # type: ignore[assignment]
+    ) -> Callable[[], Awaitable[C]]:
+        """A dependency returning a `client_class` of `service`, for
+        `Depends`"""
+
+        # async, as grpc.aio channels must be opened in the event loop
+        # while sync dependencies run in worker threads
+        async def get_client() -> C:
+            return self.client(service, target, client_class)
+
+        get_client.__name__ = f"{service.name}_client"
+        return get_client
+
+    @property
+    def open_channels(self) -> int:
+        return sum(len(channels) for channels in self._channels.values())
+
+    async def close(self, grace: Optional[float] = None) -> None:
+        channels = [c for cs in self._channels.values() for c in cs]
+        self._channels.clear()
+        self._next.clear()
+        self._clients.clear()
+        for channel in channels:
+            await channel.close(grace)
+
+
+@asynccontextmanager
+async def channel_pool_lifespan(app: "App") -> AsyncIterator[None]:
+    """Close the channels of the app pool when the app stops"""
+    try:
+        yield
+    finally:
+        await app.channel_pool.close()
@@ -0,0 +1,219 @@
+import json
+import keyword
+
+from google.protobuf.descriptor_pb2 import FileDescriptorProto
+from typing_extensions import Any, Dict, Iterable, List, Set, Tuple, Type
+
+from grpcAPI.batch import batch_file_of, batch_item_types
+from grpcAPI.client import ServiceClient, client_class_name, declared_policy
+from grpcAPI.makeproto import ILabeledMethod, IService
+
+HEADER = '''"""Clients of the grpcAPI services, written by `grpcapi build --client`.
+
+Do not edit, build again after changing the services.
+"""
+'''
+
+TYPING_NAMES = (
+    "AsyncIterable",
+    "AsyncIterator",
+    "Awaitable",
+    "Iterable",
+    "Optional",
+    "Union",
+)
+CLIENT_NAMES = ("Metadata", "MethodSpec", "ServiceClient", "ServiceSpec")
+# imported when a method declares a call policy
+POLICY_NAMES = ("CallPolicy", "HedgingPolicy", "RetryPolicy")
+# set on each client by ServiceClient.__init__, hiding methods of the class
+CLIENT_ATTRIBUTES = ("service", "channel", "policy", "policies", "metadata")
+
+
+class _Imports:
+    """Names of the message classes in the generated module, aliased when
+    two modules define the same name.
+
+    Batch wrappers are built at runtime, with no module to import them
+    from, so their serialized file is embedded and added to the pool."""
+
+    def __init__(self, taken: Iterable[str]) -> None:
+        self.taken: Set[str] = set(taken)
+        self.names: Dict[Tuple[str, str], str] = {}
+        self.client_names: Set[str] = set(CLIENT_NAMES)
+        self.batch_files: Dict[str, Tuple[FileDescriptorProto, List[str]]] = {}
+
+    def _alias(self, name: str, module: str) -> str:
+        alias = name
+        if alias in self.taken:
+            alias = f"{module.replace('.', '_')}_{name}"
+        self.taken.add(alias)
+        return alias
+
+    def name(self, cls: Type[Any]) -> str:
+        file = batch_file_of(cls)
+        if file is not None:
+            return self._batch_name(cls, file)
+        top, _, nested = cls.__qualname__.partition(".")
+        key = (cls.__module__, top)
+        alias = self.names.get(key)
+        if alias is None:
+            alias = self.names[key] = self._alias(top, cls.__module__)
+        return f"{alias}.{nested}" if nested else alias
+
+    def _batch_name(self, cls: Type[Any], file: FileDescriptorProto) -> str:
+        entry = self.batch_files.get(file.name)
+        if entry is None:
+            for item in batch_item_types(file):
+                self.name(item)  # in the pool before the batch file
+            module = file.package or "batch"
+            aliases = [self._alias(m.name, module) for m in file.message_type]
+            entry = self.batch_files[file.name] = (file, aliases)
+        names = [message.name for message in entry[0].message_type]
+        return entry[1][names.index(cls.DESCRIPTOR.name)]
+
+    def lines(self) -> List[str]:
+        modules: Dict[str, List[str]] = {"grpcAPI.client": list(self.client_names)}
+        if self.batch_files:
+            modules["grpcAPI.batch"] = ["batch_message_classes"]
+        for (module, name), alias in self.names.items():
+            imported = name if alias == name else f"{name} as {alias}"
+            modules.setdefault(module, []).append(imported)
+        lines = [
+            f"from {module} import {', '.join(sorted(names))}"
+            for module, names in sorted(modules.items())
+        ]
+        if self.batch_files:
+            lines.append("")
+        for file, aliases in self.batch_files.values():
+            serialized = file.SerializeToString(deterministic=True)
+            lines.append(
+                f"{', '.join(aliases)} = batch_message_classes({serialized!r})"
+            )
+        return lines
+
+
+def method_attribute(name: str) -> str:
+    """Attribute of a method on its client, with a trailing "_" when the
+    name is a keyword or a ServiceClient attribute"""
+    if (
+        keyword.iskeyword(name)
+        or name in CLIENT_ATTRIBUTES
+        or hasattr(ServiceClient, name)
+    ):
+        return f"{name}_"
+    return name
+
+
+def _literal(value: str) -> str:
+    return json.dumps(value)
+
+
+def _method_spec(method: ILabeledMethod, imports: _Imports) -> str:
+    args = [
+        _literal(method.name),
+        imports.name(method.input_base_type),
+        imports.name(method.output_base_type),
+    ]
+    if method.is_client_stream:
+        args.append("is_client_stream=True")
+    if method.is_server_stream:
+        args.append("is_server_stream=True")
+    policy = declared_policy(method)
+    if policy is not None:
+        # the policy dataclasses repr as the calls building them
+        args.append(f"policy={policy!r}")
+        imports.client_names.update(POLICY_NAMES)
+    return f"            MethodSpec({', '.join(args)}),"
+
+
+def _method(method: ILabeledMethod, imports: _Imports) -> List[str]:
+    request = imports.name(method.input_base_type)
+    response = imports.name(method.output_base_type)
+    if method.is_client_stream:
+        request = f"Union[Iterable[{request}], AsyncIterable[{request}]]"
+    if method.is_server_stream:
+        response = f"AsyncIterator[{response}]"
+    else:
+        response = f"Awaitable[{response}]"
+    lines = [
+        f"    def {method_attribute(method.name)}(",
+        "        self,",
+        f"        request: {request},",
+        "        *,",
+        "        timeout: Optional[float] = None,",
+        "        metadata: Optional[Metadata] = None,",
+        f"    ) -> {response}:",
+    ]
+    description = method.description.strip()
+    if description:
+        doc = description.splitlines()[0].replace("\\", "\\\\").replace('"', "'")
+        lines.append(f'        """{doc}"""')
+    lines.append(
+        f"        return self._methods[{_literal(method.name)}](request, "
+        "timeout=timeout, metadata=metadata)"
+    )
+    return lines
+
+
+def _client_class(service: IService, class_name: str, imports: _Imports) -> List[str]:
+    methods = list(service.methods)
+    lines = [
+        "",
+        "",
+        f"class {class_name}(ServiceClient):",
+        f'    """Client of {service.qual_name}"""',
+        "",
+        "    spec = ServiceSpec(",
+        f"        {_literal(service.package)},",
+        f"        {_literal(service.name)},",
+        "        (",
+    ]
+    lines.extend(_method_spec(method, imports) for method in methods)
+    lines.extend(["        ),", "    )"])
+    for method in methods:
+        lines.append("")
+        lines.extend(_method(method, imports))
+    return lines
+
+
+def render_client_module(services: Iterable[IService]) -> str:
+    """
+    Source of a module with a typed ServiceClient subclass per service,
+    named by `client_class_name`, importing the message classes of the
+    methods from the modules defining them, and the call policies the
+    methods declare. Only active services are written.
+    """
+    services = [service for service in services if service.active]
+    class_names: Dict[str, str] = {}
+    for service in services:
+        name = client_class_name(service.name)
+        if name in class_names.values():
+            package = service.package.replace(".", "_")
+            name = client_class_name(f"{package}_{service.name}")
+        class_names[service.qual_name] = name
+
+    taken = [
+        *TYPING_NAMES,
+        *CLIENT_NAMES,
+        *POLICY_NAMES,
+        "batch_message_classes",
+        *class_names.values(),
+    ]
+    imports = _Imports(taken)
+    body: List[str] = []
+    for service in services:
+        body.extend(_client_class(service, class_names[service.qual_name], imports))
+
+    names = ", ".join(_literal(name) for name in sorted(class_names.values()))
+    lines = [
+        HEADER,
+        f"from typing import {', '.join(TYPING_NAMES)}",
+        "",
+        *imports.lines(),
+        *body,
+        "",
+        "",
+        f"__all__ = [{names}]",
+        "",
+    ]
+    return "\n".join(lines)
@@ -1,4 +1,19 @@
 __all__ = ["GRPCAPICommand", "InitCommand", "run_init", "RunCommand"]
-from grpcAPI.commands.command import GRPCAPICommand
-from grpcAPI.commands.init import InitCommand, run_init
-from grpcAPI.commands.run import RunCommand
+import importlib
+
+from typing_extensions import Any
+
+# commands are imported on first access so loading one does not load them all
+_lazy_attrs = {
+    "GRPCAPICommand": "grpcAPI.commands.command",
+    "InitCommand": "grpcAPI.commands.init",
+    "run_init": "grpcAPI.commands.init",
+    "RunCommand": "grpcAPI.commands.run",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _lazy_attrs.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
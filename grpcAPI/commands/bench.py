@@ -0,0 +1,462 @@
+import asyncio
+import json
+import math
+import time
+from collections import Counter
+from contextlib import AsyncExitStack
+from fnmatch import fnmatch
+from pathlib import Path
+
+import grpc
+from google.protobuf import json_format
+from google.protobuf.descriptor import FieldDescriptor
+from typing_extensions import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Type,
+)
+
+from grpcAPI.add_to_server import add_to_server
+from grpcAPI.app import App
+from grpcAPI.commands.command import GRPCAPICommand
+from grpcAPI.commands.settings.utils import load_file_by_extension
+from grpcAPI.datatypes import Message
+from grpcAPI.lifespan import LifespanGroup
+from grpcAPI.makeproto.interface import ILabeledMethod, IService
+from grpcAPI.server import make_server
+
+FD = FieldDescriptor
+
+PERCENTILES = (("p50", 50.0), ("p90", 90.0), ("p99", 99.0), ("p999", 99.9))
+
+_sample_scalars: Dict[int, Any] = {
+    FD.CPPTYPE_STRING: "bench",
+    FD.CPPTYPE_BOOL: True,
+    FD.CPPTYPE_INT32: 1,
+    FD.CPPTYPE_INT64: 1,
+    FD.CPPTYPE_UINT32: 1,
+    FD.CPPTYPE_UINT64: 1,
+    FD.CPPTYPE_FLOAT: 1.0,
+    FD.CPPTYPE_DOUBLE: 1.0,
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile over an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    # rounded first so that float noise, as in 99.9 / 100 * 1000, does not
+    # push the rank up
+    rank = math.ceil(round(pct / 100.0 * len(sorted_values), 9)) - 1
+    rank = min(max(rank, 0), len(sorted_values) - 1)
+    return sorted_values[rank]
+
+
+def _set_sample_field(msg: Message, field: Any, depth: int) -> None:
+    # 'field' is a FieldDescriptor of the python or of the upb backend
+    if field.cpp_type == FD.CPPTYPE_MESSAGE:
+        if field.message_type.GetOptions().map_entry or depth <= 0:
+            return
+        if field.label == FD.LABEL_REPEATED:
+            fill_sample_message(getattr(msg, field.name).add(), depth - 1)
+        else:
+            fill_sample_message(getattr(msg, field.name), depth - 1)
+        return
+
+    if field.cpp_type == FD.CPPTYPE_ENUM:
+        values = field.enum_type.values
+        value: Any = values[1].number if len(values) > 1 else values[0].number
+    else:
+        value = _sample_scalars[field.cpp_type]
+        if field.type == FD.TYPE_BYTES:
+            value = b"bench"
+
+    if field.label == FD.LABEL_REPEATED:
+        getattr(msg, field.name).append(value)
+    else:
+        setattr(msg, field.name, value)
+
+
+def fill_sample_message(msg: Message, depth: int = 2) -> Message:
+    """Populate every field of 'msg' with a non-default sample value.
+
+    Only the first member of each oneof is set, map fields are skipped and
+    nested messages are filled up to 'depth' levels."""
+    seen_oneofs = set()
+    for field in msg.DESCRIPTOR.fields:
+        oneof = field.containing_oneof
+        if oneof is not None:
+            if oneof.name in seen_oneofs:
+                continue
+            seen_oneofs.add(oneof.name)
+        _set_sample_field(msg, field, depth)
+    return msg
+
+
+def make_sample_request(cls: Type[Message]) -> Message:
+    return fill_sample_message(cls())
+
+
+def method_path(service: IService, method: ILabeledMethod) -> str:
+    return f"/{service.qual_name}/{method.name}"
+
+
+def load_fixtures(path: Optional[Path]) -> Dict[str, List[Dict[str, Any]]]:
+    """Load request fixtures keyed by 'package.Service/method'."""
+    if path is None:
+        return {}
+    if not path.exists():
+        raise FileNotFoundError(f"Fixtures file not found: {path}")
+    raw = load_file_by_extension(path)
+    fixtures: Dict[str, List[Dict[str, Any]]] = {}
+    for key, value in raw.items():
+        requests = value if isinstance(value, list) else [value]
+        fixtures[key.strip("/")] = requests
+    return fixtures
+
+
+class BenchTarget:
+    def __init__(
+        self,
+        path: str,
+        method: ILabeledMethod,
+        requests: List[Message],
+    ) -> None:
+        self.path = path
+        self.method = method
+        self.requests = requests
+
+    @property
+    def shape(self) -> str:
+        return {
+            (False, False): "unary",
+            (False, True): "server_stream",
+            (True, False): "client_stream",
+            (True, True): "bidi_stream",
+        }[(self.method.is_client_stream, self.method.is_server_stream)]
+
+
+def select_targets(
+    services: Iterable[IService],
+    patterns: Optional[Iterable[str]],
+    fixtures: Mapping[str, List[Dict[str, Any]]],
+) -> List[BenchTarget]:
+    patterns = list(patterns or [])
+    targets: List[BenchTarget] = []
+    for service in services:
+        if not service.active:
+            continue
+        for method in service.methods:
+            path = method_path(service, method)
+            key = path.strip("/")
+            if patterns and not any(fnmatch(key, p) for p in patterns):
+                continue
+            req_cls = method.input_base_type
+            if key in fixtures:
+                requests = [json_format.ParseDict(d, req_cls()) for d in fixtures[key]]
+            else:
+                requests = [make_sample_request(req_cls)]
+            targets.append(BenchTarget(path, method, requests))
+    return targets
+
+
+class MethodStats:
+    def __init__(self, path: str, shape: str) -> None:
+        self.path = path
+        self.shape = shape
+        self.latencies: List[float] = []
+        self.errors: Dict[str, int] = Counter()
+        self.messages = 0
+        self.elapsed = 0.0
+
+    def record(self, latency: float, messages: int = 1) -> None:
+        self.latencies.append(latency)
+        self.messages += messages
+
+    def record_error(self, code: str) -> None:
+        self.errors[code] += 1
+
+    @property
+    def total(self) -> int:
+        return len(self.latencies) + sum(self.errors.values())
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        total = self.total
+        errors = sum(self.errors.values())
+        result: Dict[str, Any] = {
+            "method": self.path,
+            "shape": self.shape,
+            "requests": total,
+            "ok": len(ordered),
+            "errors": errors,
+            "error_rate": errors / total if total else 0.0,
+            "error_codes": dict(self.errors),
+            "messages": self.messages,
+            "elapsed_s": self.elapsed,
+            "throughput_rps": total / self.elapsed if self.elapsed else 0.0,
+            "mean_ms": (sum(ordered) / len(ordered) * 1000.0) if ordered else 0.0,
+            "max_ms": ordered[-1] * 1000.0 if ordered else 0.0,
+        }
+        for name, pct in PERCENTILES:
+            result[f"{name}_ms"] = percentile(ordered, pct) * 1000.0
+        return result
+
+
+async def _request_stream(request: Message, count: int) -> AsyncIterator[Message]:
+    for _ in range(count):
+        yield request
+
+
+async def _count_responses(responses: AsyncIterator[Message]) -> int:
+    count = 0
+    async for _ in responses:
+        count += 1
+    return count
+
+
+# channel factory of each call shape
+_STUBS = {
+    "unary": "unary_unary",
+    "server_stream": "unary_stream",
+    "client_stream": "stream_unary",
+    "bidi_stream": "stream_stream",
+}
+
+
+def make_call(
+    channel: grpc.aio.Channel, target: BenchTarget, stream_messages: int
+) -> Callable[[Message], Any]:
+    """Return a coroutine function issuing one call and returning the number
+    of response messages received."""
+    method = target.method
+    stub = getattr(channel, _STUBS[target.shape])(
+        target.path,
+        request_serializer=method.input_base_type.SerializeToString,
+        response_deserializer=method.output_base_type.FromString,
+    )
+    client_stream = method.is_client_stream
+    server_stream = method.is_server_stream
+
+    async def call(request: Message) -> int:
+        arg = _request_stream(request, stream_messages) if client_stream else request
+        if server_stream:
+            return await _count_responses(stub(arg))
+        await stub(arg)
+        return 1
+
+    return call
+
+
+async def _timed_call(
+    call: Callable[[Message], Any],
+    request: Message,
+    stats: MethodStats,
+    start: float,
+) -> None:
+    try:
+        messages = await call(request)
+        stats.record(time.perf_counter() - start, messages)
+    except grpc.aio.AioRpcError as e:
+        stats.record_error(e.code().name)
+    except Exception as e:
+        stats.record_error(type(e).__name__)
+
+
+async def drive_concurrency(
+    call: Callable[[Message], Any],
+    requests: List[Message],
+    stats: MethodStats,
+    concurrency: int,
+    duration: Optional[float],
+    total: Optional[int],
+) -> None:
+    """Closed loop: 'concurrency' workers issue calls back to back."""
+    issued = 0
+    deadline = None if duration is None else time.perf_counter() + duration
+
+    def next_request() -> Optional[Message]:
+        nonlocal issued
+        if total is not None and issued >= total:
+            return None
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        request = requests[issued % len(requests)]
+        issued += 1
+        return request
+
+    async def worker() -> None:
+        while True:
+            request = next_request()
+            if request is None:
+                return
+            await _timed_call(call, request, stats, time.perf_counter())
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def drive_rate(
+    call: Callable[[Message], Any],
+    requests: List[Message],
+    stats: MethodStats,
+    rate: float,
+    concurrency: int,
+    duration: Optional[float],
+    total: Optional[int],
+) -> None:
+    """Open loop: calls are scheduled at a fixed rate. Latency is measured
+    from the scheduled start, so queueing behind 'concurrency' in-flight
+    calls is accounted for instead of hidden."""
+    interval = 1.0 / rate
+    limit = asyncio.Semaphore(concurrency)
+    tasks: List["asyncio.Task[None]"] = []
+    begin = time.perf_counter()
+    issued = 0
+
+    async def launch(request: Message, scheduled: float) -> None:
+        async with limit:
+            await _timed_call(call, request, stats, scheduled)
+
+    while True:
+        if total is not None and issued >= total:
+            break
+        scheduled = begin + issued * interval
+        if duration is not None and scheduled - begin >= duration:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        request = requests[issued % len(requests)]
+        tasks.append(asyncio.ensure_future(launch(request, scheduled)))
+        issued += 1
+    await asyncio.gather(*tasks)
+
+
+async def run_bench(
+    channel: grpc.aio.Channel,
+    targets: List[BenchTarget],
+    concurrency: int = 10,
+    rate: Optional[float] = None,
+    duration: Optional[float] = 10.0,
+    total: Optional[int] = None,
+    stream_messages: int = 10,
+) -> List[MethodStats]:
+    """Drive each target in turn and collect its statistics."""
+    if duration is None and total is None:
+        raise ValueError("Either 'duration' or 'requests' must be set")
+    results: List[MethodStats] = []
+    for target in targets:
+        stats = MethodStats(target.path, target.shape)
+        call = make_call(channel, target, stream_messages)
+        begin = time.perf_counter()
+        if rate:
+            await drive_rate(
+                call, target.requests, stats, rate, concurrency, duration, total
+            )
+        else:
+            await drive_concurrency(
+                call, target.requests, stats, concurrency, duration, total
+            )
+        stats.elapsed = time.perf_counter() - begin
+        results.append(stats)
+    return results
+
+
+def write_bench_json(path: Path, report: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+class BenchCommand(GRPCAPICommand):
+
+    def __init__(self, app: App, settings_path: Optional[str] = None) -> None:
+        super().__init__("bench", app, settings_path)
+
+    async def run(self, **kwargs: Any) -> Dict[str, Any]:
+
+        app = self.app
+        bench_settings = self.settings.get("bench", {})
+
+        def opt(name: str, default: Any = None) -> Any:
+            value = kwargs.get(name)
+            return value if value is not None else bench_settings.get(name, default)
+
+        concurrency = int(opt("concurrency", 10))
+        rate = opt("rate")
+        rate = float(rate) if rate else None
+        total = opt("requests")
+        total = int(total) if total else None
+        # an explicit call count replaces the default time budget
+        duration = (
+            None if total and kwargs.get("duration") is None else opt("duration", 10.0)
+        )
+        duration = float(duration) if duration else None
+        stream_messages = int(opt("stream_messages", 10))
+        fixtures_path = opt("fixtures")
+        uds = opt("uds")
+
+        fixtures = load_fixtures(Path(fixtures_path) if fixtures_path else None)
+        targets = select_targets(app.service_list, kwargs.get("methods"), fixtures)
+        if not targets:
+            raise ValueError("No methods selected to benchmark")
+
+        server_settings = self.settings.get("server", {})
+        server = make_server(app.interceptors, **server_settings)
+        for service in app.service_list:
+            if service.active:
+                add_to_server(
+                    service, server, app.dependency_overrides, app._exception_handlers
+                )
+
+        if uds:
+            address = f"unix:{uds}"
+            server.add_insecure_port(address)
+        else:
+            host = opt("host", "127.0.0.1")
+            port = server.add_insecure_port(f"{host}:{int(opt('port', 0))}")
+            address = f"{host}:{port}"
+
+        lifespans = LifespanGroup(
+            app, concurrent=self.settings.get("lifespan", {}).get("concurrent", False)
+        )
+        async with AsyncExitStack() as stack:
+            await stack.enter_async_context(lifespans)
+            await server.start()
+            self.logger.info(f"Benchmarking {len(targets)} method(s) on {address}")
+            try:
+                async with grpc.aio.insecure_channel(address) as channel:
+                    stats = await run_bench(
+                        channel,
+                        targets,
+                        concurrency=concurrency,
+                        rate=rate,
+                        duration=duration,
+                        total=total,
+                        stream_messages=stream_messages,
+                    )
+            finally:
+                await server.stop(None)
+
+        report = {
+            "app": app.name,
+            "version": app.version,
+            "address": address,
+            "mode": "rate" if rate else "concurrency",
+            "concurrency": concurrency,
+            "rate": rate,
+            "duration_s": duration,
+            "requests_per_method": total,
+            "stream_messages": stream_messages,
+            "methods": [s.summary() for s in stats],
+        }
+        json_path = kwargs.get("json_path")
+        if json_path:
+            write_bench_json(Path(json_path), report)
+        return report
@@ -1,13 +1,16 @@
 import shutil
-import tempfile
-import zipfile
 from logging import Logger
 from pathlib import Path
-from typing import Any, Dict, Optional, Set
+from typing import Any, Dict, Mapping, Optional, Set
 
 from grpcAPI.app import App
+from grpcAPI.client_codegen import render_client_module
 from grpcAPI.commands import GRPCAPICommand, lint
+from grpcAPI.makeproto.archive import archive_name, collect_entries, write_archive
+from grpcAPI.makeproto.descriptor import JINJA
+from grpcAPI.makeproto.manifest import BuildManifest
 from grpcAPI.makeproto.write_proto import write_protos
+from grpcAPI.service_config import render_service_config
 
 
 def build_protos(
@@ -17,8 +20,15 @@ def build_protos(
     output_path: Path,
     overwrite: bool,
     zipcompress: bool,
+    incremental: bool = False,
+    archive_format: str = "zip",
+    renderer: str = JINJA,
+    extra_files: Optional[Mapping[str, str]] = None,
 ) -> Set[str]:
-    proto_files = lint.run_lint(app, logger)
+    """Write the app protos, with the .proto files of `proto_path`, into
+    `output_path`. With `zipcompress` everything, `extra_files` included,
+    goes into one archive; `extra_files` is ignored otherwise"""
+    proto_files = lint.run_lint(app, logger, renderer=renderer)
 
     def _atomic_write(file_path: Path, overwrite: bool):
         if proto_path.exists():
@@ -32,17 +42,84 @@ def build_protos(
         )
         return generated_files
 
+    def _incremental_write(file_path: Path, overwrite: bool) -> Set[str]:
+        manifest = BuildManifest(file_path)
+        if proto_path.exists():
+            copy_proto_files(proto_path, file_path, logger, manifest)
+
+        generated_files = write_protos(
+            proto_stream=proto_files,
+            out_dir=file_path,
+            overwrite=overwrite,
+            clean_services=False,
+            manifest=manifest,
+        )
+        logger.info(f"Build output: {manifest.finish()}")
+        return generated_files
+
     if zipcompress:
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            generated_files = _atomic_write(temp_path, True)
-            zip_directory(temp_path, output_path / "protos.zip", logger)
-            return generated_files
+        # archive members are streamed from memory, nothing is staged on disk
+        proto_list = list(proto_files)
+        archive_path = output_path / archive_name("protos", archive_format)
+        entries = collect_entries(proto_list, proto_path)
+        for name, content in (extra_files or {}).items():
+            entries[name] = content.encode("utf-8")
+        if write_archive(entries, archive_path, archive_format):
+            logger.info(f"Created archive: {archive_path}")
+        else:
+            logger.info(f"Archive unchanged: {archive_path}")
+        return {proto.qual_name for proto in proto_list} | set(extra_files or ())
+    elif incremental:
+        return _incremental_write(output_path, overwrite)
     else:
         return _atomic_write(output_path, overwrite)
 
 
-def copy_proto_files(source_path: Path, dest_path: Path, logger: Logger) -> None:
+def build_client(
+    app: App, logger: Logger, output_path: Path, filename: str = "client.py"
+) -> str:
+    """Write the typed clients of the app services next to the protos,
+    leaving the file untouched when they did not change"""
+    content = render_client_module(app.service_list)
+    client_path = output_path / filename
+    if client_path.exists() and client_path.read_text() == content:
+        logger.info(f"Client module unchanged: {client_path}")
+    else:
+        client_path.parent.mkdir(parents=True, exist_ok=True)
+        client_path.write_text(content)
+        logger.info(f"Client module written: {client_path}")
+    return filename
+
+
+def build_service_config(
+    app: App, logger: Logger, output_path: Path, filename: str = "service_config.json"
+) -> Optional[str]:
+    """Write the gRPC service config of the method policies next to the
+    protos, when any method declares one. A file left from an earlier build
+    is kept, it may be the user's own"""
+    content = render_service_config(app.service_list)
+    config_path = output_path / filename
+    if not content:
+        if config_path.exists():
+            logger.warning(
+                f"No method declares a call policy, {config_path} is left as it is"
+            )
+        return None
+    if config_path.exists() and config_path.read_text() == content:
+        logger.info(f"Service config unchanged: {config_path}")
+    else:
+        config_path.parent.mkdir(parents=True, exist_ok=True)
+        config_path.write_text(content)
+        logger.info(f"Service config written: {config_path}")
+    return filename
+
+
+def copy_proto_files(
+    source_path: Path,
+    dest_path: Path,
+    logger: Logger,
+    manifest: Optional[BuildManifest] = None,
+) -> None:
     if not source_path.exists():
         logger.warning(f"Proto source path does not exist: {source_path}")
         return
@@ -51,6 +128,11 @@ def copy_proto_files(source_path: Path, dest_path: Path, logger: Logger) -> None
         relative_path = proto_file.relative_to(source_path)
         dest_file = dest_path / relative_path
 
+        if manifest is not None:
+            status = manifest.copy(proto_file, relative_path.as_posix())
+            logger.debug(f"Copied {proto_file} to {dest_file}: {status}")
+            continue
+
         # Create parent directories if they don't exist
         dest_file.parent.mkdir(parents=True, exist_ok=True)
 
@@ -59,19 +141,6 @@ def copy_proto_files(source_path: Path, dest_path: Path, logger: Logger) -> None
         logger.debug(f"Copied {proto_file} to {dest_file}")
 
 
-def zip_directory(source_dir: Path, zip_path: Path, logger: Logger) -> None:
-    zip_path.parent.mkdir(parents=True, exist_ok=True)
-
-    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-        for file_path in source_dir.rglob("*"):
-            if file_path.is_file():
-                arcname = file_path.relative_to(source_dir)
-                zipf.write(file_path, arcname)
-                logger.debug(f"Added {file_path} to zip as {arcname}")
-
-    logger.info(f"Created zip file: {zip_path}")
-
-
 def get_proto_path(
     settings: Dict[str, Any],
 ) -> Path:
@@ -119,12 +188,44 @@ class BuildCommand(GRPCAPICommand):
         zipcompress = kwargs.get("zipcompress") or compile_settings.get(
             "zipcompress", False
         )
-
-        return build_protos(
+        incremental = not kwargs.get("full_rebuild") and compile_settings.get(
+            "incremental", False
+        )
+        archive_format = kwargs.get("archive_format") or compile_settings.get(
+            "archive_format", "zip"
+        )
+        client = kwargs.get("client") or compile_settings.get("client", False)
+        client_module = compile_settings.get("client_module", "client.py")
+        service_config = compile_settings.get("service_config", True)
+        config_file = compile_settings.get("service_config_file", "service_config.json")
+
+        # a zipped build writes nothing but the archive
+        extra_files: Dict[str, str] = {}
+        if zipcompress and client:
+            extra_files[client_module] = render_client_module(self.app.service_list)
+        if zipcompress and service_config:
+            config = render_service_config(self.app.service_list)
+            if config:
+                extra_files[config_file] = config
+
+        generated = build_protos(
             app=self.app,
             logger=self.logger,
             proto_path=proto_path,
             output_path=outdir,
             overwrite=overwrite,
             zipcompress=zipcompress,
+            incremental=incremental,
+            archive_format=archive_format,
+            renderer=compile_settings.get("renderer", JINJA),
+            extra_files=extra_files,
         )
+        if zipcompress:
+            return generated
+        if client:
+            generated.add(build_client(self.app, self.logger, outdir, client_module))
+        if service_config:
+            filename = build_service_config(self.app, self.logger, outdir, config_file)
+            if filename is not None:
+                generated.add(filename)
+        return generated
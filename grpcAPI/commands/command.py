@@ -12,6 +12,7 @@ from grpcAPI.service_proc.filter_service import DisableService
 from grpcAPI.service_proc.format_service import FormatService
 from grpcAPI.service_proc.register_descriptor import RegisterDescriptors
 from grpcAPI.service_proc.run_process_service import run_process_service
+from grpcAPI.startup_report import measure
 
 default_logger = getLogger(__name__)
 
@@ -41,7 +42,8 @@ class BaseCommand:
         self.settings_path = settings_path
         self.logger: Logger = default_logger
 
-        self.settings = resolve_settings(settings_path)
+        with measure("settings"):
+            self.settings = resolve_settings(settings_path)
 
         app_environ = self.settings.get("app_environ", {})
         for key, value in app_environ.items():
@@ -81,4 +83,5 @@ class GRPCAPICommand(BaseCommand):
             additional_services.append(AddLanguageOptions)
         elif command_name == "run":
             additional_services.append(RegisterDescriptors)
-        run_process_service(app, self.settings, additional_services)
+        with measure("process_services"):
+            run_process_service(app, self.settings, additional_services)
@@ -1,16 +1,28 @@
 from logging import Logger
-from typing import Any, Iterable, Optional
+from typing import Any, Dict, Iterable, Optional
 
 from grpcAPI.app import App
 from grpcAPI.build_proto import make_protos
 from grpcAPI.commands.command import GRPCAPICommand
+from grpcAPI.makeproto.descriptor import DESCRIPTOR, JINJA
 from grpcAPI.makeproto.interface import IProtoPackage
 
 
-def run_lint(app: App, logger: Logger) -> Iterable[IProtoPackage]:
-    files = make_protos(app.services)
+def run_lint(
+    app: App, logger: Logger, verbose: bool = False, renderer: str = JINJA
+) -> Iterable[IProtoPackage]:
+    timings: Dict[str, float] = {}
+    options: Dict[str, Any] = {}
+    if verbose:
+        options["timings"] = timings
+    if renderer != JINJA:
+        options["renderer"] = renderer
+    files = make_protos(app.services, **options)
     file_list = list(files)
     logger.info(f"{len(file_list)} Protos have been successfully generated.")
+    if timings:
+        for name, elapsed in sorted(timings.items(), key=lambda t: -t[1]):
+            logger.info(f"Compiler pass {name}: {elapsed * 1000:.2f} ms")
     logger.debug("Generated files:", [(f.package, f.filename) for f in file_list])
     return file_list
 
@@ -21,4 +33,10 @@ class LintCommand(GRPCAPICommand):
         super().__init__("lint", app, settings_path, is_sync=True)
 
     def run_sync(self, **kwargs: Any) -> Iterable[IProtoPackage]:
-        return run_lint(self.app, self.logger)
+        # only build writes the protos, through the configured renderer
+        return run_lint(
+            self.app,
+            self.logger,
+            verbose=kwargs.get("verbose", False),
+            renderer=DESCRIPTOR,
+        )
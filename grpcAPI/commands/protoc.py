@@ -3,7 +3,8 @@ from pathlib import Path
 from typing import Any, Optional
 
 from grpcAPI.commands.command import BaseCommand
-from grpcAPI.protoc.compile import compile_protoc
+from grpcAPI.protoc.compile import SUBPROCESS, compile_protoc
+from grpcAPI.protoc.incremental import compile_protoc_incremental
 
 
 class ProtocCommand(BaseCommand):
@@ -18,15 +19,36 @@ class ProtocCommand(BaseCommand):
         )
         lib_path = kwargs.get("lib_path") or self.settings.get("lib_path", "lib")
         mypy_stubs = kwargs.get("mypy_stubs", True)
+        protoc_settings = self.settings.get("protoc", {})
+        incremental = kwargs.get("incremental") or protoc_settings.get(
+            "incremental", False
+        )
+        backend = kwargs.get("backend") or protoc_settings.get("backend", SUBPROCESS)
 
         try:
-            proto_files = compile_protoc(
-                root=Path(proto_path),
-                dst=Path(lib_path),
-                clss=True,
-                services=False,
-                mypy_stubs=mypy_stubs,
-            )
+            if incremental:
+                proto_files = compile_protoc_incremental(
+                    root=Path(proto_path),
+                    dst=Path(lib_path),
+                    clss=True,
+                    services=False,
+                    mypy_stubs=mypy_stubs,
+                    logger=self.logger,
+                    cache_path=Path(
+                        protoc_settings.get("cache_path", ".grpcapi_cache")
+                    ),
+                    workers=protoc_settings.get("workers") or None,
+                    backend=backend,
+                )
+            else:
+                proto_files = compile_protoc(
+                    root=Path(proto_path),
+                    dst=Path(lib_path),
+                    clss=True,
+                    services=False,
+                    mypy_stubs=mypy_stubs,
+                    backend=backend,
+                )
             print(f"Successfully compiled proto files from {proto_path} to {lib_path}")
             return proto_files
         except Exception as e:
@@ -1,16 +1,24 @@
 from contextlib import AsyncExitStack
+from pathlib import Path
 
-from typing_extensions import Any, Optional
+from typing_extensions import Any, Callable, Dict, List, Mapping, Optional
 
-from grpcAPI.add_to_server import add_to_server
+from grpcAPI.add_to_server import LazyPolicy, add_to_server
 from grpcAPI.app import App
 from grpcAPI.build_proto import make_protos
+from grpcAPI.client import channel_pool_lifespan
 from grpcAPI.commands.command import GRPCAPICommand
+from grpcAPI.lifespan import LifespanGroup
+from grpcAPI.lint_cache import LintCache
 
 # from grpcAPI.commands.utils import get_host_port
 from grpcAPI.load_credential import get_server_certificate
+from grpcAPI.makeproto import IService
+from grpcAPI.makeproto.descriptor import DESCRIPTOR
 from grpcAPI.server import ServerWrapper, make_server
 from grpcAPI.server_plugins.loader import make_plugin
+from grpcAPI.startup_report import get_active_report, measure
+from grpcAPI.warmup import MethodKey, run_warmup
 
 
 class RunCommand(GRPCAPICommand):
@@ -22,48 +30,128 @@ class RunCommand(GRPCAPICommand):
 
         settings = self.settings
         app = self.app
-        lint = kwargs.get("lint") or settings.get("lint", True)
+        lint = kwargs.get("lint")
+        if lint is None:
+            lint = settings.get("lint", True)
         plugins_settings = settings.get("plugins", {})
 
         if lint:
-            proto_files = make_protos(app.services)
-            self.logger.debug(
-                "Generated files:", [(f.package, f.filename) for f in proto_files]
-            )
+            with measure("lint"):
+                self.lint(app.services)
 
-        if app.server:
-            server = ServerWrapper(app.server)
-        else:
-            server_settings = settings.get("server", {})
-            server = make_server(app.interceptors, **server_settings)
-
-        plugins = [
-            make_plugin(plugin_name, **kwargs)
-            for plugin_name, kwargs in plugins_settings.items()
-        ]
-        for plugin in plugins:
-            server.register_plugin(plugin)
-
-        for service in app.service_list:
-            if service.active:
-                add_to_server(
-                    service, server, app.dependency_overrides, app._exception_handlers
-                )
+        with measure("make_server"):
+            if app.server:
+                server = ServerWrapper(app.server)
+            else:
+                server_settings = settings.get("server", {})
+                server = make_server(app.interceptors, **server_settings)
+
+        for plugin_name, plugin_kwargs in plugins_settings.items():
+            with measure(plugin_name, "plugin"):
+                plugin = make_plugin(plugin_name, **plugin_kwargs)
+                server.register_plugin(plugin)
+
+        lazy = LazyPolicy.from_settings(settings.get("handlers", {}))
+        handlers: Dict[MethodKey, Callable[..., Any]] = {}
+        with measure("add_to_server"):
+            for service in app.service_list:
+                if service.active:
+                    with measure(service.qual_name, "service"):
+                        methods = add_to_server(
+                            service,
+                            server,
+                            app.dependency_overrides,
+                            app._exception_handlers,
+                            lazy,
+                        )
+                    for name, handler in methods.items():
+                        handlers[(service.package, service.name, name)] = handler
         host = kwargs.get("host") or settings.get("host", "localhost")
         port = kwargs.get("port") or settings.get("port", 50051)
         port = int(port)
         tls = settings.get("tls", {"enabled": False})
-        if tls.get("enabled"):
-            credential = get_server_certificate(
-                tls.get("certificate"),
-                tls.get("key"),
-            )
-            server.add_secure_port(f"{host}:{port}", credential)
-        else:
-            server.add_insecure_port(f"{host}:{port}")
+        with measure("bind"):
+            if tls.get("enabled"):
+                credential = get_server_certificate(
+                    tls.get("certificate"),
+                    tls.get("key"),
+                )
+                server.add_secure_port(f"{host}:{port}", credential)
+            else:
+                server.add_insecure_port(f"{host}:{port}")
 
         async with AsyncExitStack() as stack:
-            for lifespan in app.lifespan:
-                await stack.enter_async_context(lifespan(app))
-            await server.start()
+            lifespans = LifespanGroup(
+                app, concurrent=settings.get("lifespan", {}).get("concurrent", False)
+            )
+            app.channel_pool.configure(**settings.get("client", {}))
+            await stack.enter_async_context(channel_pool_lifespan(app))
+            # runs once the lifespans have exited
+            stack.callback(self.log_lifespans, lifespans)
+            with measure("lifespans"):
+                await stack.enter_async_context(lifespans)
+            await server.start_warmup()
+            with measure("server_start"):
+                await server.start()
+            with measure("warmup"):
+                await self.warmup(handlers)
+            await server.end_warmup()
+            self.report_startup(kwargs.get("startup_report"))
             await server.wait_for_termination()
+
+    def log_lifespans(self, lifespans: LifespanGroup) -> None:
+        for name, durations in lifespans.durations.items():
+            stages = ", ".join(
+                f"{stage} {seconds * 1000:.1f} ms"
+                for stage, seconds in durations.items()
+            )
+            self.logger.info(f"Lifespan {name}: {stages}")
+
+    async def warmup(self, handlers: Mapping[MethodKey, Callable[..., Any]]) -> None:
+        durations = await run_warmup(self.app, handlers)
+        for name, duration in durations.items():
+            if duration is not None:
+                self.logger.info(f"Warmup {name}: {duration * 1000:.1f} ms")
+        if durations:
+            total = sum(d for d in durations.values() if d is not None)
+            self.logger.info(
+                f"Warmup done in {total * 1000:.1f} ms "
+                f"({len(durations)} step(s), "
+                f"{sum(d is None for d in durations.values())} failed)"
+            )
+
+    def lint(self, services: Mapping[str, List[IService]]) -> None:
+        # validation only: the descriptor renderer leaves jinja to the build
+        # command, RegisterDescriptors builds the descriptors it registers
+        cache_settings: Dict[str, Any] = self.settings.get("lint_cache", {})
+        if not cache_settings.get("enabled", True):
+            proto_files = make_protos(services, renderer=DESCRIPTOR)
+            self.logger.debug(
+                "Generated files:", [(f.package, f.filename) for f in proto_files]
+            )
+            return
+
+        cache = LintCache(Path(cache_settings.get("path", ".grpcapi_cache")))
+        stale = cache.stale(services)
+        if stale:
+            proto_files = make_protos(stale, renderer=DESCRIPTOR)
+            self.logger.debug(
+                "Generated files:", [(f.package, f.filename) for f in proto_files]
+            )
+            cache.update(stale)
+        cache.save(services.keys())
+        self.logger.info(
+            f"Lint cache: {len(services) - len(stale)} package(s) unchanged, "
+            f"{len(stale)} linted"
+        )
+
+    def report_startup(self, path: Optional[str]) -> None:
+        report = get_active_report()
+        if report is None:
+            return
+        report.finish()
+        report.deactivate()
+        report.print()
+        if path:
+            report.write_json(path)
+            self.logger.info(f"Startup report written to {path}")
@@ -1,11 +1,10 @@
 import importlib.util
 import logging
 import sys
+from copy import deepcopy
+from functools import lru_cache
 from pathlib import Path
 
-import json5
-import toml
-import yaml
 from typing_extensions import Any, Dict
 
 DEFAULT_CONFIG_PATH = Path(__file__).parent / "config.json"
@@ -20,13 +19,20 @@ def load_file_by_extension(path: Path) -> Dict[str, Any]:
     """
     try:
         ext = path.suffix.lower()
+        # parsers are imported on demand, most processes only ever need one
         if ext == ".toml":
+            import toml
+
             with path.open("r", encoding="utf-8") as f:
                 return toml.load(f)
         elif ext in (".yaml", ".yml"):
+            import yaml
+
             with path.open("r", encoding="utf-8") as f:
                 return yaml.safe_load(f)
         elif ext == ".json":
+            import json5
+
             # Use JSON5 parser for JSON with comments support
             with path.open("r", encoding="utf-8") as f:
                 return json5.load(f)
@@ -37,6 +43,19 @@ def load_file_by_extension(path: Path) -> Dict[str, Any]:
         return {}
 
 
+@lru_cache(maxsize=None)
+def _parse_default_settings(path: Path) -> Dict[str, Any]:
+    return load_file_by_extension(path)
+
+
+def load_default_settings(path: Path = DEFAULT_CONFIG_PATH) -> Dict[str, Any]:
+    """
+    Returns a copy of the default settings.
+    The file is parsed once per process, on first use.
+    """
+    return deepcopy(_parse_default_settings(path))
+
+
 def combine_settings(
     user_settings: Dict[str, Any],
     default_path: Path = DEFAULT_CONFIG_PATH,
@@ -45,7 +64,7 @@ def combine_settings(
     Merges default settings with user-provided settings.
     If 'field' is defined, merges only that section.
     """
-    default_settings = load_file_by_extension(default_path)
+    default_settings = load_default_settings(default_path)
     # try:
     # if default_path.exists():
     # default_settings = load_file_by_extension(default_path)
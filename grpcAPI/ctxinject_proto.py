@@ -6,6 +6,7 @@ __all__ = [
     "ignore_enum",
     "get_mapped_ctx",
     "resolve_mapped_ctx",
+    "UnresolvedInjectableError",
     "CastType",
     "Validation",
 ]
@@ -16,6 +17,7 @@ from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Type
 from ctxinject import (
     DependsInject,
     ModelFieldInject,
+    UnresolvedInjectableError,
     func_signature_check,
     get_mapped_ctx,
     resolve_mapped_ctx,
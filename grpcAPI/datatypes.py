@@ -5,6 +5,7 @@ from typing_extensions import (
     Callable,
     Dict,
     Iterable,
+    List,
     Mapping,
     NoReturn,
     Optional,
@@ -12,6 +13,9 @@ from typing_extensions import (
     Sequence,
     Tuple,
     Type,
+    TypeVar,
+    get_args,
+    get_origin,
     runtime_checkable,
 )
 
@@ -105,6 +109,24 @@ class AsyncContext(Protocol):
 
 ExceptionRegistry = Dict[Type[Exception], Callable[[Exception, AsyncContext], None]]
 
+T = TypeVar("T")
+
+
+class Batch(List[T]):
+    """
+    Messages of a client stream handed over together. A handler taking
+    `AsyncIterator[Batch[Position]]` gets the stream of `Position` grouped
+    by at most `stream_batch_size` messages, or those received within
+    `stream_batch_linger` seconds of the first of the batch.
+    """
+
+
+def batch_item_type(tgt: Any) -> Optional[Type[Any]]:
+    """`Position` of `Batch[Position]`, None for other types"""
+    if get_origin(tgt) is Batch:
+        return get_args(tgt)[0]
+    return None
+
 
 # add protobuf metadata to function
 
@@ -127,6 +149,7 @@ __all__ = [
     "FromContext",
     "FromRequest",
     "AsyncContext",
+    "Batch",
     "ProtobufEnum",
     "CastType",
     "Validation",
@@ -1,5 +1,5 @@
 from collections.abc import AsyncIterator
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 from typing import Dict
 
 from typemapping import get_func_args, map_return_type
@@ -10,13 +10,35 @@ from typing_extensions import (
     Optional,
     Set,
     Type,
+    TypeVar,
     get_args,
     get_origin,
 )
 
-from grpcAPI.datatypes import AsyncContext, FromRequest, Message, set_function_metadata
+from grpcAPI.datatypes import (
+    AsyncContext,
+    FromRequest,
+    Message,
+    batch_item_type,
+    set_function_metadata,
+)
 from grpcAPI.makeproto import ILabeledMethod, IMetaType
 
+T = TypeVar("T")
+
+
+def slotted(cls: Type[T]) -> Type[T]:
+    """`dataclass(slots=True)` for the python versions that lack it: rebuild
+    the dataclass with a slot per field and no instance `__dict__`"""
+    names = tuple(f.name for f in fields(cls))  # type: ignore[arg-type]
+    namespace = dict(cls.__dict__)
+    for name in names:
+        namespace.pop(name, None)
+    namespace.pop("__dict__", None)
+    namespace.pop("__weakref__", None)
+    namespace["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)  # type: ignore
+
 
 def get_protofile_path(cls: Type[Any]) -> str:
     return cls.DESCRIPTOR.file.name
@@ -26,6 +48,7 @@ def get_package(cls: Type[Any]) -> str:
     return cls.DESCRIPTOR.file.package
 
 
+@slotted
 @dataclass
 class LabeledMethod(ILabeledMethod):
     title: str
@@ -43,6 +66,10 @@ class LabeledMethod(ILabeledMethod):
     request_types: List[IMetaType]
     response_types: Optional[IMetaType]
     _active: bool = True
+    # called when `active` changes, so the owner can refresh its views
+    _on_change: Optional[Callable[[], None]] = field(
+        default=None, repr=False, compare=False
+    )
 
     @property
     def active(self) -> bool:
@@ -50,7 +77,10 @@ class LabeledMethod(ILabeledMethod):
 
     @active.setter
     def active(self, value: bool) -> None:
+        changed = value != self._active
         self._active = value
+        if changed and self._on_change is not None:
+            self._on_change()
 
     @property
     def input_type(self) -> Type[Any]:
@@ -156,6 +186,7 @@ def extract_response_type(
     return type_to_metatype(response_arg)
 
 
+@slotted
 @dataclass
 class MetaType(IMetaType):
     argtype: Type[Any]
@@ -180,6 +211,8 @@ def type_to_metatype(varinfo: Type[Any]) -> IMetaType:
     argtype = varinfo
     origin = get_origin(varinfo)
     basetype = varinfo if origin is None else get_args(varinfo)[0]
+    # AsyncIterator[Batch[Position]] streams Position messages
+    basetype = batch_item_type(basetype) or basetype
 
     try:
         package = get_package(basetype)
@@ -230,7 +263,8 @@ def is_message(bt: Optional[Type[Any]]) -> bool:
 
 def if_stream_get_type(bt: Type[Any]) -> Optional[Type[Any]]:
     if get_origin(bt) is AsyncIterator:
-        return get_args(bt)[0]
+        item = get_args(bt)[0]
+        return batch_item_type(item) or item
     return bt
 
 
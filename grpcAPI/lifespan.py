@@ -0,0 +1,273 @@
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+from types import TracebackType
+
+from typing_extensions import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+)
+
+from grpcAPI.startup_report import measure
+
+if TYPE_CHECKING:
+    from grpcAPI.app import App, Lifespan
+
+L = TypeVar("L", bound=Callable[..., Any])
+
+logger = logging.getLogger(__name__)
+
+
+def depends_on(*lifespans: Callable[..., Any]) -> Callable[[L], L]:
+    """Declare the lifespans that must be entered before, and exited after,
+    the decorated one"""
+
+    def decorator(lifespan: L) -> L:
+        lifespan.__lifespan_depends_on__ = tuple(lifespans)  # type: ignore
+        return lifespan
+
+    return decorator
+
+
+def get_dependencies(lifespan: Callable[..., Any]) -> Sequence[Callable[..., Any]]:
+    return getattr(lifespan, "__lifespan_depends_on__", ())
+
+
+def lifespan_name(lifespan: Callable[..., Any]) -> str:
+    return getattr(lifespan, "__name__", repr(lifespan))
+
+
+def sort_lifespans(lifespans: Sequence["Lifespan"]) -> List["Lifespan"]:
+    """Lifespans with each one after its dependencies, otherwise in the
+    given order"""
+    known = set(lifespans)
+    for lifespan in lifespans:
+        for dependency in get_dependencies(lifespan):
+            if dependency not in known:
+                raise ValueError(
+                    f"Lifespan '{lifespan_name(lifespan)}' depends on "
+                    f"'{lifespan_name(dependency)}', which is not an app lifespan"
+                )
+    ordered: List["Lifespan"] = []
+    visiting: List["Lifespan"] = []
+
+    def visit(lifespan: "Lifespan") -> None:
+        if lifespan in ordered:
+            return
+        if lifespan in visiting:
+            cycle = visiting[visiting.index(lifespan) :] + [lifespan]
+            names = " -> ".join(lifespan_name(ls) for ls in cycle)
+            raise ValueError(f"Lifespan dependency cycle: {names}")
+        visiting.append(lifespan)
+        for dependency in get_dependencies(lifespan):
+            visit(dependency)  # type: ignore[arg-type]
+        visiting.pop()
+        ordered.append(lifespan)
+
+    for lifespan in lifespans:
+        visit(lifespan)
+    return ordered
+
+
+class _TimedLifespan:
+    """A lifespan context recording how long it takes to enter and exit"""
+
+    def __init__(self, group: "LifespanGroup", lifespan: "Lifespan") -> None:
+        self.group = group
+        self.name = lifespan_name(lifespan)
+        self.context = lifespan(group.app)
+
+    async def __aenter__(self) -> None:
+        start = time.perf_counter()
+        with measure(self.name, "lifespan"):
+            await self.context.__aenter__()
+        self.group._record(self.name, "enter", start)
+
+    async def __aexit__(self, *exc_info: Any) -> Optional[bool]:
+        start = time.perf_counter()
+        try:
+            return await self.context.__aexit__(*exc_info)
+        finally:
+            self.group._record(self.name, "exit", start)
+
+
+class _Running:
+    """State of a lifespan run by its own task, from enter to exit"""
+
+    def __init__(self, lifespan: "Lifespan") -> None:
+        self.lifespan = lifespan
+        self.state = "waiting"  # entering, entered, failed, skipped
+        self.settled = asyncio.Event()  # entered, or never will be
+        self.exited = asyncio.Event()
+        self.dependencies: List["_Running"] = []
+        self.dependents: List["_Running"] = []
+        self.task: Optional["asyncio.Future[None]"] = None
+
+
+class LifespanGroup:
+    """
+    Enters the app lifespans, and exits them in reverse order.
+
+    By default they are entered one after another, each after the
+    lifespans it depends on (see `depends_on`). With `concurrent`, each
+    lifespan runs in its own task, entered as soon as its dependencies are
+    and exited once its dependents are, so independent lifespans set up
+    and tear down at the same time. Context variables set by a concurrent
+    lifespan are not seen outside of it.
+
+    As in a task group, when a lifespan fails to enter, the ones still
+    entering are cancelled, the ones entered are exited and the error is
+    raised. Errors while exiting are logged, and the first one is raised
+    once every lifespan has exited. `durations` holds the seconds each
+    lifespan took to enter and to exit.
+    """
+
+    def __init__(
+        self,
+        app: "App",
+        lifespans: Optional[Sequence["Lifespan"]] = None,
+        concurrent: bool = False,
+    ) -> None:
+        self.app = app
+        self.lifespans = sort_lifespans(
+            app.lifespan if lifespans is None else lifespans
+        )
+        self.concurrent = concurrent
+        self.durations: Dict[str, Dict[str, float]] = {}
+        self._stack = AsyncExitStack()
+        self._running: List[_Running] = []
+        self._changed = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._exc_info: Any = (None, None, None)
+        self._errors: List[BaseException] = []
+
+    def _record(self, name: str, stage: str, start: float) -> None:
+        self.durations.setdefault(name, {})[stage] = time.perf_counter() - start
+
+    async def __aenter__(self) -> "LifespanGroup":
+        if not self.concurrent:
+            async with AsyncExitStack() as stack:
+                for lifespan in self.lifespans:
+                    await stack.enter_async_context(_TimedLifespan(self, lifespan))
+                self._stack = stack.pop_all()
+            return self
+
+        running = {lifespan: _Running(lifespan) for lifespan in self.lifespans}
+        for run in running.values():
+            for dependency in get_dependencies(run.lifespan):
+                run.dependencies.append(running[dependency])  # type: ignore
+                running[dependency].dependents.append(run)  # type: ignore
+        self._running = list(running.values())
+        for run in self._running:
+            run.task = asyncio.ensure_future(self._run(run))
+
+        try:
+            while not self._errors and not all(
+                run.settled.is_set() for run in self._running
+            ):
+                await self._changed.wait()
+                self._changed.clear()
+        except BaseException as e:
+            await self._abort(e)
+            raise
+        if self._errors:
+            error = self._errors[0]
+            await self._abort(error)
+            raise error
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        if not self.concurrent:
+            await self._stack.__aexit__(exc_type, exc, tb)
+            return
+        self._exc_info = (exc_type, exc, tb)
+        self._stop.set()
+        await self._wait_tasks()
+        if self._errors:
+            raise self._errors[0]
+
+    async def _abort(self, error: BaseException) -> None:
+        # the lifespans already entered exit seeing the error, as they would
+        # in an AsyncExitStack
+        self._exc_info = (type(error), error, error.__traceback__)
+        self._stop.set()
+        for run in self._running:
+            if run.state == "entering" and run.task is not None:
+                run.task.cancel()
+        await self._wait_tasks()
+
+    async def _wait_tasks(self) -> None:
+        tasks = [run.task for run in self._running if run.task is not None]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _settle(self, run: _Running, state: str) -> None:
+        run.state = state
+        run.settled.set()
+        self._changed.set()
+
+    async def _run(self, run: _Running) -> None:
+        try:
+            for dependency in run.dependencies:
+                await dependency.settled.wait()
+            if self._stop.is_set() or any(
+                d.state != "entered" for d in run.dependencies
+            ):
+                self._settle(run, "skipped")
+                return
+
+            lifespan = _TimedLifespan(self, run.lifespan)
+            run.state = "entering"
+            if not await self._enter(run, lifespan):
+                return
+
+            await self._stop.wait()
+            for dependent in run.dependents:
+                await dependent.exited.wait()
+            await self._exit(lifespan)
+        finally:
+            if not run.settled.is_set():
+                self._settle(run, "skipped")
+            run.exited.set()
+
+    async def _enter(self, run: _Running, lifespan: _TimedLifespan) -> bool:
+        """Enter `lifespan`, settling `run`; whether it was entered"""
+        try:
+            await lifespan.__aenter__()
+        except asyncio.CancelledError:
+            self._settle(run, "skipped")
+            raise
+        except Exception as e:
+            logger.error(f"Lifespan '{lifespan.name}' failed to start: {e!r}")
+            self._errors.append(e)
+            self._settle(run, "failed")
+            return False
+        except BaseException as e:
+            # e.g. KeyboardInterrupt: fails the group too, and goes on
+            self._errors.append(e)
+            self._settle(run, "failed")
+            raise
+        self._settle(run, "entered")
+        return True
+
+    async def _exit(self, lifespan: _TimedLifespan) -> None:
+        try:
+            await lifespan.__aexit__(*self._exc_info)
+        except Exception as e:
+            logger.error(f"Lifespan '{lifespan.name}' failed to stop: {e!r}")
+            self._errors.append(e)
+        except BaseException as e:
+            self._errors.append(e)
+            raise
@@ -0,0 +1,212 @@
+import hashlib
+import inspect
+import json
+import logging
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from typing_extensions import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from grpcAPI._version import __version__
+from grpcAPI.datatypes import Message
+from grpcAPI.makeproto import ILabeledMethod, IService
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = "lint.json"
+
+_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+
+# modules whose code decides whether a service passes lint
+_LINT_SOURCES = (
+    "grpcAPI.build_proto",
+    "grpcAPI.ctxinject_proto",
+    "grpcAPI.makeproto.build_service",
+    "grpcAPI.makeproto.compiler",
+    "grpcAPI.makeproto.compiler_passes",
+    "grpcAPI.makeproto.validators.comment",
+    "grpcAPI.makeproto.validators.custommethod",
+    "grpcAPI.makeproto.validators.imports",
+    "grpcAPI.makeproto.validators.name",
+    "grpcAPI.makeproto.validators.type",
+)
+
+
+@lru_cache(maxsize=None)
+def cache_salt() -> str:
+    """Hash of grpcAPI's version and the lint implementation sources"""
+    import importlib
+
+    digest = hashlib.sha256(__version__.encode())
+    for name in _LINT_SOURCES:
+        module = importlib.import_module(name)
+        source = getattr(module, "__file__", None)
+        if source:
+            digest.update(Path(source).read_bytes())
+    return digest.hexdigest()
+
+
+# deep enough for a Depends tree of a few levels: each level is the
+# dependency, its signature, a parameter default and its attributes
+_MAX_DEPTH = 24
+
+
+def _routine_fingerprint(obj: Any, depth: int, path: Tuple[int, ...]) -> str:
+    """Name and signature of a function, with the fingerprints of its
+    annotations and defaults, so the dependencies of a Depends count"""
+    name = f"{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', '')}"
+    if id(obj) in path:
+        return name
+    try:
+        signature = inspect.signature(obj)
+    except (TypeError, ValueError):
+        return name
+    path = (*path, id(obj))
+    params = [
+        f"{p.name}:{p.kind}:{fingerprint(p.annotation, depth + 1, path)}"
+        f"={fingerprint(p.default, depth + 1, path)}"
+        for p in signature.parameters.values()
+    ]
+    returns = fingerprint(signature.return_annotation, depth + 1, path)
+    return f"{name}({','.join(params)})->{returns}"
+
+
+def fingerprint(obj: Any, depth: int = 0, path: Tuple[int, ...] = ()) -> str:
+    """Stable text representation of the lint relevant parts of an object.
+    `path` holds the functions being fingerprinted, against recursion."""
+    if depth > _MAX_DEPTH:
+        return "..."
+    if isinstance(obj, type) and issubclass(obj, Message):
+        descriptor = obj.DESCRIPTOR
+        return f"msg:{descriptor.full_name}@{descriptor.file.name}"
+    if isinstance(obj, type):
+        return f"{obj.__module__}.{obj.__qualname__}"
+    if inspect.isroutine(obj):
+        return _routine_fingerprint(obj, depth, path)
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        items = [fingerprint(item, depth + 1, path) for item in obj]
+        if isinstance(obj, (set, frozenset)):
+            items.sort()
+        return f"[{','.join(items)}]"
+    if isinstance(obj, dict):
+        items = [
+            f"{fingerprint(k, depth + 1, path)}:{fingerprint(v, depth + 1, path)}"
+            for k, v in obj.items()
+        ]
+        return f"{{{','.join(sorted(items))}}}"
+    if hasattr(obj, "__dict__"):
+        attrs = fingerprint(vars(obj), depth + 1, path)
+        return f"{type(obj).__qualname__}{attrs}"
+    return _ADDRESS.sub("", repr(obj))
+
+
+def method_fingerprint(method: ILabeledMethod) -> List[str]:
+    func = method.method
+    try:
+        signature = inspect.signature(func)
+        params = [
+            f"{p.name}:{p.kind}:{fingerprint(p.annotation)}={fingerprint(p.default)}"
+            for p in signature.parameters.values()
+        ]
+        returns = fingerprint(signature.return_annotation)
+    except (TypeError, ValueError):  # pragma: no cover
+        params, returns = [], ""
+    requests = [
+        f"{fingerprint(r.argtype)}|{fingerprint(r.basetype)}|{r.origin}"
+        for r in method.request_types
+    ]
+    response = method.response_types
+    return [
+        method.name,
+        method.comments,
+        fingerprint(method.options),
+        fingerprint(getattr(func, "__grpc_metadata__", None)),
+        *params,
+        returns,
+        *requests,
+        (
+            f"{fingerprint(response.argtype)}|{fingerprint(response.basetype)}"
+            f"|{response.origin}"
+            if response is not None
+            else ""
+        ),
+    ]
+
+
+def service_hash(service: IService) -> str:
+    """Content hash of everything the compiler passes look at for a service"""
+    parts: List[str] = [
+        service.name,
+        service.package,
+        service.module,
+        service.comments,
+        str(service.active),
+        fingerprint(service.options),
+        fingerprint(service.module_level_options),
+        fingerprint(service.module_level_comments),
+        fingerprint(service.module_level_imports),
+    ]
+    for method in service.methods:
+        parts.extend(method_fingerprint(method))
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def package_hash(services: Iterable[IService]) -> str:
+    digest = hashlib.sha256(cache_salt().encode())
+    for service in services:
+        digest.update(service_hash(service).encode())
+    return digest.hexdigest()
+
+
+class LintCache:
+    """
+    Content addressed record of packages that passed lint.
+
+    Packages are compiled independently, so a package is skipped when the
+    hashes of all its services match the last successful lint. Entries are
+    discarded when grpcAPI's version or the lint sources change.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.file = Path(path) / CACHE_FILE
+        self.entries: Dict[str, str] = self._load()
+
+    def _load(self) -> Dict[str, str]:
+        try:
+            data = json.loads(self.file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("salt") != cache_salt():
+            return {}
+        entries = data.get("packages", {})
+        return entries if isinstance(entries, dict) else {}
+
+    def stale(
+        self, services: Mapping[str, List[IService]]
+    ) -> Dict[str, List[IService]]:
+        """Packages whose content changed since their last successful lint"""
+        return {
+            package: service_list
+            for package, service_list in services.items()
+            if self.entries.get(package) != package_hash(service_list)
+        }
+
+    def update(self, services: Mapping[str, List[IService]]) -> None:
+        for package, service_list in services.items():
+            self.entries[package] = package_hash(service_list)
+
+    def save(self, packages: Optional[Iterable[str]] = None) -> None:
+        if packages is not None:
+            keep = set(packages)
+            self.entries = {k: v for k, v in self.entries.items() if k in keep}
+        try:
+            self.file.parent.mkdir(parents=True, exist_ok=True)
+            self.file.write_text(
+                json.dumps(
+                    {"salt": cache_salt(), "packages": self.entries}, indent=2
+                ),
+                encoding="utf-8",
+            )
+        except OSError as e:
+            logger.warning(f"Could not write lint cache {self.file}: {e}")
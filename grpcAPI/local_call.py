@@ -0,0 +1,253 @@
+import asyncio
+import time
+
+import grpc
+from typing_extensions import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    List,
+    Mapping,
+    NoReturn,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from grpcAPI.make_method import make_method_async
+from grpcAPI.makeproto import ILabeledMethod
+
+if TYPE_CHECKING:
+    from grpcAPI.app import App
+
+Metadata = Sequence[Tuple[str, str]]
+
+
+class LocalRpcError(grpc.RpcError):
+    """Status of a failed in-process call, with the accessors of the
+    grpc.aio.AioRpcError a remote call would raise"""
+
+    def __init__(
+        self, code: grpc.StatusCode, details: str = "", trailing_metadata: Metadata = ()
+    ) -> None:
+        super().__init__(code, details, trailing_metadata)
+        self._code = code
+        self._details = details
+        self._trailing_metadata = tuple(trailing_metadata)
+
+    def code(self) -> grpc.StatusCode:
+        return self._code
+
+    def details(self) -> str:
+        return self._details
+
+    def trailing_metadata(self) -> Metadata:
+        return self._trailing_metadata
+
+    def __str__(self) -> str:
+        return (
+            f"<LocalRpcError of RPC that terminated with {self._code}: {self._details}>"
+        )
+
+
+class LocalContext:
+    """AsyncContext of a call dispatched in process"""
+
+    def __init__(
+        self, metadata: Optional[Metadata] = None, timeout: Optional[float] = None
+    ) -> None:
+        self._metadata = tuple(metadata or ())
+        self._deadline = None if timeout is None else time.monotonic() + timeout
+        self._code: Optional[grpc.StatusCode] = None
+        self._details = ""
+        self._trailing_metadata: Metadata = ()
+        self._callbacks: List[Callable[..., None]] = []
+        self._done = False
+
+    async def read(self) -> Any:
+        raise NotImplementedError("read is not supported for in-process calls")
+
+    async def write(self, message: Any) -> None:
+        raise NotImplementedError("write is not supported for in-process calls")
+
+    async def send_initial_metadata(self, initial_metadata: Metadata) -> None:
+        pass
+
+    async def abort(
+        self,
+        code: grpc.StatusCode,
+        details: str = "",
+        trailing_metadata: Metadata = (),
+    ) -> NoReturn:
+        raise LocalRpcError(code, details, trailing_metadata or self._trailing_metadata)
+
+    def set_trailing_metadata(self, trailing_metadata: Metadata) -> None:
+        self._trailing_metadata = trailing_metadata
+
+    def invocation_metadata(self) -> Metadata:
+        return self._metadata
+
+    def set_code(self, code: grpc.StatusCode) -> None:
+        self._code = code
+
+    def set_details(self, details: str) -> None:
+        self._details = details
+
+    def set_compression(self, compression: grpc.Compression) -> None:
+        pass
+
+    def disable_next_message_compression(self) -> None:
+        pass
+
+    def peer(self) -> str:
+        return "local"
+
+    def peer_identities(self) -> Optional[Iterable[bytes]]:
+        return None
+
+    def peer_identity_key(self) -> Optional[str]:
+        return None
+
+    def auth_context(self) -> Mapping[str, Iterable[bytes]]:
+        return {}
+
+    def time_remaining(self) -> Optional[float]:
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    def trailing_metadata(self) -> Metadata:
+        return self._trailing_metadata
+
+    def code(self) -> Optional[grpc.StatusCode]:
+        return self._code
+
+    def details(self) -> str:
+        return self._details
+
+    def add_done_callback(self, callback: Callable[..., None]) -> None:
+        self._callbacks.append(callback)
+
+    def cancelled(self) -> bool:
+        return False
+
+    def done(self) -> bool:
+        return self._done
+
+    def finish(self) -> None:
+        """End the call, raising the status set by the handler if not OK"""
+        self._done = True
+        for callback in self._callbacks:
+            callback(self)
+        if self._code is not None and self._code != grpc.StatusCode.OK:
+            raise LocalRpcError(self._code, self._details, self._trailing_metadata)
+
+
+def copy_message(message: Any) -> Any:
+    return type(message).FromString(message.SerializeToString())
+
+
+def _unexpected(e: Exception) -> LocalRpcError:
+    # the status a grpc.aio server sends for an exception left unhandled
+    return LocalRpcError(grpc.StatusCode.UNKNOWN, f"Unexpected {type(e)}: {e}")
+
+
+_deadline_exceeded = (grpc.StatusCode.DEADLINE_EXCEEDED, "Deadline Exceeded")
+
+
+class LocalMethod:
+    """
+    A method of the local app called in process, with the signature of the
+    grpc.aio multicallable that would call it over the network: unary
+    responses are awaited, streamed responses iterated, and failures raise
+    LocalRpcError with the status the server would send.
+
+    With `isolate`, requests and responses are copied through their
+    serialized form, so caller and handler never share a message.
+    """
+
+    __slots__ = ("handler", "client_stream", "server_stream", "isolate")
+
+    def __init__(self, method: ILabeledMethod, app: "App", isolate: bool) -> None:
+        # built on the first call, as the app dependencies may change until
+        # the server starts
+        self.handler = make_method_async(
+            method, app.dependency_overrides, app._exception_handlers, lazy=True
+        )
+        self.client_stream = method.is_client_stream
+        self.server_stream = method.is_server_stream
+        self.isolate = isolate
+
+    def __call__(
+        self,
+        request: Any,
+        timeout: Optional[float] = None,
+        metadata: Optional[Metadata] = None,
+        **kwargs: Any,
+    ) -> Any:
+        context = LocalContext(metadata, timeout)
+        request = self._request(request)
+        if self.server_stream:
+            return self._stream(request, context)
+        return self._unary(request, context)
+
+    def _request(self, request: Any) -> Any:
+        if not self.client_stream:
+            return copy_message(request) if self.isolate else request
+        return self._request_stream(request)
+
+    async def _request_stream(
+        self, requests: Union[Iterable[Any], AsyncIterator[Any]]
+    ) -> AsyncIterator[Any]:
+        if hasattr(requests, "__aiter__"):
+            async for request in requests:  # type: ignore[union-attr]
+                yield copy_message(request) if self.isolate else request
+        else:
+            for request in requests:  # type: ignore[union-attr]
+                yield copy_message(request) if self.isolate else request
+
+    async def _unary(self, request: Any, context: LocalContext) -> Any:
+        try:
+            response = await asyncio.wait_for(
+                self.handler(request, context), context.time_remaining()
+            )
+        except asyncio.TimeoutError:
+            raise LocalRpcError(*_deadline_exceeded) from None
+        except LocalRpcError:
+            raise
+        except Exception as e:
+            raise _unexpected(e) from e
+        context.finish()
+        if response is None:
+            # an exception handler swallowed the error without setting a
+            # status; a server answers UNKNOWN as it cannot send nothing
+            raise LocalRpcError(
+                grpc.StatusCode.UNKNOWN,
+                context.details() or "The handler returned no response",
+                context.trailing_metadata(),
+            )
+        return copy_message(response) if self.isolate else response
+
+    async def _stream(self, request: Any, context: LocalContext) -> AsyncIterator[Any]:
+        responses = self.handler(request, context)
+        try:
+            while True:
+                try:
+                    response = await asyncio.wait_for(
+                        responses.__anext__(), context.time_remaining()
+                    )
+                except StopAsyncIteration:
+                    break
+                yield copy_message(response) if self.isolate else response
+        except asyncio.TimeoutError:
+            raise LocalRpcError(*_deadline_exceeded) from None
+        except LocalRpcError:
+            raise
+        except Exception as e:
+            raise _unexpected(e) from e
+        finally:
+            await responses.aclose()
+        context.finish()
@@ -1,13 +1,32 @@
-__all__ = ["LOGGING_CONFIG"]
+__all__ = ["LOGGING_CONFIG", "configure_logging", "logging_config"]
 import logging
 import logging.config
 
-import json5
+from typing_extensions import Any, Dict
 
-from grpcAPI.commands.settings import DEFAULT_CONFIG_PATH
+from grpcAPI.commands.settings.utils import load_default_settings
 
-LOGGING_CONFIG = {}
-with DEFAULT_CONFIG_PATH.open("r", encoding="utf-8") as f:
-    config = json5.load(f)
-    LOGGING_CONFIG = config.get("logger")
-    logging.config.dictConfig(LOGGING_CONFIG)
+# filled from the "logger" settings by the first logging_config() call
+LOGGING_CONFIG: Dict[str, Any] = {}
+
+_loaded = False
+_configured = False
+
+
+def logging_config() -> Dict[str, Any]:
+    """LOGGING_CONFIG, read from the default settings on the first call, so
+    importing this module parses no settings"""
+    global _loaded
+    if not _loaded:
+        LOGGING_CONFIG.update(load_default_settings().get("logger") or {})
+        _loaded = True
+    return LOGGING_CONFIG
+
+
+def configure_logging() -> None:
+    """Apply the logging config, once. Importing this module does not touch
+    the logging setup of the process"""
+    global _configured
+    if not _configured:
+        logging.config.dictConfig(logging_config())
+        _configured = True
@@ -1,12 +1,38 @@
+import asyncio
 import inspect
+import threading
 from contextlib import AsyncExitStack
+from contextvars import ContextVar
 
-from typing_extensions import Any, Callable, Dict, Type
+from typemapping import get_func_args
+from typing_extensions import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Type,
+    Union,
+)
 
 from grpcAPI import ExceptionRegistry
-from grpcAPI.ctxinject_proto import get_mapped_ctx, resolve_mapped_ctx
-from grpcAPI.datatypes import AsyncContext, get_function_metadata
+from grpcAPI.batch import (
+    BATCH_CONCURRENCY,
+    BATCH_OF,
+    DEFAULT_CONCURRENCY,
+    REQUESTS_FIELD,
+)
+from grpcAPI.ctxinject_proto import (
+    DependsInject,
+    UnresolvedInjectableError,
+    get_mapped_ctx,
+    resolve_mapped_ctx,
+)
+from grpcAPI.datatypes import AsyncContext, Depends, get_function_metadata
 from grpcAPI.makeproto import ILabeledMethod
+from grpcAPI.stream_batch import batch_options, batch_stream_handler, is_batch_stream
+from grpcAPI.stream_buffer import buffer_size, buffered_stream_handler, stats_of
 
 
 async def safe_run(
@@ -21,27 +47,46 @@ def make_method_async(
     labeledmethod: ILabeledMethod,
     overrides: Dict[Callable[..., Any], Callable[..., Any]],
     exception_registry: ExceptionRegistry,
+    lazy: bool = False,
 ) -> Callable[..., Any]:
-    """Async implementarion for MakeMethod using ctxinject"""
+    """Async implementarion for MakeMethod using ctxinject.
+    With `lazy`, the dependencies are mapped and validated on the first call
+    instead of here."""
+
+    batch_of = labeledmethod.meta.get(BATCH_OF)
+    if batch_of is not None:
+        return make_batch_runner(
+            labeledmethod, batch_of, overrides, exception_registry, lazy
+        )
 
     try:
         req_t = labeledmethod.input_type
         func = labeledmethod.method
-        factory = (
-            make_stream_runner if labeledmethod.is_server_stream else make_unary_runner
-        )
+        if labeledmethod.is_server_stream:
+            factory = make_lazy_stream_runner if lazy else make_stream_runner
+        else:
+            factory = make_lazy_unary_runner if lazy else make_unary_runner
 
     except (AttributeError, IndexError) as e:
         raise type(e)(
             f"Not able to make method for: {labeledmethod.name}:\n Error:{str(e)}"
         )
 
-    return factory(
+    handler = factory(
         func=func,
         overrides=overrides,
         exception_registry=exception_registry,
         req=req_t,
     )
+    if is_batch_stream(req_t):
+        max_size, max_linger = batch_options(labeledmethod.meta)
+        handler = batch_stream_handler(
+            handler, labeledmethod.is_server_stream, max_size, max_linger
+        )
+    size = buffer_size(labeledmethod)
+    if size:
+        handler = buffered_stream_handler(handler, size, stats_of(labeledmethod))
+    return handler
 
 
 class CtxMngr:
@@ -103,35 +148,117 @@ class Runner:
         return await resolve_mapped_ctx(ctx, self.mapped_ctx, stack)
 
     async def _handle_exception(self, e: Exception, context: AsyncContext) -> None:
-        exc_handler = self.exception_registry.get(type(e))
-        if exc_handler is not None:
-            await safe_run(exc_handler, e, context)
-        else:
-            raise e
+        await handle_exception(self.exception_registry, e, context)
 
+    def get(self) -> "Runner":
+        """The runner itself, so handlers use a Runner and a LazyRunner alike"""
+        return self
 
-def make_unary_runner(
-    func: Callable[..., Any],
-    overrides: Dict[Callable[..., Any], Callable[..., Any]],
-    exception_registry: ExceptionRegistry,
-    req: Type[Any],
-) -> Callable[[Any, AsyncContext], Any]:
-    """Factory function to create a unary RPC handler function"""
 
-    runner = Runner(func, overrides, exception_registry, req)
+async def handle_exception(
+    exception_registry: ExceptionRegistry, e: Exception, context: AsyncContext
+) -> None:
+    exc_handler = exception_registry.get(type(e))
+    if exc_handler is not None:
+        await safe_run(exc_handler, e, context)
+    else:
+        raise e
+
+
+class LazyRunner:
+    """Builds its Runner, or what `factory` makes of the same arguments,
+    once, on the first `get`.
+
+    The Runner is built synchronously while holding a lock, so concurrent
+    calls from threads wait for the first one, and tasks of the same loop
+    cannot interleave with it. When building fails, every `get` raises the
+    same error without building again."""
+
+    __slots__ = ("args", "runner", "error", "lock", "factory")
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        overrides: Dict[Callable[..., Any], Callable[..., Any]],
+        exception_registry: ExceptionRegistry,
+        req: Type[Any],
+        factory: Optional[Callable[..., Any]] = None,
+    ) -> None:
+        self.args = (func, overrides, exception_registry, req)
+        self.runner: Optional[Any] = None
+        self.error: Optional[Exception] = None
+        self.lock = threading.Lock()
+        self.factory = factory
+
+    @property
+    def exception_registry(self) -> ExceptionRegistry:
+        return self.args[2]
+
+    def get(self) -> Any:
+        runner = self.runner
+        if runner is None:
+            with self.lock:
+                if self.runner is None and self.error is None:
+                    factory = self.factory or Runner
+                    try:
+                        self.runner = factory(*self.args)
+                    except Exception as e:
+                        self.error = e
+                if self.error is not None:
+                    raise self.error
+                runner = self.runner
+        return runner
+
+
+def unary_handler_of(
+    runners: Union[Runner, LazyRunner],
+) -> Callable[[Any, AsyncContext], Any]:
+    """The grpc handler of a unary response, calling the Runner of
+    `runners`. An error building or running it goes to the exception
+    handlers."""
 
     async def unary_handler(request: Any, context: AsyncContext) -> Any:
         try:
+            runner = runners.get()
             async with AsyncExitStack() as stack:
                 kwargs = await runner._make_kwargs(request, context, stack)
                 response = await runner.func(**kwargs)
                 return response
         except Exception as e:
-            await runner._handle_exception(e, context)
+            await handle_exception(runners.exception_registry, e, context)
 
     return unary_handler
 
 
+def stream_handler_of(
+    runners: Union[Runner, LazyRunner],
+) -> Callable[[Any, AsyncContext], Any]:
+    """The grpc handler of a response stream, see `unary_handler_of`"""
+
+    async def stream_handler(request: Any, context: AsyncContext) -> Any:
+        try:
+            runner = runners.get()
+            async with AsyncExitStack() as stack:
+                kwargs = await runner._make_kwargs(request, context, stack)
+                async for resp in runner.func(**kwargs):
+                    yield resp
+        except Exception as e:
+            await handle_exception(runners.exception_registry, e, context)
+
+    return stream_handler
+
+
+def make_unary_runner(
+    func: Callable[..., Any],
+    overrides: Dict[Callable[..., Any], Callable[..., Any]],
+    exception_registry: ExceptionRegistry,
+    req: Type[Any],
+) -> Callable[[Any, AsyncContext], Any]:
+    """Factory function to create a unary RPC handler function"""
+
+    return unary_handler_of(Runner(func, overrides, exception_registry, req))
+
+
 def make_stream_runner(
     func: Callable[..., Any],
     overrides: Dict[Callable[..., Any], Callable[..., Any]],
@@ -140,15 +267,210 @@ def make_stream_runner(
 ) -> Callable[[Any, AsyncContext], Any]:
     """Factory function to create a streaming RPC handler function"""
 
-    runner = Runner(func, overrides, exception_registry, req)
+    return stream_handler_of(Runner(func, overrides, exception_registry, req))
 
-    async def stream_handler(request: Any, context: AsyncContext) -> Any:
+
+def make_lazy_unary_runner(
+    func: Callable[..., Any],
+    overrides: Dict[Callable[..., Any], Callable[..., Any]],
+    exception_registry: ExceptionRegistry,
+    req: Type[Any],
+) -> Callable[[Any, AsyncContext], Any]:
+    """Unary RPC handler building its Runner on the first call"""
+
+    lazy = LazyRunner(func, overrides, exception_registry, req)
+    unary_handler = unary_handler_of(lazy)
+    unary_handler.lazy_runner = lazy  # type: ignore[attr-defined]
+    return unary_handler
+
+
+def make_lazy_stream_runner(
+    func: Callable[..., Any],
+    overrides: Dict[Callable[..., Any], Callable[..., Any]],
+    exception_registry: ExceptionRegistry,
+    req: Type[Any],
+) -> Callable[[Any, AsyncContext], Any]:
+    """Streaming RPC handler building its Runner on the first call"""
+
+    lazy = LazyRunner(func, overrides, exception_registry, req)
+    stream_handler = stream_handler_of(lazy)
+    stream_handler.lazy_runner = lazy  # type: ignore[attr-defined]
+    return stream_handler
+
+
+# values of the shared dependencies of the batch being run
+_batch_shared: ContextVar[Dict[Callable[..., Any], Any]] = ContextVar("batch_shared")
+
+
+def batch_shared_dependencies(
+    func: Callable[..., Any],
+    overrides: Dict[Callable[..., Any], Callable[..., Any]],
+) -> List[Callable[..., Any]]:
+    """The `Depends` of `func` that can be resolved without its request,
+    resolved once for all the requests of a batch"""
+    shared: List[Callable[..., Any]] = []
+    for arg in get_func_args(func):
+        instance = arg.getinstance(DependsInject)
+        if instance is None or instance.default in shared:
+            continue
+        try:
+            get_mapped_ctx(
+                func=overrides.get(instance.default, instance.default),
+                context={AsyncContext: None},
+                allow_incomplete=False,
+                overrides=overrides,
+            )
+        except UnresolvedInjectableError:
+            continue  # needs the request
+        shared.append(instance.default)
+    return shared
+
+
+def _shared_value(dependency: Callable[..., Any]) -> Callable[[], Any]:
+    # async, so it runs in the task of the item and sees its context
+    async def shared_value() -> Any:
+        return _batch_shared.get()[dependency]
+
+    return shared_value
+
+
+def _shared_resolver(dependencies: List[Callable[..., Any]]) -> Callable[..., Any]:
+    """A function depending on each of `dependencies`, to resolve them
+    together with ctxinject"""
+    params = [
+        inspect.Parameter(
+            f"dependency_{index}",
+            inspect.Parameter.KEYWORD_ONLY,
+            default=Depends(dependency),
+            annotation=Any,
+        )
+        for index, dependency in enumerate(dependencies)
+    ]
+
+    def shared(**kwargs: Any) -> None:  # pragma: no cover
+        pass
+
+    shared.__signature__ = inspect.Signature(params)  # type: ignore
+    shared.__annotations__ = {param.name: Any for param in params}
+    return shared
+
+
+class BatchRunner:
+    """
+    Runs the handler of a unary method for each request of a batch, at most
+    `concurrency` at a time, with the context of the batch call.
+
+    Each request gets the dependencies of the method, except the `Depends`
+    that do not read the request, which are resolved once per batch and
+    shared. A failing request fails the batch as it would fail a call of the
+    method, and cancels the others.
+    """
+
+    __slots__ = ("runner", "shared", "shared_ctx", "concurrency")
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        overrides: Dict[Callable[..., Any], Callable[..., Any]],
+        exception_registry: ExceptionRegistry,
+        req: Type[Any],
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> None:
+        self.shared = batch_shared_dependencies(func, overrides)
+        self.shared_ctx = get_mapped_ctx(
+            func=_shared_resolver(self.shared),
+            context={AsyncContext: None},
+            allow_incomplete=False,
+            validate=True,
+            overrides=overrides,
+            ordered=True,
+        )
+        item_overrides = {**overrides}
+        for dependency in self.shared:
+            item_overrides[dependency] = _shared_value(dependency)
+        self.runner = Runner(func, item_overrides, exception_registry, req)
+        self.concurrency = concurrency
+
+    async def _call(self, request: Any, context: AsyncContext) -> Any:
+        async with AsyncExitStack() as stack:
+            kwargs = await self.runner._make_kwargs(request, context, stack)
+            return await self.runner.func(**kwargs)
+
+    async def run(
+        self, requests: Iterable[Any], context: AsyncContext, stack: AsyncExitStack
+    ) -> List[Any]:
+        values = await resolve_mapped_ctx(
+            {AsyncContext: context}, self.shared_ctx, stack
+        )
+        token = _batch_shared.set(
+            {
+                dependency: values[f"dependency_{index}"]
+                for index, dependency in enumerate(self.shared)
+            }
+        )
+        try:
+            return await self._run_items(list(requests), context)
+        finally:
+            _batch_shared.reset(token)
+
+    async def _run_items(self, requests: List[Any], context: AsyncContext) -> List[Any]:
+        responses: List[Any] = [None] * len(requests)
+        pending = iter(range(len(requests)))
+
+        async def worker() -> None:
+            for index in pending:
+                responses[index] = await self._call(requests[index], context)
+
+        workers = [
+            asyncio.ensure_future(worker())
+            for _ in range(min(self.concurrency, len(requests)))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+        return responses
+
+
+def make_batch_runner(
+    labeledmethod: ILabeledMethod,
+    batch_of: ILabeledMethod,
+    overrides: Dict[Callable[..., Any], Callable[..., Any]],
+    exception_registry: ExceptionRegistry,
+    lazy: bool = False,
+) -> Callable[[Any, AsyncContext], Any]:
+    """Unary RPC handler of a batch method, see `BatchRunner`"""
+
+    concurrency = labeledmethod.meta.get(BATCH_CONCURRENCY, DEFAULT_CONCURRENCY)
+    response_type = labeledmethod.output_type
+
+    def factory(
+        func: Callable[..., Any],
+        overrides: Dict[Callable[..., Any], Callable[..., Any]],
+        exception_registry: ExceptionRegistry,
+        req: Type[Any],
+    ) -> BatchRunner:
+        return BatchRunner(func, overrides, exception_registry, req, concurrency)
+
+    runners = LazyRunner(
+        batch_of.method, overrides, exception_registry, batch_of.input_type, factory
+    )
+    if not lazy:
+        runners.get()
+
+    async def batch_handler(request: Any, context: AsyncContext) -> Any:
         try:
+            batch = runners.get()
             async with AsyncExitStack() as stack:
-                kwargs = await runner._make_kwargs(request, context, stack)
-                async for resp in runner.func(**kwargs):
-                    yield resp
+                requests = getattr(request, REQUESTS_FIELD)
+                responses = await batch.run(requests, context, stack)
+                return response_type(responses=responses)
         except Exception as e:
-            await runner._handle_exception(e, context)
+            await handle_exception(runners.exception_registry, e, context)
 
-    return stream_handler
+    if lazy:
+        batch_handler.lazy_runner = runners  # type: ignore[attr-defined]
+    return batch_handler
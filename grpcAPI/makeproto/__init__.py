@@ -1,3 +1,5 @@
+from typing_extensions import Any
+
 from grpcAPI.makeproto.interface import (
     ILabeledMethod,
     IMetaType,
@@ -13,4 +15,11 @@ __all__ = [
     "IProtoPackage",
 ]
 
-from grpcAPI.makeproto.build_service import compile_service
+
+def __getattr__(name: str) -> Any:
+    # the compiler pulls in the template engine, load it only when used
+    if name == "compile_service":
+        from grpcAPI.makeproto.build_service import compile_service
+
+        return compile_service
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,136 @@
+import gzip
+import io
+import os
+import tarfile
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from typing_extensions import IO, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from grpcAPI.makeproto.interface import IProtoPackage
+
+ARCHIVE_FORMATS = {
+    "zip": ".zip",
+    "tar": ".tar",
+    "tar.gz": ".tar.gz",
+    "tar.zst": ".tar.zst",
+}
+
+# zip cannot represent dates before 1980
+DEFAULT_EPOCH = 315532800  # 1980-01-01T00:00:00Z
+
+
+def archive_epoch() -> int:
+    """Timestamp given to every archive member, SOURCE_DATE_EPOCH if set"""
+    try:
+        return max(int(os.environ["SOURCE_DATE_EPOCH"]), DEFAULT_EPOCH)
+    except (KeyError, ValueError):
+        return DEFAULT_EPOCH
+
+
+def archive_name(stem: str, archive_format: str) -> str:
+    try:
+        return f"{stem}{ARCHIVE_FORMATS[archive_format]}"
+    except KeyError:
+        raise ValueError(
+            f"Unknown archive format '{archive_format}', "
+            f"expected one of {list(ARCHIVE_FORMATS)}"
+        ) from None
+
+
+def collect_entries(
+    proto_stream: Iterable[IProtoPackage], source_path: Optional[Path] = None
+) -> Dict[str, bytes]:
+    """Archive members by name: the .proto files under `source_path`, then
+    the generated protos, which win on a name clash"""
+    entries: Dict[str, bytes] = {}
+    if source_path is not None and source_path.exists():
+        for proto_file in source_path.rglob("*.proto"):
+            name = proto_file.relative_to(source_path).as_posix()
+            entries[name] = proto_file.read_bytes()
+    for proto in proto_stream:
+        entries[proto.qual_name] = proto.content.encode("utf-8")
+    return entries
+
+
+def _sorted(entries: Dict[str, bytes]) -> Iterator[Tuple[str, bytes]]:
+    for name in sorted(entries):
+        yield name, entries[name]
+
+
+def _write_zip(entries: Dict[str, bytes], fileobj: IO[bytes], epoch: int) -> None:
+    date_time = time.gmtime(epoch)[:6]
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for name, data in _sorted(entries):
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            zipf.writestr(info, data)
+
+
+def _write_tar(entries: Dict[str, bytes], fileobj: IO[bytes], epoch: int) -> None:
+    with tarfile.open(fileobj=fileobj, mode="w", format=tarfile.PAX_FORMAT) as tar:
+        for name, data in _sorted(entries):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = epoch
+            info.mode = 0o644
+            tar.addfile(info, io.BytesIO(data))
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    try:
+        from compression import zstd  # type: ignore[import-not-found]
+    except ImportError:  # before python 3.14
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(
+                "tar.zst archives need the 'zstandard' package: "
+                "pip install grpcAPI[zstd]"
+            ) from None
+        return zstandard.ZstdCompressor().compress(data)
+    return zstd.compress(data)
+
+
+def write_archive(
+    entries: Dict[str, bytes],
+    path: Union[str, Path],
+    archive_format: str = "zip",
+) -> bool:
+    """
+    Write `entries` straight from memory into a reproducible archive.
+
+    Members are sorted by name and share a fixed timestamp and mode, so the
+    same entries always produce the same bytes. An existing archive with
+    identical content is left untouched. Returns whether `path` was written.
+    """
+    archive_name("", archive_format)  # validate before doing any work
+    epoch = archive_epoch()
+    buffer = io.BytesIO()
+    if archive_format == "zip":
+        _write_zip(entries, buffer, epoch)
+    elif archive_format == "tar.gz":
+        with gzip.GzipFile(fileobj=buffer, mode="wb", mtime=epoch) as gz:
+            _write_tar(entries, gz, epoch)  # type: ignore[arg-type]
+    else:
+        _write_tar(entries, buffer, epoch)
+    data = buffer.getvalue()
+    if archive_format == "tar.zst":
+        data = _zstd_compress(data)
+
+    path = Path(path)
+    if path.is_file() and path.read_bytes() == data:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp, path)
+    except BaseException:
+        Path(temp).unlink(missing_ok=True)
+        raise
+    return True
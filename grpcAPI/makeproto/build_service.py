@@ -1,16 +1,29 @@
+import logging
+import multiprocessing
+import os
+import pickle  # noqa: S403
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import partial
 from typing import Generator, Iterable, Mapping, Set, Union
 
+from google.protobuf.descriptor_pb2 import FileDescriptorProto
 from typing_extensions import Any, Callable, Dict, List, Optional, Tuple
 
-from grpcAPI.makeproto.compiler import CompilerContext, CompilerPass
-from grpcAPI.makeproto.compiler_passes import (
+from grpcAPI.makeproto.compiler import (
+    CompilerContext,
+    CompilerPass,
+    merge_forks,
+    plan_walks,
+    run_walk,
+)
+from grpcAPI.makeproto.compiler_passes import (  # noqa: F401
     CompilationError,
     default_format,
     make_setters,
     make_validators,
-    run_compiler_passes,
 )
+from grpcAPI.makeproto.descriptor import JINJA, check_renderer, render_descriptor
 from grpcAPI.makeproto.format_comment import format_comment
 from grpcAPI.makeproto.interface import IProtoPackage, IService
 from grpcAPI.makeproto.make_service_template import make_service_template
@@ -21,13 +34,26 @@ from grpcAPI.makeproto.template import (
 )
 from grpcAPI.makeproto.validators.name import check_valid, check_valid_filenames
 
+logger = logging.getLogger(__name__)
+
+
+def same_name(name: str) -> str:
+    return name
+
+
+def no_custom_pass(func: Callable[..., Any]) -> List[str]:
+    return []
+
 
 def compile_service(
     services: Mapping[str, List[IService]],
-    name_normalizer: Callable[[str], str] = lambda x: x,
+    name_normalizer: Callable[[str], str] = same_name,
     format_comment: Callable[[str], str] = default_format,
-    custompassmethod: Callable[[Callable[..., Any]], List[str]] = lambda x: [],
+    custompassmethod: Callable[[Callable[..., Any]], List[str]] = no_custom_pass,
     version: int = 3,
+    workers: int = 1,
+    timings: Optional[Dict[str, float]] = None,
+    renderer: str = JINJA,
 ) -> Optional[Generator[IProtoPackage, None, None]]:
 
     validators = make_validators(custompassmethod)
@@ -39,27 +65,58 @@ def compile_service(
         services,
         [validators, setters],
         version,
+        workers,
+        timings,
+        renderer,
     )
 
 
-def compile_service_internal(
-    services: Dict[str, List[IService]],
-    compilerpasses: List[List[CompilerPass]],
-    version: int = 3,
-) -> Union[CompilerContext, Generator[IProtoPackage, None, None]]:
+class BlockName:
+    """Picklable stand-in for the blocks keying reports built in a worker"""
 
-    all_templates, compiler_execution = prepare_modules(services, version)
-    try:
-        for compilerpass in compilerpasses:
-            run_compiler_passes(compiler_execution, compilerpass)
-    except CompilationError as e:
-        for ctx in e.contexts:
-            if ctx.has_errors():
-                ctx.show()
-        return ctx
+    def __init__(self, name: str) -> None:
+        self.name = name
 
-    def generate_protos() -> Generator[IProtoPackage, None, None]:
-        for template in all_templates:
+
+@dataclass
+class PackageResult:
+    failed_at: Optional[int]
+    ctx: CompilerContext
+    protos: Optional[List["ProtoPackage"]] = None
+    timings: Optional[Dict[str, float]] = None
+
+
+PackageJob = Tuple[List[ProtoTemplate], List[ServiceTemplate], CompilerContext]
+
+
+def compile_package(
+    job: PackageJob,
+    compilerpasses: List[List[CompilerPass]],
+    timings: Optional[Dict[str, float]] = None,
+) -> Optional[int]:
+    """Run the passes over one package, returning the index of the first
+    pass that left errors in its context, if any.
+
+    Passes are fused into as few walks as possible, but never across
+    groups: setters only run once every validator passed."""
+    _, templates, ctx = job
+    index = 0
+    for group in compilerpasses:
+        for walk in plan_walks(group):
+            failed = merge_forks(ctx, run_walk(walk, templates, ctx, timings))
+            if failed is not None:
+                return index + failed
+            index += len(walk)
+    return None
+
+
+def render_package(
+    modules: Iterable[ProtoTemplate], renderer: str = JINJA
+) -> Iterable["ProtoPackage"]:
+    """Render each module with the jinja templates, or print it from its
+    FileDescriptorProto, which is then kept on the package"""
+    for template in modules:
+        if renderer == JINJA:
             module_dict = template.to_dict()
             if not module_dict:  # pragma: no cover
                 continue
@@ -67,6 +124,127 @@ def compile_service_internal(
             yield ProtoPackage(
                 template.package, template.module, rendered, template.imports
             )
+            continue
+        rendered, descriptor = render_descriptor(template)
+        if descriptor is None:  # pragma: no cover
+            continue
+        yield ProtoPackage(
+            template.package, template.module, rendered, template.imports, descriptor
+        )
+
+
+def _compile_in_worker(
+    job: PackageJob,
+    compilerpasses: List[List[CompilerPass]],
+    timed: bool,
+    renderer: str,
+) -> PackageResult:
+    timings: Optional[Dict[str, float]] = {} if timed else None
+    failed_at = compile_package(job, compilerpasses, timings)
+    ctx = job[2]
+    merged = CompilerContext(name=ctx.name)
+    for block, report in ctx.reports.items():
+        merged.reports[BlockName(block.name)] = report
+    protos = list(render_package(job[0], renderer)) if failed_at is None else None
+    return PackageResult(failed_at, merged, protos, timings)
+
+
+def resolve_workers(workers: int, packages: int) -> int:
+    """Processes to compile `packages` with, `workers` 0 for one per cpu"""
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, packages))
+
+
+def _picklable(*objs: Any) -> bool:
+    try:
+        pickle.dumps(objs)
+    except Exception as e:
+        logger.warning(f"Compiling sequentially, the app can not be pickled: {e}")
+        return False
+    return True
+
+
+def run_packages(
+    jobs: List[PackageJob],
+    compilerpasses: List[List[CompilerPass]],
+    workers: int,
+    timings: Optional[Dict[str, float]] = None,
+    renderer: str = JINJA,
+) -> List[PackageResult]:
+    if workers <= 1 or not _picklable(jobs, compilerpasses):
+        return [
+            PackageResult(compile_package(job, compilerpasses, timings), job[2])
+            for job in jobs
+        ]
+
+    # spawn, not fork: the caller may hold grpc or event loop threads. The
+    # jobs are pickled, so the handlers and their modules must be importable
+    # by the workers
+    worker = partial(
+        _compile_in_worker,
+        compilerpasses=compilerpasses,
+        timed=timings is not None,
+        renderer=renderer,
+    )
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        results = list(pool.map(worker, jobs, chunksize=chunksize))
+    if timings is not None:
+        for result in results:
+            for name, elapsed in (result.timings or {}).items():
+                timings[name] = timings.get(name, 0.0) + elapsed
+    return results
+
+
+def merge_contexts(contexts: Iterable[CompilerContext]) -> CompilerContext:
+    merged = CompilerContext(name="merged")
+    for ctx in contexts:
+        merged.reports.update(ctx.reports)
+    return merged
+
+
+def compile_service_internal(
+    services: Mapping[str, List[IService]],
+    compilerpasses: List[List[CompilerPass]],
+    version: int = 3,
+    workers: int = 1,
+    timings: Optional[Dict[str, float]] = None,
+    renderer: str = JINJA,
+) -> Union[CompilerContext, Generator[IProtoPackage, None, None]]:
+    """
+    Validates and renders every package.
+
+    Packages are independent, so with `workers` above 1 they are compiled
+    in a pool of spawned processes, when the app can be pickled.
+    Errors are reported as if each pass ran over all packages before the
+    next one: only the errors of the earliest failing pass are kept, in
+    package order, so the outcome does not depend on the worker count.
+    When given, `timings` collects the seconds spent in each pass.
+    `renderer` selects how protos are rendered, see `render_package`.
+    """
+    check_renderer(renderer)
+    jobs = prepare_packages(services, version)
+    nworkers = resolve_workers(workers, len(jobs))
+    results = run_packages(jobs, compilerpasses, nworkers, timings, renderer)
+
+    failures = [r.failed_at for r in results if r.failed_at is not None]
+    if failures:
+        first = min(failures)
+        failed = [r.ctx for r in results if r.failed_at == first]
+        for ctx in failed:
+            if ctx.has_errors():
+                ctx.show()
+        return merge_contexts(failed)
+
+    def generate_protos() -> Generator[IProtoPackage, None, None]:
+        for job, result in zip(jobs, results):
+            if result.protos is not None:
+                yield from result.protos
+            else:
+                yield from render_package(job[0], renderer)
 
     return generate_protos()
 
@@ -77,6 +255,7 @@ class ProtoPackage(IProtoPackage):
     filename: str
     content: str
     depends: Set[str]
+    descriptor: Optional[FileDescriptorProto] = None
 
     @property
     def qual_name(self) -> str:  # pragma: no cover
@@ -87,23 +266,34 @@ class ProtoPackage(IProtoPackage):
         return file_path
 
 
-def prepare_modules(
-    services: Dict[str, List[IService]],
+def prepare_packages(
+    services: Mapping[str, List[IService]],
     version: int = 3,
-) -> Tuple[List[ProtoTemplate], List[Tuple[List[ServiceTemplate], CompilerContext]]]:
-
-    all_templates: List[ProtoTemplate] = []
-    compiler_execution: List[Tuple[List[ServiceTemplate], CompilerContext]] = []
+) -> List[PackageJob]:
 
+    jobs: List[PackageJob] = []
     for _, service_list in services.items():
         compiler_ctx = make_compiler_context(service_list, version)
         if compiler_ctx is None:
             continue
         allmodules, ctx = compiler_ctx
-        all_templates.extend(allmodules)
         templates = [
             make_service_template(service) for service in service_list if service.active
         ]
+        jobs.append((allmodules, templates, ctx))
+    return jobs
+
+
+def prepare_modules(
+    services: Dict[str, List[IService]],
+    version: int = 3,
+) -> Tuple[List[ProtoTemplate], List[Tuple[List[ServiceTemplate], CompilerContext]]]:
+
+    all_templates: List[ProtoTemplate] = []
+    compiler_execution: List[Tuple[List[ServiceTemplate], CompilerContext]] = []
+
+    for allmodules, templates, ctx in prepare_packages(services, version):
+        all_templates.extend(allmodules)
         compiler_execution.append((templates, ctx))
 
     return all_templates, compiler_execution
@@ -165,11 +355,7 @@ def make_compiler_context(
 
     ctx = CompilerContext(name=package_name, state=state)
 
-    class PackageBlock:
-        def __init__(self, name: str) -> None:
-            self.name = f"Package<{name}>"
-
-    report = ctx.get_report(PackageBlock(package_name))
+    report = ctx.get_report(BlockName(f"Package<{package_name}>"))
     if package_name:
         check_valid(package_name, report, False)
     check_valid_filenames(module_list, report)
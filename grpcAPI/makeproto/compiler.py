@@ -1,5 +1,17 @@
-from rich.console import Console
-from typing_extensions import Any, Dict, List, Optional
+import time
+from functools import partial
+
+from typing_extensions import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
 
 from grpcAPI.makeproto.report import CompileReport
 from grpcAPI.makeproto.template import MethodTemplate, ServiceTemplate, Visitor
@@ -13,7 +25,7 @@ class CompilerContext:
     ):
         self.name = name
         self.reports: Dict[Any, CompileReport] = {}
-        self._state: Dict[str, Any] = state or {}
+        self._state: Dict[str, Any] = state if state is not None else {}
 
     def __len__(self) -> int:
         return sum(len(r) for r in self.reports.values())
@@ -32,7 +44,20 @@ class CompilerContext:
     def is_valid(self) -> bool:
         return all(report.is_valid() for report in self.reports.values())
 
+    def fork(self) -> "CompilerContext":
+        """Empty context sharing this context's state"""
+        return CompilerContext(name=self.name, state=self._state)
+
+    def merge(self, other: "CompilerContext") -> None:
+        for block, report in other.reports.items():
+            if block in self.reports:
+                self.reports[block].errors.extend(report.errors)
+            else:
+                self.reports[block] = report
+
     def show(self) -> None:
+        from rich.console import Console
+
         console = Console()
         for name, report in self.reports.items():
             if len(report) > 0:
@@ -51,6 +76,19 @@ def list_ctx_error_code(context: CompilerContext) -> List[str]:
 
 
 class CompilerPass(Visitor):
+    """
+    A single walk over the service blocks of a package.
+
+    Passes that declare `hooks` only implement `enter_service` and/or
+    `visit_method` and never loop the blocks themselves, so the framework
+    may run several of them in one walk (see `plan_walks`). A pass listed
+    in `after` must have finished its whole walk before this one starts.
+    Passes without `hooks` override `visit_service` and always walk alone.
+    """
+
+    hooks: ClassVar[Optional[FrozenSet[str]]] = None
+    after: ClassVar[Tuple[Type["CompilerPass"], ...]] = ()
+
     def __init__(self) -> None:
         self._ctx: Optional[CompilerContext] = None
 
@@ -79,8 +117,128 @@ class CompilerPass(Visitor):
             )  # pragma: no cover
         return self._ctx
 
+    def enter_service(self, block: ServiceTemplate) -> None:
+        return
+
     def visit_service(self, block: ServiceTemplate) -> None:
-        return  # pragma: no cover
+        self.enter_service(block)
+        if self.hooks is not None and "method" in self.hooks:
+            for method in block.methods:
+                method.accept(self)
 
     def visit_method(self, method: MethodTemplate) -> None:
         return  # pragma: no cover
+
+
+SERVICE_HOOK = frozenset({"service"})
+METHOD_HOOK = frozenset({"method"})
+SERVICE_METHOD_HOOKS = SERVICE_HOOK | METHOD_HOOK
+
+
+def pass_name(cpass: CompilerPass) -> str:
+    return type(cpass).__name__
+
+
+def plan_walks(passes: List[CompilerPass]) -> List[List[CompilerPass]]:
+    """
+    Group consecutive passes that can share a walk, keeping their order.
+
+    A new walk starts at every opaque pass and at every pass that must run
+    after one already in the current walk.
+    """
+    walks: List[List[CompilerPass]] = []
+    current: List[CompilerPass] = []
+    for cpass in passes:
+        fusable = cpass.hooks is not None
+        blocked = any(isinstance(prev, cpass.after) for prev in current)
+        if current and (not fusable or blocked or current[-1].hooks is None):
+            walks.append(current)
+            current = []
+        current.append(cpass)
+    if current:
+        walks.append(current)
+    return walks
+
+
+def _timed(
+    name: str, func: Callable[[Any], None], timings: Dict[str, float]
+) -> Callable[[Any], None]:
+    clock = time.perf_counter
+    timings.setdefault(name, 0.0)
+
+    def call(arg: Any) -> None:
+        start = clock()
+        try:
+            func(arg)
+        finally:
+            timings[name] += clock() - start
+
+    return call
+
+
+def run_walk(
+    passes: List[CompilerPass],
+    blocks: List[ServiceTemplate],
+    ctx: CompilerContext,
+    timings: Optional[Dict[str, float]] = None,
+) -> List[CompilerContext]:
+    """
+    Run `passes` in a single walk over `blocks`.
+
+    Each pass reports into its own fork of `ctx`, returned in pass order, so
+    the errors of each pass can be told apart (see `merge_forks`).
+    `timings` accumulates the seconds spent in each pass, by class name.
+    """
+    contexts = [ctx.fork() for _ in passes]
+
+    def timed(
+        cpass: CompilerPass, func: Callable[[Any], None]
+    ) -> Callable[[Any], None]:
+        if timings is None:
+            return func
+        return _timed(pass_name(cpass), func, timings)
+
+    if passes[0].hooks is None:  # opaque passes always walk alone
+        cpass = passes[0]
+        timed(cpass, partial(cpass.execute, ctx=contexts[0]))(blocks)
+    else:
+        _walk_hooks(passes, blocks, contexts, timed)
+    return contexts
+
+
+def _walk_hooks(
+    passes: List[CompilerPass],
+    blocks: List[ServiceTemplate],
+    contexts: List[CompilerContext],
+    timed: Callable[[CompilerPass, Callable[[Any], None]], Callable[[Any], None]],
+) -> None:
+    """Call the hooks of `passes`, each reporting into its context, in one
+    walk over `blocks`"""
+    for cpass, child in zip(passes, contexts):
+        cpass._ctx = child
+        cpass.set_default()
+    enters = [timed(p, p.enter_service) for p in passes if "service" in (p.hooks or ())]
+    visits = [timed(p, p.visit_method) for p in passes if "method" in (p.hooks or ())]
+    for block in blocks:
+        for enter in enters:
+            enter(block)
+        for method in block.methods:
+            for visit in visits:
+                visit(method)
+        for cpass in passes:
+            cpass.reset()
+    for cpass in passes:
+        cpass.finish()
+
+
+def merge_forks(ctx: CompilerContext, forks: List[CompilerContext]) -> Optional[int]:
+    """
+    Merge the forks back in pass order, stopping at the first pass that
+    leaves `ctx` with errors, as if the passes had run one after the other.
+    Returns the index of that pass, if any.
+    """
+    for index, fork in enumerate(forks):
+        ctx.merge(fork)
+        if len(ctx) > 0:
+            return index
+    return None
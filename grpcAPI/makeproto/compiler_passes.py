@@ -1,6 +1,11 @@
 from typing_extensions import Any, Callable, List, Tuple
 
-from grpcAPI.makeproto.compiler import CompilerContext, CompilerPass
+from grpcAPI.makeproto.compiler import (
+    CompilerContext,
+    CompilerPass,
+    plan_walks,
+    run_walk,
+)
 from grpcAPI.makeproto.format_comment import format_comment
 from grpcAPI.makeproto.setters.comment import CommentSetter
 from grpcAPI.makeproto.setters.imports import ImportsSetter
@@ -29,13 +34,15 @@ def run_compiler_passes(
     compilerpass: List[CompilerPass],
 ) -> None:
     ctxs = [ctx for _, ctx in packs]
-    for cpass in compilerpass:
-        for block, ctx in packs:
-            cpass.execute(block, ctx)
+    for walk in plan_walks(compilerpass):
+        forks = [run_walk(walk, blocks, ctx) for blocks, ctx in packs]
+        for index in range(len(walk)):
+            for ctx, pack_forks in zip(ctxs, forks):
+                ctx.merge(pack_forks[index])
 
-        total_errors = sum(len(ctx) for ctx in ctxs)
-        if total_errors > 0:
-            raise CompilationError(ctxs)
+            total_errors = sum(len(ctx) for ctx in ctxs)
+            if total_errors > 0:
+                raise CompilationError(ctxs)
 
 
 def make_validators(
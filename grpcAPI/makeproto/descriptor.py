@@ -0,0 +1,279 @@
+import logging
+import re
+
+from google.protobuf import descriptor_pb2
+from google.protobuf.text_encoding import CEscape, CUnescape
+from typing_extensions import Dict, Iterable, List, Optional, Tuple
+
+from grpcAPI.makeproto.interface import IMetaType
+from grpcAPI.makeproto.template import MethodTemplate, ProtoTemplate, ServiceTemplate
+
+JINJA = "jinja"
+DESCRIPTOR = "descriptor"
+RENDERERS = (JINJA, DESCRIPTOR)
+
+logger = logging.getLogger(__name__)
+
+HEADER = '/* "Generated .proto file" */\n'
+
+# field numbers used as SourceCodeInfo paths, see descriptor.proto
+_FILE_SYNTAX = 12
+_FILE_SERVICE = 6
+_SERVICE_METHOD = 2
+
+_OPTION = re.compile(r"^\s*(?P<name>[^=]+?)\s*=\s*(?P<value>.+?)\s*;?\s*$", re.DOTALL)
+_NAME_PART = re.compile(r"\((?P<ext>[\w.]+)\)|(?P<name>[A-Za-z_]\w*)")
+_INT = re.compile(r"^[-+]?(0[xX][0-9a-fA-F]+|\d+)$")
+_FLOAT = re.compile(r"^[-+]?(\d+\.\d*|\.\d+|\d+)([eE][-+]?\d+)?$|^[-+]?(inf|nan)$")
+
+SourcePath = Tuple[int, ...]
+
+
+def check_renderer(renderer: str) -> str:
+    if renderer not in RENDERERS:
+        raise ValueError(
+            f"Unknown proto renderer '{renderer}', expected one of {list(RENDERERS)}"
+        )
+    return renderer
+
+
+def parse_option(option: str) -> descriptor_pb2.UninterpretedOption:
+    """
+    Parse an option written as in a .proto file, `name = value`, into the
+    form protoc keeps options in before resolving them against their
+    definition. Extension names go between parentheses:
+    `(google.api.http) = { get: "/v1/users" }`.
+    """
+    match = _OPTION.match(option)
+    if match is None:
+        raise ValueError(f"Invalid option '{option}', expected 'name = value'")
+    uninterpreted = descriptor_pb2.UninterpretedOption()
+
+    name = match.group("name")
+    position = 0
+    for part in _NAME_PART.finditer(name):
+        separator = "" if position == 0 else "."
+        if name[position : part.start()].strip() != separator:
+            raise ValueError(f"Invalid option name '{name}'")
+        name_part = uninterpreted.name.add()
+        name_part.is_extension = part.group("ext") is not None
+        name_part.name_part = part.group("ext") or part.group("name")
+        position = part.end()
+    if not uninterpreted.name or name[position:].strip():
+        raise ValueError(f"Invalid option name '{name}'")
+
+    value = match.group("value")
+    if value[0] in "\"'" and value[-1] == value[0] and len(value) > 1:
+        uninterpreted.string_value = CUnescape(value[1:-1])
+    elif value.startswith("{") and value.endswith("}"):
+        uninterpreted.aggregate_value = value[1:-1].strip()
+    elif _INT.match(value):
+        number = int(value, 16) if "x" in value.lower() else int(value)
+        if number < 0:
+            uninterpreted.negative_int_value = number
+        else:
+            uninterpreted.positive_int_value = number
+    elif _FLOAT.match(value):
+        uninterpreted.double_value = float(value)
+    else:
+        uninterpreted.identifier_value = value
+    return uninterpreted
+
+
+def format_option(option: descriptor_pb2.UninterpretedOption) -> str:
+    name = ".".join(
+        f"({part.name_part})" if part.is_extension else part.name_part
+        for part in option.name
+    )
+    if option.HasField("string_value"):
+        value = f'"{CEscape(option.string_value, as_utf8=True)}"'
+    elif option.HasField("aggregate_value"):
+        value = f"{{ {option.aggregate_value} }}"
+    elif option.HasField("positive_int_value"):
+        value = str(option.positive_int_value)
+    elif option.HasField("negative_int_value"):
+        value = str(option.negative_int_value)
+    elif option.HasField("double_value"):
+        value = repr(option.double_value)
+    else:
+        value = option.identifier_value
+    return f"{name} = {value}"
+
+
+def type_name(meta: Optional[IMetaType], fallback: Optional[str]) -> str:
+    """Fully qualified name of a message type, `.package.Message`"""
+    descriptor = getattr(getattr(meta, "basetype", None), "DESCRIPTOR", None)
+    full_name = getattr(descriptor, "full_name", None)
+    return f".{full_name or fallback}"
+
+
+def file_name(template: ProtoTemplate) -> str:
+    if template.package:
+        return f"{template.package.replace('.', '/')}/{template.module}.proto"
+    return f"{template.module}.proto"
+
+
+def _add_comment(
+    info: descriptor_pb2.SourceCodeInfo, path: SourcePath, comment: str
+) -> None:
+    if comment:
+        location = info.location.add()
+        location.path.extend(path)
+        location.leading_comments = comment
+
+
+def _add_method(
+    service: descriptor_pb2.ServiceDescriptorProto, method: MethodTemplate
+) -> descriptor_pb2.MethodDescriptorProto:
+    proto = service.method.add()
+    proto.name = method.name
+    proto.input_type = type_name(
+        method.request_types[0] if method.request_types else None,
+        method.request_str,
+    )
+    proto.output_type = type_name(method.response_type, method.response_str)
+    if method.request_stream:
+        proto.client_streaming = True
+    if method.response_stream:
+        proto.server_streaming = True
+    for option in method.options:
+        proto.options.uninterpreted_option.append(parse_option(option))
+    return proto
+
+
+def _add_service(
+    file: descriptor_pb2.FileDescriptorProto,
+    service: ServiceTemplate,
+    path: SourcePath,
+) -> None:
+    proto = file.service.add()
+    proto.name = service.name
+    for option in service.options:
+        proto.options.uninterpreted_option.append(parse_option(option))
+    _add_comment(file.source_code_info, path, service.comments)
+    for index, method in enumerate(service.methods):
+        _add_method(proto, method)
+        _add_comment(
+            file.source_code_info, path + (_SERVICE_METHOD, index), method.comments
+        )
+
+
+def build_file_descriptor(
+    template: ProtoTemplate,
+) -> Optional[descriptor_pb2.FileDescriptorProto]:
+    """
+    Build the FileDescriptorProto of a compiled module, the same file the
+    jinja templates render, or None when the module has no service.
+
+    Message types are referenced by their fully qualified names. Options are
+    kept uninterpreted, as written, and comments are stored as the leading
+    comments of their element in `source_code_info`.
+    """
+    if not any(service.methods for service in template.services):
+        logger.warning(
+            f"Protofile: '{template.package or 'NO_PACKAGE'}.{template.module}.proto' is empty and it was ignored"
+        )
+        return None
+
+    file = descriptor_pb2.FileDescriptorProto()
+    file.name = file_name(template)
+    file.syntax = f"proto{template.syntax}"
+    if template.package:
+        file.package = template.package
+    file.dependency.extend(sorted(template.imports))
+    for option in template.options:
+        file.options.uninterpreted_option.append(parse_option(option))
+    _add_comment(file.source_code_info, (_FILE_SYNTAX,), template.comments)
+
+    for service in template.services:
+        if not service.methods:
+            logger.warning(
+                f"Service: '{service.package}.{service.name}' is empty and it was ignored"
+            )
+            continue
+        _add_service(file, service, (_FILE_SERVICE, len(file.service)))
+    return file
+
+
+def _comments(file: descriptor_pb2.FileDescriptorProto) -> Dict[SourcePath, str]:
+    return {
+        tuple(location.path): location.leading_comments
+        for location in file.source_code_info.location
+    }
+
+
+def _relative_name(name: str, package: str) -> str:
+    """Type name as written in the file: relative to its own package"""
+    name = name.lstrip(".")
+    local = name[len(package) + 1 :]
+    if package and name.startswith(f"{package}.") and "." not in local:
+        return local
+    return name
+
+
+def print_file_descriptor(file: descriptor_pb2.FileDescriptorProto) -> str:
+    """
+    Print a FileDescriptorProto built by `build_file_descriptor` as .proto
+    text, laid out as the jinja templates render it.
+    """
+    comments = _comments(file)
+    lines: List[str] = [HEADER, comments.get((_FILE_SYNTAX,), ""), "\n"]
+    lines.append(f'syntax = "{file.syntax or "proto2"}";\n\n')
+    if file.package:
+        lines.append(f"package {file.package};\n")
+    lines.append("\n")
+    lines.extend(f'import "{dependency}";\n' for dependency in file.dependency)
+    lines.append("\n")
+    lines.extend(
+        f"option {format_option(option)};\n"
+        for option in file.options.uninterpreted_option
+    )
+    lines.append("\n")
+
+    for index, service in enumerate(file.service):
+        path = (_FILE_SERVICE, index)
+        if path in comments:
+            lines.append(f"{comments[path]}\n")
+        lines.append(f"service {service.name} {{\n")
+        lines.extend(
+            f"  option {format_option(option)};\n"
+            for option in service.options.uninterpreted_option
+        )
+        for m, method in enumerate(service.method):
+            method_path = path + (_SERVICE_METHOD, m)
+            if method_path in comments:
+                lines.append(f"{comments[method_path]}\n")
+            request = _relative_name(method.input_type, file.package)
+            response = _relative_name(method.output_type, file.package)
+            lines.append(
+                f"rpc {method.name}"
+                f"({'stream ' if method.client_streaming else ''}{request}) returns "
+                f"({'stream ' if method.server_streaming else ''}{response})"
+            )
+            options = method.options.uninterpreted_option
+            if options:
+                lines.append("{\n")
+                lines.extend(f"    option {format_option(o)};\n" for o in options)
+                lines.append("  };\n")
+            else:
+                lines.append(";\n")
+        lines.append("}\n")
+    return "".join(lines)
+
+
+def descriptor_set(
+    files: Iterable[Optional[descriptor_pb2.FileDescriptorProto]],
+) -> descriptor_pb2.FileDescriptorSet:
+    """Bundle the descriptors of compiled protos, skipping missing ones"""
+    bundle = descriptor_pb2.FileDescriptorSet()
+    bundle.file.extend(file for file in files if file is not None)
+    return bundle
+
+
+def render_descriptor(
+    template: ProtoTemplate,
+) -> Tuple[str, Optional[descriptor_pb2.FileDescriptorProto]]:
+    file = build_file_descriptor(template)
+    if file is None:
+        return "", None
+    return print_file_descriptor(file), file
@@ -1,9 +1,14 @@
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List
 
 from typing_extensions import Any, Callable, Iterable, Optional, Protocol, Set, Type
 
 
 class IMetaType(Protocol):
+    # empty slots keep the implementations slotted; hidden from mypy,
+    # which would reject assigning the attributes through the protocol
+    if not TYPE_CHECKING:
+        __slots__ = ()
+
     argtype: Type[Any]
     basetype: Type[Any]
     origin: Optional[Type[Any]]
@@ -13,6 +18,9 @@ class IMetaType(Protocol):
 
 
 class IFilter(Protocol):
+    if not TYPE_CHECKING:
+        __slots__ = ()
+
     package: str
     module: str
     tags: Iterable[str]
@@ -21,6 +29,9 @@ class IFilter(Protocol):
 
 
 class ILabeledMethod(IFilter):
+    if not TYPE_CHECKING:
+        __slots__ = ()
+
     name: str
     method: Callable[..., Any]
     service: str
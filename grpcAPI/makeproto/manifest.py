@@ -0,0 +1,157 @@
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from typing_extensions import Any, Dict, List, Union
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = ".grpcapi_manifest.json"
+MANIFEST_VERSION = 1
+
+ADDED = "added"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+
+
+@dataclass
+class BuildSummary:
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    @property
+    def written(self) -> int:
+        return len(self.added) + len(self.changed)
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self.added)} added, {len(self.changed)} changed, "
+            f"{len(self.unchanged)} unchanged, {len(self.removed)} removed"
+        )
+
+
+class BuildManifest:
+    """
+    Content hashes of the files a build wrote into an output directory.
+
+    Files whose content did not change are left untouched, so their mtime
+    does not trigger downstream rebuilds. Files recorded by the previous
+    build but not written by the current one are deleted by `finish`.
+    Only files listed in the manifest are ever overwritten or pruned.
+
+    Usage:
+        manifest = BuildManifest(out_dir)
+        manifest.write("pack/service.proto", content, overwrite=False)
+        summary = manifest.finish()
+    """
+
+    def __init__(self, out_dir: Path) -> None:
+        self.out_dir = Path(out_dir)
+        self.file = self.out_dir / MANIFEST_FILE
+        self.entries: Dict[str, Dict[str, Any]] = self._load()
+        self.current: Dict[str, Dict[str, Any]] = {}
+        self.summary = BuildSummary()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            data = json.loads(self.file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return {}
+        files = data.get("files", {})
+        return files if isinstance(files, dict) else {}
+
+    def _intact(self, path: Path, entry: Dict[str, Any]) -> bool:
+        """Whether the file on disk is still the one recorded in `entry`"""
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        return stat.st_size == entry.get("size") and stat.st_mtime_ns == entry.get(
+            "mtime_ns"
+        )
+
+    def write(self, name: str, content: Union[str, bytes], overwrite: bool) -> str:
+        """Write `content` to `name`, relative to the output directory, unless
+        it is already there. Returns ADDED, CHANGED or UNCHANGED."""
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.out_dir / name
+        previous = self.entries.get(name)
+
+        if (
+            previous is not None
+            and previous.get("sha256") == digest
+            and self._intact(path, previous)
+        ):
+            self.current[name] = previous
+            self.summary.unchanged.append(name)
+            return UNCHANGED
+
+        existed = path.exists()
+        if existed and previous is None and not overwrite:
+            raise FileExistsError(f"{path} already exists.")
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        stat = path.stat()
+        self.current[name] = {
+            "sha256": digest,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        status = CHANGED if existed else ADDED
+        getattr(self.summary, status).append(name)
+        return status
+
+    def copy(self, source: Path, name: str) -> str:
+        return self.write(name, Path(source).read_bytes(), overwrite=True)
+
+    def prune(self) -> List[str]:
+        """Delete the files of the previous build that were not written now"""
+        removed: List[str] = []
+        for name in sorted(set(self.entries) - set(self.current)):
+            path = self.out_dir / name
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not remove stale file {path}: {e}")
+                continue
+            removed.append(name)
+            self._remove_empty_parents(path.parent)
+        self.summary.removed.extend(removed)
+        return removed
+
+    def _remove_empty_parents(self, directory: Path) -> None:
+        root = self.out_dir.resolve()
+        directory = directory.resolve()
+        while directory != root and root in directory.parents:
+            try:
+                directory.rmdir()
+            except OSError:
+                return
+            directory = directory.parent
+
+    def save(self) -> None:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.file.write_text(
+            json.dumps(
+                {"version": MANIFEST_VERSION, "files": self.current},
+                indent=2,
+                sort_keys=True,
+            ),
+            encoding="utf-8",
+        )
+        self.entries = dict(self.current)
+
+    def finish(self) -> BuildSummary:
+        self.prune()
+        self.save()
+        return self.summary
@@ -2,9 +2,6 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import List, Optional
 
-from rich.console import Console
-from rich.table import Table
-
 
 class CompileErrorCode(Enum):
     # E100 - Names
@@ -133,6 +130,9 @@ class CompileReport:
         return not self.errors  # pragma: no cover
 
     def show(self) -> None:
+        from rich.console import Console
+        from rich.table import Table
+
         console = Console()
 
         if not self.errors:
@@ -1,11 +1,12 @@
-from grpcAPI.makeproto.compiler import CompilerPass
+from grpcAPI.makeproto.compiler import SERVICE_HOOK, CompilerPass
 from grpcAPI.makeproto.report import CompileErrorCode, CompileReport
 from grpcAPI.makeproto.template import ProtoTemplate, ServiceTemplate
 
 
 class ServiceSetter(CompilerPass):
+    hooks = SERVICE_HOOK
 
-    def visit_service(self, block: ServiceTemplate) -> None:
+    def enter_service(self, block: ServiceTemplate) -> None:
         module_template: ProtoTemplate = self.ctx.get_state(block.module)
         services = module_template.services
         if block in services:
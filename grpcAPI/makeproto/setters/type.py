@@ -1,9 +1,9 @@
 from collections.abc import AsyncIterator
 
-from grpcAPI.makeproto.compiler import CompilerPass
+from grpcAPI.makeproto.compiler import METHOD_HOOK, CompilerPass
 from grpcAPI.makeproto.interface import IMetaType
 from grpcAPI.makeproto.report import CompileErrorCode, CompileReport
-from grpcAPI.makeproto.template import MethodTemplate, ServiceTemplate
+from grpcAPI.makeproto.template import MethodTemplate
 
 
 def get_type_str(bt: IMetaType, package: str) -> str:
@@ -15,10 +15,7 @@ def get_type_str(bt: IMetaType, package: str) -> str:
 
 
 class TypeSetter(CompilerPass):
-
-    def visit_service(self, block: ServiceTemplate) -> None:
-        for field in block.methods:
-            field.accept(self)
+    hooks = METHOD_HOOK
 
     def visit_method(self, method: MethodTemplate) -> None:
         try:
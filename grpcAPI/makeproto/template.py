@@ -1,8 +1,8 @@
 import logging
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
-from jinja2 import Environment, FileSystemLoader
 from typing_extensions import (
     Any,
     Callable,
@@ -152,19 +152,26 @@ class ProtoTemplate(ToDict):
 
 TEMPLATE_DIR = Path(__file__).parent / "templates"
 
-env = Environment(
-    loader=FileSystemLoader(TEMPLATE_DIR), trim_blocks=True, lstrip_blocks=True
-)
+
+@lru_cache(maxsize=None)
+def get_environment() -> Any:
+    """Jinja environment, created on first render so importing stays cheap"""
+    from jinja2 import Environment, FileSystemLoader
+
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR), trim_blocks=True, lstrip_blocks=True
+    )
+    env.globals["render_service_template"] = render_service_template
+    return env
 
 
 def render_service_template(data: Dict[str, str]) -> str:
-    template = env.get_template("service.j2")
+    template = get_environment().get_template("service.j2")
     return template.render(data)
 
 
 def render_protofile_template(data: Dict[str, str]) -> str:
     if not data:
         return ""
-    env.globals["render_service_template"] = render_service_template
-    template = env.get_template("protofile.j2")
+    template = get_environment().get_template("protofile.j2")
     return template.render(data)
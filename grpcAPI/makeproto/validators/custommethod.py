@@ -1,11 +1,13 @@
 from typing import Any, Callable, List, Optional
 
-from grpcAPI.makeproto.compiler import CompilerPass
+from grpcAPI.makeproto.compiler import METHOD_HOOK, CompilerPass
 from grpcAPI.makeproto.report import CompileErrorCode
-from grpcAPI.makeproto.template import MethodTemplate, ServiceTemplate
+from grpcAPI.makeproto.template import MethodTemplate
 
 
 class CustomPass(CompilerPass):
+    hooks = METHOD_HOOK
+
     def __init__(
         self,
         visitmethod: Callable[[Callable[..., Any]], List[str]],
@@ -38,10 +40,6 @@ class CustomPass(CompilerPass):
                 CompileErrorCode.RUNTIME_POSSIBLE_ERROR, method.name, error
             )
 
-    def visit_service(self, block: ServiceTemplate) -> None:
-        for field in block.methods:
-            field.accept(self)
-
     def visit_method(self, method: MethodTemplate) -> None:
         error_msg = self._visit_method(method.method_func)
         self._report(error_msg, method)
@@ -1,14 +1,11 @@
-from grpcAPI.makeproto.compiler import CompilerPass
+from grpcAPI.makeproto.compiler import METHOD_HOOK, CompilerPass
 from grpcAPI.makeproto.interface import IMetaType
 from grpcAPI.makeproto.report import CompileErrorCode, CompileReport
-from grpcAPI.makeproto.template import MethodTemplate, ServiceTemplate
+from grpcAPI.makeproto.template import MethodTemplate
 
 
 class ImportsValidator(CompilerPass):
-
-    def visit_service(self, block: ServiceTemplate) -> None:
-        for field in block.methods:
-            field.accept(self)
+    hooks = METHOD_HOOK
 
     def _check_proto_path(
         self, btype: IMetaType, method_name: str, arg: str, report: CompileReport
@@ -5,7 +5,7 @@ from typing import List, Tuple
 
 from typing_extensions import Optional, Sequence, Set
 
-from grpcAPI.makeproto.compiler import CompilerPass
+from grpcAPI.makeproto.compiler import METHOD_HOOK, SERVICE_HOOK, CompilerPass
 from grpcAPI.makeproto.report import CompileErrorCode, CompileReport
 from grpcAPI.makeproto.template import MethodTemplate, ServiceTemplate
 
@@ -78,8 +78,13 @@ class NameValidator(CompilerPass):
 
 
 class BlockNameValidator(NameValidator):
+    hooks = SERVICE_HOOK
 
-    def visit_service(self, block: ServiceTemplate) -> None:
+    def set_default(self) -> None:
+        # service names only need to be unique inside their package
+        self.used_names.clear()
+
+    def enter_service(self, block: ServiceTemplate) -> None:
         name = block.name
         report = self.ctx.get_report(block)
         check_valid(name, report)
@@ -91,13 +96,11 @@ class BlockNameValidator(NameValidator):
 
 
 class FieldNameValidator(NameValidator):
+    hooks = METHOD_HOOK
+
     def reset(self) -> None:
         self.used_names.clear()
 
-    def visit_service(self, block: ServiceTemplate) -> None:
-        for field in block.methods:
-            field.accept(self)
-
     def visit_method(self, method: MethodTemplate) -> None:
         name = method.name
         report = self.ctx.get_report(method.service)
@@ -3,10 +3,10 @@ from collections.abc import AsyncIterator
 
 from typing_extensions import Any, Callable, List
 
-from grpcAPI.makeproto.compiler import CompilerPass
+from grpcAPI.makeproto.compiler import METHOD_HOOK, CompilerPass
 from grpcAPI.makeproto.interface import IMetaType
 from grpcAPI.makeproto.report import CompileErrorCode, CompileReport
-from grpcAPI.makeproto.template import MethodTemplate, ServiceTemplate
+from grpcAPI.makeproto.template import MethodTemplate
 
 
 def is_async_func(func: Callable[..., Any]) -> bool:
@@ -14,10 +14,7 @@ def is_async_func(func: Callable[..., Any]) -> bool:
 
 
 class TypeValidator(CompilerPass):
-
-    def visit_service(self, block: ServiceTemplate) -> None:
-        for field in block.methods:
-            field.accept(self)
+    hooks = METHOD_HOOK
 
     def _check_requests(
         self, name: str, report: CompileReport, requests: List[IMetaType]
@@ -1,9 +1,10 @@
 from pathlib import Path
 
-from typing_extensions import Iterable, Set
+from typing_extensions import Iterable, Optional, Set
 
 from grpcAPI.makeproto import IProtoPackage
 from grpcAPI.makeproto.files_sentinel import ensure_dirs, register_path
+from grpcAPI.makeproto.manifest import ADDED, BuildManifest
 
 
 def write_protos(
@@ -11,17 +12,24 @@ def write_protos(
     out_dir: Path,
     overwrite: bool = True,
     clean_services: bool = True,
+    manifest: Optional[BuildManifest] = None,
 ) -> Set[str]:
+    """Write the protos under `out_dir`. With a `manifest`, files whose
+    content is unchanged since the last build are not rewritten."""
     generated_files: Set[str] = set()
     for proto in proto_stream:
         file_path = proto.qual_name
         abs_file_path = out_dir / file_path
         ensure_dirs(abs_file_path.parent, clean_services)
-        created = write_proto(
-            proto_str=proto.content,
-            file_path=abs_file_path,
-            overwrite=overwrite,
-        )
+        if manifest is not None:
+            status = manifest.write(file_path, proto.content, overwrite)
+            created = status == ADDED
+        else:
+            created = write_proto(
+                proto_str=proto.content,
+                file_path=abs_file_path,
+                overwrite=overwrite,
+            )
         if created and clean_services:
             register_path(abs_file_path, False)
         generated_files.add(file_path)
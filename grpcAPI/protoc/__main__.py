@@ -3,7 +3,7 @@ import sys
 from pathlib import Path
 from typing import List, Optional
 
-from .compile import compile_protoc
+from .compile import BACKENDS, SUBPROCESS, compile_protoc
 
 
 def main() -> None:
@@ -51,6 +51,13 @@ def main() -> None:
         help="Specific .proto files to compile (default: all .proto files in proto)",
     )
 
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=SUBPROCESS,
+        help="Run protoc in a subprocess or in this process (default: subprocess)",
+    )
+
     args = parser.parse_args()
 
     proto_path = Path(args.proto)
@@ -66,6 +73,7 @@ def main() -> None:
             services=args.services,
             mypy_stubs=args.mypy_stubs,
             files=files,
+            backend=args.backend,
         )
         print(f"Successfully compiled proto files from {proto_path} to {lib_path}")
     except Exception as e:
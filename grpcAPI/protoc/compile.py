@@ -1,13 +1,25 @@
+import os
 import subprocess
 import sys
+import tempfile
+import threading
+from contextlib import ExitStack, contextmanager
 from logging import Logger, getLogger
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import IO, Iterable, Iterator, Optional
 
 from typing_extensions import List
 
 default_logger = getLogger(__name__)
 
+SUBPROCESS = "subprocess"
+INPROCESS = "inprocess"
+BACKENDS = (SUBPROCESS, INPROCESS)
+
+# protoc's diagnostics go straight to the process' file descriptors, so
+# in-process runs are serialized while those are redirected
+_inprocess_lock = threading.Lock()
+
 
 def compile_protoc(
     root: Path,
@@ -17,6 +29,7 @@ def compile_protoc(
     mypy_stubs: bool,
     files: Optional[Iterable[str]] = None,
     logger: Logger = default_logger,
+    backend: str = SUBPROCESS,
 ) -> Iterable[str]:
 
     if not root.exists():
@@ -29,12 +42,76 @@ def compile_protoc(
 
     args = resolve_args(root, dst, clss, services, mypy_stubs, proto_files)
 
-    result = subprocess.run(args, capture_output=True, text=True, shell=False)
+    result = run_protoc(args, backend)
 
     proc_result(result, logger, args)
     return proto_files
 
 
+def run_protoc(
+    args: List[str], backend: str = SUBPROCESS
+) -> subprocess.CompletedProcess:
+    if backend == SUBPROCESS:
+        return subprocess.run(args, capture_output=True, text=True, shell=False)
+    if backend == INPROCESS:
+        return run_protoc_inprocess(args)
+    raise ValueError(f"Unknown protoc backend '{backend}', expected one of {BACKENDS}")
+
+
+@contextmanager
+def capture_fd(fd: int) -> Iterator[IO[bytes]]:
+    """Redirect a file descriptor into a temporary file"""
+    with tempfile.TemporaryFile() as tmp:
+        saved = os.dup(fd)
+        os.dup2(tmp.fileno(), fd)
+        try:
+            yield tmp
+        finally:
+            os.dup2(saved, fd)
+            os.close(saved)
+
+
+def bundled_include() -> str:
+    """The directory of the .proto files grpc_tools ships, google/protobuf"""
+    if sys.version_info >= (3, 9):
+        from importlib.resources import files
+
+        return str(files("grpc_tools") / "_proto")
+    import grpc_tools  # pragma: no cover
+
+    return str(Path(grpc_tools.__file__).parent / "_proto")  # pragma: no cover
+
+
+def run_protoc_inprocess(args: List[str]) -> subprocess.CompletedProcess:
+    """
+    Run `args`, as built by `resolve_args`, through grpc_tools' bundled
+    protoc in this process, skipping the interpreter startup and the
+    grpc_tools import of a subprocess. Output is captured as if it ran in
+    a subprocess.
+
+    protoc writes to the file descriptors 1 and 2, which are redirected for
+    the whole process while it runs: what other threads print meanwhile,
+    e.g. a live progress display, is captured with it. Callers stop those
+    first or use the subprocess backend.
+    """
+    from grpc_tools import protoc
+
+    command = ["grpc_tools.protoc", *args[3:], f"-I{bundled_include()}"]
+
+    with _inprocess_lock, ExitStack() as stack:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        out = stack.enter_context(capture_fd(1))
+        err = stack.enter_context(capture_fd(2))
+        returncode = protoc.main(command)
+        out.seek(0)
+        err.seek(0)
+        stdout = out.read().decode("utf-8", "replace")
+        stderr = err.read().decode("utf-8", "replace")
+
+    return subprocess.CompletedProcess(args, returncode, stdout, stderr)
+
+
 def list_proto_files(base_dir: Path, rel_path: Optional[Path] = None) -> List[str]:
     base_path = base_dir.resolve()
     rel_path = rel_path or base_path
@@ -0,0 +1,261 @@
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from logging import Logger
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from grpcAPI.protoc.compile import (
+    INPROCESS,
+    SUBPROCESS,
+    default_logger,
+    list_proto_files,
+    proc_result,
+    resolve_args,
+    resolve_files,
+    run_protoc,
+)
+
+THIRD_PARTY = Path("grpcAPI/third_party")
+
+# packages whose version changes the generated code
+PLUGIN_PACKAGES = ("grpcio-tools", "protobuf", "mypy-protobuf")
+
+_COMMENTS = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+_IMPORT = re.compile(r'^\s*import\s+(?:public\s+|weak\s+)?"([^"]+)"\s*;', re.MULTILINE)
+
+
+def parse_imports(source: str) -> List[str]:
+    return _IMPORT.findall(_COMMENTS.sub("", source))
+
+
+def plugin_versions() -> Dict[str, str]:
+    from importlib.metadata import PackageNotFoundError, version
+
+    versions: Dict[str, str] = {}
+    for package in PLUGIN_PACKAGES:
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = "missing"
+    return versions
+
+
+class ProtoGraph:
+    """
+    Import graph of the .proto files under `root`.
+
+    Imports that do not resolve under `root` (well known types, third party
+    protos) are external: they are hashed by the content found in
+    `include_dirs`, or by name when they are bundled with protoc.
+    """
+
+    def __init__(self, root: Path, include_dirs: Iterable[Path] = ()) -> None:
+        self.root = root
+        self.include_dirs = list(include_dirs)
+        self.sources: Dict[str, bytes] = {}
+        self.imports: Dict[str, List[str]] = {}
+        for name in list_proto_files(root):
+            data = (root / name).read_bytes()
+            self.sources[name] = data
+            self.imports[name] = parse_imports(data.decode("utf-8", "replace"))
+        self._hashes: Dict[str, str] = {}
+
+    def dependencies(self, name: str) -> Set[str]:
+        """Transitive imports of `name` found under `root`"""
+        seen: Set[str] = set()
+        stack = [name]
+        while stack:
+            for dep in self.imports.get(stack.pop(), []):
+                if dep in self.sources and dep not in seen:
+                    seen.add(dep)
+                    stack.append(dep)
+        return seen
+
+    def _external_hash(self, name: str) -> str:
+        for directory in self.include_dirs:
+            path = directory / name
+            if path.is_file():
+                return hashlib.sha256(path.read_bytes()).hexdigest()
+        return name
+
+    def file_hash(self, name: str, salt: str = "") -> str:
+        """Hash of `name`, its transitive imports and `salt`"""
+        key = f"{salt}:{name}"
+        if key in self._hashes:
+            return self._hashes[key]
+        digest = hashlib.sha256(salt.encode())
+        for dep in sorted(self.dependencies(name) | {name}):
+            digest.update(dep.encode())
+            digest.update(self.sources[dep])
+            for imported in self.imports[dep]:
+                if imported not in self.sources:
+                    digest.update(self._external_hash(imported).encode())
+        self._hashes[key] = digest.hexdigest()
+        return self._hashes[key]
+
+
+def output_names(proto: str) -> List[str]:
+    """Glob patterns of the files protoc generates for `proto`"""
+    path = Path(proto)
+    stem = path.stem.replace("-", "_")
+    parent = path.parent.as_posix()
+    prefix = "" if parent == "." else f"{parent}/"
+    return [f"{prefix}{stem}_pb2.*", f"{prefix}{stem}_pb2_grpc.*"]
+
+
+@dataclass
+class ProtocSummary:
+    compiled: List[str] = field(default_factory=list)
+    cached: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self.compiled)} compiled, {len(self.cached)} from cache, "
+            f"{len(self.unchanged)} up to date"
+        )
+
+
+class ProtocCache:
+    """Generated files keyed by the hash of their inputs"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path) / "protoc"
+
+    def entry(self, key: str) -> Path:
+        return self.path / key[:2] / key
+
+    def get(self, key: str) -> Optional[Path]:
+        entry = self.entry(key)
+        return entry if entry.is_dir() else None
+
+    def put(self, key: str, outputs: Dict[str, Path]) -> None:
+        entry = self.entry(key)
+        if entry.is_dir():
+            return
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=entry.parent))
+        for name, source in outputs.items():
+            target = staging / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source, target)
+        try:
+            staging.rename(entry)
+        except OSError:  # another build stored it first
+            shutil.rmtree(staging, ignore_errors=True)
+
+
+def collect_outputs(out_dir: Path, proto: str) -> Dict[str, Path]:
+    outputs: Dict[str, Path] = {}
+    for pattern in output_names(proto):
+        for path in out_dir.glob(pattern):
+            outputs[path.relative_to(out_dir).as_posix()] = path
+    return outputs
+
+
+def install(entry: Path, dst: Path) -> bool:
+    """Copy a cache entry to `dst`, leaving identical files untouched.
+    Returns whether any file was written."""
+    written = False
+    for source in entry.rglob("*"):
+        if not source.is_file():
+            continue
+        target = dst / source.relative_to(entry)
+        data = source.read_bytes()
+        if target.is_file() and target.read_bytes() == data:
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        written = True
+    return written
+
+
+def make_shards(
+    protos: List[str], sizes: Dict[str, int], count: int
+) -> List[List[str]]:
+    """Split `protos` in up to `count` shards of similar total size"""
+    shards: List[List[str]] = [[] for _ in range(max(1, min(count, len(protos))))]
+    loads = [0] * len(shards)
+    for proto in sorted(protos, key=lambda p: (-sizes.get(p, 0), p)):
+        index = loads.index(min(loads))
+        shards[index].append(proto)
+        loads[index] += sizes.get(proto, 0)
+    return [sorted(shard) for shard in shards if shard]
+
+
+def compile_protoc_incremental(
+    root: Path,
+    dst: Path,
+    clss: bool,
+    services: bool,
+    mypy_stubs: bool,
+    files: Optional[Iterable[str]] = None,
+    logger: Logger = default_logger,
+    cache_path: Optional[Path] = None,
+    workers: Optional[int] = None,
+    backend: str = SUBPROCESS,
+) -> Iterable[str]:
+    """
+    Same as `compile_protoc`, but only runs protoc for the files whose
+    content, transitive imports, options or plugin versions changed since
+    they were last compiled. Generated files are cached by the hash of those
+    inputs, and the files left to compile are split in shards compiled by
+    parallel protoc processes. The in-process backend compiles them in a
+    single protoc run instead. The cache is kept in `cache_path`,
+    .grpcapi_cache by default.
+    """
+    if not root.exists():
+        raise FileNotFoundError(f"Proto path '{root}' does not exist.")
+    dst.mkdir(parents=True, exist_ok=True)
+
+    proto_files = list(resolve_files(files, root))
+    graph = ProtoGraph(root, [THIRD_PARTY])
+    salt = repr((sorted(plugin_versions().items()), clss, services, mypy_stubs))
+    cache = ProtocCache(cache_path or Path(".grpcapi_cache"))
+    summary = ProtocSummary()
+
+    stale: List[str] = []
+    for proto in proto_files:
+        if proto not in graph.sources:
+            stale.append(proto)  # let protoc report it
+            continue
+        entry = cache.get(graph.file_hash(proto, salt))
+        if entry is None:
+            stale.append(proto)
+        elif install(entry, dst):
+            summary.cached.append(proto)
+        else:
+            summary.unchanged.append(proto)
+
+    if stale:
+        sizes = {p: len(graph.sources.get(p, b"")) for p in stale}
+        count = 1 if backend == INPROCESS else workers or os.cpu_count() or 1
+        shards = make_shards(stale, sizes, count)
+        with tempfile.TemporaryDirectory() as temp_dir:
+
+            def run_shard(index: int) -> None:
+                out_dir = Path(temp_dir) / str(index)
+                out_dir.mkdir()
+                args = resolve_args(
+                    root, out_dir, clss, services, mypy_stubs, shards[index]
+                )
+                proc_result(run_protoc(args, backend), logger, args)
+
+            with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+                list(pool.map(run_shard, range(len(shards))))
+
+            for index, shard in enumerate(shards):
+                out_dir = Path(temp_dir) / str(index)
+                for proto in shard:
+                    key = graph.file_hash(proto, salt)
+                    cache.put(key, collect_outputs(out_dir, proto))
+                    install(cache.entry(key), dst)
+                    summary.compiled.append(proto)
+
+    logger.info("protoc: %s", summary)
+    return proto_files
@@ -43,6 +43,14 @@ class ServerPlugin(Protocol):
         """Called when server is starting."""
         pass
 
+    async def on_warmup_start(self, server: "ServerWrapper") -> None:
+        """Called before the server starts, when the app warmup begins."""
+        pass
+
+    async def on_warmup_end(self, server: "ServerWrapper") -> None:
+        """Called when the app warmup is over and it can take traffic."""
+        pass
+
     async def on_wait_for_termination(self, timeout: Optional[float] = None) -> None:
         """Called when server is waiting for termination."""
         pass
@@ -114,6 +122,12 @@ class ServerWrapper:
         await self._trigger_plugins_async("on_start", server=self)
         await self._server.start()
 
+    async def start_warmup(self) -> None:
+        await self._trigger_plugins_async("on_warmup_start", server=self)
+
+    async def end_warmup(self) -> None:
+        await self._trigger_plugins_async("on_warmup_end", server=self)
+
     async def stop(self, grace: Optional[float]) -> None:
         await self._trigger_plugins_async("on_stop")
         return await self._server.stop(grace)
@@ -13,6 +13,7 @@ class HealthCheckPlugin(ServerPlugin):
         self._servicer: health.HealthServicer = health.HealthServicer()
         self._services_set: Set[str] = set()
         self.grace = grace
+        self._warming_up = False
 
     @property
     def plugin_name(self) -> str:
@@ -25,19 +26,39 @@ class HealthCheckPlugin(ServerPlugin):
             "servicer": self._servicer,
             "services": list(self._services_set),
             "grace": self.grace,
+            "warming_up": self._warming_up,
         }
 
+    def _status(self) -> int:
+        if self._warming_up:
+            return health_pb2.HealthCheckResponse.NOT_SERVING
+        return health_pb2.HealthCheckResponse.SERVING
+
+    def _set_all(self) -> None:
+        status = self._status()
+        for service_name in self._services_set:
+            self._servicer.set(service_name, status)
+
     def on_register(self, server: ServerWrapper) -> None:
         health_pb2_grpc.add_HealthServicer_to_server(self._servicer, server.server)
-        self._servicer.set("", health_pb2.HealthCheckResponse.SERVING)
+        self._servicer.set("", self._status())
         self._services_set.add("")
 
     def on_add_service(
         self, service_name: str, methods_name: Iterable[str], server: "ServerWrapper"
     ) -> None:
-        self._servicer.set(service_name, health_pb2.HealthCheckResponse.SERVING)
+        self._servicer.set(service_name, self._status())
         self._services_set.add(service_name)
 
+    async def on_warmup_start(self, server: "ServerWrapper") -> None:
+        # load balancers only route to the instance once warmup is over
+        self._warming_up = True
+        self._set_all()
+
+    async def on_warmup_end(self, server: "ServerWrapper") -> None:
+        self._warming_up = False
+        self._set_all()
+
     async def on_stop(self) -> None:
         for service_name in self._services_set:
             self._servicer.set(service_name, health_pb2.HealthCheckResponse.NOT_SERVING)
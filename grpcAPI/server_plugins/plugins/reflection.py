@@ -1,13 +1,206 @@
-from grpc_reflection.v1alpha import reflection
-from typing_extensions import Any, Iterable, Mapping, Set
+import grpc
+from google.protobuf import descriptor_pb2, descriptor_pool
+from google.protobuf.descriptor import Descriptor, FileDescriptor
+from grpc_reflection.v1alpha import reflection, reflection_pb2, reflection_pb2_grpc
+from typing_extensions import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+)
 
 from grpcAPI.server import ServerPlugin, ServerWrapper
 from grpcAPI.server_plugins import loader
 
 
+def transitive_files(descriptor: FileDescriptor) -> List[FileDescriptor]:
+    """`descriptor` followed by all the files it imports, directly or not"""
+    files: Dict[str, FileDescriptor] = {}
+    stack = [descriptor]
+    while stack:
+        current = stack.pop()
+        if current.name in files:
+            continue
+        files[current.name] = current
+        stack.extend(reversed(current.dependencies))
+    return list(files.values())
+
+
+def _message_symbols(message: Descriptor) -> Iterable[str]:
+    yield message.full_name
+    for enum in message.enum_types:
+        yield enum.full_name
+    for nested in message.nested_types:
+        yield from _message_symbols(nested)
+
+
+def file_symbols(descriptor: FileDescriptor) -> Iterable[str]:
+    """Messages, enums, services and methods declared in a file"""
+    for message in descriptor.message_types_by_name.values():
+        yield from _message_symbols(message)
+    for enum in descriptor.enum_types_by_name.values():
+        yield enum.full_name
+    for service in descriptor.services_by_name.values():
+        yield service.full_name
+        for method in service.methods:
+            yield method.full_name
+
+
+def _not_found(
+    request: reflection_pb2.ServerReflectionRequest,
+) -> reflection_pb2.ServerReflectionResponse:
+    code, message = grpc.StatusCode.NOT_FOUND.value
+    return reflection_pb2.ServerReflectionResponse(
+        error_response=reflection_pb2.ErrorResponse(
+            error_code=code, error_message=message.encode()
+        ),
+        original_request=request,
+    )
+
+
+class CachedReflectionServicer(reflection_pb2_grpc.ServerReflectionServicer):
+    """
+    Reflection servicer answering from serialized descriptors.
+
+    The files declaring the served services, and every file they import,
+    are serialized once when the servicer is created and indexed by file
+    name and by the symbols they declare. Requests for other files and
+    symbols are looked up in the pool, and cached when found. Extension
+    requests are left to the grpcio-reflection servicer.
+    """
+
+    def __init__(self, service_names: Iterable[str], pool: Any = None) -> None:
+        self._service_names: Tuple[str, ...] = tuple(sorted(service_names))
+        self._pool = pool if pool is not None else descriptor_pool.Default()
+        self._fallback = reflection.aio.ReflectionServicer(
+            self._service_names, pool=self._pool
+        )
+        self._serialized: Dict[str, bytes] = {}
+        self._responses: Dict[str, reflection_pb2.FileDescriptorResponse] = {}
+        self._symbols: Dict[str, str] = {}
+        for name in self._service_names:
+            try:
+                self._cache_file(self._pool.FindFileContainingSymbol(name))
+            except KeyError:
+                continue
+        self._services = reflection_pb2.ListServiceResponse(
+            service=[
+                reflection_pb2.ServiceResponse(name=name)
+                for name in self._service_names
+            ]
+        )
+
+    def _serialize(self, descriptor: FileDescriptor) -> bytes:
+        data = self._serialized.get(descriptor.name)
+        if data is None:
+            proto = descriptor_pb2.FileDescriptorProto()
+            descriptor.CopyToProto(proto)
+            data = proto.SerializeToString()
+            self._serialized[descriptor.name] = data
+        return data
+
+    def _cache_file(
+        self, descriptor: FileDescriptor
+    ) -> reflection_pb2.FileDescriptorResponse:
+        response = self._responses.get(descriptor.name)
+        if response is None:
+            files = transitive_files(descriptor)
+            response = reflection_pb2.FileDescriptorResponse(
+                file_descriptor_proto=[self._serialize(f) for f in files]
+            )
+            self._responses[descriptor.name] = response
+            for symbol in file_symbols(descriptor):
+                self._symbols.setdefault(symbol, descriptor.name)
+            for dependency in files[1:]:
+                self._cache_file(dependency)
+        return response
+
+    @staticmethod
+    def _file_response(
+        request: reflection_pb2.ServerReflectionRequest,
+        response: reflection_pb2.FileDescriptorResponse,
+    ) -> reflection_pb2.ServerReflectionResponse:
+        return reflection_pb2.ServerReflectionResponse(
+            file_descriptor_response=response, original_request=request
+        )
+
+    @property
+    def service_names(self) -> Tuple[str, ...]:
+        return self._service_names
+
+    @property
+    def cached_files(self) -> Set[str]:
+        return set(self._responses)
+
+    async def ServerReflectionInfo(
+        self,
+        request_iterator: AsyncIterator[reflection_pb2.ServerReflectionRequest],
+        context: Any,
+    ) -> AsyncIterator[reflection_pb2.ServerReflectionResponse]:
+        async for request in request_iterator:
+            if request.HasField("file_by_filename"):
+                yield self._file_by_filename(request, request.file_by_filename)
+            elif request.HasField("file_containing_symbol"):
+                yield self._file_containing_symbol(
+                    request, request.file_containing_symbol
+                )
+            elif request.HasField("list_services"):
+                yield self._list_services(request)
+            else:
+                yield await self._forward(request, context)
+
+    async def _forward(
+        self, request: reflection_pb2.ServerReflectionRequest, context: Any
+    ) -> reflection_pb2.ServerReflectionResponse:
+        async def single() -> AsyncIterator[reflection_pb2.ServerReflectionRequest]:
+            yield request
+
+        responses = self._fallback.ServerReflectionInfo(single(), context)
+        async for response in responses:
+            return response
+        return _not_found(request)  # pragma: no cover
+
+    def _file_by_filename(
+        self, request: reflection_pb2.ServerReflectionRequest, filename: str
+    ) -> reflection_pb2.ServerReflectionResponse:
+        response = self._responses.get(filename)
+        if response is None:
+            try:
+                response = self._cache_file(self._pool.FindFileByName(filename))
+            except KeyError:
+                return _not_found(request)
+        return self._file_response(request, response)
+
+    def _file_containing_symbol(
+        self, request: reflection_pb2.ServerReflectionRequest, symbol: str
+    ) -> reflection_pb2.ServerReflectionResponse:
+        filename: Optional[str] = self._symbols.get(symbol)
+        if filename is None:
+            try:
+                descriptor = self._pool.FindFileContainingSymbol(symbol)
+            except KeyError:
+                return _not_found(request)
+            self._symbols[symbol] = descriptor.name
+            return self._file_response(request, self._cache_file(descriptor))
+        return self._file_response(request, self._responses[filename])
+
+    def _list_services(
+        self, request: reflection_pb2.ServerReflectionRequest
+    ) -> reflection_pb2.ServerReflectionResponse:
+        return reflection_pb2.ServerReflectionResponse(
+            list_services_response=self._services, original_request=request
+        )
+
+
 class ReflectionPlugin(ServerPlugin):
     def __init__(self) -> None:
         self._services: Set[str] = set()
+        self._servicer: Optional[CachedReflectionServicer] = None
         # self._services.add(reflection.SERVICE_NAME)
 
     @property
@@ -19,6 +212,9 @@ class ReflectionPlugin(ServerPlugin):
         return {
             "name": self.plugin_name,
             "services": list(self._services),
+            "cached_files": (
+                sorted(self._servicer.cached_files) if self._servicer else []
+            ),
         }
 
     def on_add_service(
@@ -27,7 +223,12 @@ class ReflectionPlugin(ServerPlugin):
         self._services.add(service_name)
 
     async def on_start(self, server: "ServerWrapper") -> None:
-        reflection.enable_server_reflection(self._services, server.server)
+        # descriptors of the app services are in the pool by now, see
+        # RegisterDescriptors, so every response can be computed upfront
+        self._servicer = CachedReflectionServicer(self._services)
+        reflection_pb2_grpc.add_ServerReflectionServicer_to_server(
+            self._servicer, server.server
+        )
 
 
 def register() -> None:
@@ -6,12 +6,13 @@ from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 
 import grpc
 
-from grpcAPI.logger import LOGGING_CONFIG
+from grpcAPI.logger import LOGGING_CONFIG, configure_logging, logging_config
 from grpcAPI.server import ServerPlugin, ServerWrapper
 from grpcAPI.server_plugins import loader
 
 
 def add_logger(name: str, **kwargs: Any) -> Tuple[str, List[str], bool]:
+    logging_config()  # load the defaults before extending them
     loggers = LOGGING_CONFIG.get("loggers", {})
     if name in loggers:
         level = loggers[name].get("level", "DEBUG")
@@ -61,6 +62,7 @@ class ServerLoggerPlugin(ServerPlugin):
         self,
         **kwargs: Any,
     ) -> None:
+        configure_logging()
         self._services: Dict[str, Iterable[str]] = {}
         self.level, self.handlers, self.propagate = add_logger(
             "server_logger_plugin", **kwargs  # FIX: consistent name
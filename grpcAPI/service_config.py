@@ -0,0 +1,86 @@
+import json
+
+from typing_extensions import Any, Dict, Iterable, List, Optional
+
+from grpcAPI.client import CallPolicy, HedgingPolicy, RetryPolicy
+from grpcAPI.makeproto import IService
+
+# gRPC ignores retry and hedging policies with fewer attempts
+MIN_ATTEMPTS = 2
+
+
+def duration(seconds: float) -> str:
+    """A protobuf JSON duration, e.g. 0.25s"""
+    text = f"{seconds:.9f}".rstrip("0").rstrip(".")
+    return f"{text}s"
+
+
+def retry_config(retry: RetryPolicy) -> Dict[str, Any]:
+    return {
+        "maxAttempts": retry.max_attempts,
+        "initialBackoff": duration(retry.initial_backoff),
+        "maxBackoff": duration(retry.max_backoff),
+        "backoffMultiplier": retry.backoff_multiplier,
+        "retryableStatusCodes": [c.upper() for c in retry.retryable_status_codes],
+    }
+
+
+def hedging_config(hedging: HedgingPolicy) -> Dict[str, Any]:
+    config: Dict[str, Any] = {
+        "maxAttempts": hedging.max_attempts,
+        "hedgingDelay": duration(hedging.hedging_delay),
+    }
+    if hedging.non_fatal_status_codes:
+        codes = [c.upper() for c in hedging.non_fatal_status_codes]
+        config["nonFatalStatusCodes"] = codes
+    return config
+
+
+def method_config(policy: CallPolicy) -> Dict[str, Any]:
+    """The methodConfig fields of a policy, without its names. Policies of
+    a single attempt, or retrying no status code, are left out"""
+    config: Dict[str, Any] = {}
+    if policy.timeout is not None:
+        config["timeout"] = duration(policy.timeout)
+    retry = policy.retry
+    if (
+        retry is not None
+        and retry.max_attempts >= MIN_ATTEMPTS
+        and retry.retryable_status_codes
+    ):
+        config["retryPolicy"] = retry_config(retry)
+    hedging = policy.hedging
+    if hedging is not None and hedging.max_attempts >= MIN_ATTEMPTS:
+        config["hedgingPolicy"] = hedging_config(hedging)
+    return config
+
+
+def make_service_config(services: Iterable[IService]) -> Dict[str, Any]:
+    """
+    The gRPC service config of the policies the active methods declare,
+    `@service(timeout=..., retry=..., hedging=...)`. Methods declaring the
+    same policy share a methodConfig entry.
+    """
+    entries: List[Dict[str, Any]] = []
+    by_config: Dict[str, Dict[str, Any]] = {}
+    for service in services:
+        if not service.active:
+            continue
+        for method in service.methods:
+            policy: Optional[CallPolicy] = CallPolicy.from_meta(method.meta)
+            config = method_config(policy) if policy is not None else {}
+            if not config:
+                continue
+            key = json.dumps(config, sort_keys=True)
+            entry = by_config.get(key)
+            if entry is None:
+                entry = by_config[key] = {"name": [], **config}
+                entries.append(entry)
+            entry["name"].append({"service": service.qual_name, "method": method.name})
+    return {"methodConfig": entries} if entries else {}
+
+
+def render_service_config(services: Iterable[IService]) -> str:
+    """The service config JSON, empty when no method declares a policy"""
+    config = make_service_config(services)
+    return json.dumps(config, indent=2) + "\n" if config else ""
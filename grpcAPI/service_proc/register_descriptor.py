@@ -1,15 +1,40 @@
-from typing import Any, Dict, Tuple
+import logging
+from typing import Any, Dict, List, Tuple
 
 from google.protobuf import descriptor_pb2, descriptor_pool
 
 from grpcAPI.makeproto.interface import IService
 from grpcAPI.service_proc import ProcessService
 
+logger = logging.getLogger(__name__)
+
+
+def proto_file_name(package: str, module: str) -> str:
+    """Name of the .proto file `build` generates for a module"""
+    if package:
+        return f"{package.replace('.', '/')}/{module}.proto"
+    return f"{module}.proto"
+
+
+def qual_name(
+    fd: descriptor_pb2.FileDescriptorProto,
+    service: descriptor_pb2.ServiceDescriptorProto,
+) -> str:
+    return f"{fd.package}.{service.name}" if fd.package else service.name
+
 
 class RegisterDescriptors(ProcessService):
+    """
+    Add the services of the app to the default descriptor pool, one file per
+    module, named and linked as the .proto files `build` generates. The
+    files are built from the services as they are, without the compiler
+    passes, so registering them costs nothing to `run --no-lint` or to a
+    warm lint cache. Files and services already in the pool, e.g. from
+    generated code, are left as they are.
+    """
 
     def __init__(self, **kwargs: Any) -> None:
-        self.fds: Dict[Tuple[str, str], descriptor_pb2.FileDescriptorProto] = {}
+        self.services: Dict[str, List[IService]] = {}
         self.pool = descriptor_pool.Default()
 
     def _is_registered(self, filename: str) -> bool:
@@ -19,37 +44,74 @@ class RegisterDescriptors(ProcessService):
         except KeyError:
             return False
 
-    def _get_fd(self, label: Tuple[str, str]) -> descriptor_pb2.FileDescriptorProto:
-
-        fd = self.fds.get(label)
-        if fd is None:
-            fd = descriptor_pb2.FileDescriptorProto()
-            fd.name, fd.package = label
-            self.fds[label] = fd
-        return fd
+    def _has_service(self, full_name: str) -> bool:
+        try:
+            self.pool.FindServiceByName(full_name)
+            return True
+        except KeyError:
+            return False
 
     def _process_service(self, service: IService) -> None:
+        services = self.services.setdefault(service.package, [])
+        if all(s.qual_name != service.qual_name for s in services):
+            services.append(service)
+
+    def descriptors(self) -> descriptor_pb2.FileDescriptorSet:
+        """The descriptors of the processed services"""
+        files: Dict[Tuple[str, str], descriptor_pb2.FileDescriptorProto] = {}
+        for package, services in self.services.items():
+            for service in services:
+                key = (package, service.module)
+                fd = files.get(key)
+                if fd is None:
+                    fd = files[key] = descriptor_pb2.FileDescriptorProto()
+                    fd.name = proto_file_name(package, service.module)
+                    fd.package = package
+                    fd.syntax = "proto3"
+                add_service(fd, service)
+        bundle = descriptor_pb2.FileDescriptorSet()
+        bundle.file.extend(files.values())
+        return bundle
 
-        label = (f"_{service.module}_", service.package)
-        fd = self._get_fd(label)
-        register_service(fd, service)
+    def register(self, files: descriptor_pb2.FileDescriptorSet) -> None:
+        for fd in files.file:
+            if self._is_registered(fd.name):
+                continue
+            pending = descriptor_pb2.FileDescriptorProto()
+            pending.CopyFrom(fd)
+            del pending.service[:]
+            pending.service.extend(
+                s for s in fd.service if not self._has_service(qual_name(fd, s))
+            )
+            if not pending.service:
+                continue
+            try:
+                self.pool.Add(pending)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Could not register descriptor '{fd.name}': {e}")
 
-    def stop(self) -> None:
-        for fd in self.fds.values():
-            if not self._is_registered(fd.name):
-                self.pool.Add(fd)
-        self.fds.clear()
+    def close(self) -> None:
+        if self.services:
+            self.register(self.descriptors())
+        self.services.clear()
 
+    stop = close
 
-def register_service(fd: descriptor_pb2.FileDescriptorProto, service: IService) -> None:
+
+def add_service(fd: descriptor_pb2.FileDescriptorProto, service: IService) -> None:
+    """Add `service` and the files of its messages to `fd`"""
     fdservice = fd.service.add()
     fdservice.name = service.name
-
+    dependencies = set(fd.dependency)
     for method in service.methods:
         rpc = fdservice.method.add()
         rpc.name = method.name
-
         rpc.input_type = f".{method.input_base_type.DESCRIPTOR.full_name}"
         rpc.output_type = f".{method.output_base_type.DESCRIPTOR.full_name}"
         rpc.client_streaming = method.is_client_stream
         rpc.server_streaming = method.is_server_stream
+        for message in (method.input_base_type, method.output_base_type):
+            dependencies.add(message.DESCRIPTOR.file.name)
+    dependencies.discard(fd.name)
+    del fd.dependency[:]
+    fd.dependency.extend(sorted(dependencies))
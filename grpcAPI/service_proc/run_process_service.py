@@ -8,6 +8,7 @@ from grpcAPI.service_proc.filter_service import DisableService
 
 # from grpcAPI.service_proc.format_service import FormatService
 from grpcAPI.service_proc.inject_typing import InjectProtoTyping
+from grpcAPI.startup_report import measure
 
 # from grpcAPI.service_proc.register_descriptor import RegisterDescriptors
 
@@ -31,7 +32,8 @@ def run_process_service(
         proc_service(**settings) for proc_service in set(process_service_cls)
     ]
     for proc in process_services:
-        proc.start(app.name, app.version)
-        for service in app.service_list:
-            proc.process(service)
-        proc.close()
+        with measure(type(proc).__name__, "process_service"):
+            proc.start(app.name, app.version)
+            for service in app.service_list:
+                proc.process(service)
+            proc.close()
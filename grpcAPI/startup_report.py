@@ -0,0 +1,140 @@
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from typing_extensions import Any, Dict, Iterator, List, Optional, Union
+
+_active_report: Optional["StartupReport"] = None
+
+
+class StartupRecord:
+    __slots__ = ("kind", "name", "start", "duration")
+
+    def __init__(self, kind: str, name: str, start: float, duration: float) -> None:
+        self.kind = kind
+        self.name = name
+        self.start = start
+        self.duration = duration
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "name": self.name,
+            "start_ms": round(self.start * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+        }
+
+
+class StartupReport:
+    """
+    Collects the duration of each startup phase.
+
+    Phases are recorded through the module level `measure`, which is a no-op
+    unless a report is active, so instrumented code pays nothing by default.
+
+    Usage:
+        with StartupReport() as report:
+            app = get_app_instance("app.py")
+            RunCommand(app)
+        report.print()
+        report.write_json("startup.json")
+    """
+
+    def __init__(self) -> None:
+        self.records: List[StartupRecord] = []
+        self.created = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def activate(self) -> "StartupReport":
+        global _active_report
+        _active_report = self
+        return self
+
+    def deactivate(self) -> None:
+        global _active_report
+        if _active_report is self:
+            _active_report = None
+
+    def __enter__(self) -> "StartupReport":
+        return self.activate()
+
+    def __exit__(self, *args: Any) -> None:
+        self.finish()
+        self.deactivate()
+
+    @contextmanager
+    def measure(self, name: str, kind: str = "phase") -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.records.append(
+                StartupRecord(kind, name, start - self.created, end - start)
+            )
+
+    def finish(self) -> None:
+        if self.finished is None:
+            self.finished = time.perf_counter()
+
+    @property
+    def total(self) -> float:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.created
+
+    def sorted_records(self, kind: Optional[str] = None) -> List[StartupRecord]:
+        records = [r for r in self.records if kind is None or r.kind == kind]
+        return sorted(records, key=lambda r: r.duration, reverse=True)
+
+    def to_dict(self) -> Dict[str, Any]:
+        totals: Dict[str, float] = {}
+        for record in self.records:
+            totals[record.kind] = totals.get(record.kind, 0.0) + record.duration
+        return {
+            "total_ms": round(self.total * 1000, 3),
+            "kinds": {k: round(v * 1000, 3) for k, v in totals.items()},
+            "records": [r.to_dict() for r in self.sorted_records()],
+        }
+
+    def write_json(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        return path
+
+    def print(self, limit: Optional[int] = 30) -> None:
+        from rich.console import Console
+        from rich.table import Table
+
+        total = self.total
+        table = Table(title=f"Startup Report ({total * 1000:.1f} ms)")
+        table.add_column("Kind", style="cyan")
+        table.add_column("Name", style="white")
+        table.add_column("ms", justify="right", style="green")
+        table.add_column("%", justify="right")
+
+        for record in self.sorted_records()[:limit]:
+            share = record.duration / total if total else 0.0
+            table.add_row(
+                record.kind,
+                record.name,
+                f"{record.duration * 1000:.2f}",
+                f"{share:.1%}",
+            )
+        Console().print(table)
+
+
+def get_active_report() -> Optional[StartupReport]:
+    return _active_report
+
+
+@contextmanager
+def measure(name: str, kind: str = "phase") -> Iterator[None]:
+    """Time a block into the active StartupReport, if any"""
+    report = _active_report
+    if report is None:
+        yield
+        return
+    with report.measure(name, kind):
+        yield
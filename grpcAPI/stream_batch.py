@@ -0,0 +1,173 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+
+from typing_extensions import (
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    Callable,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+    get_args,
+    get_origin,
+)
+
+from grpcAPI.datatypes import AsyncContext, Batch, batch_item_type
+
+T = TypeVar("T")
+
+# meta of a method taking AsyncIterator[Batch[...]]
+STREAM_BATCH_SIZE = "stream_batch_size"
+STREAM_BATCH_LINGER = "stream_batch_linger"
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_BATCH_LINGER = 0.05
+
+_END = object()
+_LINGERED = object()
+
+
+def is_batch_stream(req: Any) -> bool:
+    """Whether a request type is AsyncIterator[Batch[...]]"""
+    args = get_args(req)
+    return (
+        get_origin(req) is AsyncIterator
+        and bool(args)
+        and batch_item_type(args[0]) is not None
+    )
+
+
+def batch_options(meta: Mapping[str, Any]) -> Tuple[int, Optional[float]]:
+    """The batch size and linger of a method, from its meta"""
+    size = meta.get(STREAM_BATCH_SIZE, DEFAULT_BATCH_SIZE)
+    linger = meta.get(STREAM_BATCH_LINGER, DEFAULT_BATCH_LINGER)
+    if size < 1:
+        raise ValueError(f"{STREAM_BATCH_SIZE} must be at least 1")
+    if linger is not None and linger < 0:
+        raise ValueError(f"{STREAM_BATCH_LINGER} must not be negative")
+    return size, linger
+
+
+async def _read(
+    messages: AsyncIterable[T],
+    queue: "asyncio.Queue[Tuple[Any, Optional[BaseException]]]",
+) -> None:
+    try:
+        async for message in messages:
+            await queue.put((message, None))
+    except Exception as e:
+        await queue.put((_END, e))
+    else:
+        await queue.put((_END, None))
+
+
+async def _next(
+    queue: "asyncio.Queue[Tuple[Any, Optional[BaseException]]]",
+    deadline: Optional[float],
+) -> Tuple[Any, Optional[BaseException]]:
+    """The next entry of `queue`, `_LINGERED` once `deadline` is past"""
+    if not queue.empty():
+        return queue.get_nowait()
+    if deadline is None:
+        return await queue.get()
+    timeout = deadline - asyncio.get_running_loop().time()
+    if timeout <= 0:
+        return _LINGERED, None
+    try:
+        return await asyncio.wait_for(queue.get(), timeout)
+    except asyncio.TimeoutError:
+        return _LINGERED, None
+
+
+async def _fill(
+    batch: Batch[T],
+    queue: "asyncio.Queue[Tuple[Any, Optional[BaseException]]]",
+    max_size: int,
+    deadline: Optional[float],
+) -> Tuple[bool, Optional[BaseException]]:
+    """Add the next messages to `batch` until it is full or `deadline` is
+    past. Whether the stream ended, and its error"""
+    while len(batch) < max_size:
+        message, error = await _next(queue, deadline)
+        if message is _LINGERED:
+            break
+        if message is _END:
+            return True, error
+        batch.append(message)
+    return False, None
+
+
+async def batch_stream(
+    messages: AsyncIterable[T],
+    max_size: int = DEFAULT_BATCH_SIZE,
+    max_linger: Optional[float] = DEFAULT_BATCH_LINGER,
+) -> AsyncGenerator[Batch[T], None]:
+    """
+    Group `messages` into batches of at most `max_size`, handing a batch
+    over `max_linger` seconds after its first message at the latest, or
+    only when full with None. The last batch holds what is left when the
+    stream ends.
+
+    Messages are read ahead by a task, at most `max_size` of them while the
+    handler works on a batch, so a slow handler slows the client down.
+    An error reading the stream is raised after the messages received
+    before it are handed over.
+    """
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue[Tuple[Any, Optional[BaseException]]]" = asyncio.Queue(
+        max_size
+    )
+    reader = asyncio.ensure_future(_read(messages, queue))
+    try:
+        while True:
+            message, error = await queue.get()
+            if message is _END:
+                break
+            batch: Batch[T] = Batch([message])
+            deadline = None if max_linger is None else loop.time() + max_linger
+            ended, error = await _fill(batch, queue, max_size, deadline)
+            yield batch
+            if ended:
+                break
+        if error is not None:
+            raise error
+    finally:
+        reader.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await reader
+
+
+def batch_stream_handler(
+    handler: Callable[[Any, AsyncContext], Any],
+    server_stream: bool,
+    max_size: int,
+    max_linger: Optional[float],
+) -> Callable[[Any, AsyncContext], Any]:
+    """`handler`, a grpc handler of a client stream, with its requests
+    grouped by `batch_stream`. The batches are closed once the handler is
+    done, so a handler that stops reading early stops the reader too"""
+
+    async def stream_of_batches(request: Any, context: AsyncContext) -> Any:
+        batches = batch_stream(request, max_size, max_linger)
+        try:
+            async for response in handler(batches, context):
+                yield response
+        finally:
+            await batches.aclose()
+
+    async def unary_of_batches(request: Any, context: AsyncContext) -> Any:
+        batches = batch_stream(request, max_size, max_linger)
+        try:
+            return await handler(batches, context)
+        finally:
+            await batches.aclose()
+
+    wrapped: Callable[[Any, AsyncContext], Any] = (
+        stream_of_batches if server_stream else unary_of_batches
+    )
+    lazy_runner = getattr(handler, "lazy_runner", None)
+    if lazy_runner is not None:
+        wrapped.lazy_runner = lazy_runner  # type: ignore[attr-defined]
+    return wrapped
@@ -0,0 +1,206 @@
+import asyncio
+import contextlib
+import weakref
+
+from typing_extensions import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    NoReturn,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from grpcAPI.datatypes import AsyncContext
+from grpcAPI.makeproto import ILabeledMethod
+
+T = TypeVar("T")
+
+# meta of a server stream method: how many responses are produced ahead
+STREAM_BUFFER = "stream_buffer"
+
+_END = object()
+
+
+class StreamBufferStats:
+    """
+    Queue depths of the buffered streams of a method, across its calls.
+    `depth` is the number of responses produced and not yet sent. A high
+    `producer_waits` means the clients are slower than the handler, a high
+    `sender_waits` means the buffer is of no help.
+    """
+
+    def __init__(self) -> None:
+        self.streams = 0
+        self.depth = 0
+        self.max_depth = 0
+        self.responses = 0
+        self.producer_waits = 0
+        self.sender_waits = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+
+# stats of the buffered methods, by method path, kept while their handlers are
+_stats: "weakref.WeakValueDictionary[str, StreamBufferStats]" = (
+    weakref.WeakValueDictionary()
+)
+
+
+def stream_buffer_stats() -> Dict[str, StreamBufferStats]:
+    """The stats of the methods declaring a `stream_buffer`, by method path,
+    e.g. /ride.rides/track"""
+    return dict(_stats)
+
+
+def stats_of(method: ILabeledMethod) -> StreamBufferStats:
+    service = f"{method.package}.{method.service}" if method.package else method.service
+    path = f"/{service}/{method.name}"
+    stats = _stats.get(path)
+    if stats is None:
+        stats = _stats[path] = StreamBufferStats()
+    return stats
+
+
+def buffer_size(method: ILabeledMethod) -> int:
+    """The `stream_buffer` of a method, 0 when not buffered"""
+    size = method.meta.get(STREAM_BUFFER)
+    if not size:
+        return 0
+    if isinstance(size, bool) or not isinstance(size, int) or size < 1:
+        raise ValueError(f"{STREAM_BUFFER} must be a positive int, not {size!r}")
+    if not method.is_server_stream:
+        raise ValueError(f"{STREAM_BUFFER} is only for server stream methods")
+    return size
+
+
+async def _produce(
+    responses: AsyncIterator[T],
+    queue: "asyncio.Queue[Tuple[Any, Optional[BaseException]]]",
+    stats: StreamBufferStats,
+) -> None:
+    try:
+        async for response in responses:
+            if queue.full():
+                stats.producer_waits += 1
+            await queue.put((response, None))
+            stats.responses += 1
+            stats.depth += 1
+            stats.max_depth = max(stats.max_depth, stats.depth)
+    except Exception as e:
+        await queue.put((_END, e))
+    else:
+        await queue.put((_END, None))
+    finally:
+        aclose = getattr(responses, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+async def _stop(
+    producer: "asyncio.Future[None]",
+    queue: "asyncio.Queue[Tuple[Any, Optional[BaseException]]]",
+    stats: StreamBufferStats,
+) -> None:
+    """Cancel the producer and drop the responses it left"""
+    stats.streams -= 1
+    producer.cancel()  # no-op once it is done
+    with contextlib.suppress(asyncio.CancelledError):
+        await producer
+    while not queue.empty():
+        response, _ = queue.get_nowait()
+        if response is not _END:
+            stats.depth -= 1
+
+
+async def buffered(
+    responses: AsyncIterator[T],
+    size: int,
+    stats: Optional[StreamBufferStats] = None,
+) -> AsyncIterator[T]:
+    """
+    Iterate `responses` in a task of its own, at most `size` ahead of the
+    consumer, so the next responses are produced while one is sent. The
+    task shares the contextvars of the caller.
+
+    An error of `responses` is raised after the responses produced before
+    it. When the consumer stops, by error, cancellation or closing this
+    generator, the task is cancelled and `responses` is closed.
+    """
+    stats = stats if stats is not None else StreamBufferStats()
+    queue: "asyncio.Queue[Tuple[Any, Optional[BaseException]]]" = asyncio.Queue(size)
+    stopping = False
+
+    def stopped(task: "asyncio.Future[None]") -> None:
+        # cancelled by someone else, wake the consumer if it waits
+        if task.cancelled() and not stopping and not queue.full():
+            queue.put_nowait((_END, asyncio.CancelledError()))
+
+    stats.streams += 1
+    producer = asyncio.ensure_future(_produce(responses, queue, stats))
+    producer.add_done_callback(stopped)
+    try:
+        while True:
+            if queue.empty():
+                if producer.done():
+                    raise asyncio.CancelledError()
+                stats.sender_waits += 1
+            response, error = await queue.get()
+            if response is _END:
+                if error is not None:
+                    raise error
+                break
+            stats.depth -= 1
+            yield response
+    finally:
+        stopping = True
+        await _stop(producer, queue, stats)
+
+
+class _Abort(Exception):
+    """An abort of a buffered handler, carried to the sending task with the
+    arguments of `abort`"""
+
+    def __init__(self, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> None:
+        super().__init__(args, kwargs)
+
+
+class _BufferedContext:
+    """The context of a buffered handler. grpc can not send the status of a
+    call while one of its responses is written, so aborting is left to the
+    task sending the responses"""
+
+    def __init__(self, context: AsyncContext) -> None:
+        self._context = context
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._context, name)
+
+    async def abort(self, *args: Any, **kwargs: Any) -> NoReturn:
+        raise _Abort(args, kwargs)
+
+
+def buffered_stream_handler(
+    handler: Callable[[Any, AsyncContext], Any],
+    size: int,
+    stats: StreamBufferStats,
+) -> Callable[[Any, AsyncContext], Any]:
+    """`handler`, a grpc handler of a server stream, running ahead of the
+    stream by `size` responses, with its dependencies, in a task"""
+
+    async def buffered_stream_handler(request: Any, context: AsyncContext) -> Any:
+        responses = handler(request, _BufferedContext(context))
+        try:
+            async for response in buffered(responses, size, stats):
+                yield response
+        except _Abort as e:
+            args, kwargs = e.args
+            await context.abort(*args, **kwargs)
+
+    lazy_runner = getattr(handler, "lazy_runner", None)
+    if lazy_runner is not None:
+        buffered_stream_handler.lazy_runner = lazy_runner  # type: ignore[attr-defined]
+    return buffered_stream_handler
@@ -0,0 +1,89 @@
+import inspect
+import logging
+import time
+from functools import partial
+
+from typing_extensions import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from grpcAPI.app import App
+from grpcAPI.startup_report import measure
+from grpcAPI.testclient.contextmock import ContextMock
+
+logger = logging.getLogger(__name__)
+
+MethodKey = Tuple[str, str, str]
+
+
+def warmup_requests(meta: Mapping[str, Any]) -> Iterable[Any]:
+    """Requests declared with `@service(warmup=[...])`"""
+    requests = meta.get("warmup") or []
+    if not isinstance(requests, (list, tuple)):
+        return [requests]
+    return requests
+
+
+async def _stream(messages: Iterable[Any]) -> AsyncIterator[Any]:
+    for message in messages:
+        yield message
+
+
+async def call_handler(handler: Callable[..., Any], request: Any, stream: bool) -> Any:
+    """Call a handler the way the server would, consuming streamed responses.
+    A client stream request is an iterable of messages."""
+    if stream:
+        request = _stream(request)
+    response = handler(request, ContextMock())
+    if inspect.isasyncgen(response):
+        return [r async for r in response]
+    if inspect.isawaitable(response):
+        return await response
+    return response
+
+
+async def _timed(name: str, call: Callable[[], Any]) -> Optional[float]:
+    start = time.perf_counter()
+    try:
+        with measure(name, "warmup"):
+            result = call()
+            if inspect.isawaitable(result):
+                await result
+    except Exception as e:
+        logger.warning(f"Warmup '{name}' failed: {e!r}")
+        return None
+    return time.perf_counter() - start
+
+
+async def run_warmup(
+    app: App, handlers: Mapping[MethodKey, Callable[..., Any]]
+) -> Dict[str, Optional[float]]:
+    """
+    Run the `@app.warmup` functions, then send each method its declared
+    warmup requests, in process, through the handlers registered in the
+    server. Returns the seconds each one took, or None when it failed;
+    failures are logged and do not stop the warmup.
+    """
+    durations: Dict[str, Optional[float]] = {}
+    for func in app.warmups:
+        name = getattr(func, "__name__", repr(func))
+        durations[name] = await _timed(name, func)
+
+    for service in app.service_list:
+        for method in service.methods:
+            handler = handlers.get((service.package, service.name, method.name))
+            if handler is None:
+                continue
+            stream = method.is_client_stream
+            for i, request in enumerate(warmup_requests(method.meta)):
+                name = f"{service.qual_name}.{method.name}[{i}]"
+                call = partial(call_handler, handler, request, stream)
+                durations[name] = await _timed(name, call)
+    return durations
@@ -0,0 +1,170 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from typing_extensions import AsyncIterator
+
+from grpcAPI.app import APIService, App
+from grpcAPI.commands.bench import (
+    BenchCommand,
+    MethodStats,
+    load_fixtures,
+    make_sample_request,
+    percentile,
+    select_targets,
+)
+from grpcAPI.service_proc.inject_typing import InjectProtoTyping
+from tests.conftest import AccountInput, StringValue
+
+
+@pytest.fixture
+def bench_app() -> App:
+    service = APIService("bench_service", package="bench")
+
+    @service
+    async def echo(req: StringValue) -> StringValue:
+        return StringValue(value=req.value)
+
+    @service
+    async def fail(req: StringValue) -> StringValue:
+        raise NotImplementedError()
+
+    @service
+    async def split(req: StringValue) -> AsyncIterator[StringValue]:
+        for c in req.value:
+            yield StringValue(value=c)
+
+    @service
+    async def join(reqs: AsyncIterator[StringValue]) -> StringValue:
+        value = ""
+        async for req in reqs:
+            value += req.value
+        return StringValue(value=value)
+
+    @service
+    async def chat(reqs: AsyncIterator[StringValue]) -> AsyncIterator[StringValue]:
+        async for req in reqs:
+            yield req
+
+    InjectProtoTyping().process(service)
+    app = App(name="bench_app")
+    app.add_service(service)
+    return app
+
+
+def test_percentile() -> None:
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50.0) == 50.0
+    assert percentile(values, 90.0) == 90.0
+    assert percentile(values, 99.0) == 99.0
+    assert percentile(values, 99.9) == 100.0
+    ten = [float(i) for i in range(1, 11)]
+    assert percentile(ten, 50.0) == 5.0
+    assert percentile(ten, 90.0) == 9.0
+    assert percentile(ten, 99.0) == 10.0
+    assert percentile([1.0, 2.0], 50.0) == 1.0
+    assert percentile([float(i) for i in range(1, 1001)], 99.9) == 999.0
+    assert percentile([], 50.0) == 0.0
+    assert percentile([3.0], 99.0) == 3.0
+
+
+def test_method_stats_summary() -> None:
+    stats = MethodStats("/pkg.svc/m", "unary")
+    for latency in (0.001, 0.002, 0.003):
+        stats.record(latency)
+    stats.record_error("INTERNAL")
+    stats.elapsed = 2.0
+
+    summary = stats.summary()
+    assert summary["requests"] == 4
+    assert summary["ok"] == 3
+    assert summary["errors"] == 1
+    assert summary["error_rate"] == 0.25
+    assert summary["error_codes"] == {"INTERNAL": 1}
+    assert summary["throughput_rps"] == 2.0
+    assert summary["p50_ms"] == pytest.approx(2.0)
+    assert summary["p999_ms"] == pytest.approx(3.0)
+
+
+def test_make_sample_request() -> None:
+    request = make_sample_request(AccountInput)
+    assert request.name == "bench"
+    assert request.email == "bench"
+    assert request.inner.name == "bench"
+
+
+def test_select_targets_with_fixtures(bench_app: App) -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "fixtures.json"
+        path.write_text(
+            # wrapper types use their bare value as JSON representation
+            json.dumps({"/bench.bench_service/echo": ["a", "b"]})
+        )
+        fixtures = load_fixtures(path)
+
+    targets = select_targets(bench_app.service_list, ["*/echo", "*/chat"], fixtures)
+    assert [t.path for t in targets] == [
+        "/bench.bench_service/echo",
+        "/bench.bench_service/chat",
+    ]
+    assert [r.value for r in targets[0].requests] == ["a", "b"]
+    assert targets[1].requests[0].value == "bench"
+    assert targets[1].shape == "bidi_stream"
+
+
+def test_load_fixtures_missing_file() -> None:
+    with pytest.raises(FileNotFoundError):
+        load_fixtures(Path("does_not_exist.json"))
+
+
+def test_bench_command_runs_all_shapes(bench_app: App) -> None:
+    with patch("grpcAPI.commands.command.run_process_service"):
+        cmd = BenchCommand(bench_app, None)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        json_path = Path(temp_dir) / "bench.json"
+        report = cmd.execute(
+            requests=8,
+            concurrency=2,
+            stream_messages=3,
+            host="127.0.0.1",
+            json_path=str(json_path),
+        )
+        written = json.loads(json_path.read_text())
+
+    assert report["mode"] == "concurrency"
+    assert written["methods"] == report["methods"]
+    rows = {row["method"]: row for row in report["methods"]}
+    assert set(rows) == {
+        "/bench.bench_service/echo",
+        "/bench.bench_service/fail",
+        "/bench.bench_service/split",
+        "/bench.bench_service/join",
+        "/bench.bench_service/chat",
+    }
+    assert all(row["requests"] == 8 for row in rows.values())
+    assert rows["/bench.bench_service/echo"]["errors"] == 0
+    assert rows["/bench.bench_service/fail"]["error_rate"] == 1.0
+    assert rows["/bench.bench_service/split"]["messages"] == 8 * len("bench")
+    assert rows["/bench.bench_service/chat"]["messages"] == 8 * 3
+
+
+def test_bench_command_rate_mode(bench_app: App) -> None:
+    with patch("grpcAPI.commands.command.run_process_service"):
+        cmd = BenchCommand(bench_app, None)
+
+    report = cmd.execute(
+        methods=["*/echo"], requests=10, rate=200.0, host="127.0.0.1"
+    )
+    assert report["mode"] == "rate"
+    assert len(report["methods"]) == 1
+    assert report["methods"][0]["ok"] == 10
+
+
+def test_bench_command_no_methods(bench_app: App) -> None:
+    with patch("grpcAPI.commands.command.run_process_service"):
+        cmd = BenchCommand(bench_app, None)
+    with pytest.raises(ValueError):
+        cmd.execute(methods=["nothing/*"], requests=1)
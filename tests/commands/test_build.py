@@ -1,4 +1,5 @@
 import tempfile
+import zipfile
 from pathlib import Path
 from unittest.mock import Mock, patch
 
@@ -47,9 +48,10 @@ class TestBuildProtos:
                     output_path,
                     overwrite=True,
                     zipcompress=False,
+                    incremental=False,
                 )
 
-                mock_lint.assert_called_once_with(app, logger)
+                mock_lint.assert_called_once_with(app, logger, renderer="jinja")
                 mock_write.assert_called_once_with(
                     proto_stream=[mock_proto],
                     out_dir=output_path,
@@ -59,34 +61,78 @@ class TestBuildProtos:
                 mock_copy.assert_called_once_with(proto_path, output_path, logger)
                 assert result == {"test_service.proto"}
 
+    def test_build_protos_incremental(self, app_fixture: App) -> None:
+        """Test build_protos only rewrites changed files and prunes removed ones"""
+        logger = Mock()
+
+        def make_proto(name: str, content: str) -> Mock:
+            proto = Mock(spec=IProtoPackage)
+            proto.content = content
+            proto.qual_name = name
+            return proto
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            proto_path = Path(temp_dir) / "proto"
+            output_path = Path(temp_dir) / "output"
+            (proto_path / "inner").mkdir(parents=True)
+            (proto_path / "inner" / "message.proto").write_text("message M {}")
+
+            def build(*protos: Mock) -> None:
+                with patch("grpcAPI.commands.build.lint.run_lint") as mock_lint:
+                    mock_lint.return_value = list(protos)
+                    build_protos(
+                        app_fixture,
+                        logger,
+                        proto_path,
+                        output_path,
+                        overwrite=False,
+                        zipcompress=False,
+                        incremental=True,
+                    )
+
+            build(
+                make_proto("a.proto", "service A {}"),
+                make_proto("pack/b.proto", "service B {}"),
+            )
+            logger.info.assert_called_with(
+                "Build output: 3 added, 0 changed, 0 unchanged, 0 removed"
+            )
+            a_file = output_path / "a.proto"
+            mtime = a_file.stat().st_mtime_ns
+
+            build(make_proto("a.proto", "service A {}"))
+            logger.info.assert_called_with(
+                "Build output: 0 added, 0 changed, 2 unchanged, 1 removed"
+            )
+            assert a_file.stat().st_mtime_ns == mtime
+            assert not (output_path / "pack").exists()
+            assert (output_path / "inner" / "message.proto").exists()
+
+            build(make_proto("a.proto", "service A { rpc x(M) returns (M); }"))
+            logger.info.assert_called_with(
+                "Build output: 0 added, 1 changed, 1 unchanged, 0 removed"
+            )
+            assert "rpc x" in a_file.read_text()
+
     def test_build_protos_zip_mode(self, app_fixture: App) -> None:
-        """Test build_protos with zip compression"""
+        """Test build_protos streams sources and generated protos into a zip"""
         app = app_fixture
         logger = Mock()
 
         mock_proto = Mock(spec=IProtoPackage)
-        mock_proto.package = "test_package"
-        mock_proto.filename = "test_service"
         mock_proto.content = 'syntax = "proto3";\nservice TestService {}'
-        mock_proto.depends = set()
-        mock_proto.qual_name = "test.proto"
+        mock_proto.qual_name = "pack/test.proto"
 
         with tempfile.TemporaryDirectory() as temp_dir:
             proto_path = Path(temp_dir) / "proto"
             output_path = Path(temp_dir) / "output"
             proto_path.mkdir()
-            output_path.mkdir()
+            (proto_path / "message.proto").write_text("message M {}")
 
             with patch("grpcAPI.commands.build.lint.run_lint") as mock_lint, patch(
                 "grpcAPI.commands.build.write_protos"
-            ) as mock_write, patch(
-                "grpcAPI.commands.build.copy_proto_files"
-            ) as mock_copy, patch(
-                "grpcAPI.commands.build.zip_directory"
-            ) as mock_zip:
-
+            ) as mock_write:
                 mock_lint.return_value = [mock_proto]
-                mock_write.return_value = {"test.proto"}
 
                 result = build_protos(
                     app,
@@ -97,11 +143,15 @@ class TestBuildProtos:
                     zipcompress=True,
                 )
 
-                mock_lint.assert_called_once_with(app, logger)
-                assert mock_write.call_count == 1
-                assert mock_copy.call_count == 1
-                mock_zip.assert_called_once()
-                assert result == {"test.proto"}
+                mock_lint.assert_called_once_with(app, logger, renderer="jinja")
+                mock_write.assert_not_called()
+                assert result == {"pack/test.proto"}
+
+            archive = output_path / "protos.zip"
+            with zipfile.ZipFile(archive) as zipf:
+                assert zipf.namelist() == ["message.proto", "pack/test.proto"]
+                assert zipf.read("pack/test.proto") == mock_proto.content.encode()
+            assert list(output_path.iterdir()) == [archive]
 
 
 class TestBuildCommand:
@@ -152,8 +202,45 @@ class TestBuildCommand:
                         output_path=Path("lib"),
                         overwrite=False,
                         zipcompress=True,
+                        incremental=False,
+                        archive_format="zip",
+                        renderer="jinja",
+                        extra_files={},
                     )
 
+    async def test_zipped_build_writes_only_the_archive(self, app_fixture: App) -> None:
+        """Test the client module and service config go into the archive"""
+        with patch("grpcAPI.commands.command.run_process_service"):
+            cmd = BuildCommand(app_fixture, None)
+
+        proto = Mock(spec=IProtoPackage)
+        proto.content = 'syntax = "proto3";'
+        proto.qual_name = "pack/test.proto"
+        config = '{"methodConfig": []}'
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = Path(temp_dir) / "output"
+            cmd.settings["compile_proto"].update(zipcompress=True, client=True)
+            with patch("grpcAPI.commands.build.lint.run_lint") as mock_lint, patch(
+                "grpcAPI.commands.build.render_service_config"
+            ) as mock_config:
+                mock_lint.return_value = [proto]
+                mock_config.return_value = config
+                generated = await cmd.run(
+                    proto_path=Path(temp_dir) / "proto", outdir=output_path
+                )
+
+            archive = output_path / "protos.zip"
+            assert list(output_path.iterdir()) == [archive]
+            assert generated == {"pack/test.proto", "client.py", "service_config.json"}
+            with zipfile.ZipFile(archive) as zipf:
+                assert zipf.namelist() == [
+                    "client.py",
+                    "pack/test.proto",
+                    "service_config.json",
+                ]
+                assert zipf.read("service_config.json").decode() == config
+
     def test_multiple_commands_with_same_app(self, app_fixture: App):
         """Test that multiple BuildCommand instances can use the same app instance"""
         with patch("grpcAPI.commands.command.run_process_service"):
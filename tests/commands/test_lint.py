@@ -62,6 +62,39 @@ class TestRunLint:
             assert len(result_list) == 1
             assert result_list[0] is mock_proto
 
+    def test_run_lint_verbose_reports_pass_timings(
+        self, functional_service: APIService
+    ) -> None:
+        """Test run_lint logs the time spent in each compiler pass"""
+        app = App()
+        app.add_service(functional_service)
+        logger = Mock()
+
+        with patch("grpcAPI.build_proto.compile_service") as mock_compile:
+
+            def fake_compile(**kwargs):
+                kwargs["timings"]["TypeValidator"] = 0.002
+                return iter([])
+
+            mock_compile.side_effect = fake_compile
+            run_lint(app, logger, verbose=True)
+
+        logger.info.assert_any_call("Compiler pass TypeValidator: 2.00 ms")
+
+    def test_run_lint_descriptor_renderer(self, functional_service: APIService) -> None:
+        """Test run_lint forwards a non default renderer to make_protos"""
+        app = App()
+        app.add_service(functional_service)
+        logger = Mock()
+
+        with patch("grpcAPI.commands.lint.make_protos") as mock_make_protos:
+            mock_make_protos.return_value = []
+            run_lint(app, logger, renderer="descriptor")
+
+            mock_make_protos.assert_called_once_with(
+                app.services, renderer="descriptor"
+            )
+
     def test_run_lint_empty_services(self):
         """Test run_lint with empty services"""
         app = App()  # No services added
@@ -143,7 +176,9 @@ class TestLintCommand:
                 cmd.execute()
 
                 # Verify run_lint was called with the app instance
-                mock_run_lint.assert_called_once_with(cmd.app, cmd.logger)
+                mock_run_lint.assert_called_once_with(
+                    cmd.app, cmd.logger, verbose=False, renderer="descriptor"
+                )
 
     def test_multiple_commands_with_same_app(self, app_fixture: App) -> None:
         """Test that multiple LintCommand instances can use the same app instance"""
@@ -3,12 +3,36 @@ from pathlib import Path
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
+from typing_extensions import Any
 
 from grpcAPI.app import App
 from grpcAPI.commands.run import RunCommand
+from grpcAPI.makeproto.build_service import compile_service_internal
 from grpcAPI.service_proc.register_descriptor import RegisterDescriptors
 
 
+@pytest.fixture(autouse=True)
+def lint_cache_in_tmp(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """run writes its lint cache to the working dir"""
+    monkeypatch.chdir(tmp_path)
+
+
+async def run_mocked_server(cmd: RunCommand, **kwargs: Any) -> None:
+    """Run `cmd` up to its server, which is a mock"""
+    server = Mock()
+    server.start = AsyncMock()
+    server.start_warmup = AsyncMock()
+    server.end_warmup = AsyncMock()
+    server.wait_for_termination = AsyncMock()
+    with patch("grpcAPI.commands.run.make_server", return_value=server), patch(
+        "grpcAPI.commands.run.add_to_server", return_value={}
+    ), patch("grpcAPI.commands.run.AsyncExitStack") as mock_stack:
+        stack = AsyncMock()
+        mock_stack.return_value.__aenter__ = AsyncMock(return_value=stack)
+        mock_stack.return_value.__aexit__ = AsyncMock(return_value=None)
+        await cmd.run(host="localhost", port=50051, **kwargs)
+
+
 class TestRunCommand:
     """Test the RunCommand class"""
 
@@ -67,6 +91,8 @@ class TestRunCommand:
                 mock_server.add_insecure_port = Mock(return_value=50051)
                 mock_server.register_plugin = Mock()
                 mock_server.start = AsyncMock()
+                mock_server.start_warmup = AsyncMock()
+                mock_server.end_warmup = AsyncMock()
                 mock_server.wait_for_termination = AsyncMock()
 
                 mock_make_server.return_value = mock_server
@@ -86,13 +112,17 @@ class TestRunCommand:
                     await cmd.run(host="localhost", port=50051)
 
                     # Verify the execution flow
-                    mock_make_protos.assert_called_once_with(cmd.app.services)
+                    mock_make_protos.assert_called_once_with(
+                        cmd.app.services, renderer="descriptor"
+                    )
                     mock_make_server.assert_called_once()
                     mock_server.add_insecure_port.assert_called_once_with(
                         "localhost:50051"
                     )
                     mock_add_to_server.assert_called_once()
                     mock_server.start.assert_called_once()
+                    mock_server.start_warmup.assert_called_once()
+                    mock_server.end_warmup.assert_called_once()
                     mock_server.wait_for_termination.assert_called_once()
 
     @pytest.mark.asyncio
@@ -121,6 +151,8 @@ class TestRunCommand:
                 mock_server.add_insecure_port = Mock(return_value=50051)
                 mock_server.register_plugin = Mock()
                 mock_server.start = AsyncMock()
+                mock_server.start_warmup = AsyncMock()
+                mock_server.end_warmup = AsyncMock()
                 mock_server.wait_for_termination = AsyncMock()
 
                 mock_plugin = Mock()
@@ -161,6 +193,8 @@ class TestRunCommand:
                 mock_server.add_insecure_port = Mock(return_value=50051)
                 mock_server.register_plugin = Mock()
                 mock_server.start = AsyncMock()
+                mock_server.start_warmup = AsyncMock()
+                mock_server.end_warmup = AsyncMock()
                 mock_server.wait_for_termination = AsyncMock()
 
                 mock_server_wrapper.return_value = mock_server
@@ -180,6 +214,35 @@ class TestRunCommand:
                     mock_server_wrapper.assert_called_once_with(cmd.app.server)
                     mock_make_server.assert_not_called()
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("lint, compiles", [(False, 0), (True, 1)])
+    async def test_run_compiles_only_to_lint(
+        self, app_fixture: App, lint: bool, compiles: int
+    ):
+        """Test registering the descriptors runs no compiler pass, and
+        `run --no-lint` none at all"""
+        with patch(
+            "grpcAPI.makeproto.build_service.compile_service_internal",
+            wraps=compile_service_internal,
+        ) as spy:
+            cmd = RunCommand(app_fixture, None)
+            cmd.settings["lint_cache"] = {"enabled": False}
+            assert spy.call_count == 0
+            await run_mocked_server(cmd, lint=lint)
+        assert spy.call_count == compiles
+
+    @pytest.mark.asyncio
+    async def test_warm_lint_cache_skips_compiling(self, app_fixture: App):
+        """Test a run with a warm lint cache, the default, compiles nothing"""
+        await run_mocked_server(RunCommand(app_fixture, None))  # fills the cache
+        assert (Path(".grpcapi_cache") / "lint.json").exists()
+        with patch(
+            "grpcAPI.makeproto.build_service.compile_service_internal",
+            wraps=compile_service_internal,
+        ) as spy:
+            await run_mocked_server(RunCommand(app_fixture, None))
+        spy.assert_not_called()
+
     def test_multiple_commands_with_same_app(self, app_fixture: App):
         """Test that multiple RunCommand instances can use the same app instance"""
         with patch("grpcAPI.commands.command.run_process_service"):
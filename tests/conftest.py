@@ -8,6 +8,7 @@ from datetime import datetime
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
+import grpc
 import pytest
 from google.protobuf.descriptor_pb2 import DescriptorProto  # noqa: F401
 from google.protobuf.empty_pb2 import Empty
@@ -18,6 +19,7 @@ from grpc import StatusCode
 from typing_extensions import (
     Annotated,
     Any,
+    AsyncContextManager,
     AsyncIterator,
     Callable,
     Dict,
@@ -31,17 +33,19 @@ from typing_extensions import (
     get_origin,
 )
 
+from grpcAPI.add_to_server import add_to_server
 from grpcAPI.app import APIService, App
 from grpcAPI.commands.protoc import ProtocCommand
 from grpcAPI.commands.settings.utils import combine_settings
 from grpcAPI.datatypes import AsyncContext, Depends, FromRequest
 from grpcAPI.makeproto.interface import ILabeledMethod, IMetaType, IService
 from grpcAPI.protoc.compile import compile_protoc
+from grpcAPI.server import ServerWrapper
 from grpcAPI.service_proc.inject_typing import InjectProtoTyping
 from grpcAPI.testclient import TestClient
 
 protoc = ProtocCommand()
-protoc.execute(proto_path="tests/proto", lib_path="tests/lib")
+protoc.execute(proto_path="tests/proto", lib_path="tests/lib", backend="inprocess")
 
 lib_path = Path(__file__).parent / "lib"
 sys.path.insert(0, str(lib_path.resolve()))
@@ -262,15 +266,37 @@ def app_fixture(functional_service: APIService) -> App:
     return app
 
 
+Serve = Callable[[APIService], AsyncContextManager[str]]
+
+
+@asynccontextmanager
+async def _serve(service: APIService) -> AsyncIterator[str]:
+    server = ServerWrapper(grpc.aio.server())
+    add_to_server(service, server, {}, {})
+    port = server.add_insecure_port("127.0.0.1:0")
+    await server.start()
+    try:
+        yield f"127.0.0.1:{port}"
+    finally:
+        await server.stop(None)
+
+
+@pytest.fixture
+def serve() -> Serve:
+    """Serve a service on a free local port, yielding its address"""
+    return _serve
+
+
 @pytest.fixture(autouse=True)
 def isolate_logging_config():
     """Isolate LOGGING_CONFIG to prevent test interference"""
     import copy
     import logging.config
 
-    from grpcAPI.logger import LOGGING_CONFIG
+    from grpcAPI.logger import logging_config
 
     # Deep copy to preserve nested dicts
+    LOGGING_CONFIG = logging_config()
     original_config = copy.deepcopy(LOGGING_CONFIG)
 
     # Also backup actual logger state
@@ -510,6 +536,7 @@ def write_template(rendered: str, filename: str, expected_files: int) -> None:
             clss=True,
             services=True,
             mypy_stubs=False,
+            backend="inprocess",
         )
         created_files = list(proto_path.rglob("*"))
         assert len(created_files) == expected_files
@@ -0,0 +1,91 @@
+import io
+import tarfile
+import zipfile
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from grpcAPI.makeproto.archive import (
+    DEFAULT_EPOCH,
+    archive_name,
+    collect_entries,
+    write_archive,
+)
+
+ENTRIES = {"b/service.proto": b"service B {}", "a.proto": b"message A {}"}
+
+
+def test_archive_name() -> None:
+    assert archive_name("protos", "zip") == "protos.zip"
+    assert archive_name("protos", "tar.gz") == "protos.tar.gz"
+    with pytest.raises(ValueError):
+        archive_name("protos", "rar")
+
+
+def test_collect_entries_generated_wins(tmp_path: Path) -> None:
+    (tmp_path / "inner").mkdir()
+    (tmp_path / "inner" / "msg.proto").write_text("source")
+    (tmp_path / "service.proto").write_text("source")
+    generated = Mock(qual_name="service.proto", content="generated")
+
+    entries = collect_entries([generated], tmp_path)
+
+    assert entries == {"inner/msg.proto": b"source", "service.proto": b"generated"}
+
+
+@pytest.mark.parametrize("archive_format", ["zip", "tar", "tar.gz"])
+def test_archive_is_reproducible(
+    tmp_path: Path, archive_format: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+    first = tmp_path / "first" / archive_name("protos", archive_format)
+    second = tmp_path / "second" / archive_name("protos", archive_format)
+
+    assert write_archive(ENTRIES, first, archive_format)
+    assert write_archive(dict(reversed(ENTRIES.items())), second, archive_format)
+
+    assert first.read_bytes() == second.read_bytes()
+
+
+def test_zip_members(tmp_path: Path) -> None:
+    path = tmp_path / "protos.zip"
+    write_archive(ENTRIES, path)
+
+    with zipfile.ZipFile(path) as zipf:
+        assert zipf.namelist() == ["a.proto", "b/service.proto"]
+        assert zipf.read("b/service.proto") == b"service B {}"
+        assert {info.date_time for info in zipf.infolist()} == {(1980, 1, 1, 0, 0, 0)}
+
+
+def test_tar_members(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", str(DEFAULT_EPOCH + 100))
+    path = tmp_path / "protos.tar.gz"
+    write_archive(ENTRIES, path, "tar.gz")
+
+    with tarfile.open(path) as tar:
+        assert tar.getnames() == ["a.proto", "b/service.proto"]
+        assert {m.mtime for m in tar.getmembers()} == {DEFAULT_EPOCH + 100}
+        member = tar.extractfile("a.proto")
+        assert member is not None and member.read() == b"message A {}"
+
+
+def test_unchanged_archive_is_not_rewritten(tmp_path: Path) -> None:
+    path = tmp_path / "protos.zip"
+    assert write_archive(ENTRIES, path)
+    mtime = path.stat().st_mtime_ns
+
+    assert not write_archive(ENTRIES, path)
+    assert path.stat().st_mtime_ns == mtime
+    assert write_archive({**ENTRIES, "c.proto": b""}, path)
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_tar_zst(tmp_path: Path) -> None:
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "protos.tar.zst"
+    write_archive(ENTRIES, path, "tar.zst")
+
+    data = zstandard.ZstdDecompressor().decompressobj().decompress(path.read_bytes())
+    with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+        assert tar.getnames() == ["a.proto", "b/service.proto"]
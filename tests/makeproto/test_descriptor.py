@@ -0,0 +1,142 @@
+from typing import Dict, List
+
+import pytest
+from google.protobuf import descriptor_pool, wrappers_pb2
+from google.protobuf.descriptor_pb2 import FileDescriptorProto
+
+from benchmarks.compile_parallel import make_synthetic_services
+from grpcAPI.app import APIService
+from grpcAPI.build_proto import make_protos
+from grpcAPI.makeproto.build_service import compile_service, prepare_packages
+from grpcAPI.makeproto.descriptor import (
+    build_file_descriptor,
+    descriptor_set,
+    format_option,
+    parse_option,
+)
+from tests.test_protobuild import basic_proto, complex_proto  # noqa: F401
+
+
+def by_name(protos: object) -> Dict[str, object]:
+    return {proto.qual_name: proto for proto in protos}  # type: ignore
+
+
+def test_descriptor_matches_jinja_synthetic() -> None:
+    jinja = list(compile_service(make_synthetic_services(3, 3, 3), workers=1))
+    printed = list(
+        compile_service(
+            make_synthetic_services(3, 3, 3), workers=1, renderer="descriptor"
+        )
+    )
+
+    assert [p.qual_name for p in printed] == [p.qual_name for p in jinja]
+    assert [p.content for p in printed] == [p.content for p in jinja]
+    assert all(p.descriptor is None for p in jinja)
+    assert [p.descriptor.name for p in printed] == [p.qual_name for p in printed]
+
+
+def test_descriptor_matches_jinja_app(complex_proto: List[APIService]) -> None:
+    services = {"pack1": complex_proto}
+    jinja = by_name(make_protos(services, exit=False))
+    printed = by_name(make_protos(services, exit=False, renderer="descriptor"))
+
+    assert set(printed) == set(jinja)
+    for name, proto in printed.items():
+        # the templates list imports in set order, the descriptor sorts them
+        assert sorted(proto.content.splitlines()) == sorted(
+            jinja[name].content.splitlines()
+        )
+
+
+def test_descriptor_streams_and_types(basic_proto: APIService) -> None:
+    services = {"pack1": [basic_proto]}
+    protos = list(make_protos(services, exit=False, renderer="descriptor"))
+    methods = {
+        method.name: method
+        for proto in protos
+        for service in proto.descriptor.service
+        for method in service.method
+    }
+
+    for labeled in basic_proto.methods:
+        method = methods[labeled.name]
+        assert method.client_streaming == labeled.is_client_stream
+        assert method.server_streaming == labeled.is_server_stream
+        assert method.input_type == f".{labeled.input_base_type.DESCRIPTOR.full_name}"
+        assert method.output_type == f".{labeled.output_base_type.DESCRIPTOR.full_name}"
+
+
+def test_descriptor_loads_in_pool() -> None:
+    protos = list(
+        compile_service(
+            make_synthetic_services(1, 2, 2), workers=1, renderer="descriptor"
+        )
+    )
+    pool = descriptor_pool.DescriptorPool()
+    wrappers = FileDescriptorProto()
+    wrappers_pb2.DESCRIPTOR.CopyToProto(wrappers)
+    pool.Add(wrappers)
+    files = descriptor_set(proto.descriptor for proto in protos).file
+    for file in files:
+        pool.Add(file)
+
+    service = pool.FindServiceByName("pack0.service1")
+    assert [m.name for m in service.methods] == ["method0", "method1"]
+    assert service.methods[0].input_type.full_name == "google.protobuf.StringValue"
+
+
+def test_print_options_and_comments() -> None:
+    services = make_synthetic_services(1, 1, 2)
+    service = services["pack0"][0]
+    service.module_level_options.append('java_package = "com.example"')
+    service.methods[0].options.append("deprecated = true")
+    service.methods[0].comments = "first method"
+    protos = list(compile_service(services, workers=1))
+    printed = list(compile_service(services, workers=1, renderer="descriptor"))
+
+    assert printed[0].content == protos[0].content
+    assert 'option java_package = "com.example";' in printed[0].content
+    assert "    option deprecated = true;" in printed[0].content
+
+
+@pytest.mark.parametrize(
+    "option",
+    [
+        'java_package = "com.example"',
+        "deprecated = true",
+        "optimize_for = SPEED",
+        "(my.ext).field = 42",
+        "(my.ext) = -3",
+        "(my.ratio) = 0.5",
+        '(google.api.http) = { get: "/v1/users" }',
+    ],
+)
+def test_option_round_trip(option: str) -> None:
+    assert format_option(parse_option(option)) == option
+
+
+def test_parse_option_values() -> None:
+    extension = parse_option("(my.ext).field = 0x10")
+    assert [(p.name_part, p.is_extension) for p in extension.name] == [
+        ("my.ext", True),
+        ("field", False),
+    ]
+    assert extension.positive_int_value == 16
+    assert parse_option(r'go_package = "a\"b"').string_value == b'a"b'
+
+
+@pytest.mark.parametrize("option", ["deprecated", "= true", "a b = 1", "(x = 1"])
+def test_parse_option_invalid(option: str) -> None:
+    with pytest.raises(ValueError):
+        parse_option(option)
+
+
+def test_unknown_renderer() -> None:
+    with pytest.raises(ValueError):
+        compile_service(make_synthetic_services(1, 1, 1), renderer="mako")
+
+
+def test_empty_module_skipped() -> None:
+    # modules are only filled with their services by the setters
+    (modules, _, _), *_ = prepare_packages(make_synthetic_services(1, 1, 1))
+    assert build_file_descriptor(modules[0]) is None
@@ -0,0 +1,146 @@
+from typing import Dict, List
+
+import pytest
+
+from benchmarks.compile_parallel import make_synthetic_services
+from grpcAPI.makeproto.build_service import compile_service, compile_service_internal
+from grpcAPI.makeproto.compiler import (
+    METHOD_HOOK,
+    SERVICE_HOOK,
+    CompilerContext,
+    CompilerPass,
+    list_ctx_error_code,
+    plan_walks,
+    run_walk,
+)
+from grpcAPI.makeproto.compiler_passes import make_setters, make_validators
+from grpcAPI.makeproto.make_service_template import make_service_template
+from grpcAPI.makeproto.template import MethodTemplate, ServiceTemplate
+from tests.conftest import Service
+
+
+class Alone(CompilerPass):
+    """Opaque wrapper forcing a pass to walk the blocks on its own"""
+
+    def __init__(self, inner: CompilerPass) -> None:
+        super().__init__()
+        self.inner = inner
+
+    def execute(self, blocks: List[ServiceTemplate], ctx: CompilerContext) -> None:
+        self.inner.execute(blocks, ctx)
+
+
+class Recorder(CompilerPass):
+    hooks = SERVICE_HOOK | METHOD_HOOK
+
+    def __init__(self, name: str, events: List[str]) -> None:
+        super().__init__()
+        self.name = name
+        self.events = events
+
+    def enter_service(self, block: ServiceTemplate) -> None:
+        self.events.append(f"{self.name}:{block.name}")
+
+    def visit_method(self, method: MethodTemplate) -> None:
+        self.events.append(f"{self.name}:{method.service.name}.{method.name}")
+
+
+class After(Recorder):
+    after = (Recorder,)
+
+
+def walk_names(walks: List[List[CompilerPass]]) -> List[List[str]]:
+    return [[type(p).__name__ for p in walk] for walk in walks]
+
+
+def test_plan_walks_default_passes() -> None:
+    assert walk_names(plan_walks(make_validators())) == [
+        [
+            "TypeValidator",
+            "BlockNameValidator",
+            "ImportsValidator",
+            "FieldNameValidator",
+            "CommentsValidator",
+            "CustomPass",
+        ]
+    ]
+    assert walk_names(plan_walks(make_setters())) == [
+        ["ServiceSetter", "TypeSetter"],
+        ["NameSetter", "ImportsSetter", "CommentSetter"],
+    ]
+
+
+def test_plan_walks_opaque_and_after() -> None:
+    events: List[str] = []
+    first, second = Recorder("a", events), Recorder("b", events)
+    opaque = Alone(first)
+    after = After("c", events)
+
+    walks = plan_walks([first, second, opaque, second, after, first])
+
+    assert [len(w) for w in walks] == [2, 1, 1, 2]
+    assert walks[1] == [opaque]
+
+
+def test_run_walk_interleaves_passes() -> None:
+    events: List[str] = []
+    passes: List[CompilerPass] = [Recorder("a", events), Recorder("b", events)]
+    service = make_synthetic_services(1, 1, 2)["pack0"][0]
+    forks = run_walk(passes, [make_service_template(service)], CompilerContext())
+
+    assert len(forks) == 2
+    assert events == [
+        "a:service0",
+        "b:service0",
+        "a:service0.method0",
+        "b:service0.method0",
+        "a:service0.method1",
+        "b:service0.method1",
+    ]
+
+
+def compile_unfused(services: Dict[str, list]) -> object:
+    passes = [
+        [Alone(p) for p in make_validators()],
+        [Alone(p) for p in make_setters()],
+    ]
+    return compile_service_internal(services, passes, workers=1)
+
+
+def test_fused_output_matches_unfused() -> None:
+    fused = list(compile_service(make_synthetic_services(3, 3, 3), workers=1))
+    unfused = list(compile_unfused(make_synthetic_services(3, 3, 3)))
+
+    assert [p.qual_name for p in fused] == [p.qual_name for p in unfused]
+    assert [p.content for p in fused] == [p.content for p in unfused]
+    assert [p.depends for p in fused] == [p.depends for p in unfused]
+
+
+def test_fused_errors_match_unfused(capfd: pytest.CaptureFixture[str]) -> None:
+    def failing() -> Dict[str, list]:
+        services = make_synthetic_services(2, 2, 1)
+        # same pass errors in both packages, later pass error in the first
+        services["pack0"].append(Service(name="invalid name", package="pack0"))
+        services["pack0"].append(Service(name="other", package="pack0", comments=3))
+        services["pack1"].append(Service(name="service0", package="pack1"))
+        return services
+
+    fused = compile_service(failing(), workers=1)
+    unfused = compile_unfused(failing())
+
+    assert isinstance(fused, CompilerContext)
+    assert isinstance(unfused, CompilerContext)
+    assert list_ctx_error_code(fused) == list_ctx_error_code(unfused)
+    assert list_ctx_error_code(fused) == ["E101", "E104"]
+
+
+def test_timings_per_pass() -> None:
+    timings: Dict[str, float] = {}
+    assert list(
+        compile_service(make_synthetic_services(2, 2, 2), workers=1, timings=timings)
+    )
+
+    assert set(timings) == {
+        type(p).__name__ for p in make_validators() + make_setters()
+    }
+    assert all(elapsed >= 0.0 for elapsed in timings.values())
@@ -0,0 +1,79 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from grpcAPI.makeproto.manifest import (
+    ADDED,
+    CHANGED,
+    MANIFEST_FILE,
+    UNCHANGED,
+    BuildManifest,
+)
+
+
+def build(out_dir: Path, files: dict, overwrite: bool = False) -> BuildManifest:
+    manifest = BuildManifest(out_dir)
+    for name, content in files.items():
+        manifest.write(name, content, overwrite)
+    manifest.finish()
+    return manifest
+
+
+def test_write_statuses(tmp_path: Path) -> None:
+    manifest = BuildManifest(tmp_path)
+    assert manifest.write("a.proto", "a", overwrite=False) == ADDED
+    manifest.finish()
+
+    manifest = BuildManifest(tmp_path)
+    assert manifest.write("a.proto", "a", overwrite=False) == UNCHANGED
+    assert manifest.write("b.proto", "b", overwrite=False) == ADDED
+    manifest.finish()
+
+    manifest = BuildManifest(tmp_path)
+    assert manifest.write("a.proto", "changed", overwrite=False) == CHANGED
+    assert str(manifest.finish()) == "0 added, 1 changed, 0 unchanged, 1 removed"
+    assert not (tmp_path / "b.proto").exists()
+
+
+def test_unchanged_file_is_not_touched(tmp_path: Path) -> None:
+    build(tmp_path, {"pack/a.proto": "a"})
+    path = tmp_path / "pack" / "a.proto"
+    mtime = path.stat().st_mtime_ns
+
+    manifest = build(tmp_path, {"pack/a.proto": "a"})
+
+    assert manifest.summary.unchanged == ["pack/a.proto"]
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_edited_output_is_rewritten(tmp_path: Path) -> None:
+    build(tmp_path, {"a.proto": "a"})
+    (tmp_path / "a.proto").write_text("edited by hand")
+
+    manifest = build(tmp_path, {"a.proto": "a"})
+
+    assert manifest.summary.changed == ["a.proto"]
+    assert (tmp_path / "a.proto").read_text() == "a"
+
+
+def test_foreign_files_are_kept(tmp_path: Path) -> None:
+    (tmp_path / "foreign.proto").write_text("not ours")
+
+    with pytest.raises(FileExistsError):
+        build(tmp_path, {"foreign.proto": "ours"})
+
+    build(tmp_path, {"a.proto": "a"})
+    build(tmp_path, {})
+
+    assert (tmp_path / "foreign.proto").read_text() == "not ours"
+    assert not (tmp_path / "a.proto").exists()
+
+
+def test_invalid_manifest_is_ignored(tmp_path: Path) -> None:
+    (tmp_path / MANIFEST_FILE).write_text("{not json")
+    manifest = build(tmp_path, {"a.proto": "a"})
+
+    assert manifest.summary.added == ["a.proto"]
+    data = json.loads((tmp_path / MANIFEST_FILE).read_text())
+    assert list(data["files"]) == ["a.proto"]
@@ -0,0 +1,91 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from google.protobuf.wrappers_pb2 import StringValue
+
+from benchmarks.compile_parallel import make_synthetic_services
+from grpcAPI.app import APIService
+from grpcAPI.build_proto import validate_signature_pass
+from grpcAPI.makeproto.build_service import compile_service, resolve_workers
+from grpcAPI.makeproto.compiler import (
+    CompilerContext,
+    list_ctx_error_code,
+    list_ctx_error_messages,
+)
+from tests.conftest import Service
+
+
+def test_resolve_workers() -> None:
+    assert resolve_workers(1, 100) == 1
+    assert resolve_workers(8, 3) == 3
+    assert resolve_workers(0, 1000) == (os.cpu_count() or 1)
+
+
+def test_sequential_by_default() -> None:
+    with patch("grpcAPI.makeproto.build_service.ProcessPoolExecutor") as pool:
+        assert list(compile_service(make_synthetic_services(20, 1, 1)))
+    pool.assert_not_called()
+
+
+def test_spawned_output_matches_sequential() -> None:
+    options = {"custompassmethod": validate_signature_pass}
+    services = make_synthetic_services(6, 3, 2)
+    sequential = list(compile_service(services, workers=1, **options))
+    with patch(
+        "grpcAPI.makeproto.build_service.ProcessPoolExecutor",
+        wraps=ProcessPoolExecutor,
+    ) as pool:
+        parallel = list(compile_service(services, workers=2, **options))
+    assert pool.call_args.kwargs["mp_context"].get_start_method() == "spawn"
+
+    assert [p.qual_name for p in parallel] == [p.qual_name for p in sequential]
+    assert [p.content for p in parallel] == [p.content for p in sequential]
+
+
+def test_unpicklable_app_compiles_sequentially() -> None:
+    service = APIService("local", package="closures")
+
+    @service
+    async def get(request: StringValue) -> StringValue:
+        return request
+
+    # a closure, which workers could not import
+    with patch("grpcAPI.makeproto.build_service.ProcessPoolExecutor") as pool:
+        protos = list(compile_service({"closures": [service]}, workers=3))
+    pool.assert_not_called()
+    assert [p.qual_name for p in protos] == ["closures/service.proto"]
+
+
+def make_failing_services() -> dict:
+    services = make_synthetic_services(4, 2, 1)
+    # name error (earlier pass) and duplicated service (same pass) in two
+    # packages, empty comment type error (later pass) in a third one
+    services["pack1"].append(Service(name="invalid name", package="pack1"))
+    services["pack2"].append(Service(name="service0", package="pack2"))
+    services["pack3"].append(Service(name="other", package="pack3", comments=3))
+    return services
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_errors_are_deterministic(
+    workers: int, capfd: pytest.CaptureFixture[str]
+) -> None:
+    ctx = compile_service(make_failing_services(), workers=workers)
+
+    assert isinstance(ctx, CompilerContext)
+    assert list_ctx_error_code(ctx) == ["E101", "E104"]
+    messages = list_ctx_error_messages(ctx)
+    assert "Duplicated Service name 'service0'" in messages[1]
+
+    out, _ = capfd.readouterr()
+    assert "Package: invalid name" in out
+
+
+def test_same_service_name_in_other_package() -> None:
+    # service names are unique per package, as in protobuf, not across them
+    services = make_synthetic_services(2, 1, 1)
+    names = [[s.name for s in package] for package in services.values()]
+    assert names[0] == names[1] == ["service0"]
+    assert list(compile_service(services, workers=1))
@@ -1,6 +1,7 @@
 from unittest.mock import Mock, patch
 
 import pytest
+from grpc_health.v1 import health_pb2
 
 from grpcAPI.server_plugins.plugins.health_check import HealthCheckPlugin
 
@@ -67,3 +68,23 @@ class TestHealthCheckPlugin:
         with patch("asyncio.sleep") as mock_sleep:
             await plugin.on_stop()
             mock_sleep.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_not_serving_during_warmup(self, plugin: HealthCheckPlugin) -> None:
+        serving = health_pb2.HealthCheckResponse.SERVING
+        not_serving = health_pb2.HealthCheckResponse.NOT_SERVING
+
+        def status(name: str) -> int:
+            request = health_pb2.HealthCheckRequest(service=name)
+            return plugin._servicer.Check(request, Mock()).status
+
+        plugin.on_add_service("Before", [], Mock())
+        await plugin.on_warmup_start(Mock())
+        plugin.on_add_service("During", [], Mock())
+        assert status("Before") == not_serving
+        assert status("During") == not_serving
+        assert plugin.state["warming_up"]
+
+        await plugin.on_warmup_end(Mock())
+        assert status("Before") == serving
+        assert status("During") == serving
@@ -46,7 +46,7 @@ class TestIntegration:
         name = "TestService"
 
         with patch(
-            "grpc_reflection.v1alpha.reflection.enable_server_reflection"
+            "grpcAPI.server_plugins.plugins.reflection.reflection_pb2_grpc.add_ServerReflectionServicer_to_server"
         ), patch(
             "grpcAPI.server_plugins.plugins.health_check.health_pb2_grpc.add_HealthServicer_to_server"
         ):
@@ -104,7 +104,7 @@ class TestIntegration:
 
         # Add multiple services
         with patch(
-            "grpc_reflection.v1alpha.reflection.enable_server_reflection"
+            "grpcAPI.server_plugins.plugins.reflection.reflection_pb2_grpc.add_ServerReflectionServicer_to_server"
         ) as mock_reflection:
             services = {"ServiceA", "ServiceB", "ServiceC"}
 
@@ -113,4 +113,6 @@ class TestIntegration:
             await reflection_plugin.on_start(mock_server_wrapper)
             # Check that reflection was called for each service
             assert mock_reflection.call_count == 1
-            mock_reflection.assert_any_call(services, mock_server_wrapper.server)
+            servicer, server = mock_reflection.call_args.args
+            assert set(servicer._service_names) == services
+            assert server is mock_server_wrapper.server
@@ -1,9 +1,22 @@
+from typing import List
 from unittest.mock import Mock, patch
 
 import pytest
+from google.protobuf.descriptor_pb2 import FileDescriptorProto
+from grpc_reflection.v1alpha import reflection_pb2, reflection_pb2_grpc
+from grpc_reflection.v1alpha.reflection import aio
 
+from grpcAPI.app import App
 from grpcAPI.server import ServerWrapper
-from grpcAPI.server_plugins.plugins.reflection import ReflectionPlugin
+from grpcAPI.server_plugins.plugins.reflection import (
+    CachedReflectionServicer,
+    ReflectionPlugin,
+)
+from grpcAPI.service_proc.register_descriptor import (
+    RegisterDescriptors,
+    proto_file_name,
+)
+from grpcAPI.service_proc.run_process_service import run_process_service
 
 
 class TestReflectionPlugin:
@@ -30,7 +43,9 @@ class TestReflectionPlugin:
         assert state["name"] == "reflection"
         assert "TestService" in state["services"]
 
-    @patch("grpc_reflection.v1alpha.reflection.enable_server_reflection")
+    @patch(
+        "grpcAPI.server_plugins.plugins.reflection.reflection_pb2_grpc.add_ServerReflectionServicer_to_server"
+    )
     async def test_on_add_service(
         self,
         mock_enable_reflection,
@@ -40,12 +55,14 @@ class TestReflectionPlugin:
         plugin.on_add_service("TestService", [], mock_server_wrapper)
         await plugin.on_start(mock_server_wrapper)
         # Verificar se foi chamado com tupla de service names e o servidor interno
-        mock_enable_reflection.assert_called_once_with(
-            {"TestService"}, mock_server_wrapper.server
-        )
+        servicer, server = mock_enable_reflection.call_args.args
+        assert servicer.service_names == ("TestService",)
+        assert server is mock_server_wrapper.server
         assert "TestService" in plugin._services
 
-    @patch("grpc_reflection.v1alpha.reflection.enable_server_reflection")
+    @patch(
+        "grpcAPI.server_plugins.plugins.reflection.reflection_pb2_grpc.add_ServerReflectionServicer_to_server"
+    )
     async def test_on_add_service_multiple_services(
         self,
         mock_enable_reflection,
@@ -59,9 +76,8 @@ class TestReflectionPlugin:
         # Verificar se ambos foram chamados
         await plugin.on_start(mock_server_wrapper)
         assert mock_enable_reflection.call_count == 1
-        mock_enable_reflection.assert_any_call(
-            {"ServiceA", "ServiceB"}, mock_server_wrapper.server
-        )
+        servicer, _ = mock_enable_reflection.call_args.args
+        assert servicer.service_names == ("ServiceA", "ServiceB")
 
         # Verificar se ambos estão no state
         assert "ServiceA" in plugin._services
@@ -88,7 +104,9 @@ class TestReflectionPlugin:
         assert isinstance(instance, ReflectionPlugin)
         assert instance.plugin_name == "reflection"
 
-    @patch("grpc_reflection.v1alpha.reflection.enable_server_reflection")
+    @patch(
+        "grpcAPI.server_plugins.plugins.reflection.reflection_pb2_grpc.add_ServerReflectionServicer_to_server"
+    )
     async def test_on_add_service_no_duplicates(
         self,
         mock_enable_reflection,
@@ -105,7 +123,9 @@ class TestReflectionPlugin:
         assert len(plugin._services) == 1
         assert "TestService" in plugin._services
 
-    @patch("grpc_reflection.v1alpha.reflection.enable_server_reflection")
+    @patch(
+        "grpcAPI.server_plugins.plugins.reflection.reflection_pb2_grpc.add_ServerReflectionServicer_to_server"
+    )
     def test_state_reflects_current_services(
         self,
         mock_enable_reflection,
@@ -126,3 +146,85 @@ class TestReflectionPlugin:
         assert len(final_state["services"]) == 2
         assert "ServiceA" in final_state["services"]
         assert "ServiceB" in final_state["services"]
+
+
+async def reflect(
+    servicer: reflection_pb2_grpc.ServerReflectionServicer,
+    *requests: reflection_pb2.ServerReflectionRequest,
+) -> List[reflection_pb2.ServerReflectionResponse]:
+    async def request_iterator():
+        for request in requests:
+            yield request
+
+    return [r async for r in servicer.ServerReflectionInfo(request_iterator(), None)]
+
+
+class TestCachedReflectionServicer:
+
+    @pytest.fixture
+    def registered(self, app_fixture: App) -> App:
+        # the run command flushes the descriptors through close()
+        run_process_service(app_fixture, {}, [RegisterDescriptors])
+        return app_fixture
+
+    async def test_matches_stock_servicer(self, registered: App) -> None:
+        names = [service.qual_name for service in registered.service_list]
+        service = registered.service_list[0]
+        method = service.methods[0]
+        requests = [
+            reflection_pb2.ServerReflectionRequest(list_services=""),
+            reflection_pb2.ServerReflectionRequest(
+                file_containing_symbol=service.qual_name
+            ),
+            reflection_pb2.ServerReflectionRequest(
+                file_containing_symbol=method.input_base_type.DESCRIPTOR.full_name
+            ),
+            reflection_pb2.ServerReflectionRequest(
+                file_by_filename=proto_file_name(service.package, service.module)
+            ),
+            reflection_pb2.ServerReflectionRequest(file_containing_symbol="no.Such"),
+            # left to the stock servicer
+            reflection_pb2.ServerReflectionRequest(
+                all_extension_numbers_of_type=method.input_base_type.DESCRIPTOR.full_name
+            ),
+            reflection_pb2.ServerReflectionRequest(),
+            reflection_pb2.ServerReflectionRequest(file_by_filename="no_such.proto"),
+        ]
+
+        cached = await reflect(CachedReflectionServicer(names), *requests)
+        stock = await reflect(aio.ReflectionServicer(names), *requests)
+
+        assert cached == stock
+        assert cached[-1].HasField("error_response")
+        files = cached[1].file_descriptor_response.file_descriptor_proto
+        linked = [FileDescriptorProto.FromString(data).name for data in files]
+        assert linked[0] == proto_file_name(service.package, service.module)
+        assert method.input_base_type.DESCRIPTOR.file.name in linked
+
+        # methods are symbols too, the stock servicer does not find them
+        (by_method,) = await reflect(
+            CachedReflectionServicer(names),
+            reflection_pb2.ServerReflectionRequest(
+                file_containing_symbol=f"{service.qual_name}.{method.name}"
+            ),
+        )
+        assert by_method.file_descriptor_response == cached[1].file_descriptor_response
+
+    async def test_responses_are_precomputed(self, registered: App) -> None:
+        service = registered.service_list[0]
+        method = service.methods[0]
+        servicer = CachedReflectionServicer([service.qual_name])
+
+        assert proto_file_name(service.package, service.module) in (
+            servicer.cached_files
+        )
+        assert method.input_base_type.DESCRIPTOR.file.name in servicer.cached_files
+
+        request = reflection_pb2.ServerReflectionRequest(
+            file_containing_symbol=service.qual_name
+        )
+        # answered without touching the pool
+        servicer._pool = Mock(spec=[])
+        first, second = await reflect(servicer, request, request)
+        assert first.file_descriptor_response == second.file_descriptor_response
+        assert first.original_request == request
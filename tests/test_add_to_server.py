@@ -1,10 +1,14 @@
-from unittest.mock import MagicMock
+import asyncio
+import threading
+from unittest.mock import MagicMock, patch
 
 import pytest
-from typing_extensions import Any, Dict
+from typing_extensions import Any, Dict, List
 
-from grpcAPI.add_to_server import add_to_server
+from grpcAPI.add_to_server import LazyPolicy, add_to_server
 from grpcAPI.app import APIService
+from grpcAPI.datatypes import AsyncContext
+from grpcAPI.make_method import LazyRunner, Runner, unary_handler_of
 from grpcAPI.server import ServerWrapper
 from grpcAPI.service_proc.inject_typing import InjectProtoTyping
 from grpcAPI.testclient.contextmock import ContextMock
@@ -48,3 +52,85 @@ async def test_add_simple(
     req2.name = "abort"
     with pytest.raises(RuntimeError):
         resp = await methods["create_account"](req2, context)
+
+
+@pytest.mark.asyncio
+async def test_add_lazy(
+    mock_server: ServerWrapper,
+    functional_service: APIService,
+    account_input: Dict[str, Any],
+) -> None:
+    InjectProtoTyping().process(functional_service)
+    with patch("grpcAPI.make_method.Runner", wraps=Runner) as runner:
+        methods = add_to_server(functional_service, mock_server, {}, {}, lazy=True)
+        assert runner.call_count == 0
+
+        create = methods["create_account"]
+        assert create.lazy_runner.runner is None  # type: ignore[attr-defined]
+        resp = await create(account_input["request"], ContextMock())
+        assert resp.created_at == Timestamp(seconds=1577836800)
+        await create(account_input["request"], ContextMock())
+        assert runner.call_count == 1
+        assert create.lazy_runner.runner is not None  # type: ignore[attr-defined]
+
+
+@pytest.mark.asyncio
+async def test_lazy_runner_built_once(functional_service: APIService) -> None:
+    InjectProtoTyping().process(functional_service)
+    method = next(m for m in functional_service.methods if m.name == "create_account")
+    lazy = LazyRunner(method.method, {}, {}, method.input_type)
+    built = []
+
+    def get() -> None:
+        built.append(lazy.get())
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(loop.run_in_executor(None, get) for _ in range(8)))
+    assert len({id(runner) for runner in built}) == 1
+
+
+@pytest.mark.asyncio
+async def test_lazy_runner_failure(functional_service: APIService) -> None:
+    method = functional_service.methods[0]
+    built: List[int] = []
+    handled: List[str] = []
+
+    def factory(*args: Any) -> Runner:
+        built.append(1)
+        raise LookupError("no runner")
+
+    def handle_lookup(e: Exception, context: AsyncContext) -> None:
+        handled.append(str(e))
+
+    lazy = LazyRunner(
+        method.method, {}, {LookupError: handle_lookup}, method.input_type, factory
+    )
+    handler = unary_handler_of(lazy)
+    assert await handler(None, ContextMock()) is None
+    assert await handler(None, ContextMock()) is None
+    # built once, the failure goes to the exception handlers on every call
+    assert built == [1] and handled == ["no runner", "no runner"]
+
+    with pytest.raises(LookupError):
+        await unary_handler_of(LazyRunner(method.method, {}, {}, None, factory))(
+            None, ContextMock()
+        )
+
+
+def test_lazy_policy(functional_service: APIService) -> None:
+    method = functional_service.methods[0]
+    method.tags = ["hot"]
+    service = functional_service.qual_name
+
+    assert not LazyPolicy()(method)
+    assert LazyPolicy(lazy=True)(method)
+    assert not LazyPolicy(lazy=True, warm=[service])(method)
+    assert not LazyPolicy(lazy=True, warm=[f"{service}.{method.name}"])(method)
+    assert not LazyPolicy(lazy=True, eager_tags=["hot"])(method)
+    assert LazyPolicy(lazy_tags=["hot"])(method)
+    assert LazyPolicy.from_settings({"lazy": True, "eager_tags": ["cold"]})(method)
@@ -0,0 +1,219 @@
+import asyncio
+
+import grpc
+import pytest
+from google.protobuf import descriptor_pool
+from google.protobuf.wrappers_pb2 import Int32Value, StringValue
+from typing_extensions import AsyncGenerator, AsyncIterator, List
+
+from grpcAPI import Depends
+from grpcAPI.app import APIService, App
+from grpcAPI.batch import batch_file_of, batch_protos
+from grpcAPI.build_proto import make_protos
+from grpcAPI.client_codegen import render_client_module
+from grpcAPI.datatypes import AsyncContext
+from grpcAPI.make_method import batch_shared_dependencies, make_method_async
+from grpcAPI.testclient.contextmock import ContextMock
+from tests.conftest import Serve
+
+events: List[str] = []
+
+
+async def connection() -> AsyncGenerator[str, None]:
+    events.append("open")
+    yield "conn"
+    events.append("close")
+
+
+def owner(req: StringValue) -> str:
+    return req.value.upper()
+
+
+@pytest.fixture
+def ride_service() -> APIService:
+    events.clear()
+    service = APIService("rides", package="batching")
+    running = {"now": 0, "max": 0}
+
+    @service(batchable=True, batch_concurrency=2, tags=["rides"])
+    async def get_ride(
+        req: StringValue,
+        context: AsyncContext,
+        conn: str = Depends(connection),
+        name: str = Depends(owner),
+    ) -> StringValue:
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.01 * (len(req.value) % 3))
+        running["now"] -= 1
+        if req.value == "missing":
+            await context.abort(grpc.StatusCode.NOT_FOUND, "no ride")
+        if req.value == "boom":
+            raise LookupError(req.value)
+        return StringValue(value=f"{name}:{conn}:{running['max']}")
+
+    app = App()
+    app.add_service(service)
+    app.services  # adds the batch methods
+    return service
+
+
+def batch_request(service: APIService, *values: str) -> object:
+    method = service.get_method("batch_get_ride")
+    assert method is not None
+    return method.input_type(requests=[StringValue(value=v) for v in values])
+
+
+def test_batch_method_registered(ride_service: APIService) -> None:
+    method = ride_service.get_method("batch_get_ride")
+    assert method is not None
+    assert method.input_type.DESCRIPTOR.full_name == "batching.BatchGetRideRequest"
+    assert method.output_type.DESCRIPTOR.full_name == "batching.BatchGetRideResponse"
+    assert method.tags == ["rides"]
+    assert not method.is_client_stream and not method.is_server_stream
+    file = batch_file_of(method.input_type)
+    assert file is not None and file.name == "batching/batch/rides_get_ride.proto"
+    assert [m.name for m in ride_service.methods] == ["get_ride", "batch_get_ride"]
+
+
+def test_batch_method_added_on_build() -> None:
+    service = APIService("deferred", package="batching")
+
+    @service(batchable=True)
+    async def get(req: StringValue) -> StringValue:
+        return req
+
+    pool = descriptor_pool.Default()
+    filename = "batching/batch/deferred_get.proto"
+    assert service.get_method("batch_get") is None
+    with pytest.raises(KeyError):
+        pool.FindFileByName(filename)
+
+    app = App()
+    app.add_service(service)
+    assert app.get_method("batching", "deferred", "batch_get") is not None
+    assert pool.FindFileByName(filename).name == filename
+    # building again does not add it twice
+    service.add_batch_methods()
+    assert [m.name for m in service.methods] == ["get", "batch_get"]
+
+
+def test_batch_method_registered_after_build() -> None:
+    app = App()
+    service = APIService("late", package="batching")
+    app.add_service(service)
+    assert app.services["batching"] == [service]
+
+    @service(batchable=True)
+    async def fetch(req: StringValue) -> StringValue:
+        return req
+
+    assert app.get_method("batching", "late", "batch_fetch") is not None
+
+
+def test_batch_method_invalid() -> None:
+    service = APIService("invalid", package="batching")
+
+    with pytest.raises(ValueError):
+
+        @service(batchable=True)
+        async def spell(req: StringValue) -> AsyncIterator[StringValue]:
+            yield req
+
+    @service
+    async def batch_get(req: StringValue) -> StringValue:
+        return req
+
+    with pytest.raises(KeyError):
+
+        @service(batchable=True)
+        async def get(req: StringValue) -> StringValue:
+            return req
+
+
+def test_shared_dependencies(ride_service: APIService) -> None:
+    method = ride_service.get_method("get_ride")
+    assert batch_shared_dependencies(method.method, {}) == [connection]
+
+    def fake_connection(req: StringValue) -> str:
+        return req.value
+
+    assert batch_shared_dependencies(method.method, {connection: fake_connection}) == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("lazy", [False, True])
+async def test_batch_handler(ride_service: APIService, lazy: bool) -> None:
+    method = ride_service.get_method("batch_get_ride")
+    handler = make_method_async(method, {}, {}, lazy=lazy)
+
+    request = batch_request(ride_service, "a", "bb", "ccc", "dddd", "e")
+    response = await handler(request, ContextMock())
+    names = [r.value.split(":")[0] for r in response.responses]
+    assert names == ["A", "BB", "CCC", "DDDD", "E"]
+    # the connection is shared by the whole batch, at most 2 calls at a time
+    assert events == ["open", "close"]
+    assert {int(r.value.split(":")[2]) for r in response.responses} <= {1, 2}
+
+    empty = await handler(batch_request(ride_service), ContextMock())
+    assert list(empty.responses) == []
+
+
+@pytest.mark.asyncio
+async def test_batch_failure(ride_service: APIService) -> None:
+    method = ride_service.get_method("batch_get_ride")
+    handled: List[str] = []
+
+    def handle_lookup(e: Exception, context: AsyncContext) -> None:
+        handled.append(str(e))
+
+    handler = make_method_async(method, {}, {LookupError: handle_lookup})
+
+    context = ContextMock()
+    with pytest.raises(RuntimeError):
+        await handler(batch_request(ride_service, "a", "missing", "b"), context)
+    context.tracker.abort.assert_called_once()
+
+    assert await handler(batch_request(ride_service, "boom"), ContextMock()) is None
+    assert handled == ["boom"]
+
+
+@pytest.mark.asyncio
+async def test_batch_served(ride_service: APIService, serve: Serve) -> None:
+    app = App()
+    app.add_service(ride_service)
+    async with serve(ride_service) as address:
+        app.channel_pool.configure(local={"enabled": False})
+        client = app.channel_pool.client(ride_service, address)
+        response = await client.batch_get_ride(batch_request(ride_service, "x", "y"))
+        assert [r.value[0] for r in response.responses] == ["X", "Y"]
+        await app.channel_pool.close()
+
+
+def test_batch_protos(ride_service: APIService) -> None:
+    other = APIService("plain", package="batching")
+
+    @other
+    async def ping(req: Int32Value) -> Int32Value:
+        return req
+
+    files = {p.qual_name: p for p in make_protos({"batching": [ride_service, other]})}
+    assert 'import "batching/batch/rides_get_ride.proto";' in (
+        files["batching/service.proto"].content
+    )
+    batch = files["batching/batch/rides_get_ride.proto"]
+    assert "repeated .google.protobuf.StringValue requests = 1;" in batch.content
+    assert "message BatchGetRideResponse {" in batch.content
+
+    ride_service.active = False
+    assert batch_protos({"batching": [ride_service, other]}) == []
+
+
+def test_batch_client_module(ride_service: APIService) -> None:
+    source = render_client_module([ride_service])
+    assert "from grpcAPI.batch import batch_message_classes" in source
+    namespace: dict = {}
+    exec(compile(source, "client.py", "exec"), namespace)  # noqa: S102 # nosec B102
+    spec = {m.name: m for m in namespace["RidesClient"].spec.methods}
+    request_type = ride_service.get_method("batch_get_ride").input_type
+    assert spec["batch_get_ride"].input_base_type is request_type
@@ -0,0 +1,132 @@
+import argparse
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from benchmarks._common import find_regressions
+from benchmarks.overhead import build_cases, main, run_cases, select_cases
+
+
+def test_find_regressions() -> None:
+    baseline = {"a": {"ratio": 2.0}, "b": {"ratio": 4.0}, "gone": {"ratio": 1.0}}
+    current = {"a": {"ratio": 2.1}, "b": {"ratio": 5.0}, "new": {"ratio": 9.0}}
+
+    regressions = find_regressions(current, baseline, "ratio", 10.0)
+
+    assert [r["case"] for r in regressions] == ["b"]
+    assert regressions[0]["change_pct"] == 25.0
+
+
+def test_select_cases_keeps_reference() -> None:
+    cases = build_cases()
+    selected = select_cases(cases, ["unary_depends_*", "stream_*"])
+    assert set(selected) == {
+        "unary_depends_1",
+        "unary_depends_5",
+        "unary_depends_10",
+        "stream_no_deps",
+        "raw_unary",
+        "raw_stream",
+    }
+    assert select_cases(cases, None) is cases
+
+
+def test_run_cases_ratios() -> None:
+    cases = build_cases()
+    results = asyncio.run(run_cases(cases, number=5, repeat=1))
+    assert set(results) == set(cases)
+    assert results["raw_unary"]["ratio"] == 1.0
+    assert results["stream_no_deps"]["ratio"] > 0.0
+    assert all(r["ns_per_call"] > 0 for r in results.values())
+
+
+def test_main_compare_baseline() -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "overhead.json"
+        args = ["--number", "5", "--repeat", "1", "--case", "unary_no_deps"]
+
+        assert main([*args, "--json", str(path)]) == 0
+        data = json.loads(path.read_text())
+        assert set(data["results"]) == {"unary_no_deps", "raw_unary"}
+
+        # a baseline with no overhead at all can only be regressed against
+        for result in data["results"].values():
+            result["ratio"] = 0.01
+        path.write_text(json.dumps(data))
+        assert main([*args, "--baseline", str(path)]) == 1
+
+
+def test_protoc_backends_main() -> None:
+    from benchmarks.protoc_backends import main as protoc_main
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "protoc.json"
+        assert protoc_main(["--files", "2", "--repeat", "1", "--json", str(path)]) == 0
+        data = json.loads(path.read_text())
+        assert set(data["speedup"]) == {"batch", "per_file"}
+        assert data["results"]["batch_inprocess"]["median_s"] > 0
+
+
+def test_compiler_scaling_main() -> None:
+    from benchmarks.compiler_scaling import main as scaling_main
+    from benchmarks.compiler_scaling import make_app, parse_size
+
+    assert parse_size("2x3x4x5") == (2, 3, 4, 5)
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_size("2x3")
+    app = make_app((2, 2, 3, 4))
+    assert len(app.service_list) == 12
+    assert sum(len(s.methods) for s in app.service_list) == 48
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "scaling.json"
+        args = ["--sizes", "1x1x1x2", "1x2x1x2", "--repeat", "1"]
+        assert scaling_main([*args, "--json", str(path)]) == 0
+        data = json.loads(path.read_text())
+        assert set(data["results"]) == {
+            f"{size}/{stage}"
+            for size in ("1x1x1x2", "1x2x1x2")
+            for stage in (
+                "run_process_service",
+                "compile_service",
+                "make_protos",
+                "write_protos",
+            )
+        }
+        assert all(r["peak_kib"] > 0 for r in data["results"].values())
+        assert len(data["scaling_exponents"]["make_protos"]) == 1
+
+        for result in data["results"].values():
+            result["us_per_method"] = 0.01
+        path.write_text(json.dumps(data))
+        stage = ["--stage", "make_protos"]
+        assert scaling_main([*args, *stage, "--baseline", str(path)]) == 1
+        assert scaling_main([*args, *stage, "--max-exponent", "-100"]) == 1
+
+
+def test_registry_main() -> None:
+    from benchmarks.registry import build_app
+    from benchmarks.registry import main as registry_main
+
+    app = build_app(250, 5)
+    assert len(app.service_list) == 50
+    assert len(app.services) == 1
+    assert app.get_method("pack0", "service49", "method4") is not None
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "registry.json"
+        args = ["--methods", "40", "--per-service", "4", "--number", "10"]
+        assert registry_main([*args, "--json", str(path)]) == 0
+        results = json.loads(path.read_text())["results"]
+        assert results["methods"] == 40
+        assert results["labeled_method_slotted"]
+        assert set(results["lookup_ns"]) == {
+            "services",
+            "service_list",
+            "service.methods",
+            "get_service",
+            "get_method",
+        }
@@ -63,12 +63,10 @@ class TestCLICommands:
 
         # Create a test app file
         self.test_app_path = self.temp_path / "test_app.py"
-        self.test_app_path.write_text(
-            """
+        self.test_app_path.write_text("""
 from grpcAPI.app import GrpcAPI
 app = GrpcAPI()
-"""
-        )
+""")
 
     def teardown_method(self):
         """Cleanup test environment."""
@@ -100,12 +98,10 @@ class TestRunCommand:
 
         # Create a test app file
         self.test_app_path = self.temp_path / "test_app.py"
-        self.test_app_path.write_text(
-            """
+        self.test_app_path.write_text("""
 from grpcAPI.app import GrpcAPI
 app = GrpcAPI()
-"""
-        )
+""")
 
     def teardown_method(self):
         """Cleanup test environment."""
@@ -166,6 +162,28 @@ app = GrpcAPI()
         mock_get_app.assert_called_once_with(str(self.test_app_path))
         mock_run_cmd.assert_called_once_with(mock_app, "config.json")
 
+    @patch("grpcAPI.cli.asyncio.run")
+    @patch("grpcAPI.cli.RunCommand")
+    @patch("grpcAPI.cli.get_app_instance")
+    def test_run_command_startup_report(self, mock_get_app, mock_run_cmd, mock_asyncio):
+        """Test run command with --startup-report."""
+        from grpcAPI.startup_report import get_active_report
+
+        mock_command = MagicMock()
+        mock_run_cmd.return_value = mock_command
+
+        try:
+            self.runner.invoke(
+                cli, ["run", str(self.test_app_path), "--startup-report"]
+            )
+            assert get_active_report() is not None
+        finally:
+            get_active_report().deactivate()
+
+        mock_command.run.assert_called_once_with(
+            host=None, port=None, lint=True, startup_report="startup_report.json"
+        )
+
     @patch("grpcAPI.cli.handle_error")
     @patch("grpcAPI.cli.get_app_instance")
     def test_run_command_error_handling(self, mock_get_app, mock_handle_error):
@@ -188,12 +206,10 @@ class TestBuildCommand:
 
         # Create a test app file
         self.test_app_path = self.temp_path / "test_app.py"
-        self.test_app_path.write_text(
-            """
+        self.test_app_path.write_text("""
 from grpcAPI.app import GrpcAPI
 app = GrpcAPI()
-"""
-        )
+""")
 
     def teardown_method(self):
         """Cleanup test environment."""
@@ -219,6 +235,9 @@ app = GrpcAPI()
             outdir=None,
             overwrite=False,
             zipcompress=False,
+            full_rebuild=False,
+            archive_format=None,
+            client=False,
         )
 
     @patch("grpcAPI.cli.BuildCommand")
@@ -242,6 +261,7 @@ app = GrpcAPI()
                 "config.json",
                 "--overwrite",
                 "--zip",
+                "--client",
             ],
         )
 
@@ -249,6 +269,9 @@ app = GrpcAPI()
             outdir="./custom_output",
             overwrite=True,
             zipcompress=True,
+            full_rebuild=False,
+            archive_format=None,
+            client=True,
         )
 
 
@@ -263,12 +286,10 @@ class TestLintCommand:
 
         # Create a test app file
         self.test_app_path = self.temp_path / "test_app.py"
-        self.test_app_path.write_text(
-            """
+        self.test_app_path.write_text("""
 from grpcAPI.app import GrpcAPI
 app = GrpcAPI()
-"""
-        )
+""")
 
     def teardown_method(self):
         """Cleanup test environment."""
@@ -313,6 +334,105 @@ app = GrpcAPI()
         mock_setup_logging.assert_called_once_with(True)
 
 
+class TestBenchCommand:
+    """Test the bench command."""
+
+    def setup_method(self):
+        """Setup test environment."""
+        self.runner = CliRunner()
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+
+        # Create a test app file
+        self.test_app_path = self.temp_path / "test_app.py"
+        self.test_app_path.write_text("""
+from grpcAPI.app import GrpcAPI
+app = GrpcAPI()
+""")
+
+    def teardown_method(self):
+        """Cleanup test environment."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @patch("grpcAPI.cli.BenchCommand")
+    @patch("grpcAPI.cli.get_app_instance")
+    def test_bench_command_basic(self, mock_get_app, mock_bench_cmd):
+        """Test bench command with basic parameters."""
+        mock_app = MagicMock()
+        mock_get_app.return_value = mock_app
+        mock_command = MagicMock()
+        mock_command.execute.return_value = {"mode": "concurrency", "methods": []}
+        mock_bench_cmd.return_value = mock_command
+
+        result = self.runner.invoke(cli, ["bench", str(self.test_app_path)])
+
+        assert result.exit_code == 0
+        mock_bench_cmd.assert_called_once_with(mock_app, None)
+        mock_command.execute.assert_called_once_with(
+            methods=[],
+            concurrency=None,
+            rate=None,
+            duration=None,
+            requests=None,
+            fixtures=None,
+            stream_messages=None,
+            host=None,
+            port=None,
+            uds=None,
+            json_path=None,
+        )
+
+    @patch("grpcAPI.cli.BenchCommand")
+    @patch("grpcAPI.cli.get_app_instance")
+    def test_bench_command_with_options(self, mock_get_app, mock_bench_cmd):
+        """Test bench command with custom options."""
+        mock_command = MagicMock()
+        mock_command.execute.return_value = {
+            "mode": "rate",
+            "methods": [
+                {
+                    "method": "/pkg.svc/m",
+                    "shape": "unary",
+                    "requests": 10,
+                    "throughput_rps": 100.0,
+                    "p50_ms": 1.0,
+                    "p90_ms": 2.0,
+                    "p99_ms": 3.0,
+                    "p999_ms": 4.0,
+                    "errors": 0,
+                    "error_rate": 0.0,
+                }
+            ],
+        }
+        mock_bench_cmd.return_value = mock_command
+
+        result = self.runner.invoke(
+            cli,
+            [
+                "bench",
+                str(self.test_app_path),
+                "-m",
+                "pkg.svc/*",
+                "--rate",
+                "100",
+                "--requests",
+                "10",
+                "--json",
+                "out.json",
+            ],
+        )
+
+        assert result.exit_code == 0
+        kwargs = mock_command.execute.call_args.kwargs
+        assert kwargs["methods"] == ["pkg.svc/*"]
+        assert kwargs["rate"] == 100.0
+        assert kwargs["requests"] == 10
+        assert kwargs["json_path"] == "out.json"
+        assert "/pkg.svc/m" in result.output
+
+
 class TestListCommand:
     """Test the list command."""
 
@@ -324,12 +444,10 @@ class TestListCommand:
 
         # Create a test app file
         self.test_app_path = self.temp_path / "test_app.py"
-        self.test_app_path.write_text(
-            """
+        self.test_app_path.write_text("""
 from grpcAPI.app import GrpcAPI
 app = GrpcAPI()
-"""
-        )
+""")
 
     def teardown_method(self):
         """Cleanup test environment."""
@@ -0,0 +1,253 @@
+import asyncio
+
+import grpc
+import pytest
+from google.protobuf.wrappers_pb2 import StringValue
+from typing_extensions import AsyncIterator
+
+from grpcAPI import Depends
+from grpcAPI.add_to_server import add_to_server
+from grpcAPI.app import APIService, App
+from grpcAPI.client import (
+    CallPolicy,
+    ChannelPool,
+    HedgingPolicy,
+    RetryPolicy,
+    ServiceClient,
+    channel_options,
+    channel_pool_lifespan,
+    make_client_class,
+    make_metadata,
+)
+from grpcAPI.datatypes import AsyncContext
+from grpcAPI.server import ServerWrapper
+from grpcAPI.testclient.contextmock import ContextMock
+from tests.conftest import Serve
+
+
+@pytest.fixture
+def echo_service() -> APIService:
+    service = APIService("echo", package="pack")
+
+    @service
+    async def say(req: StringValue) -> StringValue:
+        return StringValue(value=f"echo {req.value}")
+
+    @service
+    async def spell(req: StringValue) -> AsyncIterator[StringValue]:
+        for char in req.value:
+            yield StringValue(value=char)
+
+    return service
+
+
+def test_channel_options() -> None:
+    options = dict(
+        channel_options(
+            {"time_ms": 1000, "timeout_ms": 500, "permit_without_calls": False},
+            [["grpc.keepalive_time_ms", 2000], ["grpc.primary_user_agent", "x"]],
+        )
+    )
+    assert options["grpc.keepalive_time_ms"] == 2000
+    assert options["grpc.keepalive_timeout_ms"] == 500
+    assert options["grpc.keepalive_permit_without_calls"] == 0
+    assert options["grpc.use_local_subchannel_pool"] == 1
+    assert options["grpc.primary_user_agent"] == "x"
+
+
+@pytest.mark.asyncio
+async def test_pool_round_robin(echo_service: APIService, serve: Serve) -> None:
+    async with serve(echo_service) as address:
+        targets = {"echo": {"address": address}}
+        pool = ChannelPool(channels_per_target=2, targets=targets)
+        first, second, third = (pool.client(echo_service, "echo") for _ in range(3))
+
+        assert first.channel is not second.channel
+        assert first is third
+        assert pool.resolve("echo") == pool.resolve(address)
+        assert pool.channel(address) in (first.channel, second.channel)
+        assert pool.open_channels == 2
+
+        assert (await first.say(StringValue(value="hi"))).value == "echo hi"
+        letters = [r.value async for r in second.spell(StringValue(value="abc"))]
+        assert letters == ["a", "b", "c"]
+    with pytest.raises(AttributeError):
+        first.shout
+
+    await pool.close()
+    assert pool.open_channels == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_dependency(echo_service: APIService, serve: Serve) -> None:
+    app = App()
+    echo_client = app.channel_pool.dependency(echo_service, "echo")
+    caller = APIService("caller")
+
+    @caller
+    async def relay(
+        req: StringValue, echo: ServiceClient = Depends(echo_client)
+    ) -> StringValue:
+        return await echo.say(req)
+
+    methods = add_to_server(caller, ServerWrapper(grpc.aio.server()), {}, {})
+    async with serve(echo_service) as address:
+        app.channel_pool.configure(targets={"echo": {"address": address}})
+        async with channel_pool_lifespan(app):
+            response = await methods["relay"](StringValue(value="x"), ContextMock())
+            assert response.value == "echo x"
+            assert app.channel_pool.open_channels == 1
+    assert app.channel_pool.open_channels == 0
+
+
+def test_pool_invalid() -> None:
+    with pytest.raises(ValueError):
+        ChannelPool(channels_per_target=0)
+
+
+def test_client_without_channel(echo_service: APIService) -> None:
+    with pytest.raises(ValueError, match="pack.echo.say"):
+        ServiceClient(echo_service, None)
+
+
+@pytest.fixture
+def flaky_app() -> App:
+    app = App()
+    service = APIService("flaky", package="pack")
+    calls = {"fail": 0, "slow": 0}
+
+    @service
+    async def fail(req: StringValue, context: AsyncContext) -> StringValue:
+        # fails with the status in the request until called `value` times
+        calls["fail"] += 1
+        code, _, times = req.value.partition(":")
+        if calls["fail"] < int(times):
+            await context.abort(grpc.StatusCode[code], "try again")
+        return StringValue(value=str(calls["fail"]))
+
+    @service
+    async def slow(req: StringValue) -> StringValue:
+        # the first call hangs, the next ones answer at once
+        calls["slow"] += 1
+        if calls["slow"] == 1:
+            await asyncio.sleep(10)
+        return StringValue(value=str(calls["slow"]))
+
+    @service
+    async def headers(req: StringValue, context: AsyncContext) -> StringValue:
+        metadata = ",".join(f"{k}={v}" for k, v in context.invocation_metadata())
+        return StringValue(value=metadata)
+
+    app.add_service(service)
+    app.channel_pool.configure(local={"enabled": True})
+    return app
+
+
+def flaky_client(app: App) -> ServiceClient:
+    return app.channel_pool.client(app.get_service("pack", "flaky"), "unused:1")
+
+
+def test_call_policy_invalid() -> None:
+    with pytest.raises(ValueError):
+        CallPolicy(retry=RetryPolicy(), hedging=HedgingPolicy())
+    with pytest.raises(ValueError):
+        RetryPolicy(retryable_status_codes=("SOMETIMES",))
+    with pytest.raises(ValueError):
+        HedgingPolicy(max_attempts=0)
+
+    policy = CallPolicy.from_config({"timeout": 2, "retry": {"max_attempts": 5}})
+    assert policy == CallPolicy(timeout=2, retry=RetryPolicy(max_attempts=5))
+
+
+@pytest.mark.asyncio
+async def test_retry_policy(flaky_app: App) -> None:
+    retry = RetryPolicy(initial_backoff=0.001, max_attempts=3)
+    client = flaky_client(flaky_app).with_options(
+        policies={"fail": CallPolicy(retry=retry)}
+    )
+
+    assert (await client.fail(StringValue(value="UNAVAILABLE:3"))).value == "3"
+    with pytest.raises(grpc.RpcError) as exc:
+        await client.fail(StringValue(value="UNAVAILABLE:10"))
+    assert exc.value.code() == grpc.StatusCode.UNAVAILABLE
+    # not retryable
+    with pytest.raises(grpc.RpcError) as exc:
+        await client.fail(StringValue(value="INTERNAL:100"))
+    assert exc.value.code() == grpc.StatusCode.INTERNAL
+    # the original client is untouched
+    with pytest.raises(grpc.RpcError):
+        await flaky_client(flaky_app).fail(StringValue(value="UNAVAILABLE:100"))
+
+
+@pytest.mark.asyncio
+async def test_hedging_and_timeout(flaky_app: App) -> None:
+    hedging = HedgingPolicy(max_attempts=2, hedging_delay=0.01)
+    client = flaky_client(flaky_app).with_options(
+        policy=CallPolicy(timeout=5), policies={"slow": CallPolicy(hedging=hedging)}
+    )
+    response = await asyncio.wait_for(client.slow(StringValue()), 1)
+    assert response.value == "2"
+
+    client = client.with_options(policies={"slow": CallPolicy(timeout=0.01)})
+    await client.slow(StringValue())  # answers at once now
+    with pytest.raises(grpc.RpcError) as exc:
+        await client.headers(StringValue(), timeout=0)
+    assert exc.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+
+
+@pytest.mark.asyncio
+async def test_client_metadata(flaky_app: App) -> None:
+    assert make_metadata({"Request_Id": "1"}, trace=b"x") == (
+        ("request-id", "1"),
+        ("trace-bin", b"x"),
+    )
+    client = flaky_client(flaky_app).with_metadata(tenant="a")
+    response = await client.headers(StringValue(), metadata=[("user", "b")])
+    assert response.value == "tenant=a,user=b"
+    assert (await flaky_client(flaky_app).headers(StringValue())).value == ""
+
+
+@pytest.mark.asyncio
+async def test_pool_policies(echo_service: APIService) -> None:
+    pool = ChannelPool(
+        policies={
+            "pack.echo": {"timeout": 3},
+            "pack.echo.say": {"retry": {"max_attempts": 2}},
+        }
+    )
+    client = pool.client(echo_service, "localhost:1")
+    assert client.policy == CallPolicy(timeout=3)
+    assert client.policies == {"say": CallPolicy(retry=RetryPolicy(max_attempts=2))}
+
+    Echo = make_client_class(echo_service)
+    assert Echo.__name__ == "EchoClient"
+    echo = Echo.connect(pool, "localhost:1")
+    assert isinstance(echo, Echo)
+    assert echo is Echo.connect(pool, "localhost:1")
+    assert echo.channel is client.channel
+    with pytest.raises(TypeError):
+        ServiceClient.connect(pool, "localhost:1")
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_declared_policies(flaky_app: App) -> None:
+    service = flaky_app.get_service("pack", "flaky")
+    retry = RetryPolicy(initial_backoff=0.001)
+
+    @service(retry=retry)
+    async def retried(req: StringValue, context: AsyncContext) -> StringValue:
+        return await fail(req, context)
+
+    fail = service.get_method("fail").method
+    client = flaky_client(flaky_app)
+    assert (await client.retried(StringValue(value="UNAVAILABLE:3"))).value == "3"
+    # the policies of the client replace the declared one
+    client = client.with_options(policy=CallPolicy(timeout=5))
+    with pytest.raises(grpc.RpcError):
+        await client.retried(StringValue(value="UNAVAILABLE:100"))
+
+    Flaky = make_client_class(service)
+    spec = {method.name: method for method in Flaky.spec.methods}
+    assert spec["retried"].policy == CallPolicy(retry=retry)
+    assert spec["fail"].policy is None
@@ -0,0 +1,130 @@
+import importlib.util
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from google.protobuf.wrappers_pb2 import BoolValue, StringValue
+from typing_extensions import Any, AsyncIterator
+
+from grpcAPI.app import APIService, App
+from grpcAPI.client import CallPolicy, RetryPolicy
+from grpcAPI.client_codegen import method_attribute, render_client_module
+from grpcAPI.commands.build import build_client
+from tests.conftest import Serve
+
+
+@pytest.fixture
+def echo_service() -> APIService:
+    service = APIService("echo_words", package="pack")
+
+    @service(description='Says "it" back')
+    async def say(req: StringValue) -> StringValue:
+        return StringValue(value=f"echo {req.value}")
+
+    @service
+    async def spell(req: StringValue) -> AsyncIterator[StringValue]:
+        for char in req.value:
+            yield StringValue(value=char)
+
+    @service
+    async def join(reqs: AsyncIterator[StringValue]) -> StringValue:
+        return StringValue(value="".join([r.value async for r in reqs]))
+
+    @service
+    async def spec(req: StringValue) -> BoolValue:
+        return BoolValue(value=bool(req.value))
+
+    @service(timeout=1.5, retry={"max_attempts": 4})
+    async def lookup(req: StringValue) -> StringValue:
+        return req
+
+    @service
+    async def hidden(req: StringValue) -> StringValue:
+        return req
+
+    method = service.get_method("hidden")
+    assert method is not None
+    method.active = False
+    return service
+
+
+def load_module(path: Path) -> Any:
+    spec = importlib.util.spec_from_file_location("generated_client", path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_method_attribute() -> None:
+    assert method_attribute("say") == "say"
+    assert method_attribute("class") == "class_"
+    assert method_attribute("connect") == "connect_"
+    assert method_attribute("channel") == "channel_"
+
+
+def test_render_client_module(echo_service: APIService) -> None:
+    other = APIService("echo", package="other")
+
+    @other
+    async def say(req: StringValue) -> StringValue:
+        return req
+
+    duplicate = APIService("echo_words", package="other.pack")
+
+    @duplicate
+    async def ping(req: StringValue) -> StringValue:
+        return req
+
+    source = render_client_module([echo_service, other, duplicate])
+    compile(source, "client.py", "exec")
+    assert "class EchoWordsClient(ServiceClient):" in source
+    assert "class OtherPackEchoWordsClient(ServiceClient):" in source
+    assert "class EchoClient(ServiceClient):" in source
+    assert "from google.protobuf.wrappers_pb2 import BoolValue, StringValue" in source
+    assert '"""Says \'it\' back"""' in source
+    assert "def spec_(" in source
+    assert "policy=CallPolicy(timeout=1.5, retry=RetryPolicy(max_attempts=4," in source
+    assert "from grpcAPI.client import CallPolicy, HedgingPolicy," in source
+    assert "hidden" not in source
+
+
+@pytest.mark.asyncio
+async def test_generated_client(
+    echo_service: APIService, tmp_path: Path, serve: Serve
+) -> None:
+    app = App()
+    app.add_service(echo_service)
+    logger = Mock()
+    assert build_client(app, logger, tmp_path / "out") == "client.py"
+    path = tmp_path / "out" / "client.py"
+    mtime = path.stat().st_mtime_ns
+    build_client(app, logger, tmp_path / "out")
+    assert path.stat().st_mtime_ns == mtime
+
+    module = load_module(path)
+    assert module.__all__ == ["EchoWordsClient"]
+    EchoWordsClient = module.EchoWordsClient
+
+    # in process, through the app pool
+    app.channel_pool.configure(local={"enabled": True})
+    local = EchoWordsClient.connect(app.channel_pool, "unused:1")
+    assert local.is_local
+    assert (await local.say(StringValue(value="hi"))).value == "echo hi"
+    assert (await local.spec_(StringValue(value="x"))).value is True
+    lookup = {m.name: m for m in EchoWordsClient.spec.methods}["lookup"]
+    assert lookup.policy == CallPolicy(timeout=1.5, retry=RetryPolicy(max_attempts=4))
+
+    async with serve(echo_service) as address:
+        app.channel_pool.configure(local={"enabled": False})
+        remote = EchoWordsClient.connect(app.channel_pool, address)
+        assert not remote.is_local
+        assert (await remote.say(StringValue(value="hi"))).value == "echo hi"
+        letters = [r.value async for r in remote.spell(StringValue(value="ab"))]
+        assert letters == ["a", "b"]
+        words = [StringValue(value="a"), StringValue(value="b")]
+        assert (await remote.join(words)).value == "ab"
+
+        direct = EchoWordsClient.from_channel(remote.channel)
+        assert (await direct.say(StringValue(value="x"), timeout=5)).value == "echo x"
+        await app.channel_pool.close()
@@ -0,0 +1,101 @@
+import subprocess
+import sys
+
+import pytest
+from typing_extensions import Dict
+
+# tooling that only build/lint/protoc/CLI output need
+TOOLING = ("rich", "jinja2", "yaml", "toml", "json5", "grpc_tools.protoc")
+
+# import time of the grpcAPI modules themselves, without grpc, protobuf and
+# the other dependencies, about 25ms on a laptop
+OWN_IMPORT_BUDGET_US = 100_000
+
+
+def import_times(statement: str) -> Dict[str, int]:
+    """Cumulative import time in microseconds of every module loaded by statement"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+def loaded(times: Dict[str, int], package: str) -> bool:
+    return any(m == package or m.startswith(package + ".") for m in times)
+
+
+def test_import_package_skips_tooling() -> None:
+    times = import_times("import grpcAPI")
+    assert "grpcAPI" in times
+    for package in TOOLING:
+        assert not loaded(times, package), f"'import grpcAPI' imports {package}"
+
+
+def own_import_time(statement: str) -> int:
+    """Import time in microseconds spent in grpcAPI modules themselves"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, _, module = line[len("import time:") :].split("|")
+        if module.strip().startswith("grpcAPI") and own.strip().isdigit():
+            total += int(own)
+    return total
+
+
+def test_import_package_budget() -> None:
+    # the best of 3 runs, a single one can be slowed down by the machine
+    best = min(own_import_time("import grpcAPI") for _ in range(3))
+    assert best < OWN_IMPORT_BUDGET_US, f"grpcAPI modules import in {best}us"
+
+
+@pytest.mark.parametrize(
+    "module",
+    ["grpcAPI.makeproto", "grpcAPI.commands", "grpcAPI.logger"],
+)
+def test_import_submodule_skips_tooling(module: str) -> None:
+    times = import_times(f"import {module}")
+    for package in ("jinja2", "yaml", "toml", "grpc_tools.protoc"):
+        assert not loaded(times, package), f"'import {module}' imports {package}"
+    assert not loaded(times, "json5"), f"'import {module}' imports json5"
+
+
+def test_import_logger_keeps_logging_setup() -> None:
+    statement = (
+        "import logging; import grpcAPI.logger; "
+        "assert not logging.getLogger('grpcAPI').handlers"
+    )
+    subprocess.run([sys.executable, "-c", statement], check=True)
+
+
+def test_logging_config_loaded_on_first_use() -> None:
+    statement = (
+        "import sys; from grpcAPI.logger import LOGGING_CONFIG, logging_config; "
+        "assert not LOGGING_CONFIG and 'json5' not in sys.modules; "
+        "assert logging_config() is LOGGING_CONFIG and 'loggers' in LOGGING_CONFIG"
+    )
+    subprocess.run([sys.executable, "-c", statement], check=True)
+
+
+def test_import_cli_defers_commands() -> None:
+    times = import_times("import grpcAPI.cli")
+    for package in ("jinja2", "yaml", "toml", "json5", "grpc_tools.protoc"):
+        assert not loaded(times, package), f"'import grpcAPI.cli' imports {package}"
+    assert not loaded(times, "grpcAPI.commands.build")
+    assert not loaded(times, "grpcAPI.makeproto.build_service")
@@ -0,0 +1,136 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+from typing_extensions import Any, AsyncIterator, Callable, List, Optional
+
+from grpcAPI.app import App
+from grpcAPI.lifespan import LifespanGroup, depends_on, sort_lifespans
+
+
+def make_lifespan(
+    name: str,
+    events: List[str],
+    delay: float = 0.0,
+    fail_enter: bool = False,
+    fail_exit: bool = False,
+) -> Callable[[App], Any]:
+    @asynccontextmanager
+    async def lifespan(app: App) -> AsyncIterator[None]:
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            events.append(f"cancel {name}")
+            raise
+        if fail_enter:
+            raise RuntimeError(f"{name} down")
+        events.append(f"enter {name}")
+        error: Optional[BaseException] = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            await asyncio.sleep(delay)
+            events.append(f"exit {name}" + (f" ({error})" if error else ""))
+            if fail_exit:
+                raise RuntimeError(f"{name} stuck")
+
+    lifespan.__name__ = name
+    return lifespan
+
+
+def test_sort_lifespans() -> None:
+    events: List[str] = []
+    db = make_lifespan("db", events)
+    cache = depends_on(db)(make_lifespan("cache", events))
+    broker = make_lifespan("broker", events)
+    assert sort_lifespans([cache, broker, db]) == [db, cache, broker]
+
+    with pytest.raises(ValueError, match="not an app lifespan"):
+        sort_lifespans([cache])
+    first = make_lifespan("first", events)
+    second = depends_on(first)(make_lifespan("second", events))
+    depends_on(second)(first)
+    with pytest.raises(ValueError, match="first -> second -> first"):
+        sort_lifespans([first, second])
+
+
+@pytest.mark.asyncio
+async def test_sequential() -> None:
+    events: List[str] = []
+    db = make_lifespan("db", events)
+    cache = depends_on(db)(make_lifespan("cache", events))
+    app = App(lifespan=[cache, db])
+
+    async with LifespanGroup(app) as group:
+        events.append("serving")
+
+    assert events == ["enter db", "enter cache", "serving", "exit cache", "exit db"]
+    assert set(group.durations) == {"db", "cache"}
+    assert set(group.durations["db"]) == {"enter", "exit"}
+
+
+@pytest.mark.asyncio
+async def test_concurrent() -> None:
+    events: List[str] = []
+    db = make_lifespan("db", events, delay=0.05)
+    broker = make_lifespan("broker", events, delay=0.05)
+    cache = depends_on(db)(make_lifespan("cache", events, delay=0.01))
+    app = App(lifespan=[db, broker, cache])
+
+    start = time.perf_counter()
+    async with LifespanGroup(app, concurrent=True) as group:
+        entered = time.perf_counter() - start
+        events.append("serving")
+
+    # db and broker together, then cache
+    assert entered < 0.095
+    assert events.index("enter db") < events.index("enter cache")
+    assert events.index("serving") == 3
+    assert events.index("exit cache") < events.index("exit db")
+    assert group.durations["db"]["enter"] >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_concurrent_enter_failure() -> None:
+    events: List[str] = []
+    db = make_lifespan("db", events)
+    slow = make_lifespan("slow", events, delay=1.0)
+    broker = make_lifespan("broker", events, delay=0.01, fail_enter=True)
+    cache = depends_on(broker)(make_lifespan("cache", events))
+    app = App(lifespan=[db, slow, broker, cache])
+
+    with pytest.raises(RuntimeError, match="broker down"):
+        async with LifespanGroup(app, concurrent=True):
+            events.append("serving")
+
+    assert sorted(events) == ["cancel slow", "enter db", "exit db (broker down)"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_exit_failure() -> None:
+    events: List[str] = []
+    db = make_lifespan("db", events)
+    cache = depends_on(db)(make_lifespan("cache", events, fail_exit=True))
+    app = App(lifespan=[db, cache])
+
+    with pytest.raises(RuntimeError, match="cache stuck"):
+        async with LifespanGroup(app, concurrent=True):
+            pass
+
+    assert events == ["enter db", "enter cache", "exit cache", "exit db"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_body_error() -> None:
+    events: List[str] = []
+    app = App(lifespan=[make_lifespan("db", events)])
+
+    with pytest.raises(KeyError):
+        async with LifespanGroup(app, concurrent=True):
+            raise KeyError("request")
+
+    assert events == ["enter db", "exit db ('request')"]
@@ -0,0 +1,130 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from grpcAPI.app import APIService, App
+from grpcAPI.build_proto import make_protos
+from grpcAPI.commands.run import RunCommand
+from grpcAPI.datatypes import Depends, FromRequest
+from grpcAPI.lint_cache import LintCache, fingerprint, service_hash
+from grpcAPI.service_proc.inject_typing import InjectProtoTyping
+from tests.conftest import AccountInput, StringValue
+
+
+def make_service(option: str = "") -> APIService:
+    service = APIService("cached", package="cache_pack", options=[option])
+
+    @service
+    async def get_name(name: str = FromRequest(AccountInput)) -> StringValue:
+        return StringValue(value=name)
+
+    return service
+
+
+def test_service_hash_is_stable() -> None:
+    assert service_hash(make_service()) == service_hash(make_service())
+    assert service_hash(make_service()) != service_hash(make_service("opt = 1"))
+
+
+def make_depends_service(typed: bool) -> APIService:
+    service = APIService("cached", package="cache_pack")
+
+    if typed:
+
+        def account_name(name: str = FromRequest(AccountInput)) -> str:
+            return name
+
+    else:
+
+        def account_name(name: int = FromRequest(AccountInput)) -> str:
+            return str(name)
+
+    def greeting(name: str = Depends(account_name)) -> str:
+        return f"hi {name}"
+
+    @service
+    async def greet(text: str = Depends(greeting)) -> StringValue:
+        return StringValue(value=text)
+
+    return service
+
+
+def test_service_hash_follows_depends() -> None:
+    # same names, the dependency of a dependency changes its signature
+    assert service_hash(make_depends_service(True)) == service_hash(
+        make_depends_service(True)
+    )
+    assert service_hash(make_depends_service(True)) != service_hash(
+        make_depends_service(False)
+    )
+
+
+def test_fingerprint_recursive_function() -> None:
+    def loop(x: int = 0) -> int:
+        return x
+
+    loop.__defaults__ = (loop,)
+    assert "loop" in fingerprint(loop)
+
+
+def test_fingerprint_ignores_addresses() -> None:
+    class Plain:
+        __slots__ = ()
+
+    assert fingerprint(Plain()) == fingerprint(Plain())
+    assert fingerprint(AccountInput) == "msg:account.AccountInput@account.proto"
+
+
+def test_lint_cache_roundtrip() -> None:
+    services = {"cache_pack": [make_service()]}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = LintCache(Path(temp_dir))
+        assert cache.stale(services) == services
+
+        cache.update(services)
+        cache.save(services.keys())
+        assert LintCache(Path(temp_dir)).stale(services) == {}
+
+        changed = {"cache_pack": [make_service("opt = 1")]}
+        assert LintCache(Path(temp_dir)).stale(changed) == changed
+
+        # a different grpcAPI version or lint implementation drops every entry
+        path = Path(temp_dir) / "lint.json"
+        data = json.loads(path.read_text())
+        data["salt"] = "other"
+        path.write_text(json.dumps(data))
+        assert LintCache(Path(temp_dir)).stale(services) == services
+
+
+def test_lint_cache_prunes_removed_packages() -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = LintCache(Path(temp_dir))
+        cache.update({"a": [make_service()], "b": [make_service()]})
+        cache.save(["a"])
+        assert set(LintCache(Path(temp_dir)).entries) == {"a"}
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_run_lint_uses_cache(app_fixture: App, enabled: bool) -> None:
+    with patch("grpcAPI.commands.command.run_process_service"):
+        cmd = RunCommand(app_fixture, None)
+    for service in app_fixture.service_list:
+        InjectProtoTyping().process(service)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cmd.settings["lint_cache"] = {"enabled": enabled, "path": temp_dir}
+        with patch(
+            "grpcAPI.commands.run.make_protos", wraps=make_protos
+        ) as mock_make_protos:
+            cmd.lint(app_fixture.services)
+            cmd.lint(app_fixture.services)
+
+    if enabled:
+        mock_make_protos.assert_called_once_with(
+            app_fixture.services, renderer="descriptor"
+        )
+    else:
+        assert mock_make_protos.call_count == 2
@@ -0,0 +1,163 @@
+import asyncio
+import pickle
+
+import grpc
+import pytest
+from google.protobuf.wrappers_pb2 import StringValue
+from typing_extensions import Any, AsyncIterator
+
+from grpcAPI.app import APIService, App
+from grpcAPI.datatypes import AsyncContext
+from grpcAPI.local_call import LocalContext, LocalRpcError
+
+
+@pytest.fixture
+def app() -> App:
+    app = App()
+    service = APIService("echo", package="pack")
+
+    @service
+    async def say(req: StringValue) -> StringValue:
+        return req
+
+    @service
+    async def spell(req: StringValue) -> AsyncIterator[StringValue]:
+        for char in req.value:
+            yield StringValue(value=char)
+
+    @service
+    async def join(reqs: AsyncIterator[StringValue]) -> StringValue:
+        return StringValue(value="".join([r.value async for r in reqs]))
+
+    @service
+    async def fail(req: StringValue, context: AsyncContext) -> StringValue:
+        if req.value == "abort":
+            await context.abort(grpc.StatusCode.NOT_FOUND, "no such thing")
+        if req.value == "code":
+            context.set_code(grpc.StatusCode.PERMISSION_DENIED)
+            context.set_details("denied")
+            return StringValue()
+        if req.value == "slow":
+            await asyncio.sleep(1)
+        raise ValueError("boom")
+
+    app.add_service(service)
+    app.channel_pool.configure(local={"enabled": True})
+    return app
+
+
+def echo(app: App) -> APIService:
+    service = app.get_service("pack", "echo")
+    assert isinstance(service, APIService)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_local_calls(app: App) -> None:
+    client = app.channel_pool.client(echo(app), "unused:1")
+    assert client.is_local
+    assert app.channel_pool.open_channels == 0
+    assert client is app.channel_pool.client(echo(app), "unused:1")
+
+    request = StringValue(value="hi")
+    assert await client.say(request) is request
+    assert [r.value async for r in client.spell(StringValue(value="ab"))] == ["a", "b"]
+    joined = await client.join([StringValue(value="a"), StringValue(value="b")])
+    assert joined.value == "ab"
+
+
+@pytest.mark.asyncio
+async def test_local_isolate(app: App) -> None:
+    app.channel_pool.configure(local={"enabled": True, "isolate": True})
+    client = app.channel_pool.client(echo(app), "unused:1")
+
+    request = StringValue(value="hi")
+    response = await client.say(request)
+    assert response == request
+    assert response is not request
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("isolate", [False, True])
+async def test_local_swallowed_error(app: App, isolate: bool) -> None:
+    @app.exception_handler(ValueError)
+    async def ignore(exc: Exception, context: AsyncContext) -> None:
+        pass
+
+    app.channel_pool.configure(local={"enabled": True, "isolate": isolate})
+    client = app.channel_pool.client(echo(app), "unused:1")
+    with pytest.raises(LocalRpcError) as e:
+        await client.fail(StringValue(value="boom"))
+    assert e.value.code() == grpc.StatusCode.UNKNOWN
+    assert e.value.details() == "The handler returned no response"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "value, code, details",
+    [
+        ("abort", grpc.StatusCode.NOT_FOUND, "no such thing"),
+        ("code", grpc.StatusCode.PERMISSION_DENIED, "denied"),
+        ("boom", grpc.StatusCode.UNKNOWN, "Unexpected <class 'ValueError'>: boom"),
+        ("slow", grpc.StatusCode.DEADLINE_EXCEEDED, "Deadline Exceeded"),
+    ],
+)
+async def test_local_errors(
+    app: App, value: str, code: grpc.StatusCode, details: str
+) -> None:
+    client = app.channel_pool.client(echo(app), "unused:1")
+    with pytest.raises(grpc.RpcError) as error:
+        await client.fail(StringValue(value=value), timeout=0.05)
+    assert isinstance(error.value, LocalRpcError)
+    assert error.value.code() == code
+    assert error.value.details() == details
+
+
+@pytest.mark.asyncio
+async def test_remote_when_not_served(app: App) -> None:
+    echo(app).active = False
+    client = app.channel_pool.client(echo(app), "localhost:1")
+    assert not client.is_local
+    await app.channel_pool.close()
+
+    echo(app).active = True
+    app.channel_pool.configure(local={"enabled": False})
+    assert not app.channel_pool.client(echo(app), "localhost:1").is_local
+    await app.channel_pool.close()
+
+    app.channel_pool.configure()
+    assert not app.channel_pool.client(echo(app), "localhost:1").is_local
+    await app.channel_pool.close()
+
+
+class PassInterceptor(grpc.aio.ServerInterceptor):
+    async def intercept_service(self, continuation: Any, details: Any) -> Any:
+        return await continuation(details)
+
+
+@pytest.mark.asyncio
+async def test_remote_when_intercepted(app: App) -> None:
+    # in process calls would skip the interceptors
+    app.add_interceptor(PassInterceptor())
+    try:
+        app.channel_pool.configure(local={"enabled": True})
+        assert not app.channel_pool.client(echo(app), "localhost:1").is_local
+        await app.channel_pool.close()
+    finally:
+        app._interceptor.clear()
+
+
+def test_local_context() -> None:
+    context = LocalContext([("key", "value")], timeout=10)
+    assert isinstance(context, AsyncContext)
+    assert context.invocation_metadata() == (("key", "value"),)
+    assert 0 < context.time_remaining() <= 10
+    assert LocalContext().time_remaining() is None
+
+
+def test_local_rpc_error_copies() -> None:
+    error = LocalRpcError(grpc.StatusCode.NOT_FOUND, "lost", (("key", "value"),))
+    copied = pickle.loads(pickle.dumps(error))
+    assert copied.code() == grpc.StatusCode.NOT_FOUND
+    assert copied.details() == "lost"
+    assert copied.trailing_metadata() == (("key", "value"),)
@@ -0,0 +1,60 @@
+import subprocess
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from benchmarks.protoc_backends import make_proto_tree
+from grpcAPI.protoc.compile import bundled_include, compile_protoc, run_protoc
+
+
+def output_files(path: Path) -> dict:
+    return {
+        p.relative_to(path).as_posix(): p.read_bytes()
+        for p in path.rglob("*")
+        if p.is_file()
+    }
+
+
+def test_inprocess_matches_subprocess(tmp_path: Path) -> None:
+    root = tmp_path / "proto"
+    make_proto_tree(root, 3)
+
+    compile_protoc(root, tmp_path / "sub", True, True, False, backend="subprocess")
+    compile_protoc(root, tmp_path / "in", True, True, False, backend="inprocess")
+
+    files = output_files(tmp_path / "in")
+    assert "file0_pb2.py" in files
+    assert "file0_pb2_grpc.py" in files
+    assert files == output_files(tmp_path / "sub")
+
+
+def test_inprocess_captures_diagnostics(tmp_path: Path) -> None:
+    (tmp_path / "bad.proto").write_text(
+        'syntax = "proto3";\nmessage Bad { Unknown value = 1; }\n'
+    )
+    logger = Mock()
+
+    with pytest.raises(subprocess.CalledProcessError):
+        compile_protoc(
+            tmp_path,
+            tmp_path / "out",
+            True,
+            False,
+            False,
+            files=["bad.proto"],
+            logger=logger,
+            backend="inprocess",
+        )
+
+    _, stderr = logger.warning.call_args.args
+    assert '"Unknown" is not defined' in stderr
+
+
+def test_unknown_backend() -> None:
+    with pytest.raises(ValueError):
+        run_protoc(["python", "-m", "grpc_tools.protoc"], backend="docker")
+
+
+def test_bundled_include() -> None:
+    assert (Path(bundled_include()) / "google/protobuf/empty.proto").is_file()
@@ -0,0 +1,121 @@
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from grpcAPI.protoc.compile import compile_protoc
+from grpcAPI.protoc.incremental import (
+    ProtoGraph,
+    compile_protoc_incremental,
+    make_shards,
+    parse_imports,
+)
+
+
+def test_parse_imports() -> None:
+    source = """
+    syntax = "proto3";
+    import "a.proto";
+    import public "pkg/b.proto";
+    // import "commented.proto";
+    /* import "block.proto"; */
+    import weak "c.proto";
+    """
+    assert parse_imports(source) == ["a.proto", "pkg/b.proto", "c.proto"]
+
+
+def test_file_hash_follows_transitive_imports(tmp_path: Path) -> None:
+    (tmp_path / "a.proto").write_text('syntax = "proto3";\nimport "b.proto";')
+    (tmp_path / "b.proto").write_text('syntax = "proto3";\nimport "c.proto";')
+    (tmp_path / "c.proto").write_text('syntax = "proto3";')
+    (tmp_path / "d.proto").write_text('syntax = "proto3";')
+    before = ProtoGraph(tmp_path)
+
+    (tmp_path / "c.proto").write_text('syntax = "proto3";\nmessage C {}')
+    after = ProtoGraph(tmp_path)
+
+    assert before.dependencies("a.proto") == {"b.proto", "c.proto"}
+    for name in ["a.proto", "b.proto", "c.proto"]:
+        assert before.file_hash(name) != after.file_hash(name)
+    assert before.file_hash("d.proto") == after.file_hash("d.proto")
+    assert before.file_hash("d.proto", "x") != before.file_hash("d.proto", "y")
+
+
+def test_make_shards() -> None:
+    sizes = {"a": 10, "b": 5, "c": 5, "d": 1}
+    shards = make_shards(list(sizes), sizes, 2)
+    assert shards == [["a", "d"], ["b", "c"]]
+    assert make_shards(["a"], sizes, 8) == [["a"]]
+
+
+def write_tree(root: Path) -> None:
+    (root / "inner").mkdir(parents=True)
+    (root / "inner" / "inner.proto").write_text(
+        'syntax = "proto3";\npackage inner;\nmessage Inner { string v = 1; }\n'
+    )
+    (root / "user.proto").write_text(
+        'syntax = "proto3";\nimport "inner/inner.proto";\n'
+        'import "google/protobuf/timestamp.proto";\n'
+        "message User { inner.Inner inner = 1; "
+        "google.protobuf.Timestamp at = 2; }\n"
+    )
+    for name in ["a", "b", "c"]:
+        (root / f"{name}.proto").write_text(
+            f'syntax = "proto3";\nmessage {name.upper()} {{ int32 v = 1; }}\n'
+        )
+
+
+def output_files(path: Path) -> dict:
+    return {
+        p.relative_to(path).as_posix(): p.read_bytes()
+        for p in path.rglob("*")
+        if p.is_file()
+    }
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_incremental_matches_full_compile(tmp_path: Path, workers: int) -> None:
+    root = tmp_path / "proto"
+    write_tree(root)
+    full, incremental = tmp_path / "full", tmp_path / "incremental"
+    compile_protoc(root, full, True, True, False)
+    compile_protoc_incremental(
+        root,
+        incremental,
+        True,
+        True,
+        False,
+        cache_path=tmp_path / "cache",
+        workers=workers,
+    )
+    assert output_files(incremental) == output_files(full)
+
+
+def test_recompiles_only_changed_files(tmp_path: Path) -> None:
+    root, dst, cache = tmp_path / "proto", tmp_path / "lib", tmp_path / "cache"
+    write_tree(root)
+
+    def run() -> str:
+        logger = Mock()
+        compile_protoc_incremental(
+            root, dst, True, False, False, logger=logger, cache_path=cache, workers=2
+        )
+        fmt, summary = logger.info.call_args.args
+        return fmt % summary
+
+    assert run() == "protoc: 5 compiled, 0 from cache, 0 up to date"
+    other = dst / "a_pb2.py"
+    mtime = other.stat().st_mtime_ns
+
+    assert run() == "protoc: 0 compiled, 0 from cache, 5 up to date"
+    assert other.stat().st_mtime_ns == mtime
+
+    # user.proto imports inner/inner.proto
+    inner = root / "inner" / "inner.proto"
+    original = inner.read_text()
+    inner.write_text(original + "\nmessage Extra {}\n")
+    assert run() == "protoc: 2 compiled, 0 from cache, 3 up to date"
+
+    # both come back from the cache, but only inner's output differs on disk
+    inner.write_text(original)
+    assert run() == "protoc: 0 compiled, 1 from cache, 4 up to date"
@@ -4,7 +4,11 @@ import pytest
 from google.protobuf import descriptor_pool
 
 from grpcAPI.app import APIService, App
-from grpcAPI.service_proc.register_descriptor import RegisterDescriptors
+from grpcAPI.service_proc.register_descriptor import (
+    RegisterDescriptors,
+    proto_file_name,
+)
+from grpcAPI.service_proc.run_process_service import run_process_service
 
 # Import real protobuf classes from tests - these imports ensure the descriptors are loaded
 
@@ -32,7 +36,7 @@ class TestRegisterDescriptors:
     def test_init(self):
         """Test RegisterDescriptors initialization"""
         register = RegisterDescriptors()
-        assert register.fds == {}
+        assert register.services == {}
         assert register.pool is descriptor_pool.Default()
 
     def test_is_registered(self):
@@ -42,26 +46,14 @@ class TestRegisterDescriptors:
         # Should not be registered initially
         assert not register._is_registered("test_file.proto")
 
-    def test_get_fd_creates_new_descriptor(self):
-        """Test _get_fd creates new FileDescriptorProto"""
+    def test_process_service_groups_by_package(self, functional_service: APIService):
+        """Test services are collected once, by package"""
         register = RegisterDescriptors()
-        label = ("test_file.proto", "test.package")
 
-        fd = register._get_fd(label)
-
-        assert fd.name == "test_file.proto"
-        assert fd.package == "test.package"
-        assert label in register.fds
-
-    def test_get_fd_returns_existing_descriptor(self):
-        """Test _get_fd returns existing FileDescriptorProto"""
-        register = RegisterDescriptors()
-        label = ("test_file.proto", "test.package")
-
-        fd1 = register._get_fd(label)
-        fd2 = register._get_fd(label)
+        register._process_service(functional_service)
+        register._process_service(functional_service)
 
-        assert fd1 is fd2
+        assert register.services == {functional_service.package: [functional_service]}
 
     def test_add_service_with_real_service(self, functional_service: APIService):
         """Test adding a real APIService creates proper descriptor"""
@@ -70,11 +62,10 @@ class TestRegisterDescriptors:
         register._process_service(functional_service)
 
         # Check that a file descriptor was created
-        expected_label = (f"_{functional_service.module}_", functional_service.package)
-        assert expected_label in register.fds
-
-        fd = register.fds[expected_label]
-        assert fd.name == f"_{functional_service.module}_"
+        (fd,) = register.descriptors().file
+        assert fd.name == proto_file_name(
+            functional_service.package, functional_service.module
+        )
         assert fd.package == functional_service.package
 
         # Check that service was added
@@ -105,6 +96,36 @@ class TestRegisterDescriptors:
             assert method_desc.input_type == expected_input
             assert method_desc.output_type == expected_output
 
+    def test_dependencies_are_linked(self, functional_service: APIService):
+        """Test the file depends on the files of its message types"""
+        register = RegisterDescriptors()
+        register._process_service(functional_service)
+
+        (fd,) = register.descriptors().file
+        for method in functional_service.methods:
+            assert method.input_base_type.DESCRIPTOR.file.name in fd.dependency
+            assert method.output_base_type.DESCRIPTOR.file.name in fd.dependency
+
+    def test_invalid_service_is_not_registered(self):
+        """Test a service the pool rejects registers nothing, lint reports it"""
+        service = APIService("invalid name", package="unregistered")
+        register = RegisterDescriptors()
+        register._process_service(service)
+
+        register.stop()
+        assert not register._has_service("unregistered.invalid name")
+
+    def test_close_flushes_to_pool(self, app_fixture: App):
+        """Test run_process_service registers the descriptors, it calls close"""
+        run_process_service(app_fixture, {}, [RegisterDescriptors])
+
+        register = RegisterDescriptors()
+        for service in app_fixture.service_list:
+            assert register._has_service(service.qual_name)
+            assert register._is_registered(
+                proto_file_name(service.package, service.module)
+            )
+
 
 class TestReflectionIntegration:
     """Integration tests using real gRPC reflection"""
@@ -118,7 +139,9 @@ class TestReflectionIntegration:
         register.stop()
 
         # Test that we can find the registered service
-        filename = f"_{functional_service.module}_"
+        filename = proto_file_name(
+            functional_service.package, functional_service.module
+        )
         try:
             file_desc = register.pool.FindFileByName(filename)
 
@@ -157,7 +180,9 @@ class TestReflectionIntegration:
         discovered_services = []
 
         # Find all file descriptors in the pool using the public API
-        filename = f"_{functional_service.module}_"
+        filename = proto_file_name(
+            functional_service.package, functional_service.module
+        )
         try:
             file_desc = register.pool.FindFileByName(filename)
             if hasattr(file_desc, "services_by_name"):
@@ -176,7 +201,9 @@ class TestReflectionIntegration:
         register._process_service(functional_service)
         register.stop()
 
-        filename = f"_{functional_service.module}_"
+        filename = proto_file_name(
+            functional_service.package, functional_service.module
+        )
         file_desc = register.pool.FindFileByName(filename)
         service_desc = file_desc.services_by_name[functional_service.name]
 
@@ -216,7 +243,9 @@ class TestReflectionIntegration:
         register.stop()
 
         # Should still be registered
-        filename = f"_{functional_service.module}_"
+        filename = proto_file_name(
+            functional_service.package, functional_service.module
+        )
         assert register._is_registered(filename)
 
 
@@ -235,7 +264,9 @@ class TestRealWorldScenario:
             register.stop()
 
             # Should be able to find it
-            expected_filename = f"_{real_service.module}_"
+            expected_filename = proto_file_name(
+                real_service.package, real_service.module
+            )
             assert register._is_registered(expected_filename)
 
             # Should be able to access service details
@@ -267,7 +298,7 @@ class TestRealWorldScenario:
 
         # Verify all services were registered
         for service in app_fixture.service_list:
-            expected_filename = f"_{service.module}_"
+            expected_filename = proto_file_name(service.package, service.module)
             assert register._is_registered(expected_filename)
 
             # Verify we can access the service
@@ -286,7 +317,9 @@ class TestRealWorldScenario:
             register_service_descriptors([app_fixture.service_list[0]])
 
             register = RegisterDescriptors()
-            filename = f"_{app_fixture.service_list[0].module}_"
+            filename = proto_file_name(
+                app_fixture.service_list[0].package, app_fixture.service_list[0].module
+            )
             assert register._is_registered(filename)
         else:
             # Test with multiple real services
@@ -294,5 +327,5 @@ class TestRealWorldScenario:
 
             register = RegisterDescriptors()
             for service in app_fixture.service_list:
-                filename = f"_{service.module}_"
+                filename = proto_file_name(service.package, service.module)
                 assert register._is_registered(filename)
@@ -0,0 +1,93 @@
+from google.protobuf.wrappers_pb2 import StringValue
+
+from benchmarks.compiler_scaling import make_app
+from grpcAPI.app import APIPackage, APIService, App
+from grpcAPI.service_proc.format_service import FormatService
+
+
+def test_services_view_cached_until_add() -> None:
+    app = make_app((2, 1, 2, 2))
+    services, service_list = app.services, app.service_list
+
+    assert app.services is services
+    assert app.service_list is service_list
+    assert len(service_list) == 4
+
+    app.add_service(APIService("extra", package="pack0"))
+    assert app.services is not services
+    assert [s.name for s in app.services["pack0"]][-1] == "extra"
+    assert len(app.service_list) == 5
+
+
+def test_get_service_and_method() -> None:
+    app = make_app((2, 2, 1, 3))
+
+    service = app.get_service("pack1", "module1_service0")
+    assert service is not None and service.qual_name == "pack1.module1_service0"
+    assert app.get_service("pack1", "missing") is None
+    assert app.get_service("pack2", "module1_service0") is None
+
+    method = app.get_method("pack1", "module1_service0", "method2")
+    assert method is not None and method.name == "method2"
+    assert app.get_method("pack1", "module1_service0", "missing") is None
+    assert app.get_method("pack1", "missing", "method2") is None
+
+
+def test_lookups_follow_renames() -> None:
+    app = make_app((1, 1, 1, 2))
+    service = app.get_service("pack0", "module0_service0")
+    FormatService(format_proto={"title_case": "pascal"}).process(service)
+
+    assert app.get_service("pack0", "module0_service0") is None
+    assert app.get_service("pack0", "Module0Service0") is service
+    assert app.get_method("pack0", "Module0Service0", "Method1") is not None
+
+
+def test_methods_view_tracks_active() -> None:
+    service = APIService("service")
+
+    @service
+    async def first(req: StringValue) -> StringValue: ...
+
+    methods = service.methods
+    assert service.methods is methods
+
+    @service
+    async def second(req: StringValue) -> StringValue: ...
+
+    assert [m.name for m in service.methods] == ["first", "second"]
+
+    service.get_method("first").active = False
+    assert [m.name for m in service.methods] == ["second"]
+    assert service.get_method("first") is not None  # inactive, still registered
+
+    service.get_method("first").active = True
+    assert [m.name for m in service.methods] == ["first", "second"]
+
+
+def test_duplicate_service_rejected() -> None:
+    app = App()
+    app.add_service(APIService("service", package="pack"))
+    try:
+        app.add_service(APIService("service", package="pack"))
+    except KeyError as e:
+        assert "already registered" in str(e)
+    else:  # pragma: no cover
+        raise AssertionError("duplicate service was accepted")
+
+
+def test_get_module_indexed() -> None:
+    package = APIPackage("pack")
+    module = package.make_module("module")
+    assert package.get_module("module") is module
+    assert package.make_service("service", module="module") in module.services
+    assert package.get_module("missing") is None
+
+
+def test_records_are_slotted() -> None:
+    app = make_app((1, 1, 1, 1))
+    method = app.service_list[0].methods[0]
+
+    assert not hasattr(method, "__dict__")
+    assert not hasattr(method.request_types[0], "__dict__")
+    assert not hasattr(method.response_types, "__dict__")
@@ -0,0 +1,186 @@
+import json
+from pathlib import Path
+from unittest.mock import Mock
+
+import grpc
+import pytest
+from google.protobuf.wrappers_pb2 import StringValue
+from typing_extensions import List
+
+from grpcAPI.app import APIService, App
+from grpcAPI.client import (
+    CallPolicy,
+    ChannelPool,
+    HedgingPolicy,
+    RetryPolicy,
+    service_config_options,
+)
+from grpcAPI.commands.build import build_service_config
+from grpcAPI.datatypes import AsyncContext
+from grpcAPI.service_config import duration, make_service_config, method_config
+from tests.conftest import Serve
+
+
+@pytest.fixture
+def policy_service() -> APIService:
+    service = APIService("rides", package="ride")
+
+    @service(timeout=2, retry={"max_attempts": 4})
+    async def get_ride(req: StringValue) -> StringValue:
+        return req
+
+    @service(timeout=2, retry={"max_attempts": 4})
+    async def get_driver(req: StringValue) -> StringValue:
+        return req
+
+    @service(hedging=HedgingPolicy(hedging_delay=0.25))
+    async def quote(req: StringValue) -> StringValue:
+        return req
+
+    @service(retry=RetryPolicy(max_attempts=1))
+    async def once(req: StringValue) -> StringValue:
+        return req
+
+    @service
+    async def plain(req: StringValue) -> StringValue:
+        return req
+
+    return service
+
+
+def test_duration() -> None:
+    assert duration(2) == "2s"
+    assert duration(0.25) == "0.25s"
+    assert duration(0.000001) == "0.000001s"
+
+
+def test_from_meta() -> None:
+    assert CallPolicy.from_meta({"tags": ["x"]}) is None
+    assert CallPolicy.from_meta({"retry": True}) == CallPolicy(retry=RetryPolicy())
+    policy = CallPolicy.from_meta({"timeout": 1, "hedging": {"max_attempts": 3}})
+    assert policy == CallPolicy(timeout=1, hedging=HedgingPolicy(max_attempts=3))
+    with pytest.raises(TypeError):
+        CallPolicy.from_meta({"retry": "yes"})
+    with pytest.raises(TypeError):
+        CallPolicy.from_meta({"timeout": "1s"})
+
+
+def test_invalid_policy_fails_on_registration() -> None:
+    service = APIService("bad")
+    with pytest.raises(ValueError):
+
+        @service(retry={"max_attempts": 2}, hedging=True)
+        async def both(req: StringValue) -> StringValue:
+            return req
+
+
+def test_method_config() -> None:
+    policy = CallPolicy(timeout=0.5, retry=RetryPolicy(retryable_status_codes=()))
+    assert method_config(policy) == {"timeout": "0.5s"}
+    assert method_config(CallPolicy(hedging=HedgingPolicy(max_attempts=1))) == {}
+
+
+def test_make_service_config(policy_service: APIService) -> None:
+    config = make_service_config([policy_service])
+    assert config == {
+        "methodConfig": [
+            {
+                "name": [
+                    {"service": "ride.rides", "method": "get_ride"},
+                    {"service": "ride.rides", "method": "get_driver"},
+                ],
+                "timeout": "2s",
+                "retryPolicy": {
+                    "maxAttempts": 4,
+                    "initialBackoff": "0.1s",
+                    "maxBackoff": "1s",
+                    "backoffMultiplier": 2.0,
+                    "retryableStatusCodes": ["UNAVAILABLE"],
+                },
+            },
+            {
+                "name": [{"service": "ride.rides", "method": "quote"}],
+                "hedgingPolicy": {"maxAttempts": 2, "hedgingDelay": "0.25s"},
+            },
+        ]
+    }
+    policy_service.active = False
+    assert make_service_config([policy_service]) == {}
+
+
+def test_build_service_config(policy_service: APIService, tmp_path: Path) -> None:
+    app = App()
+    app.add_service(policy_service)
+    logger = Mock()
+    assert build_service_config(app, logger, tmp_path) == "service_config.json"
+    path = tmp_path / "service_config.json"
+    assert json.loads(path.read_text()) == make_service_config([policy_service])
+    mtime = path.stat().st_mtime_ns
+    build_service_config(app, logger, tmp_path)
+    assert path.stat().st_mtime_ns == mtime
+
+    policy_service.active = False
+    assert build_service_config(app, logger, tmp_path) is None
+    assert path.exists()
+
+
+def test_build_service_config_keeps_user_file(tmp_path: Path) -> None:
+    app = App()
+    service = APIService("plain", package="nopolicy")
+
+    @service
+    async def get(req: StringValue) -> StringValue:
+        return req
+
+    app.add_service(service)
+    path = tmp_path / "service_config.json"
+    path.write_text('{"loadBalancingConfig": [{"round_robin": {}}]}')
+    logger = Mock()
+    assert build_service_config(app, logger, tmp_path) is None
+    assert path.read_text() == '{"loadBalancingConfig": [{"round_robin": {}}]}'
+    logger.warning.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_pool_service_config(policy_service: APIService, tmp_path: Path) -> None:
+    path = tmp_path / "service_config.json"
+    path.write_text(json.dumps(make_service_config([policy_service])))
+    option = dict(service_config_options(str(path)))["grpc.service_config"]
+    assert json.loads(option) == make_service_config([policy_service])
+
+    pool = ChannelPool(
+        targets={"ride": {"address": "localhost:1", "service_config": str(path)}}
+    )
+    assert pool.resolve("ride") == ("localhost:1", None, str(path))
+    assert pool.channel("ride") is not None
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_service_config_retries_once(tmp_path: Path, serve: Serve) -> None:
+    service = APIService("flaky", package="retrying")
+    hits: List[int] = []
+
+    @service(retry={"max_attempts": 3, "initial_backoff": 0.01})
+    async def fail(req: StringValue, context: AsyncContext) -> StringValue:
+        hits.append(1)
+        await context.abort(grpc.StatusCode.UNAVAILABLE, "try again")
+
+    path = tmp_path / "service_config.json"
+    path.write_text(json.dumps(make_service_config([service])))
+    async with serve(service) as address:
+        pool = ChannelPool(
+            targets={"flaky": {"address": address, "service_config": str(path)}}
+        )
+        client = pool.client(service, "flaky")
+        with pytest.raises(grpc.RpcError):
+            await client.fail(StringValue())
+        # the channel retries, the client does not retry its attempts
+        assert len(hits) == 3
+
+        hits.clear()
+        pool.configure(targets={"flaky": {"address": address}})
+        with pytest.raises(grpc.RpcError):
+            await pool.client(service, "flaky").fail(StringValue())
+        assert len(hits) == 3
+        await pool.close()
@@ -0,0 +1,106 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from grpcAPI.add_to_server import add_to_server
+from grpcAPI.app import APIService, App
+from grpcAPI.commands.run import RunCommand
+from grpcAPI.server import ServerWrapper
+from grpcAPI.service_proc.inject_typing import InjectProtoTyping
+from grpcAPI.startup_report import StartupReport, get_active_report, measure
+
+
+@pytest.fixture(autouse=True)
+def lint_cache_in_tmp(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """run writes its lint cache to the working dir"""
+    monkeypatch.chdir(tmp_path)
+
+
+def test_measure_without_active_report() -> None:
+    assert get_active_report() is None
+    with measure("noop"):
+        pass
+    assert get_active_report() is None
+
+
+def test_report_records_sorted() -> None:
+    with StartupReport() as report:
+        assert get_active_report() is report
+        with measure("fast"):
+            pass
+        with measure("slow", "service"):
+            sum(range(200000))
+    assert get_active_report() is None
+
+    names = [r.name for r in report.sorted_records()]
+    assert names == ["slow", "fast"]
+    assert [r.name for r in report.sorted_records("service")] == ["slow"]
+
+    data = report.to_dict()
+    assert data["records"][0]["kind"] == "service"
+    assert set(data["kinds"]) == {"phase", "service"}
+    assert data["total_ms"] >= data["records"][0]["duration_ms"]
+
+
+def test_report_write_json() -> None:
+    report = StartupReport()
+    with report.measure("settings"):
+        pass
+    report.finish()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = report.write_json(Path(temp_dir) / "nested" / "startup.json")
+        data = json.loads(path.read_text())
+    assert data["records"][0]["name"] == "settings"
+
+
+def test_add_to_server_records_methods(functional_service: APIService) -> None:
+    InjectProtoTyping().process(functional_service)
+    with StartupReport() as report:
+        add_to_server(functional_service, ServerWrapper(server=MagicMock()), {}, {})
+
+    names = {r.name for r in report.sorted_records("method")}
+    assert f"{functional_service.qual_name}.create_account" in names
+    assert len(names) == len(functional_service.methods)
+
+
+@pytest.mark.asyncio
+async def test_run_command_startup_report(app_fixture: App) -> None:
+    report = StartupReport().activate()
+    try:
+        cmd = RunCommand(app_fixture, None)
+
+        with patch("grpcAPI.commands.run.make_server") as mock_make_server, patch(
+            "grpcAPI.commands.run.make_plugin"
+        ):
+            mock_server = MagicMock()
+            mock_server.start = AsyncMock()
+            mock_server.start_warmup = AsyncMock()
+            mock_server.end_warmup = AsyncMock()
+            mock_server.wait_for_termination = AsyncMock()
+            mock_make_server.return_value = mock_server
+
+            with tempfile.TemporaryDirectory() as temp_dir:
+                path = Path(temp_dir) / "startup.json"
+                await cmd.run(host="localhost", port=50051, startup_report=str(path))
+                data = json.loads(path.read_text())
+    finally:
+        report.deactivate()
+
+    assert get_active_report() is None
+    kinds = {(r["kind"], r["name"]) for r in data["records"]}
+    for phase in (
+        "settings",
+        "process_services",
+        "lint",
+        "make_server",
+        "add_to_server",
+        "server_start",
+        "warmup",
+    ):
+        assert ("phase", phase) in kinds
+    assert ("process_service", "InjectProtoTyping") in kinds
+    assert any(kind == "service" for kind, _ in kinds)
+    assert any(kind == "method" for kind, _ in kinds)
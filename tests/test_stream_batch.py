@@ -0,0 +1,185 @@
+import asyncio
+
+import pytest
+from google.protobuf.wrappers_pb2 import Int32Value, StringValue
+from typing_extensions import AsyncIterator, List, Optional
+
+from grpcAPI import Batch, Depends
+from grpcAPI.app import APIService
+from grpcAPI.build_proto import make_protos, validate_signature_pass
+from grpcAPI.make_method import make_method_async
+from grpcAPI.stream_batch import (
+    batch_options,
+    batch_stream,
+    batch_stream_handler,
+    is_batch_stream,
+)
+from grpcAPI.testclient.contextmock import ContextMock
+
+
+async def positions(
+    count: int, delay: float = 0, fail: Optional[Exception] = None
+) -> AsyncIterator[StringValue]:
+    for i in range(count):
+        if delay:
+            await asyncio.sleep(delay)
+        yield StringValue(value=str(i))
+    if fail is not None:
+        raise fail
+
+
+async def collect(batches: AsyncIterator[Batch[StringValue]]) -> List[List[str]]:
+    return [[m.value for m in batch] async for batch in batches]
+
+
+def stored_count(req: AsyncIterator[Batch[StringValue]]) -> int:
+    return 100
+
+
+@pytest.fixture
+def position_service() -> APIService:
+    service = APIService("positions", package="tracking")
+
+    @service(stream_batch_size=3, stream_batch_linger=None)
+    async def save(
+        req: AsyncIterator[Batch[StringValue]],
+        offset: int = Depends(stored_count),
+    ) -> Int32Value:
+        written = 0
+        async for batch in req:
+            assert isinstance(batch, Batch) and len(batch) <= 3
+            written += len(batch)
+        return Int32Value(value=offset + written)
+
+    @service(stream_batch_size=2)
+    async def ack(
+        req: AsyncIterator[Batch[StringValue]],
+    ) -> AsyncIterator[Int32Value]:
+        async for batch in req:
+            yield Int32Value(value=len(batch))
+
+    return service
+
+
+def test_batch_options() -> None:
+    assert is_batch_stream(AsyncIterator[Batch[StringValue]])
+    assert not is_batch_stream(AsyncIterator[StringValue])
+    assert not is_batch_stream(Batch[StringValue])
+    assert batch_options({}) == (100, 0.05)
+    assert batch_options({"stream_batch_size": 5, "stream_batch_linger": None}) == (
+        5,
+        None,
+    )
+    with pytest.raises(ValueError):
+        batch_options({"stream_batch_size": 0})
+    with pytest.raises(ValueError):
+        batch_options({"stream_batch_linger": -1})
+
+
+@pytest.mark.asyncio
+async def test_batch_by_size() -> None:
+    batches = await collect(batch_stream(positions(7), 3, None))
+    assert batches == [["0", "1", "2"], ["3", "4", "5"], ["6"]]
+    assert await collect(batch_stream(positions(0), 3)) == []
+
+
+@pytest.mark.asyncio
+async def test_batch_by_linger() -> None:
+    # one message every 20ms, a batch is handed over 50ms after its first
+    batches = await collect(batch_stream(positions(6, delay=0.02), 100, 0.05))
+    assert 2 <= len(batches) <= 4
+    assert [v for batch in batches for v in batch] == [str(i) for i in range(6)]
+
+
+@pytest.mark.asyncio
+async def test_batch_stream_error() -> None:
+    batches = batch_stream(positions(4, fail=LookupError("lost")), 3, None)
+    assert [m.value for m in await batches.__anext__()] == ["0", "1", "2"]
+    assert [m.value for m in await batches.__anext__()] == ["3"]
+    with pytest.raises(LookupError):
+        await batches.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_batch_stream_backpressure() -> None:
+    read: List[int] = []
+
+    async def source() -> AsyncIterator[int]:
+        for i in range(100):
+            read.append(i)
+            yield i
+
+    batches = batch_stream(source(), 4, None)
+    assert await batches.__anext__() == [0, 1, 2, 3]
+    await asyncio.sleep(0.01)
+    # reads ahead a batch, plus the message waiting for room
+    assert len(read) <= 4 + 4 + 1
+    await batches.aclose()
+    await asyncio.sleep(0)
+    count = len(read)
+    await asyncio.sleep(0.01)
+    assert len(read) == count
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("server_stream", [False, True])
+async def test_batch_handler_stops_early(server_stream: bool) -> None:
+    read: List[int] = []
+
+    async def source() -> AsyncIterator[int]:
+        for i in range(100):
+            read.append(i)
+            yield i
+
+    async def first(batches: AsyncIterator[Batch[int]], context: object) -> int:
+        return len(await batches.__anext__())
+
+    async def first_stream(
+        batches: AsyncIterator[Batch[int]], context: object
+    ) -> AsyncIterator[int]:
+        yield len(await batches.__anext__())
+
+    handler = batch_stream_handler(
+        first_stream if server_stream else first, server_stream, 4, None
+    )
+    if server_stream:
+        assert [r async for r in handler(source(), ContextMock())] == [4]
+    else:
+        assert await handler(source(), ContextMock()) == 4
+    count = len(read)
+    await asyncio.sleep(0.01)
+    assert len(read) == count
+    assert count <= 4 + 4 + 1
+
+
+def test_batch_method(position_service: APIService) -> None:
+    method = position_service.get_method("save")
+    assert method.is_client_stream and not method.is_server_stream
+    assert method.input_base_type is StringValue
+    assert validate_signature_pass(method.method) == []
+
+    files = {p.qual_name: p for p in make_protos({"tracking": [position_service]})}
+    content = files["tracking/service.proto"].content
+    assert "save(stream google.protobuf.StringValue)" in content
+    assert "ack(stream google.protobuf.StringValue)" in content
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("lazy", [False, True])
+async def test_batch_handler(position_service: APIService, lazy: bool) -> None:
+    save = make_method_async(position_service.get_method("save"), {}, {}, lazy)
+    response = await save(positions(8), ContextMock())
+    assert response.value == 108
+
+    ack = make_method_async(position_service.get_method("ack"), {}, {}, lazy)
+    sizes = [r.value async for r in ack(positions(5), ContextMock())]
+    assert sum(sizes) == 5 and max(sizes) <= 2
+
+
+def test_invalid_options_fail_on_registration() -> None:
+    service = APIService("bad")
+    with pytest.raises(ValueError):
+
+        @service(stream_batch_size=0)
+        async def save(req: AsyncIterator[Batch[StringValue]]) -> Int32Value:
+            return Int32Value()
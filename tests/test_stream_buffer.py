@@ -0,0 +1,246 @@
+import asyncio
+import gc
+import pickle
+from dataclasses import replace
+
+import grpc
+import pytest
+from google.protobuf.wrappers_pb2 import Int32Value
+from typing_extensions import AsyncGenerator, AsyncIterator, List
+
+from grpcAPI import Depends
+from grpcAPI.app import APIService
+from grpcAPI.datatypes import AsyncContext
+from grpcAPI.make_method import make_method_async
+from grpcAPI.stream_buffer import (
+    StreamBufferStats,
+    _Abort,
+    buffer_size,
+    buffered,
+    stream_buffer_stats,
+)
+from grpcAPI.testclient.contextmock import ContextMock
+from tests.conftest import Serve
+
+events: List[str] = []
+
+
+async def cursor() -> AsyncGenerator[str, None]:
+    events.append("open")
+    yield "cursor"
+    events.append("close")
+
+
+@pytest.fixture
+def ride_service() -> APIService:
+    events.clear()
+    service = APIService("rides", package="buffering")
+
+    @service(stream_buffer=4)
+    async def track(
+        req: Int32Value, context: AsyncContext, cur: str = Depends(cursor)
+    ) -> AsyncIterator[Int32Value]:
+        assert cur == "cursor"
+        for i in range(req.value):
+            await asyncio.sleep(0)
+            events.append(f"produced {i}")
+            yield Int32Value(value=i)
+        if req.value == 3:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "lost")
+        if req.value == 4:
+            raise LookupError("lost")
+
+    return service
+
+
+async def numbers(count: int, produced: List[int]) -> AsyncIterator[int]:
+    for i in range(count):
+        produced.append(i)
+        yield i
+
+
+def test_buffer_size(ride_service: APIService) -> None:
+    method = ride_service.get_method("track")
+    assert buffer_size(method) == 4
+    for wrong in (-1, 2.5, True):
+        with pytest.raises(ValueError):
+            buffer_size(replace(method, meta={"stream_buffer": wrong}))
+    plain = replace(method, meta={})
+    assert buffer_size(plain) == 0
+
+
+def test_invalid_buffer_fails_on_registration() -> None:
+    service = APIService("bad")
+    with pytest.raises(ValueError):
+
+        @service(stream_buffer=2)
+        async def get(req: Int32Value) -> Int32Value:
+            return req
+
+
+@pytest.mark.asyncio
+async def test_buffered_runs_ahead() -> None:
+    produced: List[int] = []
+    stats = StreamBufferStats()
+    responses = buffered(numbers(10, produced), 3, stats)
+
+    assert await responses.__anext__() == 0
+    await asyncio.sleep(0.01)
+    # 3 waiting in the queue, one more waiting for room
+    assert produced == [0, 1, 2, 3, 4]
+    assert stats.depth == 3 and stats.producer_waits == 2
+
+    assert [r async for r in responses] == list(range(1, 10))
+    assert stats.as_dict() == {
+        "streams": 0,
+        "depth": 0,
+        "max_depth": 3,
+        "responses": 10,
+        "producer_waits": stats.producer_waits,
+        "sender_waits": stats.sender_waits,
+    }
+
+
+@pytest.mark.asyncio
+async def test_buffered_error() -> None:
+    async def failing() -> AsyncIterator[int]:
+        yield 1
+        yield 2
+        raise LookupError("lost")
+
+    responses = buffered(failing(), 5)
+    assert await responses.__anext__() == 1
+    assert await responses.__anext__() == 2
+    with pytest.raises(LookupError):
+        await responses.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_buffered_close() -> None:
+    closed: List[bool] = []
+
+    async def endless() -> AsyncIterator[int]:
+        try:
+            i = 0
+            while True:
+                yield i
+                i += 1
+        finally:
+            closed.append(True)
+
+    stats = StreamBufferStats()
+    responses = buffered(endless(), 2, stats)
+    assert await responses.__anext__() == 0
+    await responses.aclose()
+    assert closed == [True]
+    assert stats.streams == 0 and stats.depth == 0
+
+
+@pytest.mark.asyncio
+async def test_buffered_cancel() -> None:
+    closed: List[bool] = []
+
+    async def slow() -> AsyncIterator[int]:
+        try:
+            yield 0
+            await asyncio.sleep(10)
+            yield 1
+        finally:
+            closed.append(True)
+
+    async def consume() -> None:
+        async for _ in buffered(slow(), 2):
+            pass
+
+    task = asyncio.ensure_future(consume())
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert closed == [True]
+
+
+@pytest.mark.asyncio
+async def test_producer_cancelled() -> None:
+    produced: List[int] = []
+    responses = buffered(numbers(10, produced), 2)
+    assert await responses.__anext__() == 0
+    for task in asyncio.all_tasks():
+        if task is not asyncio.current_task():
+            task.cancel()
+    # what was queued is sent, then the stream ends cancelled
+    assert [r async for r in _until_cancelled(responses)] == [1]
+
+
+async def _until_cancelled(responses: AsyncIterator[int]) -> AsyncIterator[int]:
+    try:
+        async for response in responses:
+            yield response
+    except asyncio.CancelledError:
+        pass
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("lazy", [False, True])
+async def test_buffered_handler(ride_service: APIService, lazy: bool) -> None:
+    method = ride_service.get_method("track")
+    handler = make_method_async(method, {}, {}, lazy=lazy)
+    assert hasattr(handler, "lazy_runner") == lazy
+
+    responses = [r.value async for r in handler(Int32Value(value=6), ContextMock())]
+    assert responses == list(range(6))
+    # the dependency is closed once the stream is over
+    assert events[0] == "open" and events[-1] == "close"
+    stats = stream_buffer_stats()["/buffering.rides/track"]
+    assert stats.streams == 0 and stats.depth == 0 and stats.max_depth <= 4
+
+    context = ContextMock()
+    with pytest.raises(RuntimeError):
+        async for _ in handler(Int32Value(value=3), context):
+            pass
+    context.tracker.abort.assert_called_once()
+
+
+def test_stats_dropped_with_handler(ride_service: APIService) -> None:
+    handler = make_method_async(ride_service.get_method("track"), {}, {})
+    assert "/buffering.rides/track" in stream_buffer_stats()
+    del handler
+    gc.collect()
+    assert "/buffering.rides/track" not in stream_buffer_stats()
+
+
+def test_abort_pickles() -> None:
+    abort = pickle.loads(pickle.dumps(_Abort((grpc.StatusCode.NOT_FOUND,), {})))
+    assert abort.args == ((grpc.StatusCode.NOT_FOUND,), {})
+
+
+@pytest.mark.asyncio
+async def test_buffered_handler_exception(ride_service: APIService) -> None:
+    method = ride_service.get_method("track")
+    handled: List[str] = []
+
+    def handle_lookup(e: Exception, context: AsyncContext) -> None:
+        handled.append(str(e))
+
+    handler = make_method_async(method, {}, {LookupError: handle_lookup})
+    responses = [r.value async for r in handler(Int32Value(value=4), ContextMock())]
+    assert responses == [0, 1, 2, 3]
+    assert handled == ["lost"]
+
+
+@pytest.mark.asyncio
+async def test_buffered_served(ride_service: APIService, serve: Serve) -> None:
+    async with serve(ride_service) as address:
+        async with grpc.aio.insecure_channel(address) as channel:
+            call = channel.unary_stream(
+                "/buffering.rides/track",
+                request_serializer=Int32Value.SerializeToString,
+                response_deserializer=Int32Value.FromString,
+            )
+            responses = [r.value async for r in call(Int32Value(value=20))]
+            assert responses == list(range(20))
+
+            with pytest.raises(grpc.aio.AioRpcError) as e:
+                async for _ in call(Int32Value(value=3)):
+                    pass
+            assert e.value.code() == grpc.StatusCode.NOT_FOUND
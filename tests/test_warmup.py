@@ -0,0 +1,96 @@
+from unittest.mock import MagicMock
+
+import pytest
+from google.protobuf.wrappers_pb2 import StringValue
+from typing_extensions import Any, AsyncIterator, Callable, Dict, List
+
+from grpcAPI.add_to_server import add_to_server
+from grpcAPI.app import APIService, App
+from grpcAPI.server import ServerWrapper
+from grpcAPI.warmup import MethodKey, run_warmup
+
+
+@pytest.fixture
+def received() -> List[str]:
+    return []
+
+
+@pytest.fixture
+def warm_app(received: List[str]) -> App:
+    app = App()
+    service = APIService("warm", package="pack")
+
+    @service(warmup=[StringValue(value="a"), StringValue(value="b")])
+    async def unary(req: StringValue) -> StringValue:
+        received.append(f"unary:{req.value}")
+        return req
+
+    @service(warmup=StringValue(value="c"))
+    async def server_stream(req: StringValue) -> AsyncIterator[StringValue]:
+        received.append(f"server_stream:{req.value}")
+        yield req
+
+    @service(warmup=[[StringValue(value="d"), StringValue(value="e")]])
+    async def client_stream(reqs: AsyncIterator[StringValue]) -> StringValue:
+        async for req in reqs:
+            received.append(f"client_stream:{req.value}")
+        return StringValue()
+
+    @service
+    async def cold(req: StringValue) -> StringValue:
+        received.append("cold")
+        return req
+
+    app.add_service(service)
+    return app
+
+
+def server_handlers(app: App) -> Dict[MethodKey, Callable[..., Any]]:
+    server = ServerWrapper(server=MagicMock())
+    handlers: Dict[MethodKey, Callable[..., Any]] = {}
+    for service in app.service_list:
+        for name, handler in add_to_server(service, server, {}, {}, True).items():
+            handlers[(service.package, service.name, name)] = handler
+    return handlers
+
+
+@pytest.mark.asyncio
+async def test_warmup_requests(warm_app: App, received: List[str]) -> None:
+    durations = await run_warmup(warm_app, server_handlers(warm_app))
+
+    assert received == [
+        "unary:a",
+        "unary:b",
+        "server_stream:c",
+        "client_stream:d",
+        "client_stream:e",
+    ]
+    assert list(durations) == [
+        "pack.warm.unary[0]",
+        "pack.warm.unary[1]",
+        "pack.warm.server_stream[0]",
+        "pack.warm.client_stream[0]",
+    ]
+    assert all(d is not None and d >= 0 for d in durations.values())
+
+
+@pytest.mark.asyncio
+async def test_warmup_functions(warm_app: App, received: List[str]) -> None:
+    @warm_app.warmup
+    def sync_warmup() -> None:
+        received.append("sync")
+
+    @warm_app.warmup
+    async def async_warmup() -> None:
+        received.append("async")
+
+    @warm_app.warmup
+    async def failing() -> None:
+        raise RuntimeError("cache down")
+
+    durations = await run_warmup(warm_app, {})
+
+    assert received == ["sync", "async"]
+    assert list(durations) == ["sync_warmup", "async_warmup", "failing"]
+    assert durations["sync_warmup"] is not None
+    assert durations["failing"] is None